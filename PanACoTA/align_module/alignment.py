@@ -48,10 +48,10 @@ import os
 import sys
 import logging
 import multiprocessing
-import progressbar
 import threading
 
 from PanACoTA import utils
+from PanACoTA import utils_fasta
 
 main_logger = logging.getLogger("align.alignment")
 
@@ -85,6 +85,7 @@ def align_all_families(prefix, all_fams, ngenomes, dname, quiet, threads):
     bool
         True if everything went well, False if there was a problem in at least 1 family.
     """
+    import progressbar
     main_logger.info(("Starting alignment of all families: protein alignment, "
                       "back-translation to nucleotides, and add missing genomes in the family"))
     nbfam = len(all_fams)
@@ -520,8 +521,8 @@ def check_extractions(num_fam, miss_file, prt_file, gen_file, ngenomes, logger):
         logger.error(f"fam {num_fam}: no file with proteins extracted "
                      f"('{prt_file}'). Cannot align.")
         sys.exit(1)
-    nbfprt = utils.grep(prt_file, "^>", counts=True)
-    nbfgen = utils.grep(gen_file, "^>", counts=True)
+    nbfprt = utils_fasta.count_records(prt_file)
+    nbfgen = utils_fasta.count_records(gen_file)
     if nbmiss + nbfprt != ngenomes:
         logger.error(("fam {}: wrong sum of missing genomes ({}) and prt extracted ({}) for {} "
                       "genomes in the dataset.").format(num_fam, nbmiss, nbfprt, ngenomes))
@@ -641,7 +642,7 @@ def check_nb_seqs(alnfile, nbfal, logger, message=""):
         - False if not same number of sequences
         - nbseqs in align file if found among values in 'nbfal'
     """
-    nbseqs = utils.grep(alnfile, "^>", counts=True)
+    nbseqs = utils_fasta.count_records(alnfile)
     if isinstance(nbfal, int):
         nbfal = [nbfal]
     for num in nbfal:
@@ -676,19 +677,12 @@ def check_lens(aln_file, num_fam, logger):
     """
     nb_gen = 0
     all_sums = set()
-    with open(aln_file, "r") as btrf:
-        cur_sum = 0
-        start = True
-        for line in btrf:
-            if line.startswith(">"):
-                nb_gen += 1
-                if not start:
-                    all_sums.add(cur_sum)
-                    cur_sum = 0
-            else:
-                start = False
-                cur_sum += len(line.strip())
-        all_sums.add(cur_sum)
+    for record in utils_fasta.read_records(aln_file):
+        nb_gen += 1
+        all_sums.add(len(record))
+    # Empty alignment file
+    if not all_sums:
+        all_sums.add(0)
     if len(all_sums) > 1:
         logger.error(f"Nucleic alignments for family {num_fam} (in {aln_file}) do not all have the same "
                      f"length. Lengths found are: {all_sums}\n")
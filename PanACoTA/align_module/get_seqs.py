@@ -36,9 +36,9 @@
 import sys
 import os
 import logging
-import progressbar
 
 from PanACoTA import utils
+from PanACoTA import utils_fasta
 
 logger = logging.getLogger("align.extract")
 
@@ -65,6 +65,7 @@ def get_all_seqs(all_genomes, dname, dbpath, listdir, aldir, all_fams, quiet):
     quiet : bool
         True if nothin must be written to stdout/stderr, False otherwise
     """
+    import progressbar
     # Get list of files not already existing
     files_todo = check_existing_extract(all_fams, aldir, dname)
     if len(files_todo) == 0:
@@ -91,8 +92,9 @@ def get_all_seqs(all_genomes, dname, dbpath, listdir, aldir, all_fams, quiet):
         ge_gen = os.path.join(listdir, dname + "-getEntry_gen_" + genome + ".txt")
         ge_prt = os.path.join(listdir, dname + "-getEntry_prt_" + genome + ".txt")
         logger.details(f"Extracting proteins and genes from {genome}")
-        prtdb = os.path.join(dbpath, "Proteins", genome + ".prt")
-        gendb = os.path.join(dbpath, "Genes", genome + ".gen")
+        # Proteins and genes files may have been compressed by 'annotate --compress'
+        prtdb = utils_fasta.find_file(os.path.join(dbpath, "Proteins", genome + ".prt"))
+        gendb = utils_fasta.find_file(os.path.join(dbpath, "Genes", genome + ".gen"))
         get_genome_seqs(prtdb, ge_prt, files_todo)
         get_genome_seqs(gendb, ge_gen, files_todo)
         if not quiet:
@@ -163,7 +165,7 @@ def get_genome_seqs(fasta, tabfile, files_todo, outfile=None):
     Parameters
     ----------
     fasta : str
-        path to fasta file from which sequences must be extracted
+        path to fasta file from which sequences must be extracted (can be compressed)
     tabfile : str
         path to the tab file containing the names of sequences to extract
     files_todo : list
@@ -183,10 +185,10 @@ def get_genome_seqs(fasta, tabfile, files_todo, outfile=None):
                            "to re-extract all sequences, use option -F (or "
                            "--force)".format(outfile))
             return
-        with open(fasta, "r") as fasf, open(outfile, "a") as outf:
+        with utils_fasta.open_read(fasta) as fasf, utils_fasta.open_write(outfile, append=True) as outf:
             extract_sequences(to_extract, fasf, outf=outf)
     else:
-        with open(fasta, "r") as fasf:
+        with utils_fasta.open_read(fasta) as fasf:
             extract_sequences(to_extract, fasf, files_todo=files_todo)
 
 
@@ -236,54 +238,46 @@ def extract_sequences(to_extract, fasf, files_todo=None, outf=None):
     to_extract : dict or []
         {sequence_to_extract: file_to_which_it_will_be_extracted} or list of sequences to
         extract, all in a same outfile (name must be given in 'outf')
-    fasf : _io.TextIO
-        open file containing sequences in multi-fasta format
+    fasf : _io.TextIO or _io.BufferedReader
+        open file containing sequences in multi-fasta format (text or binary mode)
     files_todo : list or None
         list of files which must be generated (prt and gen files). Others
         already exist, so ignore them.
-    outf : _io.TextIO or None
+    outf : _io.TextIO or _io.BufferedWriter or None
         If an outfile is given (not None), and 'to_extract' is a dict, only its keys will be
         considered, and all these sequences will be extracted to 'outfile' (if 'to_extract' is a
         list, will extract all sequences of this list). Otherwise, if None,
         each sequence will be extracted to its corresponding value in 'to_extract'.
     """
 
-    # Create optimized index for requests
     if files_todo is None:
         files_todo = []
     files_todo = frozenset(files_todo)
+    # Names are compared to the bytes read in fasta file
     if type(to_extract) == list:
-        to_extract = frozenset(to_extract)
-    # State machine variables
-    previous_fp = None
-
-    for line in fasf:
-        if line[0] == '>':
-            # Close previous file if needed
-            if outf is None and previous_fp is not None:
-                previous_fp.close()
-            previous_fp = None
-
-            # Extract sequence name
-            last_char = line.find(' ')
-            if last_char == -1:
-                last_char = len(line)
-            seq = line[1:last_char].strip()
-
-            # Seq is part of sequences to extract
-            if seq in to_extract:
-                # Open the right file
-                previous_fp = outf
-                if previous_fp is None:
-                    out = to_extract[seq]
-                    if out in files_todo:
-                        previous_fp = open(out, "a")
-                    else:
-                        print(f"Sequence {seq} not written because no output file specified", file=sys.stderr)
-
-        # Write the line content if the file pointer is opened
-        if previous_fp is not None:
-            previous_fp.write(line)
-
-    if outf is None and previous_fp is not None:
-        previous_fp.close()
+        to_extract = {name.encode(): None for name in to_extract}
+    else:
+        to_extract = {name.encode(): out for name, out in to_extract.items()}
+    if outf is not None:
+        outf = utils_fasta.binary(outf)
+    # Records to extract to each output file, written all at once at the end, instead of
+    # opening the output file for each record
+    extracted = {}
+    for record in utils_fasta.read_records(fasf):
+        # Sequence name: header until the first space
+        seq = record.header.split(b" ", 1)[0].strip()
+        # Seq is not part of sequences to extract
+        if seq not in to_extract:
+            continue
+        if outf is not None:
+            outf.write(record.raw)
+            continue
+        out = to_extract[seq]
+        if out in files_todo:
+            extracted.setdefault(out, []).append(record.raw)
+        else:
+            print(f"Sequence {seq.decode()} not written because no output file specified",
+                  file=sys.stderr)
+    for out, records in extracted.items():
+        with utils_fasta.open_write(out, append=True) as outfp:
+            outfp.write(b"".join(records))
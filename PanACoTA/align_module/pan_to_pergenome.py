@@ -63,6 +63,8 @@ import os
 import sys
 import logging
 
+from PanACoTA import utils_pangenome as utilsp
+
 logger = logging.getLogger("align.pan_to_pergenome")
 
 
@@ -148,6 +150,8 @@ def proteins_per_strain(persgen, all_genomes):
     ----------
     persgen : str
         File containing persistent genome
+    all_genomes : list
+        list of all genome names
 
     Returns
     -------
@@ -158,38 +162,20 @@ def proteins_per_strain(persgen, all_genomes):
         * several: dict, {fam_num: set(genomes having several members in fam)}
     """
     logger.info("Getting all persistent proteins and classify by strain.")
-    all_genomes = frozenset(all_genomes)
+    pan = utilsp.Pangenome.from_file(persgen, all_genomes)
     all_prots = {}  # {strain: {member: fam_num}}
     fam_genomes = {}  # {fam_num: set(genomes having a member in fam)}
     several = {}  # {fam_num: set(genomes having several members in fam)}
-    with open(persgen, "r") as pgf:
-        for line in pgf:
-            fam_num = line.split()[0]
-            members = line.strip().split()[1:]
-            fam_genomes[fam_num] = set()
-            several[fam_num] = set()
-            for mem in members:
-                # if format is ESCO.1512.00001.i0002_12124, strain is 3 first fields
-                # separated by '.'
-                if "." in mem and len(mem.split(".")) >= 3:
-                    strain = ".".join(mem.split(".")[:3])
-                    if strain not in all_genomes:
-                        strain = "_".join(mem.split("_")[:-1])
-                # if format is not like this, it must be something_00001:
-                else:
-                    strain = "_".join(mem.split("_")[:-1])
-                # if strain not already in fam_genomes, add it
-                if strain not in fam_genomes[fam_num]:
-                    fam_genomes[fam_num].add(strain)
-                # If strain already in fam_genomes, it has several members: add it to several
-                elif strain not in several[fam_num]:
-                    several[fam_num].add(strain)
-                if strain not in all_prots:
-                    all_prots[strain] = {}
-                if mem in all_prots[strain]:
-                    logger.warning((" problem: {} already exists, in family {}. Conflict with "
-                                    "family {}.").format(mem, all_prots[strain][mem], fam_num))
-                all_prots[strain][mem] = fam_num
+    for num, fam_num in enumerate(pan.fam_nums):
+        counts = pan.genome_counts(num)
+        fam_genomes[fam_num] = {pan.genomes[gen] for gen in counts.nonzero()[0].tolist()}
+        several[fam_num] = {pan.genomes[gen] for gen in (counts > 1).nonzero()[0].tolist()}
+        for mem, gen in zip(pan.family(num), pan.family_genomes(num).tolist()):
+            prots = all_prots.setdefault(pan.genomes[gen], {})
+            if mem in prots:
+                logger.warning((" problem: {} already exists, in family {}. Conflict with "
+                                "family {}.").format(mem, prots[mem], fam_num))
+            prots[mem] = fam_num
     return all_prots, fam_genomes, several
 
 
@@ -44,9 +44,9 @@ March 2017
 import os
 import sys
 import logging
-import progressbar
 import multiprocessing
 from PanACoTA import utils
+from PanACoTA import utils_fasta
 
 logger = logging.getLogger("align.post")
 
@@ -177,6 +177,7 @@ def launch_group_by_genome(all_genomes, all_alns, status, outfile, dname, type_a
         - True if everything went well or was already done
         - False if error occurred in at least one step
     """
+    import progressbar
     # Status = Done means that we just did the concatenation. So, if grouped by genome
     # file already exists, remove it.
     if status == "Done":
@@ -254,25 +255,17 @@ def read_alignments(all_alns, all_genomes):
         - None if problem with a protein for which we don't find the genome
     """
     sequences = {}  # name: [ordered list of sequences]
-    genome = None
-    seq = ""
-    with open(all_alns, 'r') as alnf:
-        for line in alnf:
-            if line.startswith(">"):
-                # If new header, write previous protein name/sequence to 'sequences'
-                if genome and seq:
-                    sequences[genome].append(seq)
-                    seq = ""
-                # Get new genome header
-                genome = get_genome(line, all_genomes)
-                if not genome:
-                    return None
-                if genome not in sequences:
-                    sequences[genome] = []
-            else:
-                seq += line.strip()
-    if genome and seq:
-        sequences[genome].append(seq)
+    index = genome_index(all_genomes)
+    for record in utils_fasta.read_records(all_alns):
+        # Get genome of this protein
+        genome = get_genome(">" + record.header.decode(), all_genomes, index)
+        if not genome:
+            return None
+        if genome not in sequences:
+            sequences[genome] = []
+        seq = record.seq
+        if seq:
+            sequences[genome].append(seq.decode())
     per_genome = [len(seq) for seq in sequences.values()]
     if len(set(per_genome)) != 1:
         logger.error("Problems occurred while grouping alignments by genome: all genomes "
@@ -303,7 +296,28 @@ def write_groups(outfile, sequences):
             outf.write("".join(sequences[genome]) + "\n")
 
 
-def get_genome(header, all_genomes):
+def genome_index(all_genomes):
+    """
+    Index genome names, to find the genome of a header without comparing it to all genome
+    names (see `get_genome`)
+
+    Parameters
+    ----------
+    all_genomes : []
+        list of all genomes
+
+    Returns
+    -------
+    tuple
+        ({genome: rank in all_genomes}, sorted lengths of genome names)
+    """
+    ranks = {}
+    for rank, genome in enumerate(all_genomes):
+        ranks.setdefault(genome, rank)
+    return ranks, sorted({len(genome) for genome in ranks})
+
+
+def get_genome(header, all_genomes, index=None):
     """
     Find to which genome belongs 'header'
 
@@ -313,6 +327,9 @@ def get_genome(header, all_genomes):
         header read in alignment file
     all_genomes : []
         list of all genomes
+    index : tuple or None
+        index of all_genomes (see `genome_index`), to give when finding the genome of
+        several headers. None to build it
 
     Returns
     -------
@@ -324,12 +341,17 @@ def get_genome(header, all_genomes):
     # Ex: in gembase complete DB: >TOTO.0215.00002.i006_00065 is from genome TOTO.0215.00002
     # So, genome name cannot be deduced directly from header. But it is always included in header
     header = header.split(">")[1].split()[0]
-
-    for genome in all_genomes:
-        if header.startswith(genome):
-            # header should start with the genome name. Nothing before it.
-            # Ex: >86KG_12345 is from genome 86KG. >6KG_12345 is from genome 6KG, not 86KG
-            return genome
+    if index is None:
+        index = genome_index(all_genomes)
+    ranks, lengths = index
+    # header should start with the genome name. Nothing before it.
+    # Ex: >86KG_12345 is from genome 86KG. >6KG_12345 is from genome 6KG, not 86KG
+    # Only look for the prefixes of header having the length of a genome name. If several
+    # genome names are prefixes, keep the first one in all_genomes
+    found = [header[:length] for length in lengths
+             if length <= len(header) and header[:length] in ranks]
+    if found:
+        return min(found, key=ranks.__getitem__)
     logger.error((f"Protein {header} does not correspond to any genome name "
                   f"given... {all_genomes}"))
     return None
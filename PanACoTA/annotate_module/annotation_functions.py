@@ -49,16 +49,26 @@ import logging
 import subprocess
 import shlex
 import multiprocessing
-import progressbar
 import threading
 
 import PanACoTA.utils as utils
+from PanACoTA import utils_fasta
 
 logger = logging.getLogger('annotate.run_annotation_all')
 
+# Memory (in bytes) used to annotate 1 base of a genome, used until annotation of a genome
+# was observed
+PROKKA_MEM_PER_BASE = 250
+PRODIGAL_MEM_PER_BASE = 30
+# Factor applied to the memory estimated for a genome, to keep a safety margin
+MEM_MARGIN = 1.2
+# Extensions of the files written by prokka/prodigal, and used by the format step
+PROKKA_FILES = [".fna", ".tbl", ".gff", ".ffn", ".faa"]
+PRODIGAL_FILES = [".faa", ".ffn", ".gff"]
+
 
 def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only=False,
-                       small=False, quiet=False):
+                       small=False, quiet=False, max_mem=None, scratch_dir=None):
     """
     For each genome in genomes, run prokka (or only prodigal) to annotate the genome.
 
@@ -84,12 +94,21 @@ def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only
         True -> use -p meta option with prodigal. Do not use training
     quiet : bool
         True if nothing must be written to stderr/stdout, False otherwise
+    max_mem : int or None
+        maximum memory (in bytes) that can be used by all prokka/prodigal jobs running at the
+        same time. None if no memory limit (only the number of threads limits the number
+        of jobs running in parallel)
+    scratch_dir : str or None
+        directory (on a local disk or tmpfs) where prokka/prodigal must run. Only the files
+        needed by the format step, and the logs, are then moved to annot_folder. None to run
+        prokka/prodigal directly in annot_folder
 
     Returns
     -------
     dict
         {genome: boolean} -> with True if prokka/prodigal ran well, False otherwise.
     """
+    import progressbar
 
     # Update information according to annotation soft used and write message
     if prodigal_only:
@@ -101,6 +120,13 @@ def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only
         run_annot = run_prokka
         main_logger = logging.getLogger("annotate.prokka")
     main_logger.info(message)
+    # Run each annotation in the scratch directory
+    if scratch_dir:
+        import functools
+        main_logger.info(f"Annotation will run in {scratch_dir} before moving results to "
+                         f"{annot_folder}")
+        os.makedirs(scratch_dir, exist_ok=True)
+        run_annot = functools.partial(run_in_scratch, run_annot, prodigal_only, scratch_dir)
     # Get total number of genomes to annotate, used to show annotation progress
     nbgen = len(genomes)
     bar = None
@@ -146,7 +172,12 @@ def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only
             cores_annot = 2
         pool_size = int(threads / cores_annot)
     #  Create pool with a given size (=number of tasks to be launched in parallel)
-    pool = multiprocessing.Pool(pool_size)
+    # With a memory limit, each process annotates only 1 genome: the peak memory of its
+    # children is then the one of this genome annotation.
+    if max_mem:
+        pool = multiprocessing.Pool(pool_size, maxtasksperchild=1)
+    else:
+        pool = multiprocessing.Pool(pool_size)
     # Create a Queue to put logs from processes, and handle them after from a single thread
     m = multiprocessing.Manager()
     q = m.Queue()
@@ -155,6 +186,25 @@ def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only
     arguments = [(genomes[g][2], annot_folder, cores_annot, genomes[g][0],
                   force, genomes[g][4], gpath_train, q)
                  for g in sorted(genomes)]
+    if max_mem:
+        main_logger.info(f"Annotation jobs will use at most {max_mem / 1e9:.2f} GB of memory "
+                         "in total.")
+        try:
+            lp = threading.Thread(target=utils.logger_thread, args=(q,))
+            lp.start()
+            gsizes = [genomes[g][3] for g in sorted(genomes)]
+            final = run_mem_limited(pool, run_annot, arguments, gsizes, pool_size, max_mem,
+                                    prodigal_only, bar)
+            pool.close()
+            pool.join()
+            q.put(None)
+            lp.join()
+        except Exception as excp:  # pragma: no cover
+            pool.terminate()
+            main_logger.error(excp)
+            sys.exit(1)
+        final = {genome: res for genome, res in zip(sorted(genomes), final)}
+        return final
     try:
         # Start pool (run 'run_annot' n each set of arguments)
         final = pool.map_async(run_annot, arguments, chunksize=1)
@@ -210,6 +260,229 @@ def run_annotation_all(genomes, threads, force, annot_folder, fgn, prodigal_only
     return final
 
 
+def run_mem_limited(pool, run_annot, arguments, gsizes, pool_size, max_mem, prodigal_only,
+                    bar=None):
+    """
+    Run the annotation of all genomes in the given pool, without exceeding the memory limit.
+
+    The memory needed by each genome is estimated from its size. A genome is annotated only
+    if its estimated memory fits in what is left from 'max_mem' by the jobs already running.
+    If it does not fit, a smaller genome can be annotated instead. If it does not fit even
+    when no other job is running, it is annotated alone.
+    Each time a genome is annotated, the memory used by prokka/prodigal is measured, and used
+    to estimate the memory needed by the next genomes. Only the peak of the largest process
+    run by prokka is measured: as prokka runs up to 'threads' tools at the same time, this
+    peak is counted once per thread.
+
+    Parameters
+    ----------
+    pool : multiprocessing.pool.Pool
+        pool of processes used to annotate genomes
+    run_annot : function
+        function annotating 1 genome (run_prokka or run_prodigal)
+    arguments : list
+        list of arguments to give to 'run_annot', 1 tuple per genome
+    gsizes : list
+        size of each genome, in the same order as 'arguments'
+    pool_size : int
+        maximum number of genomes annotated at the same time
+    max_mem : int
+        maximum memory (in bytes) used by all jobs running at the same time
+    prodigal_only : bool
+        True if only prodigal runs, False if prokka runs
+    bar : progressbar.ProgressBar or None
+        progressbar to update each time a genome is annotated. None if quiet
+
+    Returns
+    -------
+    list
+        list of booleans, True if the annotation of the genome went well, False otherwise.
+        In the same order as 'arguments'
+    """
+    import time
+
+    # Memory used per base, before having observed any annotation
+    if prodigal_only:
+        mem_per_base = PRODIGAL_MEM_PER_BASE
+    else:
+        mem_per_base = PROKKA_MEM_PER_BASE
+    # Highest memory per base observed so far
+    observed = 0
+    final = [False] * len(arguments)
+    todo = list(range(len(arguments)))
+    # {index in arguments: (multiprocessing.pool.AsyncResult, estimated memory)}
+    running = {}
+    nbdone = 0
+    while todo or running:
+        # Start the jobs whose memory fits in the memory left
+        used_mem = sum(est for _, est in running.values())
+        for num in list(todo):
+            if len(running) >= pool_size:
+                break
+            est_mem = estimate_mem(gsizes[num], mem_per_base)
+            if running and used_mem + est_mem > max_mem:
+                continue
+            if est_mem > max_mem:
+                logger.warning(f"Annotating {arguments[num][3]} may need about "
+                               f"{est_mem / 1e9:.2f} GB, more than the given memory limit. "
+                               "It is annotated alone.")
+            running[num] = (pool.apply_async(run_annot_peak_mem, ((run_annot, arguments[num]),)),
+                            est_mem)
+            used_mem += est_mem
+            todo.remove(num)
+        # Get results of finished jobs, and learn from the memory they used
+        for num, (res, _) in list(running.items()):
+            if not res.ready():
+                continue
+            final[num], peak_mem = res.get()
+            del running[num]
+            nbdone += 1
+            # Peak of the largest process only: prokka can run 1 process per thread
+            if not prodigal_only:
+                peak_mem *= max(arguments[num][2], 1)
+            # peak_mem is 0 if annotation was not run (results already existing)
+            if peak_mem and gsizes[num]:
+                observed = max(observed, peak_mem / gsizes[num])
+                mem_per_base = observed
+        if bar:
+            # Start progressbar with 0% instead of N/A%
+            bar.update(nbdone if nbdone else 0.0000001)
+        time.sleep(0.05)
+    if bar:
+        bar.finish()
+    return final
+
+
+def estimate_mem(gsize, mem_per_base):
+    """
+    Estimate the memory needed to annotate a genome, with a safety margin.
+
+    Parameters
+    ----------
+    gsize : int
+        size of the genome (number of bases)
+    mem_per_base : float
+        memory used per base (in bytes)
+
+    Returns
+    -------
+    int
+        estimated memory (in bytes)
+    """
+    return int(gsize * mem_per_base * MEM_MARGIN)
+
+
+def run_annot_peak_mem(args):
+    """
+    Annotate a genome, and get the peak memory used by the annotation software.
+
+    Parameters
+    ----------
+    args : tuple
+        (run_annot, arguments) with run_annot the function annotating the genome
+        (run_prokka or run_prodigal), and arguments the arguments to give to this function
+
+    Returns
+    -------
+    tuple
+        (ok, peak_mem) with ok the value returned by run_annot, and peak_mem the maximum
+        memory (in bytes) used by a child process of the current process. The process must
+        only annotate this genome so that peak_mem corresponds to this genome only.
+        It is the peak of the largest process run for this genome, not the sum of the
+        processes running at the same time (see `utils.children_peak_mem`).
+    """
+    run_annot, arguments = args
+    ok = run_annot(arguments)
+    return ok, utils.children_peak_mem()
+
+
+def run_in_scratch(run_annot, prodigal_only, scratch_dir, arguments):
+    """
+    Run prokka/prodigal for the given genome in a new folder of the scratch directory, and
+    move the files needed by the format step, and the logs, to the annotation folder.
+
+    If the annotation result folder already exists in the annotation folder (and not force),
+    prokka/prodigal is not run again, so there is nothing to do in the scratch directory.
+
+    Parameters
+    ----------
+    run_annot : function
+        function annotating 1 genome (run_prokka or run_prodigal)
+    prodigal_only : bool
+        True if only prodigal runs, False if prokka runs
+    scratch_dir : str
+        directory where the scratch folder of this genome is created
+    arguments : tuple
+        (gpath, annot_folder, cores_annot, name, force, nbcont, small, q): arguments given
+        to run_annot (see run_prokka and run_prodigal)
+
+    Returns
+    -------
+    boolean
+        value returned by run_annot: True if eveything went well, False otherwise.
+    """
+    import tempfile
+
+    gpath, annot_folder, _, _, force, _, _, _ = arguments
+    g_ori_name = os.path.basename(gpath)
+    if prodigal_only:
+        res_name = g_ori_name + "-prodigalRes"
+        log_names = [g_ori_name + "-prodigal.log", g_ori_name + "-prodigal.log.err"]
+        extensions = PRODIGAL_FILES
+    else:
+        res_name = g_ori_name + "-prokkaRes"
+        log_names = [g_ori_name + "-prokka.log"]
+        extensions = PROKKA_FILES
+    res_dir = os.path.join(annot_folder, res_name)
+    if os.path.isdir(res_dir) and not force:
+        return run_annot(arguments)
+    job_dir = tempfile.mkdtemp(prefix=g_ori_name + "-", dir=scratch_dir)
+    try:
+        ok = run_annot((gpath, job_dir) + tuple(arguments[2:]))
+        # Move logs, even if annotation failed, so that user can see what happened
+        for log_name in log_names:
+            if os.path.isfile(os.path.join(job_dir, log_name)):
+                move_atomic(os.path.join(job_dir, log_name), os.path.join(annot_folder, log_name))
+        if ok:
+            # Copy needed files to a tmp folder next to the final one, and rename it once all
+            # files are there: the result folder is complete, or does not exist.
+            part_dir = tempfile.mkdtemp(prefix="." + res_name + "-", dir=annot_folder)
+            os.chmod(part_dir, 0o755)
+            try:
+                for filename in os.listdir(os.path.join(job_dir, res_name)):
+                    if os.path.splitext(filename)[1] in extensions:
+                        shutil.move(os.path.join(job_dir, res_name, filename),
+                                    os.path.join(part_dir, filename))
+                if os.path.isdir(res_dir):
+                    shutil.rmtree(res_dir)
+                os.rename(part_dir, res_dir)
+            except OSError as err:
+                shutil.rmtree(part_dir, ignore_errors=True)
+                logging.getLogger("annotate.run_in_scratch").error(
+                    f"Could not move results of {g_ori_name} from {job_dir} to {res_dir}: {err}")
+                return False
+        return ok
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def move_atomic(src, dest):
+    """
+    Move file 'src' to 'dest', which can be on another filesystem. 'dest' appears with
+    its whole content, or not at all.
+
+    Parameters
+    ----------
+    src : str
+        path to the file to move
+    dest : str
+        path where the file must be moved
+    """
+    part_file = dest + ".part"
+    shutil.move(src, part_file)
+    os.replace(part_file, dest)
+
+
 def prodigal_train(gpath, annot_folder):
     """
     Use prodigal training mode.
@@ -253,6 +526,46 @@ def prodigal_train(gpath, annot_folder):
         return ""
 
 
+def pyrodigal_train(gpath, annot_folder):
+    """
+    Train pyrodigal on the first genome ('gpath'), and write the training information to
+    'genome'.trn (same format as prodigal training file), used to call genes of all
+    sequences.
+
+    Parameters
+    ----------
+    gpath : str
+        path to genome to train on
+    annot_folder : str
+        path to folder where the train file will be saved
+
+    Returns
+    -------
+    str
+        path and name of train file (will be used to annotate all next genomes)
+        If problem, returns empty string
+    """
+    import pyrodigal
+
+    logger.info(f"pyrodigal will train using {gpath}")
+    gname = os.path.basename(gpath)
+    gpath_train = os.path.join(annot_folder, gname + ".trn")
+    if os.path.isfile(gpath_train):
+        logger.info(f"A training file already exists ({gpath_train}). "
+                     "It will be used to annotate all genomes.")
+        return gpath_train
+    try:
+        seqs = [record.seq for record in utils_fasta.read_records(gpath)]
+        training_info = pyrodigal.GeneFinder().train(*seqs)
+    except (OSError, ValueError, RuntimeError) as err:
+        logger.error(f"Error while trying to train pyrodigal on {gname}: {err}")
+        return ""
+    with open(gpath_train, "wb") as trnf:
+        training_info.dump(trnf)
+    logger.log(utils.detail_lvl(), f"End training on {gpath}")
+    return gpath_train
+
+
 def run_prokka(arguments):
     """
     Run prokka for the given genome.
@@ -56,10 +56,17 @@ import glob
 import logging
 
 import PanACoTA.utils as utils
+from PanACoTA import utils_fasta
 from PanACoTA.annotate_module import general_format_functions as gfunc
 
 logger = logging.getLogger("annotate.prodigal_format")
 
+# 'source' column of gff lines: pyrodigal is a port of this version of prodigal
+PRODIGAL_SOURCE = "Prodigal_v2.6.3"
+# Width of sequence lines in prodigal .ffn (genes) and .faa (proteins) files
+GENE_WIDTH = 70
+PROT_WIDTH = 60
+
 
 def format_one_genome(gpath, name, prod_path, lst_dir, prot_dir, gene_dir,
                       rep_dir, gff_dir):
@@ -178,6 +185,213 @@ def format_one_genome(gpath, name, prod_path, lst_dir, prot_dir, gene_dir,
     return ok
 
 
+def format_one_genome_inprocess(gpath, name, gpath_train, lst_dir, prot_dir, gene_dir,
+                                rep_dir, gff_dir):
+    """
+    Call genes of the given genome with pyrodigal (in this process, instead of running
+    prodigal), and format them to create its corresponding files in the following folders:
+
+    - Proteins
+    - Genes
+    - Replicons
+    - LSTINFO
+    - gff
+
+    The sequence is read once: its contigs are given to pyrodigal, and written to the
+    Replicons file. Genes found are directly written to the other files: no prodigal
+    result file is written nor read. Generated files are the same as the ones obtained
+    from prodigal result files with 'format_one_genome'.
+
+    Parameters
+    ----------
+    gpath : str
+        path to the genome sequence to annotate
+    name : str
+        gembase name of the genome
+    gpath_train : str
+        path to the training file (prodigal format) to use, or "small option" to use
+        the 'meta' procedure
+    lst_dir : str
+        path to LSTINFO folder
+    prot_dir : str
+        path to Proteins folder
+    gene_dir : str
+        path to Genes folder
+    rep_dir : str
+        path to Replicons folder
+    gff_dir : str
+        path to gff3 folder
+
+    Returns
+    -------
+    bool :
+        True if genome was correctly annotated and formatted, False otherwise
+    """
+    logger.log(utils.detail_lvl(), f"Start annotating {name} (from {gpath} sequence) "
+                                   "with pyrodigal")
+    try:
+        records = list(utils_fasta.read_records(gpath))
+        genes = call_genes(records, gpath_train)
+    except (OSError, ValueError, RuntimeError) as err:
+        logger.error(f"Error while trying to call genes of {name} with pyrodigal: {err}")
+        return False
+    logger.log(utils.detail_lvl(), f"End annotating {name} (from {gpath})")
+
+    # Define names for generated gembase files
+    res_prot_file = os.path.join(prot_dir, name + ".prt")
+    res_gene_file = os.path.join(gene_dir, name + ".gen")
+    res_lst_file = os.path.join(lst_dir, name + ".lst")
+    res_rep_file = os.path.join(rep_dir, name + ".fna")
+    res_gff_file = os.path.join(gff_dir, name + ".gff")
+
+    # Generate replicon file from the contigs already read
+    contigs, sizes = utils.get_genome_contigs_and_rename(name, gpath, res_rep_file, logger,
+                                                         records=records)
+    if not contigs:
+        try:
+            os.remove(res_rep_file)
+        except OSError:
+            pass
+        logger.error("Problems while generating Replicon file for {}".format(name))
+        return False
+    ok = write_genes(genes, name, contigs, sizes, res_lst_file, res_gene_file, res_prot_file,
+                     res_gff_file)
+    if not ok:
+        for res_file in [res_rep_file, res_lst_file, res_gene_file, res_prot_file,
+                         res_gff_file]:
+            try:
+                os.remove(res_file)
+            except OSError:
+                pass
+        logger.error(f"Problems while generating .lst, .gen, .prt and .gff files for {name}")
+        return False
+    return True
+
+
+def call_genes(records, gpath_train):
+    """
+    Call genes on all contigs of a sequence with pyrodigal.
+
+    Parameters
+    ----------
+    records : list
+        utils_fasta.FastaRecord of all contigs of the sequence
+    gpath_train : str
+        path to the training file (prodigal format) to use, or "small option" to use
+        the 'meta' procedure
+
+    Returns
+    -------
+    list
+        [(contig_name, pyrodigal.Genes)] for each contig, in the order of the sequence
+        file. Contig name is the first word of its header, as for prodigal.
+    """
+    import pyrodigal
+
+    if gpath_train == "small option":
+        finder = pyrodigal.GeneFinder(meta=True)
+    else:
+        with open(gpath_train, "rb") as trnf:
+            finder = pyrodigal.GeneFinder(pyrodigal.TrainingInfo.load(trnf))
+    return [(record.name.decode(), finder.find_genes(record.seq)) for record in records
+            if record.name]
+
+
+def write_genes(genes, name, contigs, sizes, res_lst_file, res_gen_file, res_prot_file,
+                res_gff_file):
+    """
+    Write genes called by pyrodigal to .lst, .gen, .prt and .gff files, as 'create_gene_lst',
+    'create_prt' and 'create_gff' do from prodigal result files.
+
+    Parameters
+    ----------
+    genes : list
+        [(contig_name, pyrodigal.Genes)] for each contig (see 'call_genes')
+    name : str
+        gembase name of the genome to format
+    contigs : dict
+        {original_contig_name: gembase_contig_name}
+    sizes : dict
+        {gembase_contig_name: size}
+    res_lst_file, res_gen_file, res_prot_file, res_gff_file : str
+        .lst, .gen, .prt and .gff files to create
+
+    Returns
+    -------
+    bool :
+        True if conversion went well, False otherwise
+    """
+    # Number of the current gene: unique in the genome (do not re-start at 1 for each contig)
+    locus_num = 0
+    with open(res_lst_file, "w") as r_lst, open(res_gen_file, "w") as r_gen,\
+         open(res_prot_file, "w") as r_prt, open(res_gff_file, "w") as r_gff:
+        r_gff.write("##gff-version 3\n")
+        for new_name in contigs.values():
+            r_gff.write(f"##sequence-region\t{new_name}\t1\t{sizes[new_name]}\n")
+        # pyrodigal numbers the sequences it was given, as prodigal numbers contigs
+        for seq_num, (contig_name, contig_genes) in enumerate(genes, start=1):
+            cname = contigs[contig_name]
+            contig_num = cname.split(".")[-1]
+            for gene_num, gene in enumerate(contig_genes, start=1):
+                locus_num += 1
+                # First and last genes of a contig are at its border
+                if gene_num == 1 or gene_num == len(contig_genes):
+                    loc = "b"
+                else:
+                    loc = "i"
+                # Same information as in prodigal .ffn headers
+                partial = f"{int(gene.partial_begin)}{int(gene.partial_end)}"
+                info = (f" ID={seq_num}_{gene_num};partial={partial};"
+                        f"start_type={gene.start_type};rbs_motif={gene.rbs_motif};"
+                        f"rbs_spacer={gene.rbs_spacer};gc_cont={gene.gc_cont:.3f}")
+                strand = "D" if gene.strand == 1 else "C"
+                # Prodigal positions in .ffn headers are surrounded by spaces
+                lstline = gfunc.write_gene("CDS", locus_num, "NA", "NA", loc, name,
+                                           contig_num, "NA", info, "NA", strand,
+                                           f" {gene.begin} ", f" {gene.end} ", r_lst)
+                locus = lstline.split("\t")[4]
+                size_gen = gene.end - gene.begin + 1
+                if size_gen % 3 != 0:
+                    logger.error("Gene {} has a number of nucleotides ({}) that is not "
+                                 "divisible by 3.".format(locus, size_gen))
+                    return False
+                gfunc.write_header(lstline, r_gen)
+                r_gen.write(wrap(gene.sequence(), GENE_WIDTH))
+                gfunc.write_header(lstline, r_prt)
+                r_prt.write(wrap(gene.translate(), PROT_WIDTH))
+                # Same attributes as in prodigal gff, with the gembase name as ID
+                attributes = (f"ID={locus};partial={partial};start_type={gene.start_type};"
+                              f"rbs_motif={gene.rbs_motif};rbs_spacer={gene.rbs_spacer};"
+                              f"gc_cont={gene.gc_cont:.3f};conf={gene.confidence():.2f};"
+                              f"score={gene.score:.2f};cscore={gene.cscore:.2f};"
+                              f"sscore={gene.sscore:.2f};rscore={gene.rscore:.2f};"
+                              f"uscore={gene.uscore:.2f};tscore={gene.tscore:.2f};")
+                strand_g = "+" if gene.strand == 1 else "-"
+                r_gff.write("\t".join([cname, PRODIGAL_SOURCE, "CDS", str(gene.begin),
+                                       str(gene.end), f"{gene.score:.1f}", strand_g, "0",
+                                       attributes]) + "\n")
+    return True
+
+
+def wrap(seq, width):
+    """
+    Cut the given sequence in lines of 'width' characters
+
+    Parameters
+    ----------
+    seq : str
+        sequence to cut
+    width : int
+        maximum number of characters per line
+
+    Returns
+    -------
+    str
+        all lines of the sequence, each one ending with a new line
+    """
+    return "".join(seq[start:start + width] + "\n" for start in range(0, len(seq), width))
+
+
 def create_gene_lst(contigs, gen_file, res_gen_file, res_lst_file, gpath, name):
     """
     Generate .gen file, from sequences contained in .ffn, but changing the
@@ -54,10 +54,10 @@ May 2019
 import os
 import logging
 import logging.handlers
-import progressbar
 import multiprocessing
 import threading
 import PanACoTA.utils as utils
+from PanACoTA import utils_fasta
 from PanACoTA.annotate_module import format_prokka as fprokka
 from PanACoTA.annotate_module import format_prodigal as fprodigal
 
@@ -65,7 +65,8 @@ from PanACoTA.annotate_module import format_prodigal as fprodigal
 main_logger = logging.getLogger("annotate.geneffunc")
 
 
-def format_genomes(genomes_ok, res_path, annot_path, prodigal_only, threads=1, quiet=False):
+def format_genomes(genomes_ok, res_path, annot_path, prodigal_only, threads=1, quiet=False,
+                   gpath_train=None, compress=None):
     """
     For all genomes which were annotated (by prokka or prodigal), reformat them
     in order to have, in 'res_path', the following folders:
@@ -91,6 +92,14 @@ def format_genomes(genomes_ok, res_path, annot_path, prodigal_only, threads=1, q
         number of threads to use to while formatting genomes
     quiet : bool
         True if nothing must be sent to stderr/stdout, False otherwise
+    gpath_train : str or None
+        With prodigal_only, path to the training file (or "small option") to use to call
+        genes with pyrodigal while formatting genomes, instead of reading prodigal result
+        files. None to format prodigal/prokka result files.
+    compress : str or None
+        'gzip', 'bgzip' or 'zstd' to compress Proteins, Genes, Replicons and gff3 files of
+        each genome once it is formatted (in the formatting process). None to keep them
+        uncompressed.
 
     Returns
     -------
@@ -98,6 +107,7 @@ def format_genomes(genomes_ok, res_path, annot_path, prodigal_only, threads=1, q
 
         list of genomes skipped because they had a problem in format step
     """
+    import progressbar
     main_logger.info("Formatting all genomes")
     lst_dir = os.path.join(res_path, "LSTINFO")
     prot_dir = os.path.join(res_path, "Proteins")
@@ -127,9 +137,9 @@ def format_genomes(genomes_ok, res_path, annot_path, prodigal_only, threads=1, q
     # if at least 1 genome ok, try to format it
     # arguments for 'handle_genome' function:
     # (genome, name, gpath, annot_path, lst_dir, prot_dir, gene_dir, rep_dir,
-    # gff_dir, results, prodigal_only, q)
+    # gff_dir, results, prodigal_only, gpath_train, compress, q)
     params = [(genome, name, gpath, annot_path, lst_dir, prot_dir, gene_dir,
-               rep_dir, gff_dir, prodigal_only, q)
+               rep_dir, gff_dir, prodigal_only, gpath_train, compress, q)
               for genome, (name, _, gpath, _, _, _) in genomes_ok.items()]
 
     # Create pool and launch parallel formating steps
@@ -168,7 +178,7 @@ def handle_genome(args):
     ----------
     args : tuple
         (genome, name, gpath, prok_path, lst_dir, prot_dir,\
-         gene_dir, rep_dir, gff_dir, results, q)\
+         gene_dir, rep_dir, gff_dir, results, gpath_train, compress, q)\
          with:
 
          * genome : original genome name
@@ -181,6 +191,10 @@ def handle_genome(args):
          * rep_dir : path to 'Replicons' folder
          * gff_dir : path to 'gff3' folder
          * prodigal_only : True if annotated by prodigal, False if annotated by prokka
+         * gpath_train : training file (or "small option") to call genes with pyrodigal,
+           None to format prodigal/prokka result files
+         * compress : 'gzip', 'bgzip' or 'zstd' to compress formatted files, None to keep
+           them uncompressed
          * q : multiprocessing.managers.AutoProxy[Queue] queue to put logs during subprocess
 
     Returns
@@ -191,10 +205,14 @@ def handle_genome(args):
         * genome name (used to get info from the pool.map_async)
     """
     (genome, name, gpath, annot_path, lst_dir, prot_dir,
-     gene_dir, rep_dir, gff_dir, prodigal_only, q) = args
+     gene_dir, rep_dir, gff_dir, prodigal_only, gpath_train, compress, q) = args
 
     # Define which formatting must be used, given the annotation software
-    if prodigal_only:
+    # With pyrodigal, genes are called while formatting, using the training file
+    if prodigal_only and gpath_train:
+        format_one_genome = fprodigal.format_one_genome_inprocess
+        annot_path = gpath_train
+    elif prodigal_only:
         format_one_genome = fprodigal.format_one_genome
     else:
         format_one_genome = fprokka.format_one_genome
@@ -209,9 +227,49 @@ def handle_genome(args):
     # Handle genome
     ok_format = format_one_genome(gpath, name, annot_path, lst_dir,
                                   prot_dir, gene_dir, rep_dir, gff_dir)
+    if ok_format and compress:
+        ok_format = compress_genome(name, prot_dir, gene_dir, rep_dir, gff_dir, compress,
+                                    logger)
     return ok_format, genome
 
 
+def compress_genome(name, prot_dir, gene_dir, rep_dir, gff_dir, method, logger):
+    """
+    Compress Proteins, Genes, Replicons and gff3 files of a formatted genome.
+
+    Parameters
+    ----------
+    name : str
+        gembase name of the genome
+    prot_dir : str
+        path to 'Proteins' folder
+    gene_dir : str
+        path to 'Genes' folder
+    rep_dir : str
+        path to 'Replicons' folder
+    gff_dir : str
+        path to 'gff3' folder
+    method : str
+        'gzip', 'bgzip' or 'zstd'
+    logger : logging.Logger
+        logger object to write log information
+
+    Returns
+    -------
+    bool
+        True if all files were compressed, False otherwise
+    """
+    files = [os.path.join(prot_dir, name + ".prt"), os.path.join(gene_dir, name + ".gen"),
+             os.path.join(rep_dir, name + ".fna"), os.path.join(gff_dir, name + ".gff")]
+    for file in files:
+        try:
+            utils_fasta.compress(file, method)
+        except OSError as err:
+            logger.error(f"Error while compressing {file} with {method}: {err}")
+            return False
+    return True
+
+
 def write_gene(gtype, locus_num, gene_name, product, cont_loc,
                genome, cont_num, ecnum, inf2, db_xref, strand, start, end, lstopenfile):
     """
@@ -47,9 +47,7 @@ April 2017
 import os
 import re
 import sys
-import numpy as np
 import logging
-import progressbar
 
 from PanACoTA import utils
 
@@ -82,6 +80,7 @@ def analyse_all_genomes(genomes, dbpath, tmp_path, nbn, soft, logger, quiet=Fals
         {genome: [spegenus.date, orig_name, path_to_seq_to_annotate, size, nbcont, l90]}
 
     """
+    import progressbar
     cut = nbn > 0
     pat = None  ## To put pattern with which sequence must be cut
     if cut:
@@ -389,6 +388,7 @@ def calc_l90(contig_sizes):
     None or int
         if L90 found, returns L90. Otherwise, returns nothing
     """
+    import numpy as np
     gsize = sum(contig_sizes.values())
     sizes = [contig_sizes[cont] for cont in contig_sizes]
     cum_sizes = np.cumsum(sorted(sizes, reverse=True))
@@ -39,6 +39,8 @@ Functions to generate a persistent genome from a pangenome.
 @author gem
 April 2017
 """
+import os
+import sys
 import logging
 import math
 
@@ -47,6 +49,9 @@ from PanACoTA import utils_pangenome as utilsp
 
 logger = logging.getLogger("corepers.pers")
 
+# Number of genome subsets whose persistent families are computed at once
+SUBSET_BLOCK = 64
+
 
 def get_subset_genomes(fam_by_strain, fam_all_members, list_file):
     """
@@ -72,16 +77,182 @@ def get_subset_genomes(fam_by_strain, fam_all_members, list_file):
     """
     logger.info(f"Getting subset of pangenome for genomes in {list_file}.")
     list_genomes = utilsp.read_lstinfo(list_file, logger)
+    known = frozenset(list_genomes)
     sub_fbs = {}
     sub_fam = {}
     for fam_num, family in fam_by_strain.items():
-        kept = {genome:members for genome, members in family.items() if genome in list_genomes}
+        kept = {genome:members for genome, members in family.items() if genome in known}
         if kept != {}:
             sub_fbs[fam_num] = kept
-            sub_fam[fam_num] = [member for member in fam_all_members[fam_num] if is_in_subset(member, list_genomes)]
+            sub_fam[fam_num] = [member for member in fam_all_members[fam_num] if is_in_subset(member, known)]
     return sub_fbs, sub_fam, list_genomes
 
 
+def get_subset_pangenome(pan, list_file):
+    """
+    Same as `get_subset_genomes`, for a `Pangenome` object: only keep members of the genomes
+    given in the list file.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    list_file : str
+        name of file containing all genome names
+
+    Return
+    ------
+    tuple
+
+        sub_pan = Pangenome with only members from genomes in list_genomes
+        list_genomes = list of genomes in list_file
+    """
+    logger.info(f"Getting subset of pangenome for genomes in {list_file}.")
+    list_genomes = utilsp.read_lstinfo(list_file, logger)
+    return pan.subset(list_genomes), list_genomes
+
+
+def list_subset_files(paths):
+    """
+    Get all files listing subsets of genomes: the files given, and the files in the
+    directories given (sorted by name, hidden files excluded). A file found several times
+    is kept once. As output files are named after the file names, 2 different files
+    cannot have the same name.
+
+    Parameters
+    ----------
+    paths : list
+        files and/or directories
+
+    Returns
+    -------
+    list
+        paths to all files listing genomes
+    """
+    list_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            list_files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                              if not name.startswith(".")
+                              and os.path.isfile(os.path.join(path, name)))
+        elif os.path.isfile(path):
+            list_files.append(path)
+        else:
+            logger.error(f"{path} file not found.")
+            sys.exit(1)
+    if not list_files:
+        logger.error(f"No list of genomes found in {', '.join(paths)}.")
+        sys.exit(1)
+    uniq_files = []
+    by_name = {}
+    for path in list_files:
+        name = os.path.basename(path)
+        if name not in by_name:
+            by_name[name] = path
+            uniq_files.append(path)
+        elif not os.path.samefile(path, by_name[name]):
+            logger.error(f"{by_name[name]} and {path} have the same name: persistent "
+                         "genomes of both subsets would be written to the same file. "
+                         "Rename one of them.")
+            sys.exit(1)
+    return uniq_files
+
+
+def subset_masks(pan, list_files):
+    """
+    Get the genomes of the pangenome in each given list of genomes
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    list_files : list
+        files listing genomes (1 subset of genomes per file)
+
+    Returns
+    -------
+    (masks, nb_strains) : tuple
+
+        - masks: numpy.ndarray of bool, 1 row per subset, True for genomes of the
+          pangenome in the subset
+        - nb_strains: list, number of genomes listed in each file
+    """
+    import numpy as np
+    genome_ids = {genome: num for num, genome in enumerate(pan.genomes)}
+    masks = np.zeros((len(list_files), len(pan.genomes)), dtype=bool)
+    nb_strains = []
+    for sub, list_file in enumerate(list_files):
+        list_genomes = utilsp.read_lstinfo(list_file, logger)
+        masks[sub, [genome_ids[genome] for genome in list_genomes if genome in genome_ids]] = True
+        nb_strains.append(len(list_genomes))
+    return masks, nb_strains
+
+
+def get_pers_subsets(pan, masks, nb_strains, settings, floor=False):
+    """
+    Same as `get_pers_pangenome`, for several subsets of genomes and several settings at
+    once. For each block of SUBSET_BLOCK subsets, the number of genomes, of genomes with 1
+    member, and of genomes with several members of each family are computed for all
+    subsets of the block at once, by products of the family x genome matrices by the
+    genome masks of the subsets.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    masks : numpy.ndarray
+        genomes of each subset (see `subset_masks`)
+    nb_strains : list
+        total number of genomes of each subset
+    settings : list
+        [(tol, multi, mixed)] persistent genomes to get for each subset
+    floor : bool
+        Use floor(nb_strains*tol) as the minimum number of genomes if True,
+        ceil(nb_strains*tol) if False.
+
+    Returns
+    -------
+    generator
+        of (subset index, (tol, multi, mixed), indices of persistent families)
+    """
+    import numpy as np
+    import scipy.sparse
+    nb_fams = len(pan)
+    fam_of_member = np.repeat(np.arange(nb_fams, dtype=np.int64), pan.nb_members)
+    counts = scipy.sparse.csr_matrix((np.ones(len(fam_of_member), dtype=np.int32),
+                                      (fam_of_member, pan.member_genomes)),
+                                     shape=(nb_fams, len(pan.genomes)))
+    counts.sum_duplicates()
+
+    def having(keep):
+        # Genomes having a number of members kept
+        matrix = counts.copy()
+        matrix.data = keep(counts.data).astype(np.int32)
+        matrix.eliminate_zeros()
+        return matrix
+
+    present = having(lambda nbs: nbs > 0)
+    mono = having(lambda nbs: nbs == 1)
+    several = having(lambda nbs: nbs > 1)
+    for start in range(0, len(masks), SUBSET_BLOCK):
+        block = masks[start:start + SUBSET_BLOCK].T.astype(np.int32)
+        nb_present = present @ block
+        nb_mono = mono @ block
+        nb_several = several @ block
+        for col in range(block.shape[1]):
+            sub = start + col
+            for tol, multi, mixed in settings:
+                logger.info("Generating Persistent genome of a dataset "
+                            f"containing {nb_strains[sub]} genomes")
+                min_members = get_min_members(nb_strains[sub], tol, floor)
+                is_pers = pers_mask(nb_present[:, col], nb_mono[:, col], nb_several[:, col] > 0,
+                                    min_members, multi, mixed)
+                # Families without any member in the subset are not in its pangenome
+                fams = (is_pers & (nb_present[:, col] > 0)).nonzero()[0]
+                log_pers(len(fams), min_members, nb_strains[sub], tol, multi, mixed)
+                yield sub, (tol, multi, mixed), fams
+
+
 def is_in_subset(member, list_genomes):
     """
     From a list of members, keep only those in the given list of genomes
@@ -90,21 +261,16 @@ def is_in_subset(member, list_genomes):
     ----------
     members : str
         protein name
-    list_genomes : str
-        filename containing list of genomes
+    list_genomes : list or set
+        names of genomes to keep
 
     Return
     ------
     bool
         True if member is in list_genomes, False otherwise
     """
-    # if format is gembase (ex: ESCO.1512.00001.i0002_12124), genome name is 3 first . separated fields
-    if "." in member and len(member.split(".")) >= 3:
-        genome = ".".join(member.split(".")[:3])
-        return genome in list_genomes
-    else:   
-        # if format is not like this, it must be something_00001 (genomeName_proteinNumber):
-        return member.split("_")[0] in list_genomes
+    # Genome found as in the pangenome (see utils.split_protein)
+    return utils.split_protein(member)[0] in list_genomes
 
 
 
@@ -147,10 +313,7 @@ def get_pers(fam_by_strain, fam_all_members, nb_strains, tol=1, multi=False, mix
                 f"containing {nb_strains} genomes")
     pers = {}  # {fam_num: {strain1: [genes from strain1], strain2: [genes from strain2]}}
     fams = {}  # {fam_num: [list of members]}
-    if floor:
-        min_members = math.floor(tol * nb_strains)
-    else:
-        min_members = math.ceil(tol * nb_strains)
+    min_members = get_min_members(nb_strains, tol, floor)
     for fam_num, family in fam_by_strain.items():
         # If enough strains and multi accepted, or multi not accepted but 1 member per
         # strain, add family to core
@@ -162,29 +325,230 @@ def get_pers(fam_by_strain, fam_all_members, nb_strains, tol=1, multi=False, mix
             if len(family) >= min_members and (multi or uniq_members(family)):
                 pers[fam_num] = family
                 fams[fam_num] = fam_all_members[fam_num]
+    log_pers(len(pers), min_members, nb_strains, tol, multi, mixed)
+    return fams
+
+
+def get_pers_pangenome(pan, nb_strains, tol=1, multi=False, mixed=False, floor=False):
+    """
+    Same as `get_pers`, for a `Pangenome` object: the number of genomes, and of members of
+    each genome, are counted for all families at once.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    nb_strains : int
+        total number of strains/genomes in dataset
+    tol : float
+        min percentage of different genomes present in a family
+    multi : bool
+        True if multiple genes from the same genome/strain in a family are tolerated
+    mixed : bool
+        True if mixed families are allowed
+    floor : bool
+        Use floor(nb_strains*tol) as the minimum number of genomes if True,
+        ceil(nb_strains*tol) if False.
+
+    Returns
+    -------
+    dict
+        {fam_num: [list of members]} for persistent families
+    """
+    logger.info("Generating Persistent genome of a dataset "
+                f"containing {nb_strains} genomes")
+    min_members = get_min_members(nb_strains, tol, floor)
+    nb_genomes, nb_mono, max_multi = pan.family_stats()
+    is_pers = pers_mask(nb_genomes, nb_mono, max_multi > 1, min_members, multi, mixed)
+    fams = {pan.fam_nums[num]: pan.family(num) for num in is_pers.nonzero()[0].tolist()}
+    log_pers(len(fams), min_members, nb_strains, tol, multi, mixed)
+    return fams
+
+
+def pers_mask(nb_genomes, nb_mono, several, min_members, multi=False, mixed=False):
+    """
+    Find persistent families from their statistics
+
+    Parameters
+    ----------
+    nb_genomes : numpy.ndarray
+        number of genomes in each family
+    nb_mono : numpy.ndarray
+        number of genomes having exactly 1 member in each family
+    several : numpy.ndarray
+        True for families having several members from a same genome
+    min_members : int
+        minimum number of genomes in a persistent family
+    multi : bool
+        True if multiple genes from the same genome/strain in a family are tolerated
+    mixed : bool
+        True if mixed families are allowed
+
+    Returns
+    -------
+    numpy.ndarray
+        True for persistent families
+    """
+    if mixed:
+        return nb_mono >= min_members
+    if multi:
+        return nb_genomes >= min_members
+    return (nb_genomes >= min_members) & ~several
+
+
+def get_pers_stream(pangenome, settings, floor=False, list_genomes=None):
+    """
+    Same as `get_pers_pangenome`, for several settings, without loading the pangenome:
+    the pangenome file is read twice, line by line.
+
+    - 1st pass: for each family, only count its genomes, its genomes having 1 member, and
+      if a genome has several members
+    - 2nd pass: only keep the members of persistent families
+
+    Parameters
+    ----------
+    pangenome : str
+        pangenome file
+    settings : list
+        [(tol, multi, mixed)] persistent genomes to get
+    floor : bool
+        Use floor(nb_strains*tol) as the minimum number of genomes if True,
+        ceil(nb_strains*tol) if False.
+    list_genomes : list or None
+        genomes to keep (other members are ignored), None to keep all genomes
+
+    Returns
+    -------
+    list
+        for each setting, {fam_num: [list of members]} for persistent families
+    """
+    import array
+    import collections
+    import numpy as np
+    known = frozenset(list_genomes) if list_genomes is not None else None
+    all_genomes = set()
+    nb_genomes = array.array("q")
+    nb_mono = array.array("q")
+    several = array.array("b")
+    for _, fam in read_families(pangenome):
+        counts = collections.Counter(utilsp.get_strain(member) for member in fam)
+        if known is not None:
+            counts = {genome: nb for genome, nb in counts.items() if genome in known}
+        else:
+            all_genomes.update(counts)
+        nb_genomes.append(len(counts))
+        nb_mono.append(sum(nb == 1 for nb in counts.values()))
+        several.append(any(nb > 1 for nb in counts.values()))
+    nb_strains = len(all_genomes) if list_genomes is None else len(list_genomes)
+    nb_genomes = np.array(nb_genomes, dtype=np.int64)
+    nb_mono = np.array(nb_mono, dtype=np.int64)
+    several = np.array(several, dtype=bool)
+    masks = []
+    for tol, multi, mixed in settings:
+        logger.info("Generating Persistent genome of a dataset "
+                    f"containing {nb_strains} genomes")
+        min_members = get_min_members(nb_strains, tol, floor)
+        is_pers = pers_mask(nb_genomes, nb_mono, several, min_members, multi, mixed)
+        if known is not None:
+            # Families without any member of the genomes kept are not in their pangenome
+            is_pers &= nb_genomes > 0
+        log_pers(int(is_pers.sum()), min_members, nb_strains, tol, multi, mixed)
+        masks.append(is_pers)
+    # Families persistent for at least 1 setting
+    selected = np.logical_or.reduce(masks) if masks else np.zeros(0, dtype=bool)
+    families = {}
+    for num, (fam_num, fam) in enumerate(read_families(pangenome)):
+        if selected[num]:
+            if known is not None:
+                fam = [member for member in fam if utilsp.get_strain(member) in known]
+            families[num] = (fam_num, fam)
+    return [dict(families[num] for num in is_pers.nonzero()[0].tolist()) for is_pers in masks]
+
+
+def read_families(pangenome):
+    """
+    Read the pangenome file line by line
+
+    Parameters
+    ----------
+    pangenome : str
+        pangenome file: 1 family per line, its number followed by its members
+
+    Returns
+    -------
+    generator
+        of (fam_num, [members]) for each family
+    """
+    with open(pangenome) as panf:
+        for line in panf:
+            fields = line.split()
+            if fields:
+                yield fields[0], fields[1:]
+
+
+def get_min_members(nb_strains, tol, floor):
+    """
+    Minimum number of genomes a family must contain to be persistent
+
+    Parameters
+    ----------
+    nb_strains : int
+        total number of strains/genomes in dataset
+    tol : float
+        min percentage of different genomes present in a family
+    floor : bool
+        True to round down nb_strains*tol, False to round it up
+
+    Returns
+    -------
+    int
+    """
+    if floor:
+        return math.floor(tol * nb_strains)
+    return math.ceil(tol * nb_strains)
+
+
+def log_pers(nb_pers, min_members, nb_strains, tol, multi, mixed):
+    """
+    Write how many families are in the persistent genome, according to its definition
+
+    Parameters
+    ----------
+    nb_pers : int
+        number of persistent families
+    min_members : int
+        minimum number of genomes in a persistent family
+    nb_strains : int
+        total number of strains/genomes in dataset
+    tol : float
+        min percentage of different genomes present in a family
+    multi : bool
+        True if multiple genes from the same genome/strain in a family are tolerated
+    mixed : bool
+        True if mixed families are allowed
+    """
     # coregenome computed
     if tol == 1 and not multi and not mixed:
-        logger.info(f"The core genome contains {len(pers)} families, each one having "
+        logger.info(f"The core genome contains {nb_pers} families, each one having "
                     f"exactly {int(min_members)} members, from the {nb_strains} different genomes.")
     # multi persistent genome with multigenic families allowed
     elif multi:
-        logger.info(f"The persistent genome contains {len(pers)} families with members present "
+        logger.info(f"The persistent genome contains {nb_pers} families with members present "
                     f"in at least {min_members} different genomes ({tol*100}% of the total number of "
                     "genomes).")
     # mixed persistent genome, tol% families with exactly 1 member from each genome,
     # multigenic families allowed for the '1-tol'% remaining families
     elif mixed:
-        logger.info(f"The persistent genome contains {len(pers)} families, "
+        logger.info(f"The persistent genome contains {nb_pers} families, "
                     f"each one having exactly 1 member from at least {tol*100}% of the genomes ({min_members} "
                     f"genomes). In the remaining {round((1-tol)*100,3)}% genomes, there can be 0, 1 or "
                     "several members.")
     # Strict persistent genome. tol% families with exactly one member in each genome
     else:
-        logger.info(f"The persistent genome contains {len(pers)} families, each one having "
+        logger.info(f"The persistent genome contains {nb_pers} families, each one having "
                     f"exactly 1 member from at least {tol*100}% of the {nb_strains} "
                     f"different genomes (that is {min_members} genomes). The other genomes are absent from "
                     "the family.")
-    return fams
 
 
 def mixed_family(family, thres):
@@ -239,7 +603,7 @@ def uniq_members(family, num=1):
     return True
 
 
-def write_persistent(fams, outfile):
+def write_persistent(fams, outfile, sorted_fams=None):
     """
     Write persistent families into output file
 
@@ -249,12 +613,53 @@ def write_persistent(fams, outfile):
         {num_fam: [members]}
     outfile : str
         output file to write all families
+    sorted_fams : dict or None
+        {num_fam: line of the family}, filled with the families written, so that
+        families written again to another file (same pangenome) are not sorted again
     """
+    if sorted_fams is None:
+        sorted_fams = {}
     with open(outfile, "w") as outf:
         # Order by family number
         for num_fam in sorted(fams, key=lambda x: int(x)):
-            outf.write(str(num_fam))  # Write family num
-            fam = fams[num_fam]  # Get list of members of the family
-            for mem in sorted(fam, key=utils.sort_proteins):
-                outf.write(" " + mem)
-            outf.write("\n")
+            line = sorted_fams.get(num_fam)
+            if line is None:
+                # Family num, followed by its members
+                line = sorted_fams[num_fam] = (
+                    str(num_fam) + "".join(" " + mem for mem in sorted(fams[num_fam],
+                                                                       key=utils.sort_proteins))
+                    + "\n")
+            outf.write(line)
+
+
+def write_persistent_subset(pan, fam_indices, mask, outfile, sorted_fams=None):
+    """
+    Same as `write_persistent`, only writing the members of the genomes of a subset
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    fam_indices : list
+        indices of the persistent families in pan
+    mask : numpy.ndarray
+        True for the genomes of the subset
+    outfile : str
+        output file to write all families
+    sorted_fams : dict or None
+        {family index: (sorted members, their genome indices)}, filled with the families
+        written, so that families written again for another subset are not sorted again
+    """
+    if sorted_fams is None:
+        sorted_fams = {}
+    keep = mask.tolist()
+    with open(outfile, "w") as outf:
+        # Order by family number
+        for num in sorted(fam_indices.tolist(), key=lambda x: int(pan.fam_nums[x])):
+            if num not in sorted_fams:
+                members = sorted(zip(pan.family(num), pan.family_genomes(num).tolist()),
+                                 key=lambda mem: utils.sort_proteins(mem[0]))
+                sorted_fams[num] = members
+            outf.write(str(pan.fam_nums[num])
+                       + "".join(" " + mem for mem, genome in sorted_fams[num] if keep[genome])
+                       + "\n")
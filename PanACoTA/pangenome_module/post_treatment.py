@@ -41,15 +41,28 @@ as a summary file for the pangenome.
 April 2017
 """
 import logging
-import numpy as np
+import os
 
 from PanACoTA import utils
 from PanACoTA import utils_pangenome as utilsp
 
 logger = logging.getLogger("pangenome.post-treat")
 
+# Maximum number of cells of a block of the matrices, and of summary lines, written at once
+MATRIX_CELLS = 1 << 24
+SUMMARY_ROWS = 10000
+# Number of genomes (rows and columns of a tile of pairs), and of families, compared at
+# once when computing distances between genomes
+DIST_GENOMES = 2048
+DIST_FAMILIES = 8192
+# Quantiles of pan and core sizes written for the accumulation curves
+CURVE_QUANTILES = [0, 0.025, 0.25, 0.5, 0.75, 0.975, 1]
+# Presence/absence bits of all genomes, shared by the processes computing curves
+_CURVE_BITS = None
 
-def post_treat(families, pangenome):
+
+def post_treat(families, pangenome, matrix="csv", previous=None, distances=False, threads=1,
+               curves=0):
     """
     From clusters = {num: [members]}, create:
 
@@ -68,47 +81,58 @@ def post_treat(families, pangenome):
         - sum_0-mono-multi: should be equal to the total number of genomes in dataset
         - max_multi: maximum number of members from 1 genome
 
+    Matrices are written as csv files, and/or in sparse formats (see `write_sparse_outputs`).
+    Distances between genomes (see `write_distances`) and accumulation curves (see
+    `write_curves`) can also be written.
+
     Parameters
     ----------
-    families : dict
+    families : dict or CompactFamilies
         {num_fam: [list of members]}. Can be None, and then they will be retrieved from the\
         pangenome file
     pangenome : str
         file containing pangenome
+    matrix : str
+        format of the matrices: "csv", "sparse" or "all" (both)
+    previous : str or None
+        pangenome updated to get this one (see `update_and_write_outputs`), or None
+    distances : bool
+        True to also write the distances between genomes
+    threads : int
+        number of threads to compute distances (and of processes to compute curves)
+    curves : int
+        number of random orders of genomes for the accumulation curves. 0 for no curve
     """
-    fams_by_strain, families, all_strains = utilsp.read_pangenome(pangenome, logger, families)
-    open_outputs_to_write(fams_by_strain, families, all_strains, pangenome)
-    # result of open_outputs_to_write = (qualis, quantis, summaries)
+    pan = utilsp.load_pangenome(pangenome, logger, families)
+    open_outputs_to_write(pan, pangenome, matrix, previous)
+    # result of open_outputs_to_write = (fam_nums, summaries)
+    if distances:
+        write_distances(pan, pangenome, threads)
+    if curves:
+        write_curves(pan, pangenome, curves, threads)
 
 
-def open_outputs_to_write(fams_by_strain, families, all_strains, pangenome):
+def open_outputs_to_write(pan, pangenome, matrix="csv", previous=None):
     """
     Open output files, and call function to generate the matrix and summary file,
     and write it in those output files
 
     Parameters
     ----------
-    fams_by_strain : dict
-        {fam_num: {strain: [members]}}
-    families : dict
-        {fam_num: [all members]}
-    all_strains : list
-        list of all genome names
+    pan : utils_pangenome.Pangenome
+        pangenome families
     pangenome : str
-        filename containing pangenome. Will be extended for the 3 output files
+        filename containing pangenome. Will be extended for the output files
+    matrix : str
+        format of the matrices: "csv", "sparse" or "all" (both)
+    previous : str or None
+        pangenome updated to get this one. If given, csv matrices are patched from its
+        matrices when possible, instead of being generated.
 
     Returns
     -------
-    (qualis, quantis, summaries) : tuple
-
-        with:
-
-        - qualis = {fam_num: [0 if no gene for species, 1 if at least 1 gene, for each\
-          species in all_strains]}
-        - quantis = {fam_num: [number of genes for each strain in all_strains]}
-        - summaries = {fam_num: [nb_members, sum_quanti, sum_quali,\
-          nb_0, nb_mono, nb_multi, sum_0-mono-multi, max_multi]}
-
+    (fam_nums, summaries) : tuple
+        see `generate_and_write_outputs`
     """
     panquali = pangenome + ".quali.txt"
     panquanti = pangenome + ".quanti.txt"
@@ -116,84 +140,555 @@ def open_outputs_to_write(fams_by_strain, families, all_strains, pangenome):
     with open(pansum, "w") as psf:
         psf.write("num_fam,nb_members,sum_quanti,sum_quali,"
                   "nb_0,nb_mono,nb_multi,sum_0_mono_multi,max_multi\n")
-        res = generate_and_write_outputs(fams_by_strain, families,
-                                         all_strains, panquali, panquanti, psf)
+        res = None
+        if matrix == "sparse":
+            logger.info("Generating summary file")
+            res = write_summary(pan, pan.sorted_families(), psf)
+        elif previous:
+            res = update_and_write_outputs(pan, previous, panquali, panquanti, psf)
+        if res is None:
+            res = generate_and_write_outputs(pan, panquali, panquanti, psf)
+    if matrix in ["sparse", "all"]:
+        write_sparse_outputs(pan, pangenome)
     return res
 
 
-def generate_and_write_outputs(fams_by_strain, families, all_strains, panquali, panquanti, psf):
+def generate_and_write_outputs(pan, panquali, panquanti, psf):
     """
     From the python objects of pangenome, generate qualitative and quantitative matrix,
     as well as summary file.
 
+    Number of members of each genome in each family are computed from the genome index of
+    all members at once, and matrices are written by blocks of genomes.
+
     Parameters
     ----------
-    fams_by_strain : dict
-        {fam_num: {strain: [members]}}
-    families : dict
-        {fam_num: [all members]}
-    all_strains : list
-        list of all strains
-    pqlf : _io.TextIOWrapper
-        open file where qualitative matrix will be written
-    pqtf : _io.TextIOWrapper
-        open file where quantitative matrix will be written
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    panquali : str or _io.TextIOWrapper
+        file (or open file) where qualitative matrix will be written
+    panquanti : str or _io.TextIOWrapper
+        file (or open file) where quantitative matrix will be written
     psf : _io.TextIOWrapper
         open file where summary will be written
 
     Returns
     -------
-    (qualis, quantis, summaries) : tuple
+    (fam_nums, summaries) : tuple
 
         with:
 
-        - qualis = {fam_num: [0 if no gene for species, 1 if at least 1 gene, for each\
-        species in all_strains]}
-        - quantis = {fam_num: [number of genes for each strain in all_strains]}
-        - summaries = {fam_num: [nb_members, sum_quanti, sum_quali,\
-         nb_0, nb_mono, nb_multi, sum_0-mono-multi, max_multi]}
+        - fam_nums = list of family numbers, sorted
+        - summaries = numpy.ndarray with 1 row per family (in fam_nums order):\
+          [nb_members, sum_quanti, sum_quali, nb_0, nb_mono, nb_multi, sum_0-mono-multi,\
+          max_multi]
 
     """
+    import numpy as np
     logger.info("Generating qualitative and quantitative matrix, and summary file")
+    order = pan.sorted_families()
+    fam_nums, summaries = write_summary(pan, order, psf)
+    # Matrices are transposed: lines = genomes, columns = families
+    header = ",".join(["fam_num"] + [str(int(fam_num)) for fam_num in fam_nums]) + "\n"
+    with open_matrix(panquali) as pqlf, open_matrix(panquanti) as pqtf:
+        pqlf.write(header)
+        pqtf.write(header)
+        for genomes, counts in genome_blocks(pan, order):
+            pqlf.write(format_rows(genomes, (counts > 0).view(np.int8)))
+            pqtf.write(format_rows(genomes, counts))
+    return fam_nums, summaries
+
+
+def update_and_write_outputs(pan, previous, panquali, panquanti, psf):
+    """
+    Write the matrices of a pangenome obtained by adding genomes to a previous pangenome,
+    by patching the matrices of the previous pangenome, and write the summary file.
+
+    Previous families keep their number, and new proteins (from new genomes) are added to
+    them or to new families, numbered after them. So, for a previous genome, its line is
+    the same as in the previous matrices, followed by 0 for all new families. Only the
+    lines of new genomes are generated. Matrices are the same as with
+    `generate_and_write_outputs`.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    previous : str
+        previous pangenome file. Its matrices are <previous>.quali.txt and
+        <previous>.quanti.txt
+    panquali : str
+        file where qualitative matrix will be written
+    panquanti : str
+        file where quantitative matrix will be written
+    psf : _io.TextIOWrapper
+        open file where summary will be written
+
+    Returns
+    -------
+    (fam_nums, summaries) : tuple or None
+        see `generate_and_write_outputs`. None if the previous matrices cannot be patched
+        (not found, or families of the previous pangenome are not the first ones)
+    """
+    import numpy as np
+    oldquali = previous + ".quali.txt"
+    oldquanti = previous + ".quanti.txt"
+    if not os.path.isfile(oldquali) or not os.path.isfile(oldquanti):
+        logger.details(f"No matrix found for {previous}: matrices will be generated.")
+        return None
+    order = pan.sorted_families()
+    columns = [str(int(pan.fam_nums[num])) for num in order]
+    with open(oldquanti) as oqtf:
+        old_columns = oqtf.readline().rstrip("\n").split(",")[1:]
+    old_genomes = set(utilsp.load_pangenome(previous, logger).genomes)
+    if columns[:len(old_columns)] != old_columns or not old_genomes <= set(pan.genomes):
+        logger.details(f"Families or genomes of {previous} are not found in the new "
+                       "pangenome: matrices will be generated.")
+        return None
+    logger.info(f"Updating qualitative and quantitative matrix of {previous}, and "
+                "generating summary file")
+    fam_nums, summaries = write_summary(pan, order, psf)
+    new_genomes = [num for num, genome in enumerate(pan.genomes) if genome not in old_genomes]
+    new_lines = (lines for genomes, counts in genome_blocks(pan, order, new_genomes)
+                 for lines in zip(format_lines(genomes, (counts > 0).view(np.int8)),
+                                  format_lines(genomes, counts)))
+    # Previous genomes have no member in new families
+    new_zeros = ",0" * (len(columns) - len(old_columns)) + "\n"
+    header = ",".join(["fam_num"] + columns) + "\n"
+    with open(oldquali) as oqlf, open(oldquanti) as oqtf, \
+         open(panquali, "w") as pqlf, open(panquanti, "w") as pqtf:
+        next(oqlf)
+        next(oqtf)
+        pqlf.write(header)
+        pqtf.write(header)
+        # Genomes are sorted the same way in previous and new matrices
+        for genome in pan.genomes:
+            if genome in old_genomes:
+                pqlf.write(next(oqlf).rstrip("\n") + new_zeros)
+                pqtf.write(next(oqtf).rstrip("\n") + new_zeros)
+            else:
+                quali, quanti = next(new_lines)
+                pqlf.write(quali)
+                pqtf.write(quanti)
+    return fam_nums, summaries
+
+
+def write_summary(pan, order, psf):
+    """
+    Write the summary of all families
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    order : list
+        family indices, in the order to write them
+    psf : _io.TextIOWrapper
+        open file where summary will be written
+
+    Returns
+    -------
+    (fam_nums, summaries) : tuple
+        see `generate_and_write_outputs`
+    """
+    fam_nums = [pan.fam_nums[num] for num in order]
+    summaries = get_summaries(pan)[order]
+    for start in range(0, len(order), SUMMARY_ROWS):
+        psf.write("".join(f"{fam_num},{utils.list_to_str(summ, sep=',')}"
+                          for fam_num, summ in zip(fam_nums[start:start + SUMMARY_ROWS],
+                                                   summaries[start:start + SUMMARY_ROWS].tolist())))
+    return fam_nums, summaries
+
+
+def write_sparse_outputs(pan, pangenome):
+    """
+    Write matrices in sparse formats, with genomes as rows and families as columns
+    (as in the csv files):
+
+    - <pangenome>.quanti.npz: quantitative matrix, as a scipy.sparse CSR matrix
+      (read it with scipy.sparse.load_npz)
+    - <pangenome>.quali.npz: qualitative matrix, with each row packed into bits by
+      numpy.packbits ('bits' array), and the number of families ('nb_families').
+      Read it with np.unpackbits(bits, axis=1, count=nb_families)
+    - <pangenome>.index.json: {"genomes": [genome of each row],
+      "families": [family number of each column]}
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    pangenome : str
+        filename containing pangenome. Will be extended for the output files
+    """
+    import json
+    import numpy as np
+    import scipy.sparse
+    logger.info("Saving qualitative and quantitative matrix in sparse formats")
+    order = pan.sorted_families()
+    fam_nums = [pan.fam_nums[num] for num in order]
+    quantis = []
+    bits = []
+    for _, counts in genome_blocks(pan, order):
+        quantis.append(scipy.sparse.csr_matrix(counts.astype(np.int32)))
+        bits.append(np.packbits(counts > 0, axis=1))
+    if quantis:
+        quanti = scipy.sparse.vstack(quantis, format="csr")
+        quali = np.vstack(bits)
+    else:
+        quanti = scipy.sparse.csr_matrix((0, len(order)), dtype=np.int32)
+        quali = np.zeros((0, (len(order) + 7) // 8), dtype=np.uint8)
+    scipy.sparse.save_npz(pangenome + ".quanti.npz", quanti)
+    np.savez_compressed(pangenome + ".quali.npz", bits=quali, nb_families=len(order))
+    with open(pangenome + ".index.json", "w") as indf:
+        json.dump({"genomes": pan.genomes, "families": fam_nums}, indf)
+
+
+def write_distances(pan, pangenome, threads=1):
+    """
+    Write the distances between all pairs of genomes, on their family content, to
+    <pangenome>.distances.npz, with arrays:
+
+    - genomes: genome names
+    - nb_families: number of families of each genome
+    - jaccard: Jaccard distance (1 - shared families / families of at least 1 genome)
+    - hamming: number of families present in only 1 of the 2 genomes
+
+    Distances are in condensed form (upper triangle, row by row, as given by
+    scipy.spatial.distance.squareform).
+
+    Families shared by 2 genomes are counted from the presence/absence bits of all
+    genomes, by tiles of genome pairs. For each block of families, the bits of the genomes
+    of the tile are unpacked, and shared families are counted for all pairs of the tile
+    by a matrix product. Tiles are shared between threads.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    pangenome : str
+        filename containing pangenome. Will be extended for the output file
+    threads : int
+        number of threads used to compare genomes
+    """
+    import numpy as np
+    from multiprocessing.pool import ThreadPool
+    logger.info("Computing distances between genomes")
+    bits, nb_fams, nb_core = genome_bits(pan)
+    nb_genomes, nb_bytes = bits.shape
+    nb_pairs = nb_genomes * (nb_genomes - 1) // 2
+    jaccard = np.zeros(nb_pairs, dtype=np.float32)
+    hamming = np.zeros(nb_pairs, dtype=np.uint32)
+    tiles = [(row, col) for row in range(0, nb_genomes, DIST_GENOMES)
+             for col in range(row, nb_genomes, DIST_GENOMES)]
+
+    def compare_tile(tile):
+        row, col = tile
+        rows = bits[row:row + DIST_GENOMES]
+        cols = bits[col:col + DIST_GENOMES]
+        shared = np.full((len(rows), len(cols)), nb_core, dtype=np.int64)
+        for start in range(0, nb_bytes, DIST_FAMILIES // 8):
+            fams_rows = np.unpackbits(rows[:, start:start + DIST_FAMILIES // 8], axis=1)
+            fams_cols = np.unpackbits(cols[:, start:start + DIST_FAMILIES // 8], axis=1)
+            # Sums of at most DIST_FAMILIES 0/1 values: exact in float32
+            shared += (fams_rows.astype(np.float32) @ fams_cols.T.astype(np.float32)
+                       ).astype(np.int64)
+        for num in range(len(rows)):
+            genome = row + num
+            # Only pairs with a genome after this one
+            first_col = max(genome + 1 - col, 0)
+            shared_row = shared[num, first_col:]
+            union = nb_fams[genome] + nb_fams[col + first_col:col + len(cols)] - shared_row
+            first = (genome * nb_genomes - genome * (genome + 1) // 2
+                     + col + first_col - genome - 1)
+            hamming[first:first + len(shared_row)] = union - shared_row
+            jaccard[first:first + len(shared_row)] = 1 - shared_row / np.maximum(union, 1)
+
+    with ThreadPool(threads) as pool:
+        pool.map(compare_tile, tiles, chunksize=1)
+    np.savez(pangenome + ".distances.npz", genomes=np.array(pan.genomes, dtype=str),
+             nb_families=nb_fams, jaccard=jaccard, hamming=hamming)
+
+
+def write_curves(pan, pangenome, nb_perms, threads=1, seed=0):
+    """
+    Write the pan and core accumulation curves of the pangenome to
+    <pangenome>.curves.txt: for the first k genomes (k from 1 to the number of genomes) of
+    nb_perms random orders of genomes, number of families with at least 1 of these genomes
+    (pan), and with all of them (core). For each k, write the mean and quantiles
+    (CURVE_QUANTILES) of pan and core sizes over all orders.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    pangenome : str
+        filename containing pangenome. Will be extended for the output file
+    nb_perms : int
+        number of random orders of genomes
+    threads : int
+        number of processes sharing the orders
+    seed : int
+        seed of the random orders, so that curves are reproducible
+    """
+    import numpy as np
+    logger.info(f"Computing pan and core accumulation curves on {nb_perms} random orders "
+                "of genomes")
+    bits = genome_bits(pan, informative=False)[0]
+    nb_genomes = len(pan.genomes)
+    rand = np.random.RandomState(seed)
+    perms = np.array([rand.permutation(nb_genomes) for _ in range(nb_perms)],
+                     dtype=np.int64).reshape(nb_perms, nb_genomes)
+    if threads == 1:
+        pan_sizes, core_sizes = accumulation_curves(perms, bits)
+    else:
+        import multiprocessing
+        with multiprocessing.Pool(threads, initializer=set_curve_bits,
+                                  initargs=(bits,)) as pool:
+            res = pool.map(accumulation_curves,
+                           [perms_part for perms_part in np.array_split(perms, threads)
+                            if len(perms_part)])
+        pan_sizes = np.vstack([pan_part for pan_part, _ in res])
+        core_sizes = np.vstack([core_part for _, core_part in res])
+    names = [{0: "min", 0.5: "median", 1: "max"}.get(quant, f"q{quant * 100:g}")
+             for quant in CURVE_QUANTILES]
+    columns = [np.arange(1, nb_genomes + 1)]
+    for sizes in [pan_sizes, core_sizes]:
+        columns.append(sizes.mean(axis=0))
+        columns.extend(np.quantile(sizes, CURVE_QUANTILES, axis=0))
+    with open(pangenome + ".curves.txt", "w") as curf:
+        curf.write(",".join(["nb_genomes"] + [f"{curve}_{name}" for curve in ["pan", "core"]
+                                              for name in ["mean"] + names]) + "\n")
+        for line in np.column_stack(columns).tolist():
+            curf.write(",".join(f"{val:g}" for val in line) + "\n")
+
+
+def set_curve_bits(bits):
+    """
+    Keep the presence/absence bits of all genomes in this process, to compute curves
+    (see `accumulation_curves`)
+    """
+    global _CURVE_BITS
+    _CURVE_BITS = bits
+
+
+def accumulation_curves(perms, bits=None):
+    """
+    Pan and core sizes along the given orders of genomes.
+
+    The families present in the first genomes of all orders are computed at once:
+    for each genome added, the bits of families of the genome added to each order are
+    OR-ed (pan) and AND-ed (core) to the bits of the previous genomes of this order.
+
+    Parameters
+    ----------
+    perms : numpy.ndarray
+        1 row per order of genomes: genome indices
+    bits : numpy.ndarray or None
+        presence/absence bits of families in each genome (see `genome_bits`). None to use
+        the ones given to `set_curve_bits`
+
+    Returns
+    -------
+    (pan_sizes, core_sizes) : tuple
+        numpy.ndarray, 1 row per order, 1 column per number of genomes
+    """
+    import numpy as np
+    if bits is None:
+        bits = _CURVE_BITS
+    nb_perms, nb_genomes = perms.shape
+    # Compare 64 families at once
+    nb_words = (bits.shape[1] + 7) // 8
+    words = np.zeros((bits.shape[0], nb_words * 8), dtype=np.uint8)
+    words[:, :bits.shape[1]] = bits
+    words = words.view(np.uint64)
+    pan_sizes = np.zeros((nb_perms, nb_genomes), dtype=np.int64)
+    core_sizes = np.zeros((nb_perms, nb_genomes), dtype=np.int64)
+    union = np.zeros((nb_perms, nb_words), dtype=np.uint64)
+    inter = np.full((nb_perms, nb_words), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for num in range(nb_genomes):
+        added = words[perms[:, num]]
+        union |= added
+        inter &= added
+        pan_sizes[:, num] = count_bits(union)
+        core_sizes[:, num] = count_bits(inter)
+    return pan_sizes, core_sizes
+
+
+def count_bits(words):
+    """
+    Number of bits set in each row of a 2D array of 64-bit words
+    """
+    import numpy as np
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    # numpy < 2.0: number of bits of each byte
+    table = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
 
-    # Matrix has:
-    # - 1 row per family (header will be added after)
-    # - 1 column for fam nums + 1 column per strain
-    matrix_quali = np.empty((len(families), len(all_strains) + 1), dtype=int)
-    matrix_quanti = np.empty((len(families), len(all_strains) + 1), dtype=int)
-
-    # also save matrix as python objects
-    qualis = {}
-    quantis = {}
-    summaries = {}
-    row = 0
-    for fam_num in sorted(fams_by_strain, key=lambda x: int(x)):
-        strains = fams_by_strain[fam_num]
-        quali = [1 if strain in strains else 0 for strain in all_strains]
-        quanti = [len(strains[strain]) if strain in strains else 0 for strain in all_strains]
-        nb_0 = quanti.count(0)
-        nb_mono = quanti.count(1)
-        nb_multi = len(quanti) - nb_0 - nb_mono
-        max_multi = max(quanti)
-        # Add line to quali and quanti matrices
-        matrix_quali[row,:] = [fam_num] + quali
-        matrix_quanti[row,:] = [fam_num] + quanti
-        # Write summary line
-        summ = [len(families[fam_num]), sum(quanti), sum(quali),
-                nb_0, nb_mono, nb_multi, nb_0 + nb_mono + nb_multi, max_multi]
-        psf.write(f"{fam_num},{utils.list_to_str(summ, sep=',')}")
-        # Complete python objects with quali, quanti, sumary
-        qualis[fam_num] = quali
-        quantis[fam_num] = quanti
-        summaries[fam_num] = summ
-        row += 1
-    # Add headers to quali and quanti matrix
-    header = np.array(["fam_num"] + all_strains)
-    matrix_quali = np.vstack((header, matrix_quali))
-    matrix_quanti = np.vstack((header, matrix_quanti))
-    # Transpose matrix: lines = genomes, columns = families
-    tmatrix_quali = matrix_quali.transpose()
-    np.savetxt(panquali, tmatrix_quali, delimiter=",", fmt="%s")
-    tmatrix_quanti = matrix_quanti.transpose()
-    np.savetxt(panquanti, tmatrix_quanti, delimiter=",", fmt="%s")
-    return qualis, quantis, summaries
+def genome_bits(pan, informative=True):
+    """
+    Presence/absence of each family in each genome, packed into bits.
+
+    By default, only families changing distances between genomes are kept: families
+    present in all genomes are only counted, and families present in only 1 genome are
+    only counted in the number of families of this genome.
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    informative : bool
+        False to keep all families
+
+    Returns
+    -------
+    (bits, nb_families, nb_core) : tuple
+
+        - bits: numpy.ndarray of uint8, 1 row per genome, 1 bit per kept family (read it
+          with numpy.unpackbits)
+        - nb_families: numpy.ndarray, number of families in each genome
+        - nb_core: number of families present in all genomes
+    """
+    import numpy as np
+    nb_genomes = len(pan.genomes)
+    nb_present = pan.family_stats()[0]
+    nb_core = int(np.count_nonzero(nb_present == nb_genomes)) if nb_genomes else 0
+    if informative:
+        kept = (nb_present > 1) & (nb_present < nb_genomes)
+    else:
+        kept = nb_present > 0
+    column = np.cumsum(kept) - 1
+    nb_bytes = (int(kept.sum()) + 7) // 8
+    fam_of_member = np.repeat(np.arange(len(pan), dtype=np.int64), pan.nb_members)
+    # 1 key per (genome, family) pair found, sorted by genome
+    keys = np.sort(pan.member_genomes.astype(np.int64) * len(pan) + fam_of_member)
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    genomes, fams = np.divmod(keys[first], max(len(pan), 1))
+    nb_fams = np.bincount(genomes, minlength=nb_genomes)
+    genomes = genomes[kept[fams]]
+    columns = column[fams[kept[fams]]]
+    # Bits of a same byte are consecutive: combine them (first column on highest bit,
+    # as with numpy.packbits)
+    byte_nums = genomes * nb_bytes + columns // 8
+    values = np.left_shift(1, 7 - columns % 8).astype(np.uint8)
+    bits = np.zeros(nb_genomes * nb_bytes, dtype=np.uint8)
+    if len(byte_nums):
+        starts = np.flatnonzero(np.r_[True, byte_nums[1:] != byte_nums[:-1]])
+        bits[byte_nums[starts]] = np.bitwise_or.reduceat(values, starts)
+    return bits.reshape(nb_genomes, nb_bytes), nb_fams, nb_core
+
+
+def get_summaries(pan):
+    """
+    Get summary of all families of the pangenome
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+
+    Returns
+    -------
+    numpy.ndarray
+        1 row per family: [nb_members, sum_quanti, sum_quali, nb_0, nb_mono, nb_multi,
+        sum_0-mono-multi, max_multi]
+    """
+    import numpy as np
+    nb_strains = len(pan.genomes)
+    nb_members = pan.nb_members
+    nb_genomes, nb_mono, max_multi = pan.family_stats()
+    nb_0 = nb_strains - nb_genomes
+    nb_multi = nb_genomes - nb_mono
+    return np.column_stack([nb_members, nb_members, nb_genomes, nb_0, nb_mono, nb_multi,
+                            nb_0 + nb_mono + nb_multi, max_multi]).astype(np.int64)
+
+
+def genome_blocks(pan, order, genomes=None):
+    """
+    Number of members of each genome in each family, by blocks of genomes
+
+    Parameters
+    ----------
+    pan : utils_pangenome.Pangenome
+        pangenome families
+    order : list
+        family indices, in the order of the columns
+    genomes : list or None
+        indices of the genomes to get, in the order of the rows. None for all genomes.
+
+    Returns
+    -------
+    generator
+        of (genome names, counts) for each block of genomes, with counts a numpy.ndarray
+        of 1 row per genome and 1 column per family
+    """
+    import numpy as np
+    nb_fams = len(order)
+    column = np.empty(nb_fams, dtype=np.int64)
+    column[order] = np.arange(nb_fams)
+    member_rows = pan.member_genomes.astype(np.int64)
+    member_columns = np.repeat(column, pan.nb_members)
+    if genomes is None:
+        names = pan.genomes
+    else:
+        names = [pan.genomes[num] for num in genomes]
+        row = np.full(len(pan.genomes), -1, dtype=np.int64)
+        row[genomes] = np.arange(len(genomes))
+        member_rows = row[member_rows]
+        member_columns = member_columns[member_rows >= 0]
+        member_rows = member_rows[member_rows >= 0]
+    nb_rows = len(names)
+    # 1 key per (genome, family) pair found, sorted by row, and its number of members
+    keys, counts = np.unique(member_rows * nb_fams + member_columns, return_counts=True)
+    rows = max(1, MATRIX_CELLS // max(nb_fams, 1))
+    for start in range(0, nb_rows, rows):
+        stop = min(start + rows, nb_rows)
+        first, last = np.searchsorted(keys, [start * nb_fams, stop * nb_fams])
+        block = np.zeros((stop - start) * nb_fams, dtype=np.int64)
+        block[keys[first:last] - start * nb_fams] = counts[first:last]
+        yield names[start:stop], block.reshape(stop - start, nb_fams)
+
+
+def format_rows(names, values):
+    """
+    Format lines of a matrix as csv: the name of each row followed by its values
+
+    Parameters
+    ----------
+    names : list
+        name of each row
+    values : numpy.ndarray
+        1 row per name, of positive integers
+
+    Returns
+    -------
+    str
+        all lines
+    """
+    return "".join(format_lines(names, values))
+
+
+def format_lines(names, values):
+    """
+    Same as `format_rows`, but returns the list of lines
+    """
+    import numpy as np
+    # 1 digit values: ',' and digit as bytes for each value
+    if values.size == 0 or values.max() < 10:
+        line_bytes = np.full((values.shape[0], 2 * values.shape[1]), ord(","), dtype=np.uint8)
+        line_bytes[:, 1::2] = values + ord("0")
+        return [f"{name}{line.tobytes().decode()}\n" for name, line in zip(names, line_bytes)]
+    return [f"{name},{','.join(map(str, line))}\n" for name, line in zip(names, values.tolist())]
+
+
+def open_matrix(fileout):
+    """
+    Open the given file to write a matrix. If it is already an open file, it is returned
+    as is, and not closed at the end.
+    """
+    import contextlib
+    if isinstance(fileout, str):
+        return open(fileout, "w")
+    return contextlib.nullcontext(fileout)
@@ -45,7 +45,6 @@ import shutil
 import sys
 import glob
 import urllib.request
-import ncbi_genome_download as ngd
 
 from PanACoTA import utils
 
@@ -86,6 +85,7 @@ def download_from_ncbi(species_linked, section, ncbi_species_name,
         Output filename of downloaded summary
 
     """
+    import ncbi_genome_download as ngd
     # Name of summary file, with metadata for each strain:
     sumfile = os.path.join(outdir, f"assembly_summary-{species_linked}.txt")
     abs_sumfile = os.path.abspath(sumfile)
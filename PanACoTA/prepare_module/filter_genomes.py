@@ -44,9 +44,6 @@ import os
 import sys
 import glob
 import logging
-import progressbar
-import scipy.sparse
-from scipy.sparse import dok_matrix
 
 from PanACoTA import utils
 from PanACoTA.annotate_module import genome_seq_functions as gfunc
@@ -173,6 +170,8 @@ def iterative_mash(sorted_genomes, genomes, outdir, species_linked, min_dist, ma
     genomes_removed : dict
         {genome_name: [ref_name, dist]} genome against which 'genome_name' is removed, and corresponding distance (justifying removal)
     """
+    import progressbar
+    import scipy.sparse
     logger.info("Starting filtering steps according to distance between genomes.")
     # Run mash all vs all
     mash_dir = os.path.join(outdir, "mash_files")
@@ -419,6 +418,7 @@ def read_matrix(genomes, sorted_genomes, matrix):
     mat_sp : str
         python dok_matrix object
     """
+    from scipy.sparse import dok_matrix
     if not os.path.isfile(matrix):
         logger.error(f"Matrix file {matrix} does not exist. We cannot read it "
                      "and do the next steps. Program ending.")
@@ -81,10 +81,10 @@ def main_from_parse(args):
         min_dist (float), max_dist (float)
     args_annot : tuple
         arguments for annotate module (see subcommands/annotate.py): name (str), qc_only (bool),
-        date (str), prodigal_only (bool), small (bool)
+        date (str), prodigal_only (bool), small (bool), in_process (bool)
     args_pan : tuple
         arguments for pangenome module (see subcommands/pangenome.py): min_id (float),
-        clust_mode (int), spe_dir (str), outfile (str)
+        clust_mode (int), spe_dir (str), outfile (str), max_mem (int)
     args_corepers : tuple
         arguments for corepers module (see subcommands.corepers.py): tol (float), mixed (bool),
         multi (bool), floor (bool)
@@ -99,8 +99,9 @@ def main_from_parse(args):
     args_prepare = (args.ncbi_species_name, args.ncbi_species_taxid, args.ncbi_taxid, args.strains, args.levels,
                     args.ncbi_section, args.tmp_dir, args.norefseq, args.db_dir, args.only_mash, 
                     args.info_file, args.l90, args.nbcont, args.cutn, args.min_dist, args.max_dist)
-    args_annot = (args.name, args.qc_only, args.date, args.prodigal_only, args.small)
-    args_pan = (args.min_id, args.clust_mode, args.spedir, args.outfile)
+    args_annot = (args.name, args.qc_only, args.date, args.prodigal_only, args.small,
+                  args.in_process)
+    args_pan = (args.min_id, args.clust_mode, args.spedir, args.outfile, args.max_mem)
     args_cp = (args.tol, args.mixed, args.multi, args.floor)
     args_align = (args.prot_ali)
     args_tree = (args.soft, args.model, args.boot, args.write_boot, args.memory, args.fast)
@@ -126,10 +127,10 @@ def main(cmd, args_all, args_prepare, args_annot, args_pan, args_corepers, args_
         min_dist (float), max_dist (float)
     args_annot : tuple
         arguments for annotate module (see subcommands/annotate.py): name (str), qc_only (bool),
-        date (str), prodigal_only (bool), small (bool)
+        date (str), prodigal_only (bool), small (bool), in_process (bool)
     args_pan : tuple
         arguments for pangenome module (see subcommands/pangenome.py): min_id (float),
-        clust_mode (int), spe_dir (str), outfile (str)
+        clust_mode (int), spe_dir (str), outfile (str), max_mem (int)
     args_corepers : tuple
         arguments for corepers module (see subcommands.corepers.py): tol (float), mixed (bool),
         multi (bool), floor (bool)
@@ -176,14 +177,17 @@ def main(cmd, args_all, args_prepare, args_annot, args_pan, args_corepers, args_
     tmp_dir = ""
     force = False
     outdir_annotate = os.path.join(outdir, "2-annotate_module")
-    (name, qc_only, date, prodigal_only, small) = args_annot
+    (name, qc_only, date, prodigal_only, small, in_process) = args_annot
+    (min_id, clust_mode, spe_dir, outfile, max_mem) = args_pan
     res_annot_dir = None
 
     logger.info("annotate step")
+    # The memory limit is used by annotation jobs, and then by mmseqs
     lstinfo, nbgenomes = annotate.main("PanACoTA annotate", list_file, db_path, outdir_annotate,
                                        name, date, l90, nbcont, cutn, threads, force, qc_only,
                                        info_file, tmp_dir, res_annot_dir, verbose, quiet,
-                                       prodigal_only=prodigal_only, small=small)
+                                       prodigal_only=prodigal_only, small=small,
+                                       max_mem=max_mem, in_process=in_process)
     if qc_only:
         return "QC_only done"
 
@@ -191,11 +195,10 @@ def main(cmd, args_all, args_prepare, args_annot, args_pan, args_corepers, args_
     name_pan = f"{name}_{nbgenomes}"
     outdir_pan = os.path.join(outdir, "3-pangenome_module")
     dbpath = os.path.join(outdir_annotate, "Proteins")
-    (min_id, clust_mode, spe_dir, outfile) = args_pan
     logger.info("pangenome step")
     panfile = pangenome.main("PanACoTA pangenome", lstinfo, name_pan, dbpath, min_id, outdir_pan,
                              clust_mode, spe_dir, threads, outfile, verbose=verbose,
-                             quiet=quiet)
+                             quiet=quiet, max_mem=max_mem)
 
     # Coregenome step
     outdir_corpers = os.path.join(outdir, "4-corepers_module")
@@ -290,6 +293,10 @@ def build_parser(parser):
                         help="Add this option if you only want syntactical annotation, given "
                              "by prodigal, and not functional annotation requiring prokka and "
                              "is slower.")
+    pannote.add_argument("--pyrodigal", dest="in_process", action="store_true",
+                        help="With --prodigal, call genes with the pyrodigal python package "
+                             "instead of the prodigal executable, without writing prodigal "
+                             "result files.")
     pannote.add_argument("-n", dest="name", required=True, type=utils_argparse.gen_name,
                         help=("Choose a name for your annotated genomes. This name should "
                               "contain 4 alphanumeric characters. Generally, they correspond "
@@ -300,6 +307,11 @@ def build_parser(parser):
     ppangenome.add_argument("-i", dest="min_id", type=utils_argparse.perc_id,
                            help=("Minimum sequence identity to be considered in the same "
                                  "cluster (float between 0 and 1). Default is 0.8."))
+    ppangenome.add_argument("--max-mem", dest="max_mem", type=utils_argparse.mem_size,
+                           help=("Maximum memory that mmseqs can use (for example '16G'). "
+                                 "By default, mmseqs uses the memory of the whole machine. "
+                                 "Also used by the 'annotate' step, as the maximum memory "
+                                 "of all annotation jobs running at the same time."))
 
     pcorepers = parser.add_argument_group("'corepers' module arguments")
     pcorepers.add_argument("--tol", dest="tol", type=utils_argparse.percentage,
@@ -494,12 +506,14 @@ def get_annotate(dict_argv):
     # Add default arguments if not found in commandline nor config file
     defaults = {"verbose": 0, "threads": 1,
                 "quiet": False, "prodigal_only": False, "small": False, "qc_only": False,
-                "list_file": "list_file", "db_path": "db_path", "from_info": False}
+                "list_file": "list_file", "db_path": "db_path", "from_info": False,
+                "in_process": False}
     conf_conffile.add_default(defaults, "annotate")
     conf_conffile.set_boolean("annotate", "quiet")
     conf_conffile.set_boolean("annotate", "prodigal_only")
     conf_conffile.set_boolean("annotate", "small")
     conf_conffile.set_boolean("annotate", "qc_only")
+    conf_conffile.set_boolean("annotate", "in_process")
     conf_conffile.set_int("annotate", "verbose")
     conf_conffile.set_int("annotate", "threads")
     annot_dict = conf_conffile.get_section_dict("annotate")
@@ -520,12 +534,13 @@ def get_pangenome(dict_argv):
     conf_conffile.update(dict_argv, "pangenome")
     # Add default arguments if not found in commandline nor config file
     defaults = {"verbose": 0, "threads": 1, "min_id": 0.8, "quiet": False, "clust_mode": 1,
-                "outfile": "", "spedir": ""}
+                "outfile": "", "spedir": "", "max_mem": None}
     conf_conffile.add_default(defaults, "pangenome")
     conf_conffile.set_boolean("pangenome", "quiet")
     conf_conffile.set_int("pangenome", "verbose")
     conf_conffile.set_int("pangenome", "threads")
     conf_conffile.set_float("pangenome", "min_id")
+    conf_conffile.set_mem("pangenome", "max_mem")
     pan_dict = conf_conffile.get_section_dict("pangenome")
     return pan_dict
 
@@ -544,12 +559,14 @@ def get_corepers(dict_argv):
     conf_conffile.update(dict_argv, "corepers")
     # Add default arguments if not found in commandline nor config file
     defaults = {"verbose": 0, "quiet": False, "tol": 1, "mixed": False, "multi": False,
-                "floor": False, "threads": 1}
+                "floor": False, "threads": 1, "sweep_tols": None, "sweep_modes": None,
+                "subsets": None, "stream": False}
     conf_conffile.add_default(defaults, "corepers")
     conf_conffile.set_boolean("corepers", "quiet")
     conf_conffile.set_boolean("corepers", "floor")
     conf_conffile.set_boolean("corepers", "mixed")
     conf_conffile.set_boolean("corepers", "multi")
+    conf_conffile.set_boolean("corepers", "stream")
     conf_conffile.set_int("corepers", "verbose")
     conf_conffile.set_float("corepers", "tol")
     conf_conffile.set_int("corepers", "threads")
@@ -152,12 +152,14 @@ def main_from_parse(arguments):
          arguments.date, arguments.l90, arguments.nbcont, arguments.cutn, arguments.threads,
          arguments.force, arguments.qc_only, arguments.from_info, arguments.tmpdir,
          arguments.annotdir, arguments.verbose, arguments.quiet, arguments.prodigal_only,
-         arguments.small)
+         arguments.small, arguments.max_mem, arguments.scratch_dir, arguments.in_process,
+         arguments.compress)
 
 
 def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn=5,
          threads=1, force=False, qc_only=False, from_info=None, tmp_dir=None, res_annot_dir=None,
-         verbose=0, quiet=False, prodigal_only=False, small=False):
+         verbose=0, quiet=False, prodigal_only=False, small=False, max_mem=None,
+         scratch_dir=None, in_process=False, compress=None):
     """
     Main method, doing all steps:
 
@@ -227,6 +229,19 @@ def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn
         True -> run only prodigal. False -> run prokka
     small : bool
         True -> use -p meta option with prodigal
+    max_mem : int or None
+        Maximum memory (in bytes) used by all prokka/prodigal jobs running at the same time.
+        None to only limit the number of jobs by the number of threads
+    scratch_dir : str or None
+        Path to a folder on a fast local storage, where prokka/prodigal run. Only the files
+        needed to format genomes are then moved to res_annot_dir. None to run
+        prokka/prodigal directly in res_annot_dir
+    in_process : bool
+        True -> with prodigal_only, call genes with pyrodigal, in the formatting processes,
+        instead of running prodigal. No prodigal result file is written.
+    compress : str or None
+        'gzip', 'bgzip' or 'zstd' to compress Proteins, Genes, Replicons and gff3 files
+        once formatted. None to keep them uncompressed.
 
     Returns
     -------
@@ -250,6 +265,9 @@ def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn
     # Check that needed softs are installed
     prokka = utils.check_installed("prokka")
     prodigal = utils.check_installed("prodigal")
+    import importlib.util
+    if in_process:
+        prodigal = importlib.util.find_spec("pyrodigal") is not None
     if prodigal_only:
         soft = "prodigal"
     else:
@@ -263,12 +281,22 @@ def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn
                       "to be able to annotate genomes. If you only need syntactical annotation, "
                       "check that prodigal is installed, and add '--prodigal' option.")
                 sys.exit(1)
+            if in_process and not prodigal:
+                print("pyrodigal is not installed. 'PanACoTA annotate' cannot run with "
+                      "'--pyrodigal' option. Install the pyrodigal python package, or remove "
+                      "this option to run prodigal.")
+                sys.exit(1)
             if prodigal_only and not prodigal:
                 print("Prodigal is not installed. 'PanACoTA annotate' cannot run. Install "
                       "prodigal to be able to annotate genomes. If you also need functional "
                       "annotation, check that prokka is installed, and remove '--prodigal' "
                       "option.")
                 sys.exit(1)
+            if compress == "zstd" and importlib.util.find_spec("zstandard") is None:
+                print("zstandard is not installed. 'PanACoTA annotate' cannot compress "
+                      "files with zstd. Install the zstandard python package, or use "
+                      "'--compress gzip'.")
+                sys.exit(1)
 
     # By default, all tmp files (split sequences, renamed sequences, prokka/prodigal results) will
     # be saved in the given <res_dir>/tmp_files.
@@ -383,8 +411,19 @@ def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn
     outlst = utils.write_lstinfo(list_file, kept_genomes, res_dir)
 
     # STEP 4. Annotate all kept genomes
-    results = pfunc.run_annotation_all(kept_genomes, threads, force, res_annot_dir, first_gname,
-                                       prodigal_only, small=small, quiet=quiet)
+    # With pyrodigal, only train on the first genome: genes are called during formatting step
+    gpath_train = None
+    if in_process:
+        if small:
+            gpath_train = "small option"
+        else:
+            gpath_train = pfunc.pyrodigal_train(kept_genomes[first_gname][2], res_annot_dir)
+        results = {genome: bool(gpath_train) for genome in kept_genomes}
+    else:
+        results = pfunc.run_annotation_all(kept_genomes, threads, force, res_annot_dir,
+                                           first_gname, prodigal_only, small=small,
+                                           quiet=quiet, max_mem=max_mem,
+                                           scratch_dir=scratch_dir)
     # Information on genomes to format
     # results_ok = {genome: [gembase_name, path_to_origfile, path_split_gembase,
     #               gsize, nbcont, L90]}
@@ -408,7 +447,8 @@ def main(cmd, list_file, db_path, res_dir, name, date, l90=100, nbcont=999, cutn
     skipped_format = []
     # Generate database (folders Proteins, Genes, Replicons, LSTINFO)
     skipped_format = ffunc.format_genomes(results_ok, res_dir, res_annot_dir,
-                                          prodigal_only, threads, quiet=quiet)
+                                          prodigal_only, threads, quiet=quiet,
+                                          gpath_train=gpath_train, compress=compress)
     # At least one genome could not be formatted -> warn user
     if skipped_format:
         utils.write_warning_skipped(skipped_format, do_format=True, prodigal_only=prodigal_only,
@@ -477,6 +517,12 @@ def build_parser(parser):
                           help="If you use Prodigal to annotate genomes, if you sequences are "
                                "too small (less than 20000 characters), it cannot annotate them "
                                "with the default options. Add this option to use 'meta' procedure.")
+    optional.add_argument("--pyrodigal", dest="in_process", action="store_true", default=False,
+                          help="If you use Prodigal to annotate genomes, add this option to "
+                               "call genes with the pyrodigal python package instead of the "
+                               "prodigal executable. Genes are called and formatted in the "
+                               "same process, without writing prodigal result files. "
+                               "Generated files are the same.")
     optional.add_argument("--l90", dest="l90", type=int, default=100,
                           help="Maximum value of L90 allowed to keep a genome. Default is 100.")
     optional.add_argument("--nbcont", dest="nbcont", type=utils_argparse.cont_num, default=999,
@@ -507,6 +553,18 @@ def build_parser(parser):
                                 "<genome_name>-[prokka, Prodigal]Res) must be "
                                 "saved. By default, they are saved in the same directory as "
                                 "your temporary files (see --tmp option to change it)."))
+    optional.add_argument("--scratch", dest="scratch_dir",
+                          help=("Specify a directory on a fast local storage (local disk, "
+                                "tmpfs...) where prokka/prodigal must run. Once a genome is "
+                                "annotated, only the files needed to format it, and the logs, "
+                                "are moved to the annotation directory (see --annot_dir). Useful "
+                                "when the annotation directory is on a network filesystem."))
+    optional.add_argument("--compress", dest="compress", choices=["gzip", "bgzip", "zstd"],
+                          help=("Compress Proteins, Genes, Replicons and gff3 files with the "
+                                "given method, as soon as each genome is formatted. Files get "
+                                "a '.gz' (gzip, bgzip) or '.zst' (zstd) extension. 'PanACoTA "
+                                "pangenome' and 'PanACoTA align' read them directly. bgzip "
+                                "files can be indexed by samtools faidx."))
     optional.add_argument("-F", "--force", dest="force", action="store_true",
                           help=("Force run: Add this option if you want to (re)run annotation and "
                                 "formatting steps for all genomes "
@@ -520,6 +578,14 @@ def build_parser(parser):
                                 "prokka/prodigal folder."))
     optional.add_argument("--threads", dest="threads", type=utils_argparse.thread_num, default=1,
                           help="Specify how many threads can be used (default=1)")
+    optional.add_argument("--max-mem", dest="max_mem", type=utils_argparse.mem_size,
+                          help=("Maximum memory that can be used by all prokka/prodigal jobs "
+                                "running at the same time (for example '16G'). The memory "
+                                "needed by each genome is estimated from its size, and "
+                                "updated from the memory used by the genomes already "
+                                "annotated. A genome is annotated only when its estimated "
+                                "memory is available. By default, only the number of threads "
+                                "limits the number of genomes annotated at the same time."))
     helper = parser.add_argument_group('Others')
     helper.add_argument("-v", "--verbose", dest="verbose", action="count", default=0,
                         help="Increase verbosity in stdout/stderr.")
@@ -606,6 +672,10 @@ def check_args(parser, args):
     if not args.prodigal_only and args.small:
         parser.error("You cannot use --small option with prokka. Either use prodigal, "
                      "or remove this option.")
+    # option --pyrodigal used only with prodigal
+    if not args.prodigal_only and args.in_process:
+        parser.error("You cannot use --pyrodigal option with prokka. Either use prodigal, "
+                     "or remove this option.")
     # If user specifies a cutN value (different than default one which is 5), and give
     # an info file, it is not compatible: info file will use sequences as is, and won't cut them
     if args.cutn != 5 and args.from_info:
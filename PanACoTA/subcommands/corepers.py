@@ -65,12 +65,17 @@ def main_from_parse(args):
     """
     cmd = "PanACoTA " + ' '.join(args.argv)
     main(cmd, args.pangenome, args.tol, args.multi, args.mixed, args.outputdir,
-         args.lstinfo_file, args.floor, args.verbose, args.quiet)
+         args.lstinfo_file, args.floor, args.verbose, args.quiet, args.sweep, args.subsets,
+         args.stream)
 
 
-def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verbose, quiet):
+def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verbose, quiet,
+         sweep=None, subsets=None, stream=False):
     """
-    Read pangenome and deduce Persistent genome according to the user criteria
+    Read pangenome and deduce Persistent genome according to the user criteria.
+    With sweep, the pangenome is read only once, and 1 persistent genome is written for
+    each setting. With subsets, 1 persistent genome is written for each subset of genomes
+    (and each setting).
 
     Parameters
     ----------
@@ -96,6 +101,22 @@ def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verb
         - >=15: Add DEBUG in stdout
     quiet : bool
         True if nothing must be sent to stdout/stderr, False otherwise
+    sweep : list or None
+        [(tol, multi, mixed)] to write 1 persistent genome per setting, instead of 1
+        persistent genome with tol, multi and mixed. None to write only 1 persistent genome.
+    subsets : list or None
+        files listing genomes, or directories containing such files, to write 1 persistent
+        genome per list of genomes (lstinfo_file is then not used). None to use
+        lstinfo_file.
+    stream : bool
+        True to read the pangenome file twice, line by line, instead of loading it: only
+        the members of persistent families are kept in memory.
+
+    Returns
+    -------
+    str or list
+        persistent genome filename, or list of filenames (1 per setting, for each subset)
+        with sweep or subsets
     """
     # import needed packages
     import logging
@@ -110,21 +131,9 @@ def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verb
         _, base_lst = os.path.split(lstinfo_file)
     else:
         base_lst = "all"
-    # Define output filename
-    output_name = f"PersGenome_{base_pan}-{base_lst}_"
-    if floor:
-        output_name += "F"
-    output_name += str(tol)
-    if multi:
-        output_name += "-multi.lst"
-    elif mixed:
-        output_name += "-mixed.lst"
-    else:
-        output_name += ".lst"
-    # Define output directory and filename path
+    # Define output directory
     if not os.path.isdir(outputdir):
         os.makedirs(outputdir)
-    outputfile = os.path.join(outputdir, output_name)
     logfile_base = os.path.join(outputdir, "PanACoTA-corepers")
     # level is the minimum level that will be considered.
     # for verbose = 0 or 1, ignore details and debug, start from info
@@ -141,19 +150,104 @@ def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verb
     logger.info(f'PanACoTA version {version}')
     logger.info("Command used\n \t > " + cmd)
 
-    logger.info(get_info(tol, multi, mixed, floor))
+    settings = sweep or [(tol, multi, mixed)]
+    if not sweep:
+        logger.info(get_info(tol, multi, mixed, floor))
+
+    if stream:
+        list_genomes = utilsp.read_lstinfo(lstinfo_file, logger) if lstinfo_file else None
+        logger.info(f"Reading {pangenome} line by line.")
+        all_fams = pers.get_pers_stream(pangenome, settings, floor, list_genomes)
+        outputfiles = []
+        # Members of families already sorted for a previous setting
+        sorted_fams = {}
+        for (tol, multi, mixed), fams in zip(settings, all_fams):
+            outputfile = os.path.join(outputdir, get_output_name(base_pan, base_lst, tol, multi,
+                                                                 mixed, floor))
+            pers.write_persistent(fams, outputfile, sorted_fams)
+            outputfiles.append(outputfile)
+        logger.info("Persistent genome step done.")
+        if sweep:
+            return outputfiles
+        return outputfiles[0]
 
     # Read pangenome
-    fams_by_strain, families, all_strains = utilsp.read_pangenome(pangenome, logger)
-    # If list of genomes given, get subset of previous dicts, including only the genomes aksed
+    pan = utilsp.load_pangenome(pangenome, logger)
+    if subsets:
+        list_files = pers.list_subset_files(subsets)
+        logger.info(f"Getting persistent genomes of {len(list_files)} subsets of genomes.")
+        masks, nb_strains = pers.subset_masks(pan, list_files)
+        # Members of families already sorted for a previous subset
+        sorted_fams = {}
+        outputfiles = []
+        for sub, (tol, multi, mixed), fams in pers.get_pers_subsets(pan, masks, nb_strains,
+                                                                    settings, floor):
+            outputfile = os.path.join(outputdir,
+                                      get_output_name(base_pan,
+                                                      os.path.basename(list_files[sub]),
+                                                      tol, multi, mixed, floor))
+            pers.write_persistent_subset(pan, fams, masks[sub], outputfile, sorted_fams)
+            outputfiles.append(outputfile)
+        logger.info("Persistent genome step done.")
+        return outputfiles
+    all_strains = pan.genomes
+    # If list of genomes given, get subset of pangenome, including only the genomes asked
     if lstinfo_file:
-        fams_by_strain, families, all_strains = pers.get_subset_genomes(fams_by_strain, families, lstinfo_file)
-    # Generate persistent genome
-    fams = pers.get_pers(fams_by_strain, families, len(all_strains), tol, multi, mixed, floor)
-    # Write persistent genome to file
-    pers.write_persistent(fams, outputfile)
+        pan, all_strains = pers.get_subset_pangenome(pan, lstinfo_file)
+    # Members of families already sorted for a previous setting
+    sorted_fams = {}
+    outputfiles = []
+    for tol, multi, mixed in settings:
+        if sweep:
+            logger.info(get_info(tol, multi, mixed, floor))
+        # Generate persistent genome
+        fams = pers.get_pers_pangenome(pan, len(all_strains), tol, multi, mixed, floor)
+        # Write persistent genome to file
+        outputfile = os.path.join(outputdir, get_output_name(base_pan, base_lst, tol, multi,
+                                                             mixed, floor))
+        pers.write_persistent(fams, outputfile, sorted_fams)
+        outputfiles.append(outputfile)
     logger.info("Persistent genome step done.")
-    return outputfile
+    if sweep:
+        return outputfiles
+    return outputfiles[0]
+
+
+def get_output_name(base_pan, base_lst, tol, multi, mixed, floor):
+    """
+    Get the name of the persistent genome file
+
+    Parameters
+    ----------
+    base_pan : str
+        name of the pangenome file, without its directory
+    base_lst : str
+        name of the list of genomes file, without its directory ("all" if no list)
+    tol : float
+        min % of genomes present in a family to consider it as persistent (between 0 and 1)
+    multi : bool
+        True if multigenic families are allowed, False otherwise
+    mixed : bool
+        True if mixed families are allowed, False otherwise
+    floor : bool
+        True if floor(nb_genomes*tol) is used instead of ceil(nb_genomes*tol)
+
+    Returns
+    -------
+    str
+        PersGenome_<pangenome>-<list>_[F]<tol>[-multi|-mixed].lst
+    """
+    output_name = f"PersGenome_{base_pan}-{base_lst}_"
+    if floor:
+        output_name += "F"
+    output_name += str(tol)
+    if multi:
+        output_name += "-multi.lst"
+    elif mixed:
+        output_name += "-mixed.lst"
+    else:
+        output_name += ".lst"
+    return output_name
 
 
 def get_info(tol, multi, mixed, floor):
@@ -251,6 +345,32 @@ def build_parser(parser):
                                 "genome on a subset of those genomes, give a file with this "
                                 "list of genomes. This file must have 1 line per genome, only the first column "
                                 "(genome name without extension) will be used."))
+    optional.add_argument("--subsets", dest="subsets", nargs="+", metavar="LIST",
+                          help=("Write 1 core/persistent genome for each list of genomes "
+                                "given (same format as -l), instead of 1 for all genomes. "
+                                "Give files and/or directories: all files of a directory "
+                                "are used. The pangenome is read only once, and families "
+                                "are counted for all lists at once. Files are named as with "
+                                "-l. Not compatible with -l."))
+    optional.add_argument("--stream", dest="stream", action="store_true", default=False,
+                          help=("Read the pangenome file twice, line by line, instead of "
+                                "loading it (and its binary file): first to count the "
+                                "genomes of each family, then to only keep the members of "
+                                "persistent families. Use it when the pangenome does not fit "
+                                "in memory. Not compatible with --subsets."))
+    optional.add_argument("--sweep-tol", dest="sweep_tols", nargs="+",
+                          type=utils_argparse.percentage, metavar="TOL",
+                          help=("Write 1 persistent genome for each of these 'tol' values "
+                                "(and each type of --sweep-mode, or the one given with -M/-X), "
+                                "instead of 1 persistent genome. The pangenome is read only "
+                                "once. Files are named as with -t."))
+    optional.add_argument("--sweep-mode", dest="sweep_modes", nargs="+",
+                          choices=["strict", "mixed", "multi"],
+                          help=("Write 1 persistent genome for each of these types of "
+                                "families (and each value of --sweep-tol, or the one given "
+                                "with -t): 'strict' (default type), 'mixed' (as -X) or "
+                                "'multi' (as -M). 'mixed' is skipped for a 'tol' of 1, as it "
+                                "is then the same as 'strict'."))
 
     helper = parser.add_argument_group('Others')
     helper.add_argument("-v", "--verbose", dest="verbose", action="count", default=0,
@@ -284,16 +404,47 @@ def check_args(parser, args):
                      "- allow several members in any number of genomes of a family (-M)\n"
                      "- allow several members in only '1-tol'% of the genomes of a family "
                      "(other 'tol'% genomes must have exactly 1 member) (-X)")
-    if args.mixed and args.tol == 1:
+    if not args.sweep_tols and args.mixed and args.tol == 1:
         parser.error("You are asking for mixed families, while asking for 100% of the genomes of "
                      "a family to have exactly one member, which is not compatible. Do you want "
                      "to \n- lower the percentage of genomes required to have exactly "
                      "1 member (-t tol)\n- not allow mixed families (remove -X option)")
-    if args.floor and args.tol == 1:
+    if not args.sweep_tols and args.floor and args.tol == 1:
         parser.error("You are asking to use floor('tol'*N) as a minimum number of genomes "
                      "present in a family, but with 'tol'=1: the minimum number of genomes "
                      "will always be equal to N, using floor or the default ceil! Either "
                      "use a 'tol' lower than 1, or remove the '-F' option.")
+    if args.subsets and args.lstinfo_file:
+        parser.error("-l and --subsets options cannot be used together: add the list of "
+                     "genomes given with -l to the lists of --subsets.")
+    if args.stream and args.subsets:
+        parser.error("--stream and --subsets options cannot be used together.")
+    args.sweep = None
+    if args.sweep_tols or args.sweep_modes:
+        if args.sweep_modes and (args.multi or args.mixed):
+            parser.error("-M and -X options cannot be used with --sweep-mode: give 'multi' "
+                         "or 'mixed' in the types of --sweep-mode instead.")
+        if args.mixed:
+            modes = ["mixed"]
+        elif args.multi:
+            modes = ["multi"]
+        else:
+            modes = args.sweep_modes or ["strict"]
+        tols = args.sweep_tols or [args.tol]
+        if args.mixed and 1 in tols:
+            parser.error("Mixed families (-X) cannot be used with a 'tol' of 1 in "
+                         "--sweep-tol. Use --sweep-mode with 'strict' and 'mixed' instead.")
+        if args.floor and all(tol == 1 for tol in tols):
+            parser.error("You are asking to use floor('tol'*N) as a minimum number of genomes "
+                         "present in a family, but all values of --sweep-tol are 1. Either "
+                         "give a 'tol' lower than 1, or remove the '-F' option.")
+        settings = [(tol, mode == "multi", mode == "mixed") for tol in tols for mode in modes
+                    if not (mode == "mixed" and tol == 1)]
+        if not settings:
+            parser.error("With a 'tol' of 1, mixed families are the same as the core genome: "
+                         "add 'strict' to --sweep-mode, or a 'tol' lower than 1.")
+        # Keep the order given, without duplicates
+        args.sweep = list(dict.fromkeys(settings))
     return args
 
 
@@ -57,15 +57,17 @@ def main_from_parse(args):
     cmd = "PanACoTA " + ' '.join(args.argv)
     main(cmd, args.lstinfo_file, args.dataset_name, args.dbpath, args.min_id, args.outdir,
          args.clust_mode, args.spedir, args.threads, args.outfile, args.verbose,
-         args.quiet)
+         args.quiet, args.dedup, args.keep_bank, args.matrix, args.update, args.sweep,
+         args.engine, args.max_mem, args.distances, args.curves)
 
 
 def main(cmd, lstinfo, name, dbpath, min_id, outdir, clust_mode, spe_dir, threads, outfile=None,
-         verbose=0, quiet=False):
+         verbose=0, quiet=False, dedup=False, keep_bank=False, matrix="csv", update=None,
+         sweep=None, engine="cluster", max_mem=None, distances=False, curves=0):
     """
     Main method, doing all steps:
 
-    - concatenate all protein files
+    - concatenate all protein files (only with dedup or keep_bank)
     - create database as ffindex
     - cluster all proteins
     - convert to pangenome file
@@ -102,6 +104,37 @@ def main(cmd, lstinfo, name, dbpath, min_id, outdir, clust_mode, spe_dir, thread
         - >=15: Add DEBUG in stdout
     quiet : bool
         True if nothing must be sent to stdout/stderr, False otherwise
+    dedup : bool
+        True to cluster only 1 copy of identical proteins. The other copies are then put in
+        the family of their representative.
+    keep_bank : bool
+        True to concatenate all proteins to <name>.All.prt before giving them to mmseqs.
+        False to give the protein files of all genomes directly to mmseqs.
+    matrix : str
+        format of the pangenome matrices: "csv", "sparse" or "all" (both)
+    update : tuple or None
+        (previous pangenome file, directory with its mmseqs database and clustering) to
+        update this pangenome with the genomes of lstinfo which are not in it, keeping its
+        family numbers. None to build a new pangenome.
+    sweep : list or None
+        [(min_id, clust_mode)] to build 1 pangenome per clustering setting, instead of 1
+        pangenome with min_id and clust_mode. None to build only 1 pangenome.
+    engine : str
+        "cluster" to cluster proteins with mmseqs cluster, "linclust" to first cluster them
+        with mmseqs linclust at high identity, and then only cluster the representatives
+    max_mem : int or None
+        Maximum memory (bytes) mmseqs can use. None to let mmseqs use the memory of the
+        whole machine
+    distances : bool
+        True to also write the distances between genomes, on their family content
+    curves : int
+        number of random orders of genomes on which pan and core accumulation curves are
+        computed. 0 to not compute them
+
+    Returns
+    -------
+    str or list
+        pangenome filename, or list of pangenome filenames (1 per setting) with sweep
     """
     # import needed packages
     import logging
@@ -135,12 +168,38 @@ def main(cmd, lstinfo, name, dbpath, min_id, outdir, clust_mode, spe_dir, thread
     logger.info("Command used\n \t > " + cmd)
 
     # Build bank with all proteins to include in the pangenome
-    prt_path = protf.build_prt_bank(lstinfo, dbpath, name, spe_dir, quiet)
+    # (only with dedup or keep_bank: otherwise, protein files are given to mmseqs)
+    prt_files = None
+    if dedup or keep_bank:
+        prt_path = protf.build_prt_bank(lstinfo, dbpath, name, spe_dir, quiet, dedup=dedup)
+    else:
+        prt_path, prt_files = protf.list_prt_files(lstinfo, dbpath, name, spe_dir)
+    members = protf.read_members(prt_path) if dedup else None
+    # Do 1 pangenome per setting, post-treating each one as soon as it is done
+    if sweep:
+        panfiles = []
+        for _, _, families, panfile in mmf.run_pangenome_sweep(sweep, outdir, prt_path, threads,
+                                                               quiet, members, prt_files,
+                                                               engine, max_mem,
+                                                               compact=True):
+            pt.post_treat(families, panfile, matrix, distances=distances, threads=threads,
+                          curves=curves)
+            panfiles.append(panfile)
+        logger.info("DONE")
+        return panfiles
     # Do pangenome
-    families, panfile = mmf.run_all_pangenome(min_id, clust_mode, outdir,
-                                              prt_path, threads, outfile, quiet)
+    if update:
+        previous, old_tmpdir = update
+        families, panfile = mmf.run_pangenome_update(previous, old_tmpdir, min_id, clust_mode,
+                                                     outdir, prt_path, threads, outfile, quiet,
+                                                     prt_files, max_mem, compact=True)
+    else:
+        previous = None
+        families, panfile = mmf.run_all_pangenome(min_id, clust_mode, outdir,
+                                                  prt_path, threads, outfile, quiet, members,
+                                                  prt_files, engine, max_mem, compact=True)
     # Create matrix pan_quali, pan_quanti and summary file
-    pt.post_treat(families, panfile)
+    pt.post_treat(families, panfile, matrix, previous, distances, threads, curves)
     logger.info("DONE")
     return panfile
 
@@ -165,7 +224,8 @@ def build_parser(parser):
                                 "LSTINFO-<list_file>.lst file of 'PanACoTA annotate' module."
                                 "Here, only the first column (genome name without extension) "
                                 "will be used. All proteins of all these genomes will be "
-                                "concatenated in a file called <dataset_name>.All.prt. The "
+                                "clustered (and concatenated in a file called "
+                                "<dataset_name>.All.prt with --bank option). The "
                                 "column header must be 'gembase_name'."))
     required.add_argument("-n", dest="dataset_name", required=True,
                           help=("Name of the dataset which will be clustered (for example, "
@@ -197,6 +257,80 @@ def build_parser(parser):
                           help=("use this option if you want to save the concatenated protein "
                                 "databank in another directory than the one containing all "
                                 "individual protein files ('Proteins' folder)."))
+    optional.add_argument("--dedup", dest="dedup", action="store_true", default=False,
+                          help=("Cluster only 1 copy of identical proteins: the bank, called "
+                                "<dataset_name>.All.uniq.prt, only contains unique sequences. "
+                                "Removed copies are listed in <dataset_name>.All.uniq.members, "
+                                "and put back in the family of their identical protein in the "
+                                "pangenome. Faster on datasets with many clonal genomes."))
+    optional.add_argument("--bank", dest="keep_bank", action="store_true", default=False,
+                          help=("Concatenate all proteins to <dataset_name>.All.prt, and give "
+                                "this bank to mmseqs. By default, the protein files of all "
+                                "genomes are given directly to mmseqs, without writing this "
+                                "bank."))
+    optional.add_argument("--matrix", dest="matrix", choices=["csv", "sparse", "all"],
+                          default="csv",
+                          help=("Format of the qualitative and quantitative matrices of the "
+                                "pangenome. 'csv' (default) writes <pangenome>.quali.txt and "
+                                "<pangenome>.quanti.txt. 'sparse' writes instead "
+                                "<pangenome>.quanti.npz (scipy sparse matrix), "
+                                "<pangenome>.quali.npz (bits packed by numpy.packbits) and "
+                                "<pangenome>.index.json (genome of each row, family of each "
+                                "column). 'all' writes both."))
+    optional.add_argument("--distances", dest="distances", action="store_true", default=False,
+                          help=("Also write the distances between all pairs of genomes, on "
+                                "their family content, to <pangenome>.distances.npz: "
+                                "Jaccard distance ('jaccard') and number of families present "
+                                "in only 1 of the 2 genomes ('hamming'), in condensed form "
+                                "(see scipy.spatial.distance.squareform), with the genome "
+                                "names ('genomes') and their number of families "
+                                "('nb_families'). Computed on the given number of threads."))
+    optional.add_argument("--curves", dest="curves", type=int, default=0, metavar="NB_PERMS",
+                          help=("Also write the pan and core accumulation curves to "
+                                "<pangenome>.curves.txt: for each number of genomes k, mean "
+                                "and quantiles of the number of families present in at least "
+                                "1 (pan) and in all (core) of the first k genomes, over "
+                                "NB_PERMS random orders of genomes. Computed on the given "
+                                "number of processes. Default: 0, no curve."))
+    optional.add_argument("--update", dest="update", nargs=2,
+                          metavar=("PANGENOME", "TMPDIR"),
+                          help=("Update an existing pangenome with the new genomes of "
+                                "LSTINFO_FILE (which must also contain the genomes of the "
+                                "existing pangenome), instead of clustering all proteins "
+                                "again. Give the existing pangenome file, and the directory "
+                                "with its mmseqs clustering (tmp_<dataset>_<information> "
+                                "folder of its output directory, with any engine, or for any "
+                                "setting of a --sweep-id/--sweep-mode run). New proteins are clustered against "
+                                "the existing clusters with 'mmseqs clusterupdate': existing "
+                                "families keep their number, new families are numbered after "
+                                "them."))
+    optional.add_argument("--engine", dest="engine", choices=["cluster", "linclust"],
+                          default="cluster",
+                          help=("Clustering engine. 'cluster' (default) clusters all proteins "
+                                "with 'mmseqs cluster'. 'linclust', faster for very large "
+                                "banks, first clusters all proteins with 'mmseqs linclust' "
+                                "(linear time) at 95%% identity (or MIN_ID if higher), then "
+                                "clusters only the representatives of these clusters with "
+                                "'mmseqs cluster' at MIN_ID, and puts back their members. The "
+                                "time spent in each stage is logged."))
+    optional.add_argument("--max-mem", dest="max_mem", type=utils_argparse.mem_size,
+                          help=("Maximum memory that mmseqs can use (for example '16G'). The "
+                                "memory limit of its prefilter index (--split-memory-limit) "
+                                "is computed from it, and the index is split if the protein "
+                                "bank is too big. The peak memory used by mmseqs is written "
+                                "in the log file. By default, mmseqs uses the memory of the "
+                                "whole machine."))
+    optional.add_argument("--sweep-id", dest="sweep_ids", nargs="+",
+                          type=utils_argparse.perc_id, metavar="MIN_ID",
+                          help=("Build 1 pangenome for each of these minimum sequence "
+                                "identities (and each cluster mode of --sweep-mode, or the "
+                                "one given with -c), instead of 1 pangenome. The mmseqs "
+                                "database is created only once, and several clusterings "
+                                "are run at the same time when several threads are given."))
+    optional.add_argument("--sweep-mode", dest="sweep_modes", nargs="+", type=int,
+                          choices=[0, 1, 2], metavar="{0,1,2}",
+                          help=("Build 1 pangenome for each of these cluster modes (and "
+                                "each identity of --sweep-id, or the one given with -i)."))
     optional.add_argument("--threads", dest="threads", default=1, type=utils_argparse.thread_num,
                           help=("add this option if you want to parallelize on several threads. "
                                 "Indicate on how many threads you want to parallelize. "
@@ -231,6 +365,24 @@ def parse(parser, argu):
         with error message if error occurs with arguments given.
     """
     args = parser.parse_args(argu)
+    if args.update and args.dedup:
+        parser.error("--dedup cannot be used with --update.")
+    if args.update and args.engine != "cluster":
+        parser.error("--engine cannot be used with --update: new proteins are clustered "
+                     "with 'mmseqs clusterupdate'.")
+    if args.curves < 0:
+        parser.error("--curves must be a positive number of random orders of genomes.")
+    args.sweep = None
+    if args.sweep_ids or args.sweep_modes:
+        if args.update:
+            parser.error("--sweep-id and --sweep-mode cannot be used with --update.")
+        if args.outfile:
+            parser.error("-f cannot be used with --sweep-id or --sweep-mode: each pangenome "
+                         "has the default name, with its setting.")
+        settings = [(min_id, mode) for min_id in args.sweep_ids or [args.min_id]
+                    for mode in args.sweep_modes or [args.clust_mode]]
+        # Remove duplicate settings, keeping the given order
+        args.sweep = list(dict.fromkeys(settings))
     return args
 
 
@@ -51,8 +51,6 @@ from termcolor import colored
 
 from PanACoTA import __version__ as version
 from PanACoTA import utils
-from PanACoTA.prepare_module import download_genomes_func as dgf
-from PanACoTA.prepare_module import filter_genomes as fg
 
 
 def main_from_parse(arguments):
@@ -137,6 +135,8 @@ def main(cmd, ncbi_species_name, ncbi_species_taxid, ncbi_taxid, ncbi_strains, l
     quiet : bool
         True if nothing must be sent to stdout/stderr, False otherwise
     """
+    from PanACoTA.prepare_module import download_genomes_func as dgf
+    from PanACoTA.prepare_module import filter_genomes as fg
 
     # get species name in NCBI format
     # -> will be used to name output directory
@@ -40,7 +40,6 @@ Functions to infer a phylogenetic tree with fastME
 June 2017
 """
 
-from Bio import AlignIO
 import os
 import logging
 
@@ -89,6 +88,7 @@ def convert2phylip(infile, outfile):
     outfile: str
         Path to file to generate, in Phylip-relaxed format
     """
+    from Bio import AlignIO
     if os.path.isfile(outfile):
         logger.info("Phylip alignment file already existing.")
         logger.warning(("The Phylip alignment file {} already exists. The program "
@@ -40,7 +40,6 @@ Functions to infer a phylogenetic tree with quicktree
 June 2017
 """
 
-from Bio import AlignIO
 import os
 import logging
 
@@ -88,6 +87,7 @@ def convert2stockholm(infile, outfile):
     outfile: str
         Path to file which will contain the alignments converted to Stockholm format
     """
+    from Bio import AlignIO
     if os.path.isfile(outfile):
         logger.info("Stockholm alignment file already existing.")
         logger.warning(("The Stockholm alignment file {} already exists. The program "
@@ -43,17 +43,16 @@ April 2017
 
 import os
 import sys
-import re
 import glob
 import subprocess
 import shutil
 import shlex
-import progressbar
+
+from PanACoTA import utils_fasta
 
 # Logging
 import logging
 from logging.handlers import RotatingFileHandler
-from colorlog import ColoredFormatter
 
 try:
     import cPickle as pickle
@@ -103,6 +102,7 @@ def init_logger(logfile_base, level, name, log_details=False, verbose=0, quiet=F
         True if nothing must be sent to stdout/stderr, False otherwise
     """
     import time
+    from colorlog import ColoredFormatter
 
     # time when soft is launched
     time_start = time.strftime("_%y-%m-%d_%H-%m-%S")
@@ -319,12 +319,16 @@ def run_cmd(cmd, error, eof=False, **kwargs):
     eof : bool
         True: exit program if command failed, False: do not exit even if command fails
     kwargs : Object
-        Can provide a logger, stdout and/or stderr streams
+        Can provide a logger, stdout and/or stderr streams, and stdin_files: list of files
+        (possibly compressed) whose content is concatenated to the standard input of the
+        command
 
     Returns
     -------
     subprocess.Popen
-        returns object of subprocess call (has attributes returncode, pid, communicate etc.)
+        returns object of subprocess call (has attributes returncode, pid, communicate etc.),
+        with the peak memory (RSS, in bytes) used by the command in its peak_mem attribute
+        (0 if unknown)
 
     """
     if "logger" not in kwargs:
@@ -335,10 +339,14 @@ def run_cmd(cmd, error, eof=False, **kwargs):
         kwargs["stdout"] = None
     if "stderr" not in kwargs:
         kwargs["stderr"] = None
+    stdin_files = kwargs.get("stdin_files")
     try:
         call = subprocess.Popen(shlex.split(cmd), stdout=kwargs["stdout"],
-                                stderr=kwargs["stderr"])
-        call.wait()
+                                stderr=kwargs["stderr"],
+                                stdin=subprocess.PIPE if stdin_files else None)
+        if stdin_files:
+            feed_stdin(call, stdin_files)
+        call.peak_mem = wait_peak_mem(call)
         retcode = call.returncode
     except OSError:
         logger.error(f"error: command '>{cmd}' is not possible.")
@@ -353,6 +361,93 @@ def run_cmd(cmd, error, eof=False, **kwargs):
     return call
 
 
+def wait_peak_mem(call):
+    """
+    Wait for the end of a running command, and get the peak memory it used (this command
+    and its own children, but not the other children of the current process).
+    On Linux, the peak of a command is at least the peak memory of the current process
+    when the command was started (it is inherited when the command is forked).
+
+    Parameters
+    ----------
+    call : subprocess.Popen
+        running command. Its returncode is set.
+
+    Returns
+    -------
+    int
+        peak memory (RSS) in bytes, 0 if it cannot be known on this platform
+    """
+    if not hasattr(os, "wait4"):
+        call.wait()
+        return 0
+    try:
+        _, status, usage = os.wait4(call.pid, 0)
+    except ChildProcessError:
+        # Already waited for
+        call.wait()
+        return 0
+    if os.WIFSIGNALED(status):
+        call.returncode = -os.WTERMSIG(status)
+    else:
+        call.returncode = os.WEXITSTATUS(status)
+    return maxrss_bytes(usage.ru_maxrss)
+
+
+def maxrss_bytes(maxrss):
+    """
+    Convert ru_maxrss of resource usage to bytes: it is in bytes on macOS, and in kilobytes
+    on Linux
+    """
+    if sys.platform == "darwin":
+        return maxrss
+    return maxrss * 1024
+
+
+def feed_stdin(call, files):
+    """
+    Write the content of all given files to the standard input of a running command, and
+    close it.
+
+    Parameters
+    ----------
+    call : subprocess.Popen
+        running command, started with stdin=subprocess.PIPE
+    files : list
+        files to concatenate to the command standard input. Compressed files (gzip, bgzip,
+        zstd) are decompressed.
+    """
+    try:
+        for file in files:
+            with utils_fasta.open_read(file) as inf:
+                shutil.copyfileobj(inf, call.stdin, utils_fasta.BUFSIZE)
+    except BrokenPipeError:
+        # Command stopped before reading everything: its return code will tell why
+        pass
+    finally:
+        try:
+            call.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def children_peak_mem():
+    """
+    Get the maximum resident memory used by a child process of the current process
+    (only children which are finished are considered).
+    This is the peak of the largest child (or descendant) only, not the sum of the
+    children which ran at the same time. It is also the largest peak since the start of
+    the current process, not only of the last child.
+
+    Returns
+    -------
+    int
+        peak memory in bytes
+    """
+    import resource
+    return maxrss_bytes(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
 def plot_distr(values, limit, title, text, logger):
     """
     Plot histogram of given 'values', and add a vertical line corresponding to the chosen
@@ -595,6 +690,36 @@ def sort_genomes_l90_nbcont(x):
     return x[1][-1], x[1][-2]
 
 
+def split_protein(name):
+    """
+    Split a protein name into the name of its genome and its protein number. All paths
+    finding the genome of a protein (sorting, pangenome, subsets of genomes) use it, so
+    that they all agree.
+
+    Parameters
+    ----------
+    name : str
+        protein name: <genome>_<prot_num>. If the genome name is in gembase format
+        (ex: ESCO.1512.00001.i0002_12124), it is followed by the contig information, and
+        the genome name is the 3 first "." separated fields (ESCO.1512.00001).
+
+    Returns
+    -------
+    (genome, prot_num) : tuple
+        genome name, and protein number (as str, "" if there is no "_" in name).
+        For a protein name without any "_" in non-gembase format, genome is "".
+    """
+    base, sep, prot_num = name.rpartition("_")
+    if not sep:
+        base, prot_num = "", ""
+    fields = (base or name).split(".")
+    # if format is gembase (ex: ESCO.1512.00001.i0002_12124), genome name is 3 first . separated fields
+    if len(fields) >= 3:
+        return ".".join(fields[:3]), prot_num
+    # otherwise, it must be something_00001: genome name is everything before the last "_"
+    return base, prot_num
+
+
 def sort_proteins(x):
     """
     order by:
@@ -615,14 +740,16 @@ def sort_proteins(x):
         return ESCO, 00001 and 12124. If not, it must be something_00001:\
         return something and 00001.
     """
+    genome, prot_num = split_protein(x)
+    fields = genome.split(".")
     try:
         # if format is ESCO.1512.00001.i0002_12124, sort by ESCO, then 00001, then 12124
-        if "." in x and len(x.split(".")) >= 3:
-            return x.split(".")[0], int(x.split(".")[2].split("_")[0]), int(x.split("_")[-1])
+        if len(fields) == 3:
+            return fields[0], int(fields[2]), int(prot_num)
         # if format is not like this, it must be something_00001:
         # sort by 'something' and then 00001
-        return "_".join(x.split("_")[:-1]), int(x.split("_")[-1])
-    except (IndexError, ValueError):
+        return genome, int(prot_num)
+    except ValueError:
         logger = logging.getLogger("utils")
         logger.error(("ERROR: Protein {} does not have the required format. "
                       "It must contain, at least <alpha-num_only>_<num_only>, and at best "
@@ -925,7 +1052,8 @@ def cat(list_files, output, title=None):
 
     Concatenate all files in 'list_files' and save result in 'output' folder.
     Concat using shutil.copyfileobj, in order to copy by chunks, to
-    avoid memory problems if files are big.
+    avoid memory problems if files are big. Compressed files (gzip, bgzip, zstd) are
+    decompressed.
 
     Parameters
     ----------
@@ -941,19 +1069,20 @@ def cat(list_files, output, title=None):
     bar = None
     curnum = None
     if title:
+        import progressbar
         nbfiles = len(list_files)
         widgets = [title + ': ', progressbar.Bar(marker='█', left='', right='', fill=' '),
                    ' ', progressbar.Counter(), f"/{nbfiles}" ' (',
                    progressbar.Percentage(), ") - ", progressbar.Timer()]
         bar = progressbar.ProgressBar(widgets=widgets, max_value=nbfiles, term_width=79).start()
         curnum = 1
-    with open(output, "w") as outf:
+    with open(output, "wb") as outf:
         for file in list_files:
             if title:
                 bar.update(curnum)
                 curnum += 1
-            with open(file, "r") as inf:
-                shutil.copyfileobj(inf, outf)
+            with utils_fasta.open_read(file) as inf:
+                shutil.copyfileobj(inf, outf, utils_fasta.BUFSIZE)
     if title:
         bar.finish()
 
@@ -980,17 +1109,11 @@ def grep(filein, pattern, counts=False):
     list or int
         list of lines if counts=False; number of lines if counts=True
     """
-    num = 0
-    lines = []
-    with open(filein, "r") as inf:
-        for line in inf:
-            if re.search(pattern, line):
-                lines.append(line.strip())
-                num += 1
+    found = utils_fasta.grep_lines(filein, pattern)
     if counts:
-        return num
+        return sum(1 for _ in found)
     else:
-        return lines
+        return [line.decode().strip() for line in found]
 
 
 def count(filein, get="lines"):
@@ -1021,12 +1144,12 @@ def count(filein, get="lines"):
         logger.error("Choose what you want to count among {}.".format(gets))
         sys.exit(1)
     num = 0
-    with open(filein, "r") as inf:
-        for line in inf:
-            if get == "lines":
-                num += 1
-            elif get == "words":
-                num += len(line.split())
+    # Blocks end at the end of a line: a word is never split between 2 blocks
+    for block in utils_fasta.line_blocks(filein):
+        if get == "lines":
+            num += block.count(b"\n") + (not block.endswith(b"\n"))
+        elif get == "words":
+            num += len(block.split())
     return num
 
 
@@ -1072,29 +1195,29 @@ def check_out_dirs(resdir):
                      "LSTINFO folder. Provide another result directory, or remove the "
                      "files in this one.\nEnding program.")
         sys.exit(1)
-    if glob.glob(os.path.join(resdir, "Proteins", "*.prt")):
+    if glob.glob(os.path.join(resdir, "Proteins", "*.prt*")):
         logger.error("ERROR: Your output directory already has .prt files in the "
                      "Proteins folder. Provide another result directory, or remove the "
                      "files in this one.\nEnding program.")
         sys.exit(1)
-    if glob.glob(os.path.join(resdir, "Genes", "*.gen")):
+    if glob.glob(os.path.join(resdir, "Genes", "*.gen*")):
         logger.error("ERROR: Your output directory already has .gen files in the "
                      "Genes folder. Provide another result directory, or remove the "
                      "files in this one.\nEnding program.")
         sys.exit(1)
-    if glob.glob(os.path.join(resdir, "Replicons", "*.fna")):
+    if glob.glob(os.path.join(resdir, "Replicons", "*.fna*")):
         logger.error("ERROR: Your output directory already has .fna files in the "
                      "Replicons folder. Provide another result directory, or remove the "
                      "files in this one.\nEnding program.")
         sys.exit(1)
-    if glob.glob(os.path.join(resdir, "gff3", "*.gff")):
+    if glob.glob(os.path.join(resdir, "gff3", "*.gff*")):
         logger.error("ERROR: Your output directory already has .gff files in the "
                      "gff3 folder. Provide another result directory, or remove the "
                      "files in this one.\nEnding program.")
         sys.exit(1)
 
 
-def get_genome_contigs_and_rename(gembase_name, gpath, outfile, logger):
+def get_genome_contigs_and_rename(gembase_name, gpath, outfile, logger, records=None):
     """
     For the given genome (sequence in gpath), rename all its contigs
     with the new name: 'gembase_name', and save the output sequence in outfile.
@@ -1110,6 +1233,9 @@ def get_genome_contigs_and_rename(gembase_name, gpath, outfile, logger):
         path to the genome sequence
     outfile : str
         path to the new file, containing 'gpath' sequence, but with 'gembase_name' in headers
+    records : list or None
+        utils_fasta.FastaRecord of all contigs of gpath, if they were already read. None to
+        read them from gpath
 
     Returns
     -------
@@ -1119,77 +1245,33 @@ def get_genome_contigs_and_rename(gembase_name, gpath, outfile, logger):
         - Dict of all contigs with their size: (list of str)
         {"new_name': 'size1"}
     """
-    # Initialize variables
-
-    # Contig number
-    contig_num = 1
-    # contig size
-    cont_size = 0
     # List of contigs (str) [<name>\t<orig_name>]
     contigs = {}
     # List of contigs (str) with their sizes [<name>\t<size>]
     sizes = {}
-    # Name of previous contig (to put to contigs, as we need to wait for the next
-    # contig to know the size of the previous one)
-    prev_cont = ""
-    prev_orig_name = ""
-    # sequence of previous contig
-    seq = ""
-
     # Read input sequence given to prodigal, and open file where sequences with new
     # headers must be written.
-    with open(gpath, "r") as gpf, open(outfile, "w") as grf:
-        for line in gpf:
-            # When we find a new header line, convert its name to gembase format, and write it
-            # to output replicon file
-            if line.startswith(">") :
-                # If not first contig (contigs not empty):
-                # - add its name as well as its size to contigs list
-                # - add its name with its original name to
-                # - write header ("<contig name> <size>") to replicon file
-                if prev_cont:
-                    cont = " ".join([prev_cont, str(cont_size)]) + "\n"
-                    prevcont_nohead = prev_cont.split(">")[1]
-                    prev_orig_name_nohead = prev_orig_name.split(">")[1]
-                    if prev_orig_name_nohead:
-                        if prev_orig_name_nohead in contigs:
-                            logger.error(f"several contigs have the same name "
-                                         f"{prev_orig_name_nohead} in {gpath}.")
-                            return False, False
-                        sizes[prevcont_nohead] = cont_size
-                        contigs[prev_orig_name_nohead] = prevcont_nohead
-                        grf.write(cont)
-                        grf.write(seq)
-                prev_cont = ">" + gembase_name + "." + str(contig_num).zfill(4)
-                # keep only first string of contig
-                prev_orig_name = line.strip().split()[0]
-                contig_num += 1
-                cont_size = 0
-                seq = ""
-            # Sequence line: write it as is in replicon file, and add its size to cont_size.
-            else:
-                seq += line
-                cont_size += len(line.strip())
-        # Write last contig, if there is one (if gpath not empty)
-        if prev_cont:
-            cont = " ".join([prev_cont, str(cont_size)]) + "\n"
-            prevcont_nohead = "".join(prev_cont.split(">")[1:])
-            prev_orig_name_nohead = prev_orig_name.split(">")[1]
-            if prev_orig_name_nohead:
-                if prev_orig_name_nohead in contigs:
-                    logger.error(f"several contigs have the same name {prev_orig_name_nohead} "
-                                 f"in {gpath}.")
-                    return False, False
-            contigs[prev_orig_name_nohead] = prevcont_nohead
-            sizes[prevcont_nohead] = cont_size
-            grf.write(cont)
-            grf.write(seq)
+    with utils_fasta.open_write(outfile) as grf:
+        if records is None:
+            records = utils_fasta.read_records(gpath)
+        for contig_num, record in enumerate(records, start=1):
+            # Convert contig name to gembase format, and write contig to output replicon
+            # file, with header "<contig name> <size>", and sequence lines as is.
+            orig_name = record.name.decode()
+            if not orig_name:
+                continue
+            if orig_name in contigs:
+                logger.error(f"several contigs have the same name {orig_name} in {gpath}.")
+                return False, False
+            new_name = gembase_name + "." + str(contig_num).zfill(4)
+            cont_size = len(record)
+            contigs[orig_name] = new_name
+            sizes[new_name] = cont_size
+            grf.write(f">{new_name} {cont_size}\n".encode() + record.body)
     if not contigs:
         logger.error(f"Your genome {gpath} does not contain any sequence, "
                      "or is not in fasta format.")
     return contigs, sizes
-# Add test with empty gpath
-# Add test with non fasta gpath
 
 
 def logger_thread(q):
@@ -1318,6 +1400,7 @@ def thread_progressbar(widgets, stop):
         function returning False when thread can run, True when it has to stop.
     """
     if widgets:
+        import progressbar
         bar = progressbar.ProgressBar(widgets=widgets, max_value=20, term_width=50)
         while True:
             bar.update()
@@ -43,6 +43,7 @@ April 2017
 from PanACoTA import utils
 import argparse
 import configparser
+import math
 import sys
 import os
 
@@ -190,6 +191,29 @@ def perc_id(param):
     return param
 
 
+def mem_size(param):
+    """
+    Check argument given to parameter --max-mem: a positive amount of memory, in bytes, or
+    followed by a unit (K, M, G or T). Return the number of bytes
+    """
+    units = {"K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12}
+    value = param.strip().upper().rstrip("B")
+    factor = 1
+    if value and value[-1] in units:
+        factor = units[value[-1]]
+        value = value[:-1]
+    try:
+        value = float(value)
+    except ValueError:
+        msg = (f"argument --max-mem: invalid memory value: '{param}'. Give a number of bytes, "
+               "or a number followed by K, M, G or T (for example '16G').")
+        raise argparse.ArgumentTypeError(msg)
+    if not math.isfinite(value * factor) or value <= 0:
+        msg = f"argument --max-mem must be a positive amount of memory: invalid value: '{param}'"
+        raise argparse.ArgumentTypeError(msg)
+    return int(value * factor)
+
+
 class Conf_all_parser(configparser.ConfigParser):
     """
     Read configfile and return arguments found, according to required type
@@ -313,3 +337,17 @@ class Conf_all_parser(configparser.ConfigParser):
             val = self[section][param]
             print(f"ERROR: {param} must be a float. Wrong value: {val}.")
             sys.exit(1)
+
+    def set_mem(self, section, param):
+        """
+        Change param of section to a number of bytes (see mem_size), if given
+        raise error if problem
+        """
+        val = self.sec_dicts[section][param]
+        if val is None or isinstance(val, int):
+            return
+        try:
+            self.sec_dicts[section][param] = mem_size(val)
+        except argparse.ArgumentTypeError as err:
+            print(f"ERROR: {err}")
+            sys.exit(1)
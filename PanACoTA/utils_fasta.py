@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# ###############################################################################
+# This file is part of PanACOTA.                                                #
+#                                                                               #
+# Authors: Amandine Perrin                                                      #
+# Copyright © 2018-2020 Institut Pasteur (Paris).                               #
+# See the COPYRIGHT file for details.                                           #
+#                                                                               #
+# PanACOTA is a software providing tools for large scale bacterial comparative  #
+# genomics. From a set of complete and/or draft genomes, you can:               #
+#    -  Do a quality control of your strains, to eliminate poor quality         #
+# genomes, which would not give any information for the comparative study       #
+#    -  Uniformly annotate all genomes                                          #
+#    -  Do a Pan-genome                                                         #
+#    -  Do a Core or Persistent genome                                          #
+#    -  Align all Core/Persistent families                                      #
+#    -  Infer a phylogenetic tree from the Core/Persistent families             #
+#                                                                               #
+# PanACOTA is free software: you can redistribute it and/or modify it under the #
+# terms of the Affero GNU General Public License as published by the Free       #
+# Software Foundation, either version 3 of the License, or (at your option)     #
+# any later version.                                                            #
+#                                                                               #
+# PanACOTA is distributed in the hope that it will be useful, but WITHOUT ANY   #
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS     #
+# FOR A PARTICULAR PURPOSE. See the Affero GNU General Public License           #
+# for more details.                                                             #
+#                                                                               #
+# You should have received a copy of the Affero GNU General Public License      #
+# along with PanACOTA (COPYING file).                                           #
+# If not, see <https://www.gnu.org/licenses/>.                                  #
+# ###############################################################################
+
+
+"""
+Functions to read and write (multi)fasta files, shared by all modules.
+
+Files are read as bytes, by large blocks, and split into records without decoding them. A
+record keeps its raw content (header and sequence lines as found in the file), so that it can
+be written back as is, and its offset in the file, so that it can be read again directly.
+Sequences can be wrapped on any number of lines.
+
+@author gem
+October 2026
+"""
+
+import io
+import os
+import re
+import mmap
+import shutil
+
+# Size of the blocks read from, or buffered before writing to, fasta files
+BUFSIZE = 1 << 20
+# Characters which are not part of a sequence
+WHITESPACES = b" \t\r\n\x0b\x0c"
+# Extension of files compressed with each method
+COMPRESS_EXT = {"gzip": ".gz", "bgzip": ".gz", "zstd": ".zst"}
+# First bytes of gzip (and bgzip) and zstd compressed files
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class FastaRecord:
+    """
+    One record of a fasta file.
+
+    Attributes
+    ----------
+    raw : bytes
+        record as found in the file: header line and sequence lines
+    offset : int
+        position of the record ('>' of its header) in the file
+    """
+    __slots__ = ("raw", "offset", "_hdr_end")
+
+    def __init__(self, raw, offset=0, hdr_end=None):
+        self.raw = raw
+        self.offset = offset
+        if hdr_end is None:
+            hdr_end = raw.find(b"\n")
+            if hdr_end == -1:
+                hdr_end = len(raw)
+        self._hdr_end = hdr_end
+
+    @property
+    def header(self):
+        """ Header line, without '>' and end of line """
+        return self.raw[1:self._hdr_end].rstrip(b"\r")
+
+    @property
+    def name(self):
+        """ First word of the header (empty if there is no header) """
+        fields = self.header.split(None, 1)
+        return fields[0] if fields else b""
+
+    @property
+    def body(self):
+        """ Sequence lines, as found in the file """
+        return self.raw[self._hdr_end + 1:]
+
+    @property
+    def seq(self):
+        """ Sequence, without line breaks """
+        return self.body.translate(None, WHITESPACES)
+
+    def __len__(self):
+        """ Length of the sequence """
+        return len(self.seq)
+
+
+def _split_records(buf, end, base=0):
+    """
+    Split buf[:end] into fasta records. Lines before the first header are ignored.
+
+    Parameters
+    ----------
+    buf : bytes or mmap.mmap
+        buffer containing fasta records
+    end : int
+        end of the part of the buffer to split
+    base : int
+        offset of buf[0] in the file
+
+    Returns
+    -------
+    list
+        FastaRecord for each record in buf[:end]
+    """
+    records = []
+    if buf[:1] == b">":
+        start = 0
+    else:
+        start = buf.find(b"\n>", 0, end) + 1
+        if not start:
+            return records
+    find = buf.find
+    while start < end:
+        nxt = find(b"\n>", start, end) + 1 or end
+        hdr_end = find(b"\n", start, nxt)
+        if hdr_end == -1:
+            hdr_end = nxt
+        records.append(FastaRecord(buf[start:nxt], base + start, hdr_end - start))
+        start = nxt
+    return records
+
+
+def read_records(fasta, use_mmap=False):
+    """
+    Read all records of a fasta file.
+
+    Parameters
+    ----------
+    fasta : str or file object
+        path to the fasta file (which can be compressed), or fasta file open for reading
+        (binary or text mode; when open in text mode, nothing must have been read from it yet)
+    use_mmap : bool
+        True to map the file in memory instead of reading it by blocks (only when 'fasta' is
+        the path to an uncompressed file). Useful for big files read several times, as the operating system keeps the
+        file content in its cache.
+
+    Returns
+    -------
+    generator
+        FastaRecord for each record of the file
+    """
+    if not isinstance(fasta, (str, os.PathLike)):
+        yield from _read_blocks(binary(fasta))
+        return
+    with open_read(fasta) as fastf:
+        if not use_mmap or is_compressed(fastf):
+            yield from _read_blocks(fastf)
+        elif os.fstat(fastf.fileno()).st_size > 0:
+            with mmap.mmap(fastf.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                yield from _split_records(buf, len(buf))
+
+
+def _read_blocks(fastf):
+    """
+    Read records of an open binary fasta file, by blocks of BUFSIZE bytes.
+
+    Parameters
+    ----------
+    fastf : io.BufferedReader
+        fasta file open in binary mode
+
+    Returns
+    -------
+    generator
+        FastaRecord for each record of the file
+    """
+    # Blocks of the last record, which may continue in next block. They are joined only
+    # once the start of a new record is found, so that large records are not copied at
+    # each block.
+    pending = []
+    base = 0
+    while True:
+        block = fastf.read(BUFSIZE)
+        if not block:
+            break
+        last = block.rfind(b"\n>") + 1
+        if not last:
+            # New record starting exactly at the beginning of the block
+            if not (block[:1] == b">" and pending and pending[-1][-1:] == b"\n"):
+                pending.append(block)
+                continue
+            last = 0
+        pending.append(block)
+        buf = b"".join(pending)
+        last += len(buf) - len(block)
+        yield from _split_records(buf, last, base)
+        base += last
+        pending = [buf[last:]]
+    buf = b"".join(pending)
+    yield from _split_records(buf, len(buf), base)
+
+
+def index_records(fasta):
+    """
+    Get position of all records of a fasta file, to read them later with 'fetch_record'
+
+    Parameters
+    ----------
+    fasta : str
+        path to the fasta file
+
+    Returns
+    -------
+    dict
+        {name: (offset, size)} with name the first word of the header, offset the position
+        of the record in the file, and size its size in bytes
+    """
+    return {rec.name.decode(): (rec.offset, len(rec.raw)) for rec in read_records(fasta)}
+
+
+def fetch_record(fastf, offset, size):
+    """
+    Read the record at the given position of the fasta file
+
+    Parameters
+    ----------
+    fastf : io.BufferedReader or mmap.mmap
+        fasta file open in binary mode, or mapped in memory
+    offset : int
+        position of the record in the file
+    size : int
+        size of the record in bytes
+
+    Returns
+    -------
+    FastaRecord
+        the record found at this position
+    """
+    fastf.seek(offset)
+    return FastaRecord(fastf.read(size), offset)
+
+
+def binary(fileobj):
+    """
+    Get the binary file under the given open file.
+
+    Parameters
+    ----------
+    fileobj : file object
+        file open in text or binary mode
+
+    Returns
+    -------
+    io.BufferedIOBase
+        fileobj if it is already in binary mode, its underlying binary buffer otherwise
+    """
+    if hasattr(fileobj, "encoding"):
+        # Text mode: everything already written must go before what will be written in binary
+        if fileobj.writable():
+            fileobj.flush()
+        return fileobj.buffer
+    return fileobj
+
+
+def open_read(fasta):
+    """
+    Open a fasta file for reading in binary mode, decompressing it if it is compressed
+    with gzip, bgzip or zstd (found from its first bytes, whatever its extension).
+
+    Parameters
+    ----------
+    fasta : str
+        path to the file to read
+
+    Returns
+    -------
+    io.BufferedIOBase
+        file open in binary mode, giving the uncompressed content
+    """
+    fastf = open(fasta, "rb", buffering=BUFSIZE)
+    magic = fastf.peek(4)[:4]
+    if magic.startswith(GZIP_MAGIC):
+        import gzip
+        return gzip.GzipFile(fileobj=fastf, mode="rb")
+    if magic == ZSTD_MAGIC:
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(fastf, closefd=True)
+    return fastf
+
+
+def is_compressed(fastf):
+    """
+    Check if a file opened with open_read is decompressed while read.
+
+    Parameters
+    ----------
+    fastf : io.BufferedIOBase
+        file returned by open_read
+
+    Returns
+    -------
+    bool
+        True if the file is compressed
+    """
+    return not isinstance(fastf, io.BufferedReader)
+
+
+def find_file(fasta):
+    """
+    Find a file, which can have been compressed after being written.
+
+    Parameters
+    ----------
+    fasta : str
+        path to the file, without compression extension
+
+    Returns
+    -------
+    str
+        path to the file if it exists, otherwise to its compressed version if it exists
+        (with '.gz' or '.zst' extension), otherwise 'fasta'.
+    """
+    if os.path.isfile(fasta):
+        return fasta
+    for ext in set(COMPRESS_EXT.values()):
+        if os.path.isfile(fasta + ext):
+            return fasta + ext
+    return fasta
+
+
+def compress(filein, method):
+    """
+    Compress a file and remove the uncompressed file.
+
+    With 'bgzip', the file is compressed by independent blocks (BGZF format, as done by
+    samtools bgzip), which can still be read by any gzip reader.
+
+    Parameters
+    ----------
+    filein : str
+        path to the file to compress
+    method : str
+        compression method: 'gzip', 'bgzip' or 'zstd'
+
+    Returns
+    -------
+    str
+        path to the compressed file: filein with '.gz' or '.zst' extension added
+    """
+    fileout = filein + COMPRESS_EXT[method]
+    if method == "gzip":
+        import gzip
+        outf = gzip.open(fileout, "wb", compresslevel=6)
+    elif method == "bgzip":
+        from Bio import bgzf
+        outf = bgzf.BgzfWriter(fileout, "wb")
+    else:
+        import zstandard
+        outf = zstandard.ZstdCompressor().stream_writer(open(fileout, "wb"), closefd=True)
+    with open(filein, "rb") as inf, outf:
+        shutil.copyfileobj(inf, outf, BUFSIZE)
+    os.remove(filein)
+    return fileout
+
+
+def open_write(fasta, append=False):
+    """
+    Open a fasta file to write records, with a large buffer
+
+    Parameters
+    ----------
+    fasta : str
+        path to the file to write
+    append : bool
+        True to add records at the end of the file if it already exists
+
+    Returns
+    -------
+    io.BufferedWriter
+        file open in binary mode
+    """
+    return open(fasta, "ab" if append else "wb", buffering=BUFSIZE)
+
+
+def write_record(outf, header, seq, width=0):
+    """
+    Write a record to a fasta file
+
+    Parameters
+    ----------
+    outf : io.BufferedWriter
+        file open in binary mode (see 'open_write')
+    header : bytes
+        header of the record, without '>'
+    seq : bytes
+        sequence of the record, without line breaks
+    width : int
+        number of characters per sequence line. 0 to write the sequence on 1 line
+    """
+    if width and len(seq) > width:
+        seq = b"\n".join(seq[i:i + width] for i in range(0, len(seq), width))
+    outf.write(b">" + header + b"\n" + seq + b"\n")
+
+
+def line_blocks(filein):
+    """
+    Read a file by blocks of about BUFSIZE bytes, each block ending at the end of a line
+
+    Parameters
+    ----------
+    filein : str
+        path to the file to read (can be compressed)
+
+    Returns
+    -------
+    generator
+        bytes blocks of complete lines
+    """
+    rest = b""
+    with open_read(filein) as inf:
+        while True:
+            block = inf.read(BUFSIZE)
+            if not block:
+                break
+            block = rest + block
+            last = block.rfind(b"\n")
+            if last == -1:
+                rest = block
+                continue
+            rest = block[last + 1:]
+            yield block[:last + 1]
+    if rest:
+        yield rest
+
+
+def count_records(fasta):
+    """
+    Count the records of a fasta file
+
+    Parameters
+    ----------
+    fasta : str
+        path to the fasta file
+
+    Returns
+    -------
+    int
+        number of lines starting with '>'
+    """
+    num = 0
+    for block in line_blocks(fasta):
+        num += block.count(b"\n>") + block.startswith(b">")
+    return num
+
+
+def grep_lines(filein, pattern):
+    """
+    Find the lines of a file containing a regular expression
+
+    Parameters
+    ----------
+    filein : str
+        path to the file in which pattern must be searched
+    pattern : str
+        regular expression to search in each line
+
+    Returns
+    -------
+    generator
+        bytes lines (with their end of line) containing the pattern
+    """
+    regex = re.compile(pattern.encode(), re.MULTILINE)
+    for block in line_blocks(filein):
+        pos = 0
+        while pos < len(block):
+            found = regex.search(block, pos)
+            if not found:
+                break
+            start = block.rfind(b"\n", 0, found.start()) + 1
+            end = block.find(b"\n", start)
+            end = len(block) if end == -1 else end + 1
+            # The pattern may match over several lines: check the line alone
+            if found.end() <= end or regex.search(block, start, end):
+                yield block[start:end]
+            pos = end
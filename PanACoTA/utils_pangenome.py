@@ -47,12 +47,602 @@ from PanACoTA import utils
 logger = logging.getLogger("utils.pan")
 
 
+class CompactFamilies:
+    """
+    Families of a pangenome, stored as 1 list of all members, family after family, and the
+    position of the first member of each family in this list (as in a CSR matrix).
+    Families are numbered from 1, in the order they were added.
+
+    Attributes
+    ----------
+    members : list
+        names of all members of all families
+    offsets : array.array
+        offsets[i - 1]:offsets[i] is the slice of members of family i
+    """
+
+    def __init__(self):
+        import array
+        self.members = []
+        self.offsets = array.array("q", [0])
+
+    def append(self, members):
+        """
+        Add a family with the given members. It gets the next family number.
+        """
+        self.members.extend(members)
+        self.offsets.append(len(self.members))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, num):
+        if not 1 <= num <= len(self):
+            raise KeyError(num)
+        return self.members[self.offsets[num - 1]:self.offsets[num]]
+
+    def __iter__(self):
+        return iter(range(1, len(self) + 1))
+
+    def items(self):
+        """
+        (family number, [members]) for each family
+        """
+        for num in self:
+            yield num, self[num]
+
+    def to_dict(self):
+        """
+        Families as {fam_num: [members]}
+        """
+        return dict(self.items())
+
+
+class Pangenome:
+    """
+    Pangenome where genomes and proteins are interned: each one is identified by its index
+    in the list of genome names or protein names. Families are stored as arrays of protein
+    indices, family after family, with the position of the first member of each family
+    (as in a CSR matrix), and the genome index of each member.
+
+    Attributes
+    ----------
+    fam_nums : list
+        number of each family, as given (str when read from the pangenome file)
+    genomes : list
+        names of all genomes (sorted by species name, unless given)
+    proteins : list
+        names of all proteins
+    offsets : numpy.ndarray
+        int64 array. Members of the i-th family are members[offsets[i]:offsets[i + 1]]
+    members : numpy.ndarray
+        int32 array of the protein index of each member
+    member_genomes : numpy.ndarray
+        int32 array of the genome index of each member
+    stats : numpy.ndarray or None
+        per-family statistics table (see `family_stats`), once computed
+    """
+
+    def __init__(self, fam_nums, genomes, proteins, offsets, members, member_genomes,
+                 stats=None):
+        self.fam_nums = fam_nums
+        self.genomes = genomes
+        self.proteins = proteins
+        self.offsets = offsets
+        self.members = members
+        self.member_genomes = member_genomes
+        self.stats = stats
+
+    @classmethod
+    def from_families(cls, families, genomes=None):
+        """
+        Build the pangenome from {fam_num: [members]} (or CompactFamilies)
+
+        Parameters
+        ----------
+        families : dict or CompactFamilies
+            {fam_num: [members]}
+        genomes : list or None
+            list of all genome names, in the order to keep. See `get_strain` for how it is
+            used to find the genome of a member. If None, genomes are the ones found in the
+            families, sorted by species name.
+
+        Returns
+        -------
+        Pangenome
+        """
+        return cls._build(families.items(), genomes)
+
+    @classmethod
+    def from_file(cls, filein, genomes=None):
+        """
+        Build the pangenome from a pangenome file: 1 family per line, with the family number
+        followed by all its members
+
+        Parameters
+        ----------
+        filein : str
+            path to pangenome file
+        genomes : list or None
+            list of all genome names, in the order to keep (see `from_families`)
+
+        Returns
+        -------
+        Pangenome
+        """
+        def read_families():
+            with open(filein, "r") as panf:
+                for line in panf:
+                    genes = line.split()
+                    if genes:
+                        yield genes[0], genes[1:]
+        return cls._build(read_families(), genomes)
+
+    @classmethod
+    def _build(cls, families, genomes):
+        """
+        Intern all members and genomes of the (fam_num, [members]) given
+        """
+        import array
+        import numpy as np
+        known = frozenset(genomes) if genomes is not None else None
+        prot_ids = {}
+        genome_ids = {genome: num for num, genome in enumerate(genomes or [])}
+        fam_nums = []
+        offsets = array.array("q", [0])
+        members = array.array("i")
+        member_genomes = array.array("i")
+        for fam_num, fam in families:
+            fam_nums.append(fam_num)
+            for gene in fam:
+                members.append(prot_ids.setdefault(gene, len(prot_ids)))
+                strain = get_strain(gene, known)
+                member_genomes.append(genome_ids.setdefault(strain, len(genome_ids)))
+            offsets.append(len(members))
+        member_genomes = np.array(member_genomes, dtype=np.int32)
+        all_genomes = list(genome_ids)
+        if genomes is None:
+            # Renumber genomes, so that they are sorted by species name
+            all_genomes.sort(key=utils.sort_genomes_by_name)
+            rank = np.empty(len(all_genomes), dtype=np.int32)
+            rank[[genome_ids[genome] for genome in all_genomes]] = np.arange(len(all_genomes))
+            member_genomes = rank[member_genomes]
+        return cls(fam_nums, all_genomes, list(prot_ids), np.array(offsets, dtype=np.int64),
+                   np.array(members, dtype=np.int32), member_genomes)
+
+    def __len__(self):
+        return len(self.fam_nums)
+
+    @property
+    def nb_members(self):
+        """
+        numpy.ndarray with the number of members of each family
+        """
+        import numpy as np
+        return np.diff(self.offsets)
+
+    def sorted_families(self):
+        """
+        List of family indices, ordered by family number
+        """
+        return sorted(range(len(self)), key=lambda num: int(self.fam_nums[num]))
+
+    def family(self, num):
+        """
+        Names of the members of the num-th family (from 0)
+        """
+        prots = self.members[self.offsets[num]:self.offsets[num + 1]]
+        if isinstance(self.proteins, StringTable):
+            return self.proteins.take(prots)
+        proteins = self.proteins
+        return [proteins[prot] for prot in prots.tolist()]
+
+    def family_genomes(self, num):
+        """
+        Genome index of each member of the num-th family (from 0)
+        """
+        return self.member_genomes[self.offsets[num]:self.offsets[num + 1]]
+
+    def genome_counts(self, num):
+        """
+        numpy.ndarray with the number of members of each genome in the num-th family (from 0)
+        """
+        import numpy as np
+        return np.bincount(self.family_genomes(num), minlength=len(self.genomes))
+
+    def family_stats(self):
+        """
+        For all families at once, count genomes having members in them.
+        The table is only computed once, and saved with the pangenome binary file (see
+        `save_pangenome`), so that the pangenome summary and the persistent genomes
+        share it.
+
+        Returns
+        -------
+        (nb_genomes, nb_mono, max_multi) : tuple
+            numpy.ndarray with, for each family:
+
+            - nb_genomes: number of different genomes in the family
+            - nb_mono: number of genomes having exactly 1 member in the family
+            - max_multi: maximum number of members from 1 genome (0 for an empty family)
+        """
+        import numpy as np
+        if self.stats is not None:
+            return tuple(self.stats)
+        nb_fams = len(self)
+        nb_genomes = max(len(self.genomes), 1)
+        fam_of_member = np.repeat(np.arange(nb_fams, dtype=np.int64), self.nb_members)
+        # 1 key per (family, genome) pair found, and its number of members
+        keys, counts = np.unique(fam_of_member * nb_genomes + self.member_genomes,
+                                 return_counts=True)
+        fams = keys // nb_genomes
+        nb_present = np.bincount(fams, minlength=nb_fams)
+        nb_mono = np.bincount(fams[counts == 1], minlength=nb_fams)
+        max_multi = np.zeros(nb_fams, dtype=np.int64)
+        np.maximum.at(max_multi, fams, counts)
+        self.stats = np.vstack([nb_present, nb_mono, max_multi]).astype(np.int64)
+        return tuple(self.stats)
+
+    def subset(self, genomes):
+        """
+        Pangenome restricted to the given genomes: other members are removed, as well as
+        the families which become empty.
+
+        Parameters
+        ----------
+        genomes : list
+            names of genomes to keep
+
+        Returns
+        -------
+        Pangenome
+            with the same protein list, and genomes in the same order as in this pangenome
+        """
+        import numpy as np
+        genomes = set(genomes)
+        kept_genomes = np.array([genome in genomes for genome in self.genomes], dtype=bool)
+        keep = kept_genomes[self.member_genomes]
+        # Number of members kept in each family
+        cumkept = np.concatenate(([0], np.cumsum(keep, dtype=np.int64)))
+        nb_kept = cumkept[self.offsets[1:]] - cumkept[self.offsets[:-1]]
+        fam_nums = [num for num, nb in zip(self.fam_nums, nb_kept.tolist()) if nb]
+        offsets = np.concatenate(([0], np.cumsum(nb_kept[nb_kept > 0]))).astype(np.int64)
+        new_ids = np.cumsum(kept_genomes, dtype=np.int32) - 1
+        return Pangenome(fam_nums, [gen for gen in self.genomes if gen in genomes],
+                         self.proteins, offsets, self.members[keep],
+                         new_ids[self.member_genomes[keep]])
+
+    def families(self):
+        """
+        Families as {fam_num: [members]}
+        """
+        return {fam_num: self.family(num) for num, fam_num in enumerate(self.fam_nums)}
+
+    def fams_by_strain(self):
+        """
+        Families as {fam_num: {strain: [members]}}, strains being in the order in which
+        they appear in the family
+        """
+        fams_by_strain = {}
+        for num, fam_num in enumerate(self.fam_nums):
+            fam = fams_by_strain[fam_num] = {}
+            for member, genome in zip(self.family(num), self.family_genomes(num).tolist()):
+                fam.setdefault(self.genomes[genome], []).append(member)
+        return fams_by_strain
+
+
+class StringTable:
+    """
+    List of strings (without new line) stored as 1 array of all their utf-8 bytes, each one
+    followed by a new line, and the position of the start of each string in it. Strings are
+    decoded only when accessed.
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        uint8 array of all strings, one after the other
+    offsets : numpy.ndarray
+        int64 array. The i-th string is data[offsets[i]:offsets[i + 1] - 1]
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+        self._view = memoryview(data)
+
+    @classmethod
+    def from_list(cls, strings):
+        """
+        Build the table from a list of strings
+        """
+        import numpy as np
+        encoded = [string.encode() + b"\n" for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, num):
+        return str(self._view[int(self.offsets[num]):int(self.offsets[num + 1]) - 1], "utf-8")
+
+    def __iter__(self):
+        return iter(self.take(range(len(self))))
+
+    def take(self, nums):
+        """
+        List of the strings at the given positions (sequence or numpy array of int)
+        """
+        import numpy as np
+        nums = np.asarray(nums, dtype=np.int64)
+        view = self._view
+        if len(nums) == 0:
+            return []
+        # Consecutive strings (as members of a same family) are decoded at once
+        if nums[-1] - nums[0] == len(nums) - 1 and (len(nums) == 1 or
+                                                    (np.diff(nums) == 1).all()):
+            start, end = int(self.offsets[nums[0]]), int(self.offsets[nums[-1] + 1])
+            return str(view[start:end - 1], "utf-8").split("\n")
+        return [str(view[start:end - 1], "utf-8")
+                for start, end in zip(self.offsets[nums].tolist(),
+                                      self.offsets[nums + 1].tolist())]
+
+
+# Pangenome binary file: the magic string, followed by arrays in npy format, each one
+# starting at a multiple of CACHE_ALIGN bytes. The first array contains the json header
+# (format version, information on the pangenome file, family numbers and genome names).
+CACHE_MAGIC = b"PANACOTA"
+CACHE_VERSION = 2
+CACHE_ALIGN = 64
+CACHE_ARRAYS = ["offsets", "members", "member_genomes", "protein_data", "protein_offsets",
+                "stats"]
+
+
+def source_info(pangenome, digest=True):
+    """
+    Get information identifying the content of the pangenome file
+
+    Parameters
+    ----------
+    pangenome : str
+        path to pangenome file
+    digest : bool
+        False to skip the hash of the file content
+
+    Returns
+    -------
+    dict or None
+        {"size": size in bytes, "mtime_ns": last modification time, "blake2b": hash of the
+        file content}, or None if the file does not exist
+    """
+    import hashlib
+    if not os.path.isfile(pangenome):
+        return None
+    stat = os.stat(pangenome)
+    info = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if digest:
+        fhash = hashlib.blake2b(digest_size=16)
+        with open(pangenome, "rb") as panf:
+            for block in iter(lambda: panf.read(1 << 20), b""):
+                fhash.update(block)
+        info["blake2b"] = fhash.hexdigest()
+    return info
+
+
+def save_pangenome(pan, binfile, pangenome):
+    """
+    Save pangenome to a binary file, which can be loaded by `load_cache`, with its
+    per-family statistics table (see `Pangenome.family_stats`)
+
+    Parameters
+    ----------
+    pan : Pangenome
+        pangenome to save
+    binfile : str
+        path to binary file
+    pangenome : str
+        path to pangenome file from which pan comes
+    """
+    import numpy as np
+    proteins = pan.proteins
+    if not isinstance(proteins, StringTable):
+        proteins = StringTable.from_list(proteins)
+    header = {"version": CACHE_VERSION, "source": source_info(pangenome),
+              "fam_nums": pan.fam_nums, "genomes": pan.genomes}
+    arrays = [pan.offsets, pan.members, pan.member_genomes, proteins.data, proteins.offsets,
+              np.vstack(pan.family_stats()).reshape(3, len(pan))]
+    _write_cache(binfile, header, arrays)
+
+
+def _write_cache(binfile, header, arrays):
+    """
+    Write the header and the arrays (in the order of `CACHE_ARRAYS`) to the binary file
+    """
+    import json
+    import numpy as np
+    arrays = [np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)] + list(arrays)
+    # Write to a temporary file, so that an interrupted run does not leave a truncated file
+    with open(binfile + ".tmp", "wb") as binf:
+        binf.write(CACHE_MAGIC)
+        for array in arrays:
+            binf.write(bytes(-binf.tell() % CACHE_ALIGN))
+            np.lib.format.write_array(binf, np.ascontiguousarray(array), version=(1, 0))
+    os.replace(binfile + ".tmp", binfile)
+
+
+def _map_arrays(binfile):
+    """
+    Generator of the arrays of a pangenome binary file, mapped in memory (except the
+    first one, containing the header)
+    """
+    import numpy as np
+    with open(binfile, "rb") as binf:
+        binf.seek(len(CACHE_MAGIC))
+        first = True
+        while True:
+            binf.seek(-binf.tell() % CACHE_ALIGN, 1)
+            if not binf.read(1):
+                return
+            binf.seek(-1, 1)
+            version = np.lib.format.read_magic(binf)
+            if version != (1, 0):
+                raise ValueError(f"unexpected npy version {version}")
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(binf)
+            start = binf.tell()
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            if first:
+                yield np.frombuffer(binf.read(nbytes), dtype=dtype)
+                first = False
+            elif nbytes == 0:
+                yield np.zeros(shape, dtype=dtype)
+            else:
+                yield np.memmap(binfile, dtype=dtype, mode="r", offset=start, shape=shape,
+                                order="F" if fortran else "C")
+            binf.seek(start + nbytes)
+
+
+def check_cache(binfile, pangenome, logger):
+    """
+    Check that the binary file can be used for the pangenome file: it must be in the
+    current format, and the pangenome file must have the same size and content as when
+    the binary file was saved. If its modification time changed, its content is compared
+    through its hash. If the content did not change, the new modification time is saved
+    in the binary file, so that the file is not hashed again at the next load.
+
+    Parameters
+    ----------
+    binfile : str
+        path to binary file
+    pangenome : str
+        path to pangenome file
+    logger : logging.Logger
+        logger object to write log information
+
+    Returns
+    -------
+    dict or None
+        header of the binary file if it can be used, None otherwise
+    """
+    import json
+    if not os.path.isfile(binfile):
+        return None
+    with open(binfile, "rb") as binf:
+        magic = binf.read(len(CACHE_MAGIC))
+    if magic != CACHE_MAGIC:
+        logger.details(f"{binfile} is not in the current binary format.")
+        return None
+    try:
+        header = json.loads(next(_map_arrays(binfile)).tobytes())
+    except (ValueError, StopIteration):
+        logger.details(f"{binfile} is corrupted.")
+        return None
+    if header.get("version") != CACHE_VERSION:
+        logger.details(f"{binfile} was saved in another version of the binary format.")
+        return None
+    saved = header["source"]
+    current = source_info(pangenome, digest=False)
+    # Pangenome file not available: nothing to compare to
+    if current is None:
+        return header
+    if saved is None or saved["size"] != current["size"]:
+        logger.details(f"{pangenome} changed since {binfile} was saved.")
+        return None
+    if saved["mtime_ns"] != current["mtime_ns"]:
+        current = source_info(pangenome)
+        if saved["blake2b"] != current["blake2b"]:
+            logger.details(f"{pangenome} changed since {binfile} was saved.")
+            return None
+        logger.details(f"{pangenome} was modified, but not its content: updating {binfile}.")
+        header["source"] = current
+        _write_cache(binfile, header, list(_map_arrays(binfile))[1:])
+    return header
+
+
+def load_cache(binfile, pangenome, logger):
+    """
+    Load the pangenome from its binary file, if it can be used (see `check_cache`).
+    Arrays are mapped in memory, so that only the parts which are used are read.
+
+    Parameters
+    ----------
+    binfile : str
+        path to binary file
+    pangenome : str
+        path to pangenome file
+    logger : logging.Logger
+        logger object to write log information
+
+    Returns
+    -------
+    Pangenome or None
+        None if the binary file cannot be used
+    """
+    header = check_cache(binfile, pangenome, logger)
+    if header is None:
+        return None
+    arrays = dict(zip(CACHE_ARRAYS, list(_map_arrays(binfile))[1:]))
+    if len(arrays) != len(CACHE_ARRAYS):
+        logger.details(f"{binfile} is corrupted.")
+        return None
+    proteins = StringTable(arrays["protein_data"], arrays["protein_offsets"])
+    return Pangenome(header["fam_nums"], header["genomes"], proteins, arrays["offsets"],
+                     arrays["members"], arrays["member_genomes"], arrays["stats"])
+
+
+def load_pangenome(pangenome, logger, families=None):
+    """
+    Get pangenome as a `Pangenome` object. Build it from the families if given, otherwise
+    from the binary file if it can be used, or from the pangenome file.
+    The binary file is (re)saved if it cannot be used. Binary files saved by previous
+    versions of PanACoTA (pickles) are never loaded: they are replaced by a binary file
+    built from the pangenome file.
+
+    Parameters
+    ----------
+    pangenome : str
+        path to pangenome file
+    logger : logging.Logger
+        logger object to write log information
+    families : dict, CompactFamilies or None
+        {num: [members]} if families are given. If not (must read them from binary file
+        if exists or pangenome file otherwise), None.
+
+    Returns
+    -------
+    Pangenome
+    """
+    binfile = pangenome + ".bin"
+    if families:
+        logger.info("Retrieving information from pan families")
+        pan = Pangenome.from_families(families)
+        if check_cache(binfile, pangenome, logger) is None:
+            logger.details("Saving all information to a binary file for later use")
+            save_pangenome(pan, binfile, pangenome)
+        return pan
+    if os.path.isfile(binfile):
+        pan = load_cache(binfile, pangenome, logger)
+        if pan is not None:
+            logger.info("Retrieving info from binary file")
+            return pan
+        logger.info(f"{binfile} cannot be used.")
+    logger.info("Reading and getting information from pangenome file")
+    pan = Pangenome.from_file(pangenome)
+    if len(pan) == 0 or pan.genomes == [""]:
+        logger.error("Error in pangenome file. No family found.")
+        sys.exit(1)
+    logger.info("Saving all information to a binary file for later use")
+    save_pangenome(pan, binfile, pangenome)
+    return pan
+
+
 def read_pangenome(pangenome, logger, families=None):
     """
     Read pangenome information
 
     Read pangenome according to what is available. First, check if python objects are available,
     then if not, search for the binary file, and if not, read the text file.
+    See `load_pangenome`.
 
     Parameters
     ----------
@@ -71,19 +661,8 @@ def read_pangenome(pangenome, logger, families=None):
         - families: {fam_num: [all members]}
         - all_strains: list of all genome names
     """
-    if families:
-        fams_by_strain, all_strains = get_fams_info(families, logger)
-        if not os.path.isfile(pangenome + ".bin"):
-            logger.details("Saving all information to a binary file for later use")
-            utils.save_bin([fams_by_strain, families, all_strains], pangenome + ".bin")
-    elif os.path.isfile(pangenome + ".bin"):
-        logger.info("Retrieving info from binary file")
-        fams_by_strain, families, all_strains = utils.load_bin(pangenome + ".bin")
-    else:
-        fams_by_strain, families, all_strains = read_pan_file(pangenome, logger)
-        logger.info("Saving all information to a binary file for later use")
-        utils.save_bin([fams_by_strain, families, all_strains], pangenome + ".bin")
-    return fams_by_strain, families, all_strains
+    pan = load_pangenome(pangenome, logger, families)
+    return pan.fams_by_strain(), families or pan.families(), pan.genomes
 
 
 def get_fams_info(families, logger):
@@ -176,12 +755,7 @@ def read_gene(gene, num, fams_by_strain, all_strains):
         set of all strains
 
     """
-    # if format is ESCO.1512.00001.i001_12313 genome name is ESCO.1512.00001
-    if "." in gene and len(gene.split(".")) >= 3:
-        strain = ".".join(gene.split("_")[0].split(".")[:3])
-    # otherwise, genename is everything before the last "_"
-    else:
-        strain = "_".join(gene.split("_")[:-1])
+    strain = get_strain(gene)
     if strain in fams_by_strain[num]:
         fams_by_strain[num][strain].append(gene)
     else:
@@ -190,6 +764,31 @@ def read_gene(gene, num, fams_by_strain, all_strains):
         all_strains.add(strain)
 
 
+def get_strain(gene, genomes=None):
+    """
+    Get the name of the genome from which a gene is
+
+    Parameters
+    ----------
+    gene : str
+        gene name (species.date.strain.contig_number)
+    genomes : set or None
+        names of all genomes. If given, and the gembase-like name found is not one of them,
+        genome name is everything before the last "_"
+
+    Returns
+    -------
+    str
+        genome name
+    """
+    # if format is ESCO.1512.00001.i001_12313 genome name is ESCO.1512.00001
+    strain, _ = utils.split_protein(gene)
+    if genomes is None or strain in genomes:
+        return strain
+    # otherwise, genename is everything before the last "_"
+    return gene.rpartition("_")[0]
+
+
 def read_lstinfo(lstinfo, logger):
     """
     Read lstinfo file and return list of genomes
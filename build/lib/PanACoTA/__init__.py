@@ -0,0 +1,5 @@
+"""PanACoTA"""
+
+__version__ = "1.3.1-dev4"
+
+
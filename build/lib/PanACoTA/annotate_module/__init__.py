@@ -0,0 +1 @@
+"""annotate module of PanACoTA"""
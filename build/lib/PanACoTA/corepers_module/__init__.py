@@ -0,0 +1 @@
+"""corepers module of PanACoTA"""
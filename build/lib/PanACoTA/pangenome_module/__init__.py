@@ -0,0 +1 @@
+"""pangenome module of PanACoTA"""
@@ -0,0 +1,1227 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# ###############################################################################
+# This file is part of PanACOTA.                                                #
+#                                                                               #
+# Authors: Amandine Perrin                                                      #
+# Copyright © 2018-2020 Institut Pasteur (Paris).                               #
+# See the COPYRIGHT file for details.                                           #
+#                                                                               #
+# PanACOTA is a software providing tools for large scale bacterial comparative  #
+# genomics. From a set of complete and/or draft genomes, you can:               #
+#    -  Do a quality control of your strains, to eliminate poor quality         #
+# genomes, which would not give any information for the comparative study       #
+#    -  Uniformly annotate all genomes                                          #
+#    -  Do a Pan-genome                                                         #
+#    -  Do a Core or Persistent genome                                          #
+#    -  Align all Core/Persistent families                                      #
+#    -  Infer a phylogenetic tree from the Core/Persistent families             #
+#                                                                               #
+# PanACOTA is free software: you can redistribute it and/or modify it under the #
+# terms of the Affero GNU General Public License as published by the Free       #
+# Software Foundation, either version 3 of the License, or (at your option)     #
+# any later version.                                                            #
+#                                                                               #
+# PanACOTA is distributed in the hope that it will be useful, but WITHOUT ANY   #
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS     #
+# FOR A PARTICULAR PURPOSE. See the Affero GNU General Public License           #
+# for more details.                                                             #
+#                                                                               #
+# You should have received a copy of the Affero GNU General Public License      #
+# along with PanACOTA (COPYING file).                                           #
+# If not, see <https://www.gnu.org/licenses/>.                                  #
+# ###############################################################################
+
+"""
+Functions to use mmseqs to create a pangenome
+
+@author gem
+April 2017
+"""
+import logging
+import os
+import sys
+import time
+import threading
+import copy
+
+from PanACoTA import utils
+from PanACoTA import utils_pangenome as utils_pan
+
+logger = logging.getLogger("pangenome.mmseqs")
+
+# Minimum identity of the first (linclust) stage of the 'linclust' clustering engine
+LINCLUST_ID = 0.95
+# Part of the memory budget (--max-mem) given to the mmseqs prefilter index with
+# --split-memory-limit: the rest is for the other data mmseqs keeps in memory
+MMSEQS_INDEX_MEM = 0.7
+# Memory of the mmseqs prefilter index: 7 bytes per amino acid, and 8 bytes per k-mer of
+# its table (21^6 k-mers with the default k-mer size)
+INDEX_BYTES_PER_AA = 7
+INDEX_TABLE_BYTES = 8 * 21**6
+
+
+def run_all_pangenome(min_id, clust_mode, outdir, prt_path, threads, panfile=None, quiet=False,
+                      members=None, prt_files=None, engine="cluster", max_mem=None,
+                      compact=False):
+    """
+    Run all steps to build a pangenome:
+
+    - create mmseqs database from protein bank
+    - cluster proteins
+    - convert to pangenome
+
+
+    Parameters
+    ----------
+    min_id : float
+        minimum percentage of identity to be in the same family
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    outdir : str
+        directory where output cluster file must be saved
+    prt_path : str
+        path to file containing all proteins to cluster.
+    threads : int
+        number of threads which can be used
+    panfile : str or None
+        name for output pangenome file. Otherwise, will use default name
+    quiet : bool
+        True if nothing must be written on stdout, False otherwise.
+    members : dict or None
+        When prt_path only contains 1 copy of identical proteins:
+        {representative: [other proteins with the same sequence]}, to put them back in
+        the families of their representative. None otherwise.
+    prt_files : list or None
+        protein files to give to mmseqs instead of prt_path, which is then only used to
+        name output files. None to cluster proteins in prt_path.
+    engine : str
+        "cluster" to cluster proteins with mmseqs cluster, "linclust" to use the cascaded
+        linclust engine (see `run_mmseqs_linclust`)
+    max_mem : int or None
+        maximum memory (bytes) mmseqs can use (see `get_mem_limit`). None for no limit
+    compact : bool
+        True to return families as a utils_pangenome.CompactFamilies, which stores each
+        member name only once, instead of a dict. If the pangenome file already exists,
+        families are then None: they are read from the pangenome file when needed.
+
+    Returns
+    -------
+    (families, outfile) : tuple
+
+        - families : {fam_num: [all members]} (see compact)
+        - outfile : pangenome filename
+    """
+    # Get general information and file/directory names
+    prt_bank = os.path.basename(prt_path)
+    # start = time.strftime('%Y-%m-%d_%H-%M-%S')
+    information = ("Will run MMseqs2 with:\n"
+                   f"\t- minimum sequence identity = {min_id*100}%\n"
+                   f"\t- cluster mode {clust_mode}")
+    if threads > 1:
+        information += f"\n\t- {threads} threads"
+    if engine == "linclust":
+        information += (f"\n\t- linclust engine: linclust at {max(min_id, LINCLUST_ID)*100}% "
+                        "identity, then cluster of its representatives")
+    logger.info(information)
+    infoname = get_info(threads, min_id, clust_mode, engine)
+    logmmseq = get_logmmseq(outdir, prt_bank, infoname)
+
+    tmpdir = os.path.join(outdir, "tmp_" + prt_bank + "_" + infoname)
+    mmseqdb = os.path.join(tmpdir, prt_bank + "-msDB")
+    mmseqclust = os.path.join(tmpdir, prt_bank + "-clust-" + infoname)
+    mmseqstsv = mmseqclust + ".tsv"
+    # Get pangenome filename
+    if not panfile:
+        base = os.path.basename(mmseqstsv)
+        panfile = os.path.join(outdir, f"PanGenome-{prt_bank}-clust-{infoname}.lst")
+    else:
+        panfile = os.path.join(outdir, panfile)
+    # If pangenome file already exists, read it to get families
+    if os.path.isfile(panfile):
+        logger.warning(f"Pangenome file {panfile} already exists. PanACoTA will read it to get families.")
+        families = None
+        if not compact:
+            _, families, _ = utils_pan.read_pan_file(panfile, logger)
+    else:
+        os.makedirs(tmpdir, exist_ok=True)
+        mem_limit = get_mem_limit(max_mem, prt_path, prt_files)
+        # Create ffindex of DB if not already done
+        status = do_mmseqs_db(mmseqdb, prt_path, logmmseq, quiet, prt_files)
+        # status = create_mmseqs_db(mmseqdb, prt_path, logmmseq)
+        # Status = ok means that mmseqs_db files already existed and were not re-done
+        # If they were redone (or just done), remove any existing following file (mmseqs clust, tsv, csv)
+        # Cluster with mmseqs
+        families, panfile = do_pangenome(outdir, prt_bank, mmseqdb, mmseqclust, tmpdir, logmmseq, min_id,
+                                         clust_mode, status, threads, panfile, quiet,
+                                         members, engine, mem_limit, compact)
+    return families, panfile
+
+
+def run_pangenome_update(previous, old_tmpdir, min_id, clust_mode, outdir, prt_path, threads,
+                         panfile=None, quiet=False, prt_files=None, max_mem=None,
+                         compact=False):
+    """
+    Update an existing pangenome with new genomes, keeping the numbers of its families:
+
+    - create mmseqs database from protein bank (proteins of all genomes, previous and new)
+    - cluster new proteins against the previous clustering (mmseqs clusterupdate)
+    - convert to pangenome: new proteins are added to the family of the previous proteins
+      they are clustered with, other clusters are new families, numbered after the
+      previous ones.
+
+    Parameters
+    ----------
+    previous : str
+        previous pangenome file
+    old_tmpdir : str
+        directory containing the mmseqs database and clustering of the previous pangenome
+        (tmp_<dataset>.All.prt_<info> folder of its output directory)
+    min_id : float
+        minimum percentage of identity to be in the same family
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    outdir : str
+        directory where output cluster file must be saved
+    prt_path : str
+        path to file containing all proteins to cluster.
+    threads : int
+        number of threads which can be used
+    panfile : str or None
+        name for output pangenome file. Otherwise, will use default name
+    quiet : bool
+        True if nothing must be written on stdout, False otherwise.
+    prt_files : list or None
+        protein files to give to mmseqs instead of prt_path, which is then only used to
+        name output files. None to cluster proteins in prt_path.
+    max_mem : int or None
+        maximum memory (bytes) mmseqs can use (see `get_mem_limit`). None for no limit
+    compact : bool
+        True to return None instead of the families: they are read from the updated
+        pangenome file when needed, instead of being kept in memory
+
+    Returns
+    -------
+    (families, outfile) : tuple
+
+        - families : {fam_num: [all members]}, or None (see compact)
+        - outfile : pangenome filename
+    """
+    prt_bank = os.path.basename(prt_path)
+    logger.info(f"Will update pangenome {previous} with MMseqs2 clusterupdate:\n"
+                f"\t- minimum sequence identity = {min_id*100}%\n"
+                f"\t- cluster mode {clust_mode}")
+    infoname = get_info(threads, min_id, clust_mode)
+    logmmseq = get_logmmseq(outdir, prt_bank, infoname)
+    old_db, old_clust = find_mmseqs_files(old_tmpdir)
+    tmpdir = os.path.join(outdir, "tmp_" + prt_bank + "_" + infoname)
+    mmseqdb = os.path.join(tmpdir, prt_bank + "-msDB")
+    mmsequpdb = mmseqdb + "-updated"
+    mmseqclust = os.path.join(tmpdir, prt_bank + "-clust-" + infoname + "-updated")
+    if not panfile:
+        panfile = os.path.join(outdir, f"PanGenome-{prt_bank}-clust-{infoname}.lst")
+    else:
+        panfile = os.path.join(outdir, panfile)
+    if os.path.abspath(panfile) == os.path.abspath(previous):
+        logger.error(f"The updated pangenome would overwrite the previous one ({previous}). "
+                     "Please give another dataset name, or another pangenome filename.")
+        sys.exit(1)
+    os.makedirs(tmpdir, exist_ok=True)
+    mem_limit = get_mem_limit(max_mem, prt_path, prt_files)
+    do_mmseqs_db(mmseqdb, prt_path, logmmseq, quiet, prt_files)
+    logger.info("Clustering new proteins...")
+    ret = run_mmseqs_clusterupdate(old_db, mmseqdb, old_clust, mmsequpdb, mmseqclust, tmpdir,
+                                   logmmseq, min_id, threads, clust_mode, mem_limit)
+    log_peak_mem(ret, "mmseqs clusterupdate")
+    cmd = f"mmseqs createtsv {mmsequpdb} {mmsequpdb} {mmseqclust} {mmseqclust}.tsv"
+    msg = "Problem while trying to convert mmseq result file to tsv file"
+    logger.details(f"MMseqs command: {cmd}")
+    with open(logmmseq, "a") as logf:
+        utils.run_cmd(cmd, msg, eof=True, stdout=logf, stderr=logf)
+    logger.info("Converting mmseqs results to pangenome file")
+    old_families = utils_pan.load_pangenome(previous, logger).families()
+    families = update_families(mmseqclust + ".tsv", old_families, panfile)
+    if compact:
+        families = None
+    return families, panfile
+
+
+def run_pangenome_sweep(settings, outdir, prt_path, threads, quiet=False, members=None,
+                        prt_files=None, engine="cluster", max_mem=None, compact=False):
+    """
+    Build 1 pangenome for each clustering setting (minimum identity and cluster mode):
+
+    - create mmseqs database from protein bank, only once for all settings
+    - cluster proteins with each setting. Several clusterings are run at the same time,
+      sharing the given threads
+    - convert each clustering to a pangenome file, as soon as it is done
+
+    Each setting has its own tmp directory, mmseqs log and pangenome file, named as when
+    running `run_all_pangenome` with this setting.
+
+    Parameters
+    ----------
+    settings : list
+        [(min_id, clust_mode)] clustering settings to run
+    outdir : str
+        directory where output cluster files must be saved
+    prt_path : str
+        path to file containing all proteins to cluster.
+    threads : int
+        number of threads which can be used
+    quiet : bool
+        True if nothing must be written on stdout, False otherwise.
+    members : dict or None
+        When prt_path only contains 1 copy of identical proteins:
+        {representative: [other proteins with the same sequence]}, to put them back in
+        the families of their representative. None otherwise.
+    prt_files : list or None
+        protein files to give to mmseqs instead of prt_path, which is then only used to
+        name output files. None to cluster proteins in prt_path.
+    engine : str
+        "cluster" or "linclust", see `run_all_pangenome`
+    max_mem : int or None
+        maximum memory (bytes) mmseqs can use, shared by the clusterings running at the
+        same time. None for no limit
+    compact : bool
+        see `run_all_pangenome`
+
+    Yields
+    ------
+    (min_id, clust_mode, families, panfile) : tuple
+        for each setting, in the given order
+
+        - families : {fam_num: [all members]} (see compact)
+        - panfile : pangenome filename
+    """
+    from multiprocessing.pool import ThreadPool
+    prt_bank = os.path.basename(prt_path)
+    # Run as many clusterings at the same time as possible, each on its share of threads
+    jobs = min(len(settings), threads)
+    job_threads = threads // jobs
+    logger.info(f"Will run MMseqs2 with {len(settings)} settings (minimum sequence identity, "
+                f"cluster mode): {', '.join(f'({min_id}, {mode})' for min_id, mode in settings)}"
+                f"\n\t- {jobs} clustering(s) at the same time, with {job_threads} thread(s) "
+                "each")
+    mem_limit = get_mem_limit(max_mem // jobs if max_mem else None, prt_path, prt_files)
+    # All settings cluster the same database
+    dbdir = os.path.join(outdir, "tmp_" + prt_bank + "_sweep")
+    os.makedirs(dbdir, exist_ok=True)
+    mmseqdb = os.path.join(dbdir, prt_bank + "-msDB")
+    just_done = do_mmseqs_db(mmseqdb, prt_path, get_logmmseq(outdir, prt_bank, "sweep"), quiet,
+                             prt_files)
+    runs = []
+    for min_id, clust_mode in settings:
+        infoname = get_info(job_threads, min_id, clust_mode, engine)
+        tmpdir = os.path.join(outdir, "tmp_" + prt_bank + "_" + infoname)
+        mmseqclust = os.path.join(tmpdir, prt_bank + "-clust-" + infoname)
+        panfile = os.path.join(outdir, f"PanGenome-{prt_bank}-clust-{infoname}.lst")
+        # Database just (re)created: previous clusterings cannot be used
+        if just_done:
+            for file in [mmseqclust, mmseqclust + ".tsv", panfile]:
+                utils.remove(file)
+        os.makedirs(tmpdir, exist_ok=True)
+        runs.append((min_id, clust_mode, tmpdir, mmseqclust,
+                     get_logmmseq(outdir, prt_bank, infoname), panfile))
+    logger.info("Clustering proteins...")
+    with ThreadPool(jobs) as pool:
+        clusterings = pool.imap(lambda run: cluster_setting(mmseqdb, job_threads, *run,
+                                                            engine=engine,
+                                                            mem_limit=mem_limit), runs)
+        for (min_id, clust_mode, _, mmseqclust, logmmseq, panfile), clustered in \
+                zip(runs, clusterings):
+            if clustered is None:
+                sys.exit(1)
+            if clustered:
+                logger.info(f"Clustering with minimum identity {min_id} and cluster mode "
+                            f"{clust_mode} done.")
+                families = mmseqs_to_pangenome(mmseqdb, mmseqclust, logmmseq, panfile,
+                                               members, compact)
+            elif compact:
+                families = None
+            else:
+                _, families, _ = utils_pan.read_pan_file(panfile, logger)
+            yield min_id, clust_mode, families, panfile
+
+
+def cluster_setting(mmseqdb, threads, min_id, clust_mode, tmpdir, mmseqclust, logmmseq,
+                    panfile, engine="cluster", mem_limit=None):
+    """
+    Cluster the proteins of mmseqdb with the given setting, if not already done
+
+    Parameters
+    ----------
+    mmseqdb : str
+        path to base filename of output of mmseqs createdb
+    threads : int
+        max number of threads to use
+    min_id : float
+        min percentage of identity to be considered in the same family (between 0 and 1)
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    tmpdir : str
+        path to tmp directory of this setting
+    mmseqclust : str
+        path to base filename for output of mmseq clustering
+    logmmseq : str
+        path to file for mmseqs logs of this setting
+    panfile : str
+        pangenome filename of this setting
+    engine : str
+        "cluster" or "linclust", see `run_all_pangenome`
+    mem_limit : int or None
+        memory limit (bytes) of the mmseqs prefilter index, None for no limit
+
+    Returns
+    -------
+    bool or None
+        False if the pangenome file already exists (nothing to do), True if the clustering
+        is done, None if mmseqs failed (error already logged)
+    """
+    if os.path.isfile(panfile):
+        logger.warning(f"Pangenome file {panfile} already exists. PanACoTA will read it to "
+                       "get families.")
+        return False
+    if os.path.isfile(mmseqclust):
+        logger.warning(f"mmseqs clustering {mmseqclust} already exists. The program will now "
+                       "convert it to a pangenome file.")
+    else:
+        run_clust = run_mmseqs_linclust if engine == "linclust" else run_mmseqs_clust
+        ret = run_clust((mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode),
+                        mem_limit)
+        if isinstance(ret, int) or ret.returncode != 0:
+            return None
+        log_peak_mem(ret, f"mmseqs clustering with minimum identity {min_id} and cluster "
+                          f"mode {clust_mode}")
+    return True
+
+
+def find_mmseqs_files(tmpdir):
+    """
+    Find the mmseqs database and clustering in a directory of a previous pangenome run
+
+    The directory is named tmp_<prt_bank>_<info>, and the clustering is
+    <prt_bank>-clust-<info>: intermediate clusterings in the same directory (such as the
+    ones of the linclust engine) are not used. The database <prt_bank>-msDB is in the same
+    directory, or in tmp_<prt_bank>_sweep next to it for a run with several settings.
+
+    Parameters
+    ----------
+    tmpdir : str
+        directory containing the clustering of a previous run
+
+    Returns
+    -------
+    (mmseqdb, mmseqclust) : tuple
+        base filenames of the database and of the clustering
+    """
+    import glob
+    tmpdir = os.path.normpath(tmpdir)
+    dirname = os.path.basename(tmpdir)
+    found = []
+    for clt in glob.glob(os.path.join(tmpdir, "*-clust-*.dbtype")):
+        name = os.path.basename(clt)[:-len(".dbtype")]
+        prt_bank, _, infoname = name.rpartition("-clust-")
+        if dirname == f"tmp_{prt_bank}_{infoname}":
+            found.append((prt_bank, clt[:-len(".dbtype")]))
+    if len(found) != 1:
+        logger.error(f"{tmpdir} must be the tmp_<dataset>_<information> folder of a previous "
+                     "run, containing its mmseqs clustering <dataset>-clust-<information>. "
+                     f"Found {len(found)} such clustering(s).")
+        sys.exit(1)
+    prt_bank, mmseqclust = found[0]
+    for dbdir in [tmpdir, os.path.join(os.path.dirname(tmpdir), f"tmp_{prt_bank}_sweep")]:
+        mmseqdb = os.path.join(dbdir, prt_bank + "-msDB")
+        if os.path.isfile(mmseqdb + ".dbtype"):
+            return mmseqdb, mmseqclust
+    logger.error(f"No mmseqs database {prt_bank}-msDB found in {tmpdir}, nor in "
+                 f"tmp_{prt_bank}_sweep next to it.")
+    sys.exit(1)
+
+
+def run_mmseqs_clusterupdate(old_db, mmseqdb, old_clust, mmsequpdb, mmseqclust, tmpdir,
+                             logmmseq, min_id, threads, clust_mode, mem_limit=None):
+    """
+    Run mmseqs clusterupdate: cluster the proteins of mmseqdb which are not in old_db,
+    against the clustering of old_db
+
+    Parameters
+    ----------
+    old_db : str
+        path to base filename of the previous mmseqs database
+    mmseqdb : str
+        path to base filename of the database with all proteins (previous and new)
+    old_clust : str
+        path to base filename of the previous mmseqs clustering
+    mmsequpdb : str
+        path to base filename for the updated database (created by mmseqs)
+    mmseqclust : str
+        path to base filename for the updated clustering
+    tmpdir : str
+        path to folder which will contain mmseq temporary files
+    logmmseq : str
+        path to file where logs must be written
+    min_id : float
+        min percentage of identity to be considered in the same family (between 0 and 1)
+    threads : int
+        max number of threads to use
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    mem_limit : int or None
+        memory limit (bytes) of the mmseqs prefilter index, None for no limit
+
+    Returns
+    -------
+    subprocess.Popen
+        mmseqs call (see `utils.run_cmd`)
+    """
+    cmd = (f"mmseqs clusterupdate {old_db} {mmseqdb} {old_clust} {mmsequpdb} {mmseqclust} "
+           f"{tmpdir} --min-seq-id {min_id} --threads {threads} --cluster-mode {clust_mode}"
+           f"{mem_option(mem_limit)}")
+    logger.details(f"MMseqs command: {cmd}")
+    msg = f"Problem while updating clustering with mmseqs. See log in {logmmseq}"
+    with open(logmmseq, "a") as logm:
+        return utils.run_cmd(cmd, msg, eof=True, stdout=logm, stderr=logm)
+
+
+def update_families(tsvfile, old_families, fileout):
+    """
+    From the tsv output of mmseqs clusterupdate, add the new proteins to the previous
+    families, and write the updated pangenome file.
+
+    Previous families keep their number and members. A new protein clustered with
+    proteins of a previous family is added to this family (to the family with the
+    smallest number if they are from several families). Clusters of new proteins only are
+    new families, numbered after the previous ones, in the order of the tsv file.
+
+    Parameters
+    ----------
+    tsvfile : str
+        tsv file of the updated clustering
+    old_families : dict
+        {fam_num: [members]} of the previous pangenome
+    fileout : str
+        filename of the updated pangenome
+
+    Returns
+    -------
+    dict
+        families : {famnum: [members]}
+    """
+    fam_of = {mem: int(num) for num, fam in old_families.items() for mem in fam}
+    new_fams = {int(num): list(fam) for num, fam in old_families.items()}
+    next_num = max(new_fams, default=0) + 1
+    changed = set()
+    nb_new = 0
+    for fam in mmseq_tsv_to_clusters(tsvfile).values():
+        new_members = [mem for mem in fam if mem not in fam_of]
+        if not new_members:
+            continue
+        old_nums = sorted({fam_of[mem] for mem in fam if mem in fam_of})
+        if old_nums:
+            if len(old_nums) > 1:
+                logger.warning(f"New proteins are clustered with proteins of families "
+                               f"{', '.join(map(str, old_nums))}. They are added to family "
+                               f"{old_nums[0]}.")
+            new_fams[old_nums[0]].extend(new_members)
+            changed.add(old_nums[0])
+        else:
+            new_fams[next_num] = new_members
+            next_num += 1
+            nb_new += 1
+    families = {}
+    with open(fileout, "w") as fout:
+        for num in sorted(new_fams):
+            write_family(num, new_fams[num], None, fout, families)
+    logger.info(f"Updated pangenome has {len(families)} families: {nb_new} new families, "
+                f"and {len(changed)} previous families with new members.")
+    return families
+
+
+def get_bank_size(prt_path, prt_files=None):
+    """
+    Get the size of the proteins to cluster
+
+    Parameters
+    ----------
+    prt_path : str
+        path to the file containing all proteins to cluster
+    prt_files : list or None
+        protein files given to mmseqs instead of prt_path
+
+    Returns
+    -------
+    int
+        size (bytes) of prt_path, or total size of prt_files
+    """
+    if prt_files:
+        return sum(os.path.getsize(prt) for prt in prt_files)
+    return os.path.getsize(prt_path)
+
+
+def get_mem_limit(max_mem, prt_path, prt_files=None):
+    """
+    Get the memory limit of the mmseqs prefilter index (--split-memory-limit) for the
+    given memory budget. If the index of the bank does not fit, mmseqs splits it, and runs
+    the prefilter once per part.
+
+    Parameters
+    ----------
+    max_mem : int or None
+        maximum memory (bytes) mmseqs can use. None for no limit
+    prt_path : str
+        path to the file containing all proteins to cluster
+    prt_files : list or None
+        protein files given to mmseqs instead of prt_path
+
+    Returns
+    -------
+    int or None
+        memory limit of the prefilter index, in bytes. None for no limit
+    """
+    if not max_mem:
+        return None
+    mem_limit = int(max_mem * MMSEQS_INDEX_MEM)
+    index_mem = INDEX_BYTES_PER_AA * get_bank_size(prt_path, prt_files) + INDEX_TABLE_BYTES
+    nb_parts = -(-index_mem // mem_limit)
+    logger.info(f"mmseqs memory limited to {max_mem / 1e9:.2f} GB: prefilter index "
+                f"(estimated to {index_mem / 1e9:.2f} GB) limited to "
+                f"{mem_limit / 1e9:.2f} GB, so split in about {nb_parts} part(s).")
+    if mem_limit < INDEX_TABLE_BYTES:
+        logger.warning(f"The memory given to mmseqs is probably too small: its k-mer table "
+                       f"alone needs about {INDEX_TABLE_BYTES / 1e9:.2f} GB.")
+    return mem_limit
+
+
+def mem_option(mem_limit):
+    """
+    Get the mmseqs option limiting the memory of its prefilter index
+
+    Parameters
+    ----------
+    mem_limit : int or None
+        memory limit in bytes, None for no limit
+
+    Returns
+    -------
+    str
+        option to add to the mmseqs command ("" for no limit)
+    """
+    if not mem_limit:
+        return ""
+    # mmseqs units are binary: give the limit in MiB, rounded down
+    return f" --split-memory-limit {max(mem_limit // 2**20, 1)}M"
+
+
+def log_peak_mem(call, step):
+    """
+    Log the peak memory (RSS) used by an mmseqs command, to tune --max-mem of later runs
+
+    Parameters
+    ----------
+    call : subprocess.Popen
+        mmseqs call, with its peak memory (see `utils.run_cmd`)
+    step : str
+        name of the mmseqs step, for the log message
+    """
+    import resource
+    if not call.peak_mem:
+        return
+    own_peak = utils.maxrss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    if call.peak_mem > own_peak:
+        logger.info(f"Peak memory (RSS) used by {step}: {call.peak_mem / 1e9:.2f} GB")
+    else:
+        # Peak of the command not known: it includes the peak of the current process
+        logger.info(f"Peak memory (RSS) used by {step}: at most "
+                    f"{call.peak_mem / 1e9:.2f} GB")
+
+
+def get_info(threads, min_id, clust_mode, engine="cluster"):
+    """
+    Get string containing all information on future run
+
+    Parameters
+    ----------
+    threads : int
+        max number of threads to use
+    min_id : float
+        min percentage of identity to consider 2 proteins in hte same family
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    engine : str
+        clustering engine, "cluster" or "linclust". Only "linclust" is written in the
+        filenames, so that default names do not change.
+
+    Returns
+    -------
+    str
+        string containing info on current run, to put in filenames
+    """
+    if threads != 1:
+        threadinfo = "-th" + str(threads)
+    else:
+        threadinfo = ""
+    infoname = str(min_id) + "-mode" + str(clust_mode) + threadinfo
+    if engine == "linclust":
+        infoname += "-linclust"
+    return infoname
+
+
+def get_logmmseq(outdir, prt_bank, infoname):
+    """
+    Get filename of logfile, given information
+
+    Parameters
+    ----------
+    outdir : str
+        output directory
+    prt_bank : str
+        name of file (without path) containing all proteins to cluster
+    infoname : str
+        string containing information on the current run
+
+    Returns
+    -------
+    str
+        path to mmseq logfile
+    """
+    return os.path.join(outdir, "mmseq_" + prt_bank + "_" + infoname + ".log")
+
+
+def do_mmseqs_db(mmseqdb, prt_path, logmmseq, quiet, prt_files=None):
+    """
+    Runs create_mmseqs_db with an "infinite progress bar" in the background.
+    
+    create_mmseqs_db does :
+    Create ffindex of protein bank (prt_path) if not already done. If done, just write a message
+    to tell the user that the current existing file will be used.
+
+    Parameters
+    ----------
+    mmseqdb : str
+         path to base filename for output of mmseqs createdb
+    prt_path : str
+        path to the file containing all proteins to cluster
+    logmmseq : str
+         path to file where logs must be written
+    quiet : bool
+        True if no output in stderr/stdout, False otherwise
+    prt_files : list or None
+        protein files to put in the database instead of prt_path
+
+    Returns
+    -------
+    bool
+        True if mmseqs db just created, False if already existed
+    """
+    import progressbar
+    logger.info("Creating database")
+    try:
+        stop_bar = False
+        if quiet:
+            widgets = []
+        # If not quiet, start a progress bar while clustering proteins. We cannot guess
+        # how many time it will take, so we start an "infinite" bar, and send it a signal
+        # when it has to stop. If quiet, we start a thread that will immediatly stop
+        else:
+            widgets = [progressbar.BouncingBar(marker=progressbar.RotatingMarker(markers="◐◓◑◒")),
+                       "  -  ", progressbar.Timer()]
+        x = threading.Thread(target=utils.thread_progressbar, args=(widgets, lambda : stop_bar,))
+        x.start()
+        res = create_mmseqs_db(mmseqdb, prt_path, logmmseq, prt_files)
+    # except KeyboardInterrupt: # pragma: no cover
+    except: # pragma: no cover
+        stop_bar = True
+        x.join()
+        sys.exit(1)
+    # Clustering done, stop bar and join (if quiet, it was already finished, so we just join it)
+    stop_bar = True
+    x.join()
+    return res
+
+
+def do_pangenome(outdir, prt_bank, mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, clust_mode, 
+                just_done, threads, panfile, quiet=False, members=None, engine="cluster",
+                mem_limit=None, compact=False):
+    """
+    Use mmseqs to cluster proteins
+
+    Parameters
+    ----------
+    outdir : str
+        directory where output files are saved
+    prt_bank : str
+        name of the file containing all proteins to cluster, without path
+    mmseqdb : str
+        path to base filename of output of mmseqs createdb
+    mmseqclust : str
+        mmseqs clust
+    tmp_dir : str
+        path to tmp directory
+    logmmseq : str
+        path to file for mmseqs logs
+    min_id : float
+        min percentage of identity to be considered in the same family (between 0 and 1)
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    just_done : str
+        True if mmseqs db was just (re)created -> remove mmseqs clust. 
+        False if mmseqs db was kept from previous run -> no need to rerun mmseqs clust if already exists
+    threads : int
+        max number of threads to use
+    panfile : str
+        if a pangenome file is specified. Otherwise, default pangenome name will be used
+    quiet : bool
+        true if nothing must be print on stdout/stderr, false otherwise (show progress bar)
+    members : dict or None
+        {representative: [other proteins with the same sequence]} to add to the families,
+        None if all proteins were clustered
+    engine : str
+        "cluster" or "linclust", see `run_all_pangenome`
+    mem_limit : int or None
+        memory limit (bytes) of the mmseqs prefilter index, None for no limit
+    compact : bool
+        True to return families as a utils_pangenome.CompactFamilies instead of a dict
+
+    Returns
+    -------
+    (families, outfile) : tuple
+
+        - families : {fam_num: [all members]}
+        - outfile : pangenome filename
+    """
+    import progressbar
+    mmseqstsv = mmseqclust + ".tsv"
+    # If we just made the database, we must redo all next steps
+    # -> if existing, remove
+    # mmseqsclust (created by run_mmseqs_clust)
+    # mmseqstsv (created by mmseqs_to_pangenome)
+    # pangenome file
+    if just_done and os.path.isfile(mmseqclust) or os.path.isfile(mmseqstsv) or os.path.isfile(panfile):
+        logger.details("Removing existing clustering and/or pangenome files.")
+        utils.remove(mmseqclust)
+        utils.remove(mmseqstsv)
+        utils.remove(panfile)
+    bar = None
+    logger.debug(mmseqclust)
+    if os.path.isfile(mmseqclust):
+        logger.warning((f"mmseqs clustering {mmseqclust} already exists. The program will now convert "
+                        "it to a pangenome file."))
+    else:
+        logger.info("Clustering proteins...")
+        try:
+            stop_bar = False
+            if quiet:
+                widgets = []
+            # If not quiet, start a progress bar while clustering proteins. We cannot guess
+            # how many time it will take, so we start an "infinite" bar, and send it a signal
+            # when it has to stop. If quiet, we start a thread that will immediatly stop
+            else:
+                widgets = [progressbar.BouncingBar(marker=progressbar.RotatingMarker(markers="◐◓◑◒")),
+                           "  -  ", progressbar.Timer()]
+            x = threading.Thread(target=utils.thread_progressbar, args=(widgets, lambda : stop_bar,))
+            x.start()
+            args = (mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode)
+            if engine == "linclust":
+                ret = run_mmseqs_linclust(args, mem_limit)
+            else:
+                ret = run_mmseqs_clust(args, mem_limit)
+        # except KeyboardInterrupt: # pragma: no cover
+        except: # pragma: no cover
+            stop_bar = True
+            x.join()
+            sys.exit(1)
+        # Clustering done, stop bar and join (if quiet, it was already finished, so we just join it)
+        stop_bar = True
+        x.join()
+        # Clustering failed (error already logged): no clustering to convert
+        if isinstance(ret, int) or ret.returncode != 0:
+            sys.exit(1)
+        log_peak_mem(ret, "mmseqs clustering")
+    # Convert output to tsv file (one line per comparison done)
+    #  # Convert output to tsv file (one line per comparison done)
+    # -> returns (families, outfile)
+    families = mmseqs_to_pangenome(mmseqdb, mmseqclust, logmmseq, panfile, members, compact)
+    return families, panfile
+
+
+def run_mmseqs_clust(args, mem_limit=None):
+    """
+    Run mmseqs clustering
+
+    Parameters
+    ----------
+    args : tuple
+         (mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode), with:
+
+            * mmseqdb: path to base filename (output created by mmseq db)
+            * mmseqclust: path to base filename for output of mmseq clustering
+            * tmpdir : path to folder which will contain mmseq temporary files
+            * logmmseq : path to file where logs must be written
+            * min_id : min percentage of identity to be considered in the same family
+            *         (between 0 and 1)
+            * threads : max number of threads to use
+            * clust_mode : [0, 1, 2], 0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+
+    mem_limit : int or None
+        memory limit (bytes) of the mmseqs prefilter index, None for no limit
+
+    Returns
+    -------
+    subprocess.Popen or int
+        result of `utils.run_cmd`: the mmseqs call (with its returncode), or 1 if mmseqs
+        could not be run. An error is already logged if it failed.
+    """
+    mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode = args
+    cmd = (f"mmseqs cluster {mmseqdb} {mmseqclust} {tmpdir} --min-seq-id {min_id} --threads {threads} --cluster-mode "
+           f"{clust_mode}{mem_option(mem_limit)}")
+    logger.details(f"MMseqs command: {cmd}")
+    msg = f"Problem while clustering proteins with mmseqs. See log in {logmmseq}"
+    with open(logmmseq, "a") as logm:
+        return utils.run_cmd(cmd, msg, eof=False, stdout=logm, stderr=logm)
+
+
+def run_mmseqs_linclust(args, mem_limit=None):
+    """
+    Run the cascaded linclust clustering, for very large protein banks:
+
+    - mmseqs linclust (linear time) of all proteins at high identity (LINCLUST_ID, or
+      min_id if higher)
+    - mmseqs cluster of the representatives of these clusters only, at min_id
+    - mmseqs mergeclusters, to put back all members of the linclust clusters in the
+      clusters of their representative
+
+    The result is a clustering of all proteins in mmseqclust, as with `run_mmseqs_clust`.
+    The time spent in each stage is logged.
+
+    Parameters
+    ----------
+    args : tuple
+         (mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode), see
+         `run_mmseqs_clust`
+    mem_limit : int or None
+        memory limit (bytes) of the mmseqs k-mer and prefilter indexes, None for no limit
+
+    Returns
+    -------
+    subprocess.Popen or int
+        result of `utils.run_cmd` for the last command run: the next ones are not run if
+        a command failed (see `run_mmseqs_clust`). If all commands succeeded, its peak_mem
+        is the highest peak memory of all commands.
+    """
+    mmseqdb, mmseqclust, tmpdir, logmmseq, min_id, threads, clust_mode = args
+    lin_id = max(min_id, LINCLUST_ID)
+    linclust = mmseqclust + "-lin"
+    repdb = linclust + "-rep"
+    repclust = repdb + "-clust"
+    mem_opt = mem_option(mem_limit)
+    msg = f"Problem while clustering proteins with mmseqs. See log in {logmmseq}"
+    stages = [(f"linclust of all proteins at {lin_id*100}% identity",
+               [f"mmseqs linclust {mmseqdb} {linclust} {tmpdir} --min-seq-id {lin_id} "
+                f"--threads {threads} --cluster-mode {clust_mode}{mem_opt}"]),
+              (f"cluster of linclust representatives at {min_id*100}% identity",
+               [f"mmseqs createsubdb {linclust} {mmseqdb} {repdb}",
+                f"mmseqs cluster {repdb} {repclust} {tmpdir} --min-seq-id {min_id} "
+                f"--threads {threads} --cluster-mode {clust_mode}{mem_opt}",
+                f"mmseqs mergeclusters {mmseqdb} {mmseqclust} {linclust} {repclust} "
+                f"--threads {threads}"])]
+    peak_mem = 0
+    with open(logmmseq, "a") as logm:
+        for stage, cmds in stages:
+            start = time.perf_counter()
+            for cmd in cmds:
+                logger.details(f"MMseqs command: {cmd}")
+                ret = utils.run_cmd(cmd, msg, eof=False, stdout=logm, stderr=logm)
+                if isinstance(ret, int) or ret.returncode != 0:
+                    return ret
+                peak_mem = max(peak_mem, ret.peak_mem)
+            logger.info(f"Done {stage} in {time.perf_counter() - start:.1f} s")
+    ret.peak_mem = peak_mem
+    return ret
+
+
+def mmseqs_to_pangenome(mmseqdb, mmseqclust, logmmseq, outfile, members=None, compact=False):
+    """
+    Convert mmseqs clustering to a pangenome file:
+
+    - convert mmseqs results to tsv file
+    - convert tsv file to pangenome
+
+    Parameters
+    ----------
+    mmseqdb : str
+         path to base filename of output of mmseqs createdb
+    mmseqclust : str
+        path to base filename of output of mmseqs cluster
+    logmmseq : str
+         path to file where logs must be written
+    outfile : str
+        pangenome filename
+    members : dict or None
+        {representative: [other proteins with the same sequence]} to add to the families,
+        None if all proteins were clustered
+    compact : bool
+        True to return families as a utils_pangenome.CompactFamilies instead of a dict
+
+    Returns
+    -------
+    dict or utils_pangenome.CompactFamilies
+        - families : {fam_num: [all members]}
+    """
+    cmd = f"mmseqs createtsv {mmseqdb} {mmseqdb} {mmseqclust} {mmseqclust}.tsv"
+    msg = "Problem while trying to convert mmseq result file to tsv file"
+    logger.details(f"MMseqs command: {cmd}")
+    with open(logmmseq, "a") as logf:
+        utils.run_cmd(cmd, msg, eof=True, stdout=logf, stderr=logf)
+    # Convert the tsv file to a 'pangenome' file: one line per family
+    families = mmseqs_tsv_to_pangenome(mmseqclust, logmmseq, outfile, members, compact)
+    return families
+
+
+def mmseqs_tsv_to_pangenome(mmseqclust, logmmseq, outfile, members=None, compact=False):
+    """
+    Convert the tsv output file of mmseqs to the pangenome file
+
+    The tsv file is streamed: as mmseqs writes all members of a cluster after each other,
+    each family is written as soon as all its members are read (see `stream_tsv_to_file`).
+    If the tsv file is not grouped by cluster, the whole file is loaded instead.
+
+    Parameters
+    ----------
+    mmseqclust : str
+        path to base filename for output of mmseq clustering
+    logmmseq : str
+        path to file where logs must be written
+    outfile : str
+        pangenome filename, or None if default one must be used
+    members : dict or None
+        {representative: [other proteins with the same sequence]} to add to the families,
+        None if all proteins were clustered
+    compact : bool
+        True to return families as a utils_pangenome.CompactFamilies, False to return a dict
+
+    Returns
+    -------
+    dict or utils_pangenome.CompactFamilies
+
+        - families : {fam_num: [all members]}
+    """
+    logger.info("Converting mmseqs results to pangenome file")
+    tsvfile = mmseqclust + ".tsv"
+    families = stream_tsv_to_file(tsvfile, outfile, members, compact)
+    if families is None:
+        logger.details(f"{tsvfile} is not grouped by cluster: loading all clusters.")
+        clusters = mmseq_tsv_to_clusters(tsvfile)
+        families = clusters_to_file(clusters, outfile, members)
+        if compact:
+            compact_fams = utils_pan.CompactFamilies()
+            for fam in families.values():
+                compact_fams.append(fam)
+            families = compact_fams
+    end = time.strftime('%Y-%m-%d_%H-%M-%S')
+    with open(logmmseq, "a") as logm:
+        logm.write(f"End: {end}")
+    return families
+
+
+def stream_tsv_to_file(mmseq, fileout, members=None, compact=False):
+    """
+    Read the output of mmseq as a tsv file, where all members of a cluster follow each
+    other, and write each cluster to the pangenome file as soon as all its members are read.
+
+    Families are numbered and written as with `mmseq_tsv_to_clusters` followed by
+    `clusters_to_file`, but without keeping all clusters in memory before writing them.
+    Protein names are interned, so that each name is stored only once.
+
+    Parameters
+    ----------
+    mmseq : str
+        filename of mmseq clustering output in tsv format
+    fileout : str
+        filename of pangenome where families must be written
+    members : {representative: [other proteins with the same sequence]} or None
+        proteins which were not clustered because identical to a clustered one: they are
+        added to the family of their representative.
+    compact : bool
+        True to return families as a utils_pangenome.CompactFamilies, False to return a dict
+
+    Returns
+    -------
+    dict or utils_pangenome.CompactFamilies or None
+        families : {famnum: [members]}. None if the tsv file is not grouped by cluster (a
+        cluster found again after another one).
+    """
+    intern = sys.intern
+    families = utils_pan.CompactFamilies() if compact else {}
+    done = set()
+    repres = None
+    fam = []
+    num = 0
+    with open(mmseq) as mmsf, open(fileout, "w") as fout:
+        for line in mmsf:
+            rep_line, other = line.split()
+            if rep_line != repres:
+                if fam:
+                    num += 1
+                    write_family(num, fam, members, fout, families)
+                if rep_line in done:
+                    return None
+                repres = intern(rep_line)
+                done.add(repres)
+                # First line of a cluster is the representative with itself
+                fam = [repres]
+            else:
+                fam.append(intern(other))
+        if fam:
+            num += 1
+            write_family(num, fam, members, fout, families)
+    logger.info("Pangenome has {} families.".format(num))
+    return families
+
+
+def write_family(num, fam, members, fout, families):
+    """
+    Write a family to the pangenome file, with its members sorted, and add it to families
+
+    Parameters
+    ----------
+    num : int
+        family number
+    fam : list
+        members of the family
+    members : {representative: [other proteins with the same sequence]} or None
+        proteins to add to the family if their representative is in it
+    fout : _io.TextIOWrapper
+        open pangenome file
+    families : dict or utils_pangenome.CompactFamilies
+        families already written, to which this family is added
+    """
+    if members:
+        fam = fam + [other for mem in fam for other in members.get(mem, [])]
+    fam = sorted(fam, key=utils.sort_proteins)
+    fout.write(f"{num} {' '.join(fam)}\n")
+    if isinstance(families, dict):
+        families[num] = fam
+    else:
+        families.append(fam)
+
+
+def mmseq_tsv_to_clusters(mmseq):
+    """
+    Reads the output of mmseq as a tsv file, and converts it to a python dict
+
+    Parameters
+    ----------
+    mmseq : str
+        filename of mmseq clustering output in tsv format
+
+    Returns
+    -------
+    dict
+        {representative_of_cluster: [list of members]}
+
+    """
+    clusters = {}  # {representative: [all members]}
+    with open(mmseq) as mmsf:
+        for line in mmsf:
+            repres, other = line.strip().split()
+            if repres in clusters:
+                clusters[repres].append(other)
+            else:
+                clusters[repres] = [repres]
+    logger.info("Pangenome has {} families.".format(len(clusters)))
+    return clusters
+
+
+def clusters_to_file(clust, fileout, members=None):
+    """
+    Write all clusters to a file
+
+    Parameters
+    ----------
+    clust : {first_member: [all members = protein names]}
+    fileout : filename of pangenome where families must be written
+    members : {representative: [other proteins with the same sequence]} or None
+        proteins which were not clustered because identical to a clustered one: they are
+        added to the family of their representative.
+
+    Returns
+    -------
+    dict
+        families : {famnum: [members]}
+    """
+    families = {}  # {famnum: [members]}
+    with open(fileout, "w") as fout:
+        num = 1
+        for _, fam in clust.items():
+            if members:
+                fam = fam + [other for mem in fam for other in members.get(mem, [])]
+            families[num] = []
+            fout.write(str(num))
+            for mem in sorted(fam, key=utils.sort_proteins):
+                families[num].append(mem)
+                fout.write(" " + mem)
+            fout.write("\n")
+            num += 1
+    return families
+
+
+def create_mmseqs_db(mmseqdb, prt_path, logmmseq, prt_files=None):
+    """
+    Create ffindex of protein bank (prt_path) if not already done. If done, just write a message
+    to tell the user that the current existing file will be used.
+
+    Parameters
+    ----------
+    mmseqdb : str
+         path to base filename for output of mmseqs createdb
+    prt_path : str
+        path to the file containing all proteins to cluster
+    logmmseq : str
+         path to file where logs must be written
+    prt_files : list or None
+        protein files to put in the database instead of prt_path. They are streamed to
+        the standard input of mmseqs createdb, so that no concatenated bank is written.
+
+
+    Returns
+    -------
+    bool
+        True if mmseqs db just created, False if already existed
+    """
+    outext = ["", ".index", ".dbtype", ".lookup", "_h", "_h.index", "_h.dbtype"]
+    files_existing = []
+    if os.path.isfile(mmseqdb):
+        for file in [mmseqdb + ext for ext in outext]:
+            if not os.path.isfile(file):
+                continue
+            files_existing.append(file)
+        if len(files_existing) != len(outext):
+            logger.warning(f"mmseqs database {mmseqdb} already exists, but at least 1 associated "
+                            "file (.dbtype, .index etc). is missing. The program will "
+                            "remove existing files and recreate the database.")
+            files_remaining = copy.deepcopy(files_existing)
+            for file in files_existing:
+                os.remove(file)  # Delete file
+                files_remaining.remove(file)  # Remove file from list of existing files
+                logger.details(f"Removing '{file}'.")
+            files_existing = copy.deepcopy(files_remaining)
+        else:
+            logger.warning(f"mmseqs database {mmseqdb} already exists. The program will "
+                           "use it.")
+            return False
+    logger.debug("Existing files: {}".format(len(files_existing)))
+    logger.debug("Expected extensions: {}".format(len(outext)))
+    if prt_files:
+        cmd = f"mmseqs createdb stdin {mmseqdb}"
+        msg = (f"Problem while trying to convert proteins of {len(prt_files)} genomes to "
+               "mmseqs database format.")
+    else:
+        cmd = f"mmseqs createdb {prt_path} {mmseqdb}"
+        msg = (f"Problem while trying to convert database {prt_path} to mmseqs "
+               "database format.")
+    logger.details(f"MMseqs command: {cmd}")
+    with open(logmmseq, "w") as logf:
+        utils.run_cmd(cmd, msg, eof=True, stdout=logf, stderr=logf, stdin_files=prt_files)
+    return True
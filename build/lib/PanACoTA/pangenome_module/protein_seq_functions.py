@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# ###############################################################################
+# This file is part of PanACOTA.                                                #
+#                                                                               #
+# Authors: Amandine Perrin                                                      #
+# Copyright © 2018-2020 Institut Pasteur (Paris).                               #
+# See the COPYRIGHT file for details.                                           #
+#                                                                               #
+# PanACOTA is a software providing tools for large scale bacterial comparative  #
+# genomics. From a set of complete and/or draft genomes, you can:               #
+#    -  Do a quality control of your strains, to eliminate poor quality         #
+# genomes, which would not give any information for the comparative study       #
+#    -  Uniformly annotate all genomes                                          #
+#    -  Do a Pan-genome                                                         #
+#    -  Do a Core or Persistent genome                                          #
+#    -  Align all Core/Persistent families                                      #
+#    -  Infer a phylogenetic tree from the Core/Persistent families             #
+#                                                                               #
+# PanACOTA is free software: you can redistribute it and/or modify it under the #
+# terms of the Affero GNU General Public License as published by the Free       #
+# Software Foundation, either version 3 of the License, or (at your option)     #
+# any later version.                                                            #
+#                                                                               #
+# PanACOTA is distributed in the hope that it will be useful, but WITHOUT ANY   #
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS     #
+# FOR A PARTICULAR PURPOSE. See the Affero GNU General Public License           #
+# for more details.                                                             #
+#                                                                               #
+# You should have received a copy of the Affero GNU General Public License      #
+# along with PanACOTA (COPYING file).                                           #
+# If not, see <https://www.gnu.org/licenses/>.                                  #
+# ###############################################################################
+
+"""
+Functions to build a bank of all proteins to include in the pangenome
+
+@author gem
+April 2017
+"""
+from PanACoTA import utils
+from PanACoTA import utils_fasta
+from PanACoTA import utils_pangenome as utilsp
+import logging
+import os
+
+logger = logging.getLogger('pangenome.bank')
+
+
+def build_prt_bank(lstinfo, dbpath, name, spedir, quiet, dedup=False):
+    """
+    Build a file containing all proteins of all genomes contained in lstinfo.
+
+    Parameters
+    ----------
+    lstinfo : str
+        1 line per genome, only 1st column considered here, as the genome name
+        without extension
+    dbpath : str
+        Proteins folder, containing all proteins for each genome. Each genome has
+        its own protein file, called `<genome_name>.prt`, possibly compressed
+        (`<genome_name>.prt.gz` or `<genome_name>.prt.zst`).
+    name : str
+        dataset name, used to name the output databank: <outdir>/<name>.All.prt
+    spedir : str or None
+        By default, output file is saved in dbpath directory. If it must be saved somewhere
+        else, it is specified here.
+    quiet : bool
+        True if nothing must be written in stdout/stderr, False otherwise
+    dedup : bool
+        True to only keep 1 copy of identical proteins: the databank is then called
+        <outdir>/<name>.All.uniq.prt, and the other copies are listed in its members
+        file (see `write_unique_bank`)
+
+    Returns
+    -------
+    str
+        name (with path) of the protein databank generated
+    """
+    if not spedir:
+        outdir = dbpath
+    else:
+        os.makedirs(spedir, exist_ok=True)
+        outdir = spedir
+    if dedup:
+        outfile = os.path.join(outdir, name + ".All.uniq.prt")
+    else:
+        outfile = os.path.join(outdir, name + ".All.prt")
+    if os.path.isfile(outfile) and (not dedup or os.path.isfile(members_path(outfile))):
+        logger.warning((f"Protein bank {outfile} already exists. "
+                        "It will be used by mmseqs."))
+        return outfile
+    logger.info(f"Building bank with all proteins to {outfile}")
+    genomes = utilsp.read_lstinfo(lstinfo, logger)
+    all_names = [utils_fasta.find_file(os.path.join(dbpath, gen + ".prt")) for gen in genomes]
+    title = None if quiet else "Building bank"
+    if dedup:
+        write_unique_bank(all_names, outfile, title)
+    else:
+        utils.cat(all_names, outfile, title=title)
+    return outfile
+
+
+def list_prt_files(lstinfo, dbpath, name, spedir):
+    """
+    Get the protein files of all genomes contained in lstinfo, to give them directly to
+    mmseqs, without concatenating them to a protein bank.
+
+    Parameters
+    ----------
+    lstinfo : str
+        1 line per genome, only 1st column considered here, as the genome name
+        without extension
+    dbpath : str
+        Proteins folder, containing all proteins for each genome (see `build_prt_bank`)
+    name : str
+        dataset name
+    spedir : str or None
+        folder where the protein bank would be saved, if not in dbpath
+
+    Returns
+    -------
+    (prt_path, prt_files) : tuple
+
+        - prt_path : name (with path) that the protein bank would have: <outdir>/<name>.All.prt.
+          Used to name mmseqs files.
+        - prt_files : list of protein files, or None if the bank already exists (from a
+          previous run), so that it is used instead
+    """
+    outfile = os.path.join(spedir or dbpath, name + ".All.prt")
+    if os.path.isfile(outfile):
+        logger.warning((f"Protein bank {outfile} already exists. "
+                        "It will be used by mmseqs."))
+        return outfile, None
+    genomes = utilsp.read_lstinfo(lstinfo, logger)
+    prt_files = [utils_fasta.find_file(os.path.join(dbpath, gen + ".prt")) for gen in genomes]
+    logger.info(f"Proteins of {len(prt_files)} genomes will be given to mmseqs")
+    return outfile, prt_files
+
+
+def members_path(prt_bank):
+    """
+    Get the name of the file listing copies of proteins removed from a bank of unique
+    proteins.
+
+    Parameters
+    ----------
+    prt_bank : str
+        path to the bank of unique proteins (<name>.All.uniq.prt)
+
+    Returns
+    -------
+    str
+        path to its members file (<name>.All.uniq.members)
+    """
+    return os.path.splitext(prt_bank)[0] + ".members"
+
+
+def write_unique_bank(all_names, outfile, title=None):
+    """
+    Concatenate protein files, keeping only the first protein of each set of identical
+    sequences (its representative). Sequences are compared through a hash (blake2b, 128 bits).
+
+    The other proteins are written to the members file (see `members_path`), 1 line per
+    removed protein: `<representative>\t<protein>`.
+
+    Parameters
+    ----------
+    all_names : list
+        protein files to concatenate
+    outfile : str
+        path to the bank of unique proteins
+    title : str or None
+        title of the progressbar to show while reading protein files. None to show nothing.
+    """
+    import hashlib
+    bar = None
+    if title:
+        import progressbar
+        widgets = [title + ': ', progressbar.Bar(marker='█', left='', right='', fill=' '),
+                   ' ', progressbar.Counter(), f"/{len(all_names)}" ' (',
+                   progressbar.Percentage(), ") - ", progressbar.Timer()]
+        bar = progressbar.ProgressBar(widgets=widgets, max_value=len(all_names),
+                                      term_width=79).start()
+    # {hash of sequence: name of its representative}
+    seen = {}
+    nb_prots = 0
+    with utils_fasta.open_write(outfile) as outf, \
+         utils_fasta.open_write(members_path(outfile)) as memf:
+        for num, prt_file in enumerate(all_names, start=1):
+            for record in utils_fasta.read_records(prt_file):
+                nb_prots += 1
+                key = hashlib.blake2b(record.seq, digest_size=16).digest()
+                repres = seen.get(key)
+                if repres is None:
+                    seen[key] = record.name
+                    outf.write(record.raw)
+                else:
+                    memf.write(repres + b"\t" + record.name + b"\n")
+            if bar:
+                bar.update(num)
+    if bar:
+        bar.finish()
+    logger.info(f"{len(seen)} unique proteins among {nb_prots} proteins.")
+
+
+def read_members(prt_bank):
+    """
+    Read the members file of a bank of unique proteins
+
+    Parameters
+    ----------
+    prt_bank : str
+        path to the bank of unique proteins
+
+    Returns
+    -------
+    dict
+        {representative: [other proteins with the same sequence]}
+    """
+    members = {}
+    with open(members_path(prt_bank)) as memf:
+        for line in memf:
+            repres, member = line.split()
+            members.setdefault(repres, []).append(member)
+    return members
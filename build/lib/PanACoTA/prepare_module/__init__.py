@@ -0,0 +1 @@
+"""prepare module of PanACoTA"""
@@ -0,0 +1,3 @@
+"""
+Subpackage containing the main script used to launch each available subcommand.
+"""
\ No newline at end of file
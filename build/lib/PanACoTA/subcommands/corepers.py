@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# ###############################################################################
+# This file is part of PanACOTA.                                                #
+#                                                                               #
+# Authors: Amandine Perrin                                                      #
+# Copyright © 2018-2020 Institut Pasteur (Paris).                               #
+# See the COPYRIGHT file for details.                                           #
+#                                                                               #
+# PanACOTA is a software providing tools for large scale bacterial comparative  #
+# genomics. From a set of complete and/or draft genomes, you can:               #
+#    -  Do a quality control of your strains, to eliminate poor quality         #
+# genomes, which would not give any information for the comparative study       #
+#    -  Uniformly annotate all genomes                                          #
+#    -  Do a Pan-genome                                                         #
+#    -  Do a Core or Persistent genome                                          #
+#    -  Align all Core/Persistent families                                      #
+#    -  Infer a phylogenetic tree from the Core/Persistent families             #
+#                                                                               #
+# PanACOTA is free software: you can redistribute it and/or modify it under the #
+# terms of the Affero GNU General Public License as published by the Free       #
+# Software Foundation, either version 3 of the License, or (at your option)     #
+# any later version.                                                            #
+#                                                                               #
+# PanACOTA is distributed in the hope that it will be useful, but WITHOUT ANY   #
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS     #
+# FOR A PARTICULAR PURPOSE. See the Affero GNU General Public License           #
+# for more details.                                                             #
+#                                                                               #
+# You should have received a copy of the Affero GNU General Public License      #
+# along with PanACOTA (COPYING file).                                           #
+# If not, see <https://www.gnu.org/licenses/>.                                  #
+# ###############################################################################
+
+"""
+corepers is a subcommand of PanACoTA
+
+Generate a core genome (families containing 1 member in all genomes of the dataset)
+or a persistent genome (families with a given % of genomes having exactly 1 member).
+You can also allow:
+
+- mixed families: exactly 1 member in the given percentage of genomes, but the other genomes
+  can contain 0 or several members
+- multi families: allow several members in any genome.
+
+
+@author gem
+June 2017
+"""
+
+import os
+
+import sys
+
+
+def main_from_parse(args):
+    """
+    Call main function from the arguments given by parser
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        result of argparse parsing of all arguments in command line
+    """
+    cmd = "PanACoTA " + ' '.join(args.argv)
+    main(cmd, args.pangenome, args.tol, args.multi, args.mixed, args.outputdir,
+         args.lstinfo_file, args.floor, args.verbose, args.quiet, args.sweep, args.subsets,
+         args.stream)
+
+
+def main(cmd, pangenome, tol, multi, mixed, outputdir, lstinfo_file, floor, verbose, quiet,
+         sweep=None, subsets=None, stream=False):
+    """
+    Read pangenome and deduce Persistent genome according to the user criteria.
+    With sweep, the pangenome is read only once, and 1 persistent genome is written for
+    each setting. With subsets, 1 persistent genome is written for each subset of genomes
+    (and each setting).
+
+    Parameters
+    ----------
+    pangenome : str
+        file containing pangenome
+    tol : float
+        min % of genomes present in a family to consider it as persistent (between 0 and 1)
+    multi : bool
+        True if multigenic families are allowed, False otherwise
+    mixed : bool
+        True if mixed families are allowed, False otherwise
+    outputdir : str or None
+        Specific directory for the generated persistent genome. If not given, pangenome directory is used.
+    lstinfo_file : str
+        list of genomes to include in the core/persistent genome. If not given, include all genomes of pan
+    floor : bool
+        Require at least floor(nb_genomes*tol) genomes if True, ceil(nb_genomes*tol) if False
+    verbose : int
+        verbosity:
+        - defaut 0 : stdout contains INFO, stderr contains ERROR.
+        - 1: stdout contains INFO, stderr contains WARNING and ERROR
+        - 2: stdout contains (DEBUG), DETAIL and INFO, stderr contains WARNING and ERROR
+        - >=15: Add DEBUG in stdout
+    quiet : bool
+        True if nothing must be sent to stdout/stderr, False otherwise
+    sweep : list or None
+        [(tol, multi, mixed)] to write 1 persistent genome per setting, instead of 1
+        persistent genome with tol, multi and mixed. None to write only 1 persistent genome.
+    subsets : list or None
+        files listing genomes, or directories containing such files, to write 1 persistent
+        genome per list of genomes (lstinfo_file is then not used). None to use
+        lstinfo_file.
+    stream : bool
+        True to read the pangenome file twice, line by line, instead of loading it: only
+        the members of persistent families are kept in memory.
+
+    Returns
+    -------
+    str or list
+        persistent genome filename, or list of filenames (1 per setting, for each subset)
+        with sweep or subsets
+    """
+    # import needed packages
+    import logging
+    from PanACoTA import utils
+    from PanACoTA import utils_pangenome as utilsp
+    import PanACoTA.corepers_module.persistent_functions as pers
+    from PanACoTA import __version__ as version
+
+    # get pangenome name info
+    _, base_pan = os.path.split(pangenome)
+    if lstinfo_file:
+        _, base_lst = os.path.split(lstinfo_file)
+    else:
+        base_lst = "all"
+    # Define output directory
+    if not os.path.isdir(outputdir):
+        os.makedirs(outputdir)
+    logfile_base = os.path.join(outputdir, "PanACoTA-corepers")
+    # level is the minimum level that will be considered.
+    # for verbose = 0 or 1, ignore details and debug, start from info
+    if verbose <= 1:
+        level = logging.INFO
+    # for verbose = 2, ignore only debug
+    if verbose >= 2 and verbose < 15:
+        level = 15 # int corresponding to detail level
+    # for verbose >= 15, write everything
+    if verbose >= 15:
+        level = logging.DEBUG
+    utils.init_logger(logfile_base, level, 'corepers', verbose=verbose, quiet=quiet)
+    logger = logging.getLogger("corepers")
+    logger.info(f'PanACoTA version {version}')
+    logger.info("Command used\n \t > " + cmd)
+
+    settings = sweep or [(tol, multi, mixed)]
+    if not sweep:
+        logger.info(get_info(tol, multi, mixed, floor))
+
+    if stream:
+        list_genomes = utilsp.read_lstinfo(lstinfo_file, logger) if lstinfo_file else None
+        logger.info(f"Reading {pangenome} line by line.")
+        all_fams = pers.get_pers_stream(pangenome, settings, floor, list_genomes)
+        outputfiles = []
+        # Members of families already sorted for a previous setting
+        sorted_fams = {}
+        for (tol, multi, mixed), fams in zip(settings, all_fams):
+            outputfile = os.path.join(outputdir, get_output_name(base_pan, base_lst, tol, multi,
+                                                                 mixed, floor))
+            pers.write_persistent(fams, outputfile, sorted_fams)
+            outputfiles.append(outputfile)
+        logger.info("Persistent genome step done.")
+        if sweep:
+            return outputfiles
+        return outputfiles[0]
+
+    # Read pangenome
+    pan = utilsp.load_pangenome(pangenome, logger)
+    if subsets:
+        list_files = pers.list_subset_files(subsets)
+        logger.info(f"Getting persistent genomes of {len(list_files)} subsets of genomes.")
+        masks, nb_strains = pers.subset_masks(pan, list_files)
+        # Members of families already sorted for a previous subset
+        sorted_fams = {}
+        outputfiles = []
+        for sub, (tol, multi, mixed), fams in pers.get_pers_subsets(pan, masks, nb_strains,
+                                                                    settings, floor):
+            outputfile = os.path.join(outputdir,
+                                      get_output_name(base_pan,
+                                                      os.path.basename(list_files[sub]),
+                                                      tol, multi, mixed, floor))
+            pers.write_persistent_subset(pan, fams, masks[sub], outputfile, sorted_fams)
+            outputfiles.append(outputfile)
+        logger.info("Persistent genome step done.")
+        return outputfiles
+    all_strains = pan.genomes
+    # If list of genomes given, get subset of pangenome, including only the genomes asked
+    if lstinfo_file:
+        pan, all_strains = pers.get_subset_pangenome(pan, lstinfo_file)
+    # Members of families already sorted for a previous setting
+    sorted_fams = {}
+    outputfiles = []
+    for tol, multi, mixed in settings:
+        if sweep:
+            logger.info(get_info(tol, multi, mixed, floor))
+        # Generate persistent genome
+        fams = pers.get_pers_pangenome(pan, len(all_strains), tol, multi, mixed, floor)
+        # Write persistent genome to file
+        outputfile = os.path.join(outputdir, get_output_name(base_pan, base_lst, tol, multi,
+                                                             mixed, floor))
+        pers.write_persistent(fams, outputfile, sorted_fams)
+        outputfiles.append(outputfile)
+    logger.info("Persistent genome step done.")
+    if sweep:
+        return outputfiles
+    return outputfiles[0]
+
+
+def get_output_name(base_pan, base_lst, tol, multi, mixed, floor):
+    """
+    Get the name of the persistent genome file
+
+    Parameters
+    ----------
+    base_pan : str
+        name of the pangenome file, without its directory
+    base_lst : str
+        name of the list of genomes file, without its directory ("all" if no list)
+    tol : float
+        min % of genomes present in a family to consider it as persistent (between 0 and 1)
+    multi : bool
+        True if multigenic families are allowed, False otherwise
+    mixed : bool
+        True if mixed families are allowed, False otherwise
+    floor : bool
+        True if floor(nb_genomes*tol) is used instead of ceil(nb_genomes*tol)
+
+    Returns
+    -------
+    str
+        PersGenome_<pangenome>-<list>_[F]<tol>[-multi|-mixed].lst
+    """
+    output_name = f"PersGenome_{base_pan}-{base_lst}_"
+    if floor:
+        output_name += "F"
+    output_name += str(tol)
+    if multi:
+        output_name += "-multi.lst"
+    elif mixed:
+        output_name += "-mixed.lst"
+    else:
+        output_name += ".lst"
+    return output_name
+
+
+def get_info(tol, multi, mixed, floor):
+    """
+    Get a string corresponding to the information that will be given to logger.
+
+    Parameters
+    ----------
+    tol : float
+        min % of genomes present in a family to consider it as persistent (between 0 and 1)
+    multi : bool
+        True if multigenic families are allowed, False otherwise
+    mixed : bool
+        True if mixed families are allowed, False otherwise
+    floor : bool
+        Require at least floor(nb_genomes*tol) genomes if True, ceil(nb_genomes*tol) if False
+
+    Returns
+    -------
+    str
+        Information to give to logger
+    """
+    if tol == 1:
+        return "Will generate a CoreGenome."
+    else:
+        if floor:
+            floorstr = "floor"
+        else:
+            floorstr = "ceil"
+        toprint = (f"Will generate a Persistent genome with member(s) in at least {100*tol}"
+                   f"% of all genomes in each family.\n")
+        if multi:
+            toprint += ("Multigenic families are allowed (several members in "
+                        "any genome of a family).")
+        elif mixed:
+            toprint += ("Mixed families are allowed. To be considered as persistent, "
+                        f"a family must have exactly 1 member in {tol*100}% of the genomes, "
+                        f"but in the remaining {round((1-tol)*100,3)}% genomes, there can be 0, 1 or "
+                        "several members.")
+        else:
+            toprint += ("To be considered as persistent, a family must contain exactly 1 member "
+                        f"in at least {tol*100}% of all genomes. The other genomes are absent from the "
+                        "family.")
+        return toprint
+
+
+def build_parser(parser):
+    """
+    Method to create a parser for command-line options
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        parser to configure in order to extract command-line arguments
+    """
+    import argparse
+    from PanACoTA import utils_argparse
+
+    # Create command-line parser for all options and arguments to give
+    required = parser.add_argument_group('Required arguments')
+    required.add_argument("-p", dest="pangenome", required=True,
+                          help="PanGenome file (1 line per family, first column is fam number)")
+    required.add_argument("-o", dest="outputdir", required=True,
+                          help=("Specify the output directory for your core/persistent genome."),
+                          default=".")
+    optional = parser.add_argument_group('Optional arguments')
+    optional.add_argument("-t", "--tol", dest="tol", default=1, type=utils_argparse.percentage,
+                          help=("min %% of genomes having at least 1 member in a family to "
+                                "consider the family as persistent (between 0 and 1, "
+                                "default is 1 = 100%% of genomes = Core genome)."
+                                "By default, the minimum number of genomes will be "
+                                "ceil('tol'*N) (N being the total number of genomes). If "
+                                "you want to use floor('tol'*N) instead, add the '-F' option."))
+    optional.add_argument("-M", dest="multi", action='store_true',
+                          help=("Add this option if you allow several members in any genome "
+                                "of a family. By default, only 1 (or 0 if tol<1) member "
+                                "per genome are allowed in all genomes. If you want to allow "
+                                "exactly 1 member in 'tol'%% of the genomes, and 0, 1 "
+                                "or several members in the '1-tol'%% left, use the option -X "
+                                "instead of this one: -M and -X options are not compatible."))
+    optional.add_argument("-X", dest="mixed", action='store_true',
+                          help="Add this option if you want to allow families having several "
+                               "members only in '1-tol'%% of the genomes. In the other genomes, "
+                               "only 1 member exactly is allowed. This option is not compatible "
+                               "with -M (which is allowing multigenic families: having several "
+                               "members in any number of genomes).")
+    optional.add_argument("-F", dest="floor", action="store_true",
+                          help="When you specify the '-tol' option, with a number lower "
+                               "than 1, you can add this option to use floor('tol'*N) "
+                               "as a minimum number of genomes instead of ceil('tol'*N) "
+                               "which is the default behavior.")
+    optional.add_argument("-l", dest="lstinfo_file",
+                          help=("By default, the core/persistent genome will include all genomes "
+                                "found in the given pangenome file. If you want to do a core/persistent "
+                                "genome on a subset of those genomes, give a file with this "
+                                "list of genomes. This file must have 1 line per genome, only the first column "
+                                "(genome name without extension) will be used."))
+    optional.add_argument("--subsets", dest="subsets", nargs="+", metavar="LIST",
+                          help=("Write 1 core/persistent genome for each list of genomes "
+                                "given (same format as -l), instead of 1 for all genomes. "
+                                "Give files and/or directories: all files of a directory "
+                                "are used. The pangenome is read only once, and families "
+                                "are counted for all lists at once. Files are named as with "
+                                "-l. Not compatible with -l."))
+    optional.add_argument("--stream", dest="stream", action="store_true", default=False,
+                          help=("Read the pangenome file twice, line by line, instead of "
+                                "loading it (and its binary file): first to count the "
+                                "genomes of each family, then to only keep the members of "
+                                "persistent families. Use it when the pangenome does not fit "
+                                "in memory. Not compatible with --subsets."))
+    optional.add_argument("--sweep-tol", dest="sweep_tols", nargs="+",
+                          type=utils_argparse.percentage, metavar="TOL",
+                          help=("Write 1 persistent genome for each of these 'tol' values "
+                                "(and each type of --sweep-mode, or the one given with -M/-X), "
+                                "instead of 1 persistent genome. The pangenome is read only "
+                                "once. Files are named as with -t."))
+    optional.add_argument("--sweep-mode", dest="sweep_modes", nargs="+",
+                          choices=["strict", "mixed", "multi"],
+                          help=("Write 1 persistent genome for each of these types of "
+                                "families (and each value of --sweep-tol, or the one given "
+                                "with -t): 'strict' (default type), 'mixed' (as -X) or "
+                                "'multi' (as -M). 'mixed' is skipped for a 'tol' of 1, as it "
+                                "is then the same as 'strict'."))
+
+    helper = parser.add_argument_group('Others')
+    helper.add_argument("-v", "--verbose", dest="verbose", action="count", default=0,
+                        help="Increase verbosity in stdout/stderr.")
+    helper.add_argument("-q", "--quiet", dest="quiet", action="store_true", default=False,
+                        help=("Do not display anything to stdout/stderr. log files will "
+                              "still be created."))
+    helper.add_argument("-h", "--help", dest="help", action="help",
+                        help="show this help message and exit")
+
+
+def check_args(parser, args):
+    """
+    Check that arguments given to parser are as expected.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The parser used to parse command-line
+    args : argparse.Namespace
+        Parsed arguments
+
+    Returns
+    -------
+    argparse.Namespace or None
+        The arguments parsed, updated according to some rules. Exit program
+        with error message if error occurs with arguments given.
+    """
+    if args.multi and args.mixed:
+        parser.error("-M and -X options cannot be activated together. Choose if you want to:\n"
+                     "- allow several members in any number of genomes of a family (-M)\n"
+                     "- allow several members in only '1-tol'% of the genomes of a family "
+                     "(other 'tol'% genomes must have exactly 1 member) (-X)")
+    if not args.sweep_tols and args.mixed and args.tol == 1:
+        parser.error("You are asking for mixed families, while asking for 100% of the genomes of "
+                     "a family to have exactly one member, which is not compatible. Do you want "
+                     "to \n- lower the percentage of genomes required to have exactly "
+                     "1 member (-t tol)\n- not allow mixed families (remove -X option)")
+    if not args.sweep_tols and args.floor and args.tol == 1:
+        parser.error("You are asking to use floor('tol'*N) as a minimum number of genomes "
+                     "present in a family, but with 'tol'=1: the minimum number of genomes "
+                     "will always be equal to N, using floor or the default ceil! Either "
+                     "use a 'tol' lower than 1, or remove the '-F' option.")
+    if args.subsets and args.lstinfo_file:
+        parser.error("-l and --subsets options cannot be used together: add the list of "
+                     "genomes given with -l to the lists of --subsets.")
+    if args.stream and args.subsets:
+        parser.error("--stream and --subsets options cannot be used together.")
+    args.sweep = None
+    if args.sweep_tols or args.sweep_modes:
+        if args.sweep_modes and (args.multi or args.mixed):
+            parser.error("-M and -X options cannot be used with --sweep-mode: give 'multi' "
+                         "or 'mixed' in the types of --sweep-mode instead.")
+        if args.mixed:
+            modes = ["mixed"]
+        elif args.multi:
+            modes = ["multi"]
+        else:
+            modes = args.sweep_modes or ["strict"]
+        tols = args.sweep_tols or [args.tol]
+        if args.mixed and 1 in tols:
+            parser.error("Mixed families (-X) cannot be used with a 'tol' of 1 in "
+                         "--sweep-tol. Use --sweep-mode with 'strict' and 'mixed' instead.")
+        if args.floor and all(tol == 1 for tol in tols):
+            parser.error("You are asking to use floor('tol'*N) as a minimum number of genomes "
+                         "present in a family, but all values of --sweep-tol are 1. Either "
+                         "give a 'tol' lower than 1, or remove the '-F' option.")
+        settings = [(tol, mode == "multi", mode == "mixed") for tol in tols for mode in modes
+                    if not (mode == "mixed" and tol == 1)]
+        if not settings:
+            parser.error("With a 'tol' of 1, mixed families are the same as the core genome: "
+                         "add 'strict' to --sweep-mode, or a 'tol' lower than 1.")
+        # Keep the order given, without duplicates
+        args.sweep = list(dict.fromkeys(settings))
+    return args
+
+
+def parse(parser, argu):
+    """
+    Parse arguments given to parser
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        the parser used
+    argu : [str]
+        command-line given by user, to parse using parser
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments
+    """
+    args = parser.parse_args(argu)
+    return check_args(parser, args)
+
+
+if __name__ == '__main__':
+    import argparse
+    myparser = argparse.ArgumentParser(description="Compute core or persistent genome",
+                                       add_help=False)
+    build_parser(myparser)
+    OPTIONS = parse(myparser, sys.argv[1:])
+    main_from_parse(OPTIONS)
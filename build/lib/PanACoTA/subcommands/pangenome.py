@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# ###############################################################################
+# This file is part of PanACOTA.                                                #
+#                                                                               #
+# Authors: Amandine Perrin                                                      #
+# Copyright © 2018-2020 Institut Pasteur (Paris).                               #
+# See the COPYRIGHT file for details.                                           #
+#                                                                               #
+# PanACOTA is a software providing tools for large scale bacterial comparative  #
+# genomics. From a set of complete and/or draft genomes, you can:               #
+#    -  Do a quality control of your strains, to eliminate poor quality         #
+# genomes, which would not give any information for the comparative study       #
+#    -  Uniformly annotate all genomes                                          #
+#    -  Do a Pan-genome                                                         #
+#    -  Do a Core or Persistent genome                                          #
+#    -  Align all Core/Persistent families                                      #
+#    -  Infer a phylogenetic tree from the Core/Persistent families             #
+#                                                                               #
+# PanACOTA is free software: you can redistribute it and/or modify it under the #
+# terms of the Affero GNU General Public License as published by the Free       #
+# Software Foundation, either version 3 of the License, or (at your option)     #
+# any later version.                                                            #
+#                                                                               #
+# PanACOTA is distributed in the hope that it will be useful, but WITHOUT ANY   #
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS     #
+# FOR A PARTICULAR PURPOSE. See the Affero GNU General Public License           #
+# for more details.                                                             #
+#                                                                               #
+# You should have received a copy of the Affero GNU General Public License      #
+# along with PanACOTA (COPYING file).                                           #
+# If not, see <https://www.gnu.org/licenses/>.                                  #
+# ###############################################################################
+
+"""
+pangenome is a subcommand of PanACoTA
+
+
+@author gem
+May 2017
+"""
+
+import sys
+import os
+
+
+def main_from_parse(args):
+    """
+    Call main function from the arguments given by parser
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        result of argparse parsing of all arguments in command line
+    """
+    cmd = "PanACoTA " + ' '.join(args.argv)
+    main(cmd, args.lstinfo_file, args.dataset_name, args.dbpath, args.min_id, args.outdir,
+         args.clust_mode, args.spedir, args.threads, args.outfile, args.verbose,
+         args.quiet, args.dedup, args.keep_bank, args.matrix, args.update, args.sweep,
+         args.engine, args.max_mem, args.distances, args.curves)
+
+
+def main(cmd, lstinfo, name, dbpath, min_id, outdir, clust_mode, spe_dir, threads, outfile=None,
+         verbose=0, quiet=False, dedup=False, keep_bank=False, matrix="csv", update=None,
+         sweep=None, engine="cluster", max_mem=None, distances=False, curves=0):
+    """
+    Main method, doing all steps:
+
+    - concatenate all protein files (only with dedup or keep_bank)
+    - create database as ffindex
+    - cluster all proteins
+    - convert to pangenome file
+    - creating summary and matrix of pangenome
+
+    Parameters
+    ----------
+    lstinfo : str
+        file with name of genomes to consider for pan in the first column, without extension.
+        Other columns are ignored. The first column header must be 'gembase_name'
+    name : str
+        name given to the dataset. For example, ESCO44 for 44 *Escherichia coli* genomes.
+    dbpath : str
+        path to the folder containing all protein files (files called as the name of genome
+        given in lstinfo + ".prt"
+    min_id : float
+        Minimum percentage of identity between 2 proteins to put them in the same family
+    outdir : str
+        path to folder which will contain pangenome results and tmp files
+    clust_mode : [0, 1, 2]
+        0 for 'set cover', 1 for 'single-linkage', 2 for 'CD-Hit'
+    spe_dir : str or None
+        path to the folder where concatenated bank of proteins must be saved.
+        None to use the same folder as protein files
+    threads : int
+        Max number of threads to use
+    outfile : str or None
+        Name of the pangenome. None to use the default name
+    verbose : int
+            verbosity:
+        - defaut 0 : stdout contains INFO, stderr contains ERROR.
+        - 1: stdout contains INFO, stderr contains WARNING and ERROR
+        - 2: stdout contains (DEBUG), DETAIL and INFO, stderr contains WARNING and ERROR
+        - >=15: Add DEBUG in stdout
+    quiet : bool
+        True if nothing must be sent to stdout/stderr, False otherwise
+    dedup : bool
+        True to cluster only 1 copy of identical proteins. The other copies are then put in
+        the family of their representative.
+    keep_bank : bool
+        True to concatenate all proteins to <name>.All.prt before giving them to mmseqs.
+        False to give the protein files of all genomes directly to mmseqs.
+    matrix : str
+        format of the pangenome matrices: "csv", "sparse" or "all" (both)
+    update : tuple or None
+        (previous pangenome file, directory with its mmseqs database and clustering) to
+        update this pangenome with the genomes of lstinfo which are not in it, keeping its
+        family numbers. None to build a new pangenome.
+    sweep : list or None
+        [(min_id, clust_mode)] to build 1 pangenome per clustering setting, instead of 1
+        pangenome with min_id and clust_mode. None to build only 1 pangenome.
+    engine : str
+        "cluster" to cluster proteins with mmseqs cluster, "linclust" to first cluster them
+        with mmseqs linclust at high identity, and then only cluster the representatives
+    max_mem : int or None
+        Maximum memory (bytes) mmseqs can use. None to let mmseqs use the memory of the
+        whole machine
+    distances : bool
+        True to also write the distances between genomes, on their family content
+    curves : int
+        number of random orders of genomes on which pan and core accumulation curves are
+        computed. 0 to not compute them
+
+    Returns
+    -------
+    str or list
+        pangenome filename, or list of pangenome filenames (1 per setting) with sweep
+    """
+    # import needed packages
+    import logging
+    from PanACoTA import utils
+    from PanACoTA.pangenome_module import protein_seq_functions as protf
+    from PanACoTA.pangenome_module import mmseqs_functions as mmf
+    from PanACoTA.pangenome_module import post_treatment as pt
+    from PanACoTA import __version__ as version
+
+    # test if mmseqs is installed and in the path
+    if not utils.check_installed("mmseqs"):  # pragma: no cover
+        print("mmseqs is not installed. 'PanACoTA pangenome' cannot run.")
+        sys.exit(1)
+
+    os.makedirs(outdir, exist_ok=True)
+    # level is the minimum level that will be considered.
+    # for verbose = 0 or 1, ignore details and debug, start from info
+    if verbose <= 1:
+        level = logging.INFO
+    # for verbose = 2, ignore only debug
+    if verbose >= 2 and verbose < 15:
+        level = utils.detail_lvl() # int corresponding to detail level
+    # for verbose >= 15, write everything
+    if verbose >= 15:
+        level = logging.DEBUG
+    # name logfile, add timestamp if already existing
+    logfile_base = os.path.join(outdir, "PanACoTA-pangenome_" + name)
+    utils.init_logger(logfile_base, level, '', verbose=verbose, quiet=quiet, log_details=True)
+    logger = logging.getLogger("pangenome")
+    logger.info(f'PanACoTA version {version}')
+    logger.info("Command used\n \t > " + cmd)
+
+    # Build bank with all proteins to include in the pangenome
+    # (only with dedup or keep_bank: otherwise, protein files are given to mmseqs)
+    prt_files = None
+    if dedup or keep_bank:
+        prt_path = protf.build_prt_bank(lstinfo, dbpath, name, spe_dir, quiet, dedup=dedup)
+    else:
+        prt_path, prt_files = protf.list_prt_files(lstinfo, dbpath, name, spe_dir)
+    members = protf.read_members(prt_path) if dedup else None
+    # Do 1 pangenome per setting, post-treating each one as soon as it is done
+    if sweep:
+        panfiles = []
+        for _, _, families, panfile in mmf.run_pangenome_sweep(sweep, outdir, prt_path, threads,
+                                                               quiet, members, prt_files,
+                                                               engine, max_mem,
+                                                               compact=True):
+            pt.post_treat(families, panfile, matrix, distances=distances, threads=threads,
+                          curves=curves)
+            panfiles.append(panfile)
+        logger.info("DONE")
+        return panfiles
+    # Do pangenome
+    if update:
+        previous, old_tmpdir = update
+        families, panfile = mmf.run_pangenome_update(previous, old_tmpdir, min_id, clust_mode,
+                                                     outdir, prt_path, threads, outfile, quiet,
+                                                     prt_files, max_mem, compact=True)
+    else:
+        previous = None
+        families, panfile = mmf.run_all_pangenome(min_id, clust_mode, outdir,
+                                                  prt_path, threads, outfile, quiet, members,
+                                                  prt_files, engine, max_mem, compact=True)
+    # Create matrix pan_quali, pan_quanti and summary file
+    pt.post_treat(families, panfile, matrix, previous, distances, threads, curves)
+    logger.info("DONE")
+    return panfile
+
+
+def build_parser(parser):
+    """
+    Method to create a parser for command-line options
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        parser to configure in order to extract command-line arguments
+    """
+    import argparse
+    from PanACoTA import utils_argparse
+
+    # Create command-line parser for all options and arguments to give
+    required = parser.add_argument_group('Required arguments')
+    required.add_argument("-l", dest="lstinfo_file", required=True,
+                          help=("File containing the list of all genomes to include in "
+                                "the pan-genome, 1 genome per line: it can be the "
+                                "LSTINFO-<list_file>.lst file of 'PanACoTA annotate' module."
+                                "Here, only the first column (genome name without extension) "
+                                "will be used. All proteins of all these genomes will be "
+                                "clustered (and concatenated in a file called "
+                                "<dataset_name>.All.prt with --bank option). The "
+                                "column header must be 'gembase_name'."))
+    required.add_argument("-n", dest="dataset_name", required=True,
+                          help=("Name of the dataset which will be clustered (for example, "
+                                "SAEN1234 for 1234 Salmonella enterica genomes). This name will "
+                                "be used to name the protein databank, a well as the "
+                                "pangenome files."))
+    required.add_argument("-d", dest="dbpath", required=True,
+                          help=("Path to the folder containing all protein files corresponding "
+                                "to the genomes of the dataset (output directory 'Proteins' "
+                                "of 'PanACoTA annotate' module)."))
+    required.add_argument("-o", dest="outdir", required=True,
+                          help=("Output directory, where all results must be saved "
+                                "(including tmp folder)"))
+
+    optional = parser.add_argument_group('Optional arguments')
+    optional.add_argument("-i", dest="min_id", type=utils_argparse.perc_id, default=0.8,
+                          help=("Minimum sequence identity to be considered in the same "
+                                "cluster (float between 0 and 1). Default is 0.8."))
+    optional.add_argument("-f", dest="outfile",
+                          help=("Use this option if you want to give the name of the pangenome "
+                                "output file (without path). Otherwise, by default, it is called "
+                                "PanGenome-mmseq_<given_dataset_name>.All.prt_<"
+                                "information_on_parameters>.lst"))
+    optional.add_argument("-c", dest="clust_mode", type=int, choices=[0, 1, 2], default=1,
+                          help=("Choose the clustering mode: 0 for 'set cover', 1 for "
+                                "'single-linkage', 2 for 'CD-Hit'. Default "
+                                "is 'single-linkage' (1)"))
+    optional.add_argument("-s", dest="spedir",
+                          help=("use this option if you want to save the concatenated protein "
+                                "databank in another directory than the one containing all "
+                                "individual protein files ('Proteins' folder)."))
+    optional.add_argument("--dedup", dest="dedup", action="store_true", default=False,
+                          help=("Cluster only 1 copy of identical proteins: the bank, called "
+                                "<dataset_name>.All.uniq.prt, only contains unique sequences. "
+                                "Removed copies are listed in <dataset_name>.All.uniq.members, "
+                                "and put back in the family of their identical protein in the "
+                                "pangenome. Faster on datasets with many clonal genomes."))
+    optional.add_argument("--bank", dest="keep_bank", action="store_true", default=False,
+                          help=("Concatenate all proteins to <dataset_name>.All.prt, and give "
+                                "this bank to mmseqs. By default, the protein files of all "
+                                "genomes are given directly to mmseqs, without writing this "
+                                "bank."))
+    optional.add_argument("--matrix", dest="matrix", choices=["csv", "sparse", "all"],
+                          default="csv",
+                          help=("Format of the qualitative and quantitative matrices of the "
+                                "pangenome. 'csv' (default) writes <pangenome>.quali.txt and "
+                                "<pangenome>.quanti.txt. 'sparse' writes instead "
+                                "<pangenome>.quanti.npz (scipy sparse matrix), "
+                                "<pangenome>.quali.npz (bits packed by numpy.packbits) and "
+                                "<pangenome>.index.json (genome of each row, family of each "
+                                "column). 'all' writes both."))
+    optional.add_argument("--distances", dest="distances", action="store_true", default=False,
+                          help=("Also write the distances between all pairs of genomes, on "
+                                "their family content, to <pangenome>.distances.npz: "
+                                "Jaccard distance ('jaccard') and number of families present "
+                                "in only 1 of the 2 genomes ('hamming'), in condensed form "
+                                "(see scipy.spatial.distance.squareform), with the genome "
+                                "names ('genomes') and their number of families "
+                                "('nb_families'). Computed on the given number of threads."))
+    optional.add_argument("--curves", dest="curves", type=int, default=0, metavar="NB_PERMS",
+                          help=("Also write the pan and core accumulation curves to "
+                                "<pangenome>.curves.txt: for each number of genomes k, mean "
+                                "and quantiles of the number of families present in at least "
+                                "1 (pan) and in all (core) of the first k genomes, over "
+                                "NB_PERMS random orders of genomes. Computed on the given "
+                                "number of processes. Default: 0, no curve."))
+    optional.add_argument("--update", dest="update", nargs=2,
+                          metavar=("PANGENOME", "TMPDIR"),
+                          help=("Update an existing pangenome with the new genomes of "
+                                "LSTINFO_FILE (which must also contain the genomes of the "
+                                "existing pangenome), instead of clustering all proteins "
+                                "again. Give the existing pangenome file, and the directory "
+                                "with its mmseqs clustering (tmp_<dataset>_<information> "
+                                "folder of its output directory, with any engine, or for any "
+                                "setting of a --sweep-id/--sweep-mode run). New proteins are clustered against "
+                                "the existing clusters with 'mmseqs clusterupdate': existing "
+                                "families keep their number, new families are numbered after "
+                                "them."))
+    optional.add_argument("--engine", dest="engine", choices=["cluster", "linclust"],
+                          default="cluster",
+                          help=("Clustering engine. 'cluster' (default) clusters all proteins "
+                                "with 'mmseqs cluster'. 'linclust', faster for very large "
+                                "banks, first clusters all proteins with 'mmseqs linclust' "
+                                "(linear time) at 95%% identity (or MIN_ID if higher), then "
+                                "clusters only the representatives of these clusters with "
+                                "'mmseqs cluster' at MIN_ID, and puts back their members. The "
+                                "time spent in each stage is logged."))
+    optional.add_argument("--max-mem", dest="max_mem", type=utils_argparse.mem_size,
+                          help=("Maximum memory that mmseqs can use (for example '16G'). The "
+                                "memory limit of its prefilter index (--split-memory-limit) "
+                                "is computed from it, and the index is split if the protein "
+                                "bank is too big. The peak memory used by mmseqs is written "
+                                "in the log file. By default, mmseqs uses the memory of the "
+                                "whole machine."))
+    optional.add_argument("--sweep-id", dest="sweep_ids", nargs="+",
+                          type=utils_argparse.perc_id, metavar="MIN_ID",
+                          help=("Build 1 pangenome for each of these minimum sequence "
+                                "identities (and each cluster mode of --sweep-mode, or the "
+                                "one given with -c), instead of 1 pangenome. The mmseqs "
+                                "database is created only once, and several clusterings "
+                                "are run at the same time when several threads are given."))
+    optional.add_argument("--sweep-mode", dest="sweep_modes", nargs="+", type=int,
+                          choices=[0, 1, 2], metavar="{0,1,2}",
+                          help=("Build 1 pangenome for each of these cluster modes (and "
+                                "each identity of --sweep-id, or the one given with -i)."))
+    optional.add_argument("--threads", dest="threads", default=1, type=utils_argparse.thread_num,
+                          help=("add this option if you want to parallelize on several threads. "
+                                "Indicate on how many threads you want to parallelize. "
+                                "By default, it uses 1 thread. Put 0 if you want to use "
+                                "all threads of your computer."))
+
+    helper = parser.add_argument_group('Others')
+    helper.add_argument("-v", "--verbose", dest="verbose", action="count", default=0,
+                        help="Increase verbosity in stdout/stderr.")
+    helper.add_argument("-q", "--quiet", dest="quiet", action="store_true", default=False,
+                        help=("Do not display anything to stdout/stderr. log files will "
+                              "still be created."))
+    helper.add_argument("-h", "--help", dest="help", action="help",
+                        help="show this help message and exit")
+
+
+def parse(parser, argu):
+    """
+    Parse arguments given to parser
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser to use to parse command-line arguments
+    argu : [str]
+        command-line given
+
+    Returns
+    -------
+    argparse.Namespace or None
+        The arguments parsed, updated according to some rules. Exit program
+        with error message if error occurs with arguments given.
+    """
+    args = parser.parse_args(argu)
+    if args.update and args.dedup:
+        parser.error("--dedup cannot be used with --update.")
+    if args.update and args.engine != "cluster":
+        parser.error("--engine cannot be used with --update: new proteins are clustered "
+                     "with 'mmseqs clusterupdate'.")
+    if args.curves < 0:
+        parser.error("--curves must be a positive number of random orders of genomes.")
+    args.sweep = None
+    if args.sweep_ids or args.sweep_modes:
+        if args.update:
+            parser.error("--sweep-id and --sweep-mode cannot be used with --update.")
+        if args.outfile:
+            parser.error("-f cannot be used with --sweep-id or --sweep-mode: each pangenome "
+                         "has the default name, with its setting.")
+        settings = [(min_id, mode) for min_id in args.sweep_ids or [args.min_id]
+                    for mode in args.sweep_modes or [args.clust_mode]]
+        # Remove duplicate settings, keeping the given order
+        args.sweep = list(dict.fromkeys(settings))
+    return args
+
+
+if __name__ == '__main__':
+    import argparse
+
+    my_parser = argparse.ArgumentParser(description="Compute pan-genome", add_help=False)
+    build_parser(my_parser)
+    OPTIONS = parse(my_parser, sys.argv[1:])
+    main_from_parse(OPTIONS)
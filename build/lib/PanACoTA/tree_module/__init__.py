@@ -0,0 +1,3 @@
+"""
+PanACoTA tree_module
+"""
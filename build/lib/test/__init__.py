@@ -0,0 +1 @@
+""" PanACoTA tests """
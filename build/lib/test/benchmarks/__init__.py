@@ -0,0 +1 @@
+""" PanACoTA microbenchmarks """
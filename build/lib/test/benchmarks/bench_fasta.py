@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Microbenchmarks of the fasta reading/writing functions, against the line by line
+implementations they replaced.
+
+Run from the root of the repository with:
+
+    python -m test.benchmarks.bench_fasta [-n <number of sequences>]
+
+For each function, it checks that both implementations give the same result, and prints the
+best time of several runs.
+"""
+
+import os
+import re
+import sys
+import random
+import shutil
+import tempfile
+import argparse
+import logging
+import timeit
+
+from PanACoTA import utils
+from PanACoTA.align_module import get_seqs
+from PanACoTA.align_module import post_align
+from PanACoTA.align_module import alignment
+
+
+# Line by line implementations, as they were before using utils_fasta
+def old_rename(gembase_name, gpath, outfile):
+    contig_num = 1
+    contigs = {}
+    sizes = {}
+    prev_cont = ""
+    seq = ""
+    cont_size = 0
+    with open(gpath, "r") as gpf, open(outfile, "w") as grf:
+        for line in gpf:
+            if line.startswith(">"):
+                if prev_cont:
+                    grf.write(" ".join([prev_cont, str(cont_size)]) + "\n")
+                    grf.write(seq)
+                    sizes[prev_cont[1:]] = cont_size
+                prev_cont = ">" + gembase_name + "." + str(contig_num).zfill(4)
+                contigs[line.strip().split()[0][1:]] = prev_cont[1:]
+                contig_num += 1
+                cont_size = 0
+                seq = ""
+            else:
+                seq += line
+                cont_size += len(line.strip())
+        if prev_cont:
+            grf.write(" ".join([prev_cont, str(cont_size)]) + "\n")
+            grf.write(seq)
+            sizes[prev_cont[1:]] = cont_size
+    return contigs, sizes
+
+
+def old_extract(to_extract, fasta, outfile):
+    to_extract = frozenset(to_extract)
+    with open(fasta, "r") as fasf, open(outfile, "w") as outf:
+        keep = False
+        for line in fasf:
+            if line[0] == '>':
+                last_char = line.find(' ')
+                if last_char == -1:
+                    last_char = len(line)
+                keep = line[1:last_char].strip() in to_extract
+            if keep:
+                outf.write(line)
+
+
+def old_extract_files(to_extract, fasta):
+    # Each extracted sequence is appended to its own file, opened for each sequence
+    with open(fasta, "r") as fasf:
+        outfp = None
+        for line in fasf:
+            if line[0] == '>':
+                if outfp is not None:
+                    outfp.close()
+                    outfp = None
+                last_char = line.find(' ')
+                if last_char == -1:
+                    last_char = len(line)
+                seq = line[1:last_char].strip()
+                if seq in to_extract:
+                    outfp = open(to_extract[seq], "a")
+            if outfp is not None:
+                outfp.write(line)
+    if outfp is not None:
+        outfp.close()
+
+
+def old_read_alignments(all_alns, all_genomes):
+    sequences = {}
+    genome = None
+    seq = ""
+    with open(all_alns, 'r') as alnf:
+        for line in alnf:
+            if line.startswith(">"):
+                if genome and seq:
+                    sequences[genome].append(seq)
+                    seq = ""
+                genome = post_align.get_genome(line, all_genomes)
+                sequences.setdefault(genome, [])
+            else:
+                seq += line.strip()
+    if genome and seq:
+        sequences[genome].append(seq)
+    return sequences
+
+
+def old_check_lens(aln_file):
+    nb_gen = 0
+    all_sums = set()
+    with open(aln_file, "r") as btrf:
+        cur_sum = 0
+        start = True
+        for line in btrf:
+            if line.startswith(">"):
+                nb_gen += 1
+                if not start:
+                    all_sums.add(cur_sum)
+                    cur_sum = 0
+            else:
+                start = False
+                cur_sum += len(line.strip())
+        all_sums.add(cur_sum)
+    return list(all_sums)[0], nb_gen
+
+
+def old_grep(filein, pattern, counts=False):
+    num = 0
+    lines = []
+    with open(filein, "r") as inf:
+        for line in inf:
+            if re.search(pattern, line):
+                lines.append(line.strip())
+                num += 1
+    return num if counts else lines
+
+
+def old_count(filein, get="lines"):
+    num = 0
+    with open(filein, "r") as inf:
+        for line in inf:
+            if get == "lines":
+                num += 1
+            else:
+                num += len(line.split())
+    return num
+
+
+def write_data(tmpdir, nbseqs):
+    """
+    Write a genome (contigs wrapped at 60 characters), a protein file and an alignment
+    of the given number of sequences
+    """
+    rand = random.Random(1)
+    genome = os.path.join(tmpdir, "genome.fna")
+    with open(genome, "w") as outf:
+        for num in range(nbseqs // 100 + 1):
+            seq = "".join(rand.choice("ACGT") for _ in range(rand.randint(1000, 100000)))
+            outf.write(f">contig_{num} info\n")
+            outf.write("".join(seq[i:i + 60] + "\n" for i in range(0, len(seq), 60)))
+    prots = os.path.join(tmpdir, "proteins.prt")
+    with open(prots, "w") as outf:
+        for num in range(nbseqs):
+            seq = "".join(rand.choice("ACDEFGHIKLMNPQRSTVWY")
+                          for _ in range(rand.randint(50, 600)))
+            outf.write(f">GENO.1017.{num % 50:05d}.b0001_{num:05d} {len(seq) * 3} NA\n")
+            outf.write("".join(seq[i:i + 60] + "\n" for i in range(0, len(seq), 60)))
+    aln = os.path.join(tmpdir, "alignment.aln")
+    genomes = [f"GENO.1017.{num:05d}" for num in range(50)]
+    with open(aln, "w") as outf:
+        for num in range(nbseqs // 50 * 50):
+            outf.write(f">{genomes[num % 50]}.i0001_{num:05d}\n")
+            # mafft wraps alignments at 60 characters
+            seq = "ACGT-" * 200
+            outf.write("".join(seq[i:i + 60] + "\n" for i in range(0, len(seq), 60)))
+    return genome, prots, aln, genomes
+
+
+def bench(name, old, new, repeat=3):
+    """
+    Check that both implementations give the same result, and print their best time
+    """
+    res_old = old()
+    res_new = new()
+    assert res_old == res_new, f"{name}: results differ"
+    time_old = min(timeit.repeat(old, number=1, repeat=repeat))
+    time_new = min(timeit.repeat(new, number=1, repeat=repeat))
+    print(f"{name:<26}{time_old:>10.3f}s{time_new:>10.3f}s{time_old / time_new:>9.1f}x")
+
+
+def main(nbseqs):
+    tmpdir = tempfile.mkdtemp()
+    logger = logging.getLogger("bench")
+    try:
+        genome, prots, aln, genomes = write_data(tmpdir, nbseqs)
+        out_old = os.path.join(tmpdir, "out_old")
+        out_new = os.path.join(tmpdir, "out_new")
+        to_extract = [f"GENO.1017.{num % 50:05d}.b0001_{num:05d}" for num in range(0, nbseqs, 3)]
+
+        def read(path):
+            with open(path) as inf:
+                return inf.read()
+
+        def new_extract():
+            with open(prots, "rb") as fasf, open(out_new, "wb") as outf:
+                get_seqs.extract_sequences(to_extract, fasf, outf=outf)
+            return read(out_new)
+
+        def old_extract_out():
+            old_extract(to_extract, prots, out_old)
+            return read(out_old)
+
+        # Proteins of each family extracted to the file of the family
+        fam_files = [os.path.join(tmpdir, f"fam{num}") for num in range(20)]
+        to_extract_fam = {name: fam_files[num % 20] for num, name in enumerate(to_extract)}
+
+        def read_fams():
+            fams = [read(fam) for fam in fam_files]
+            for fam in fam_files:
+                os.remove(fam)
+            return fams
+
+        def new_extract_files():
+            with open(prots, "rb") as fasf:
+                get_seqs.extract_sequences(to_extract_fam, fasf, files_todo=fam_files)
+            return read_fams()
+
+        def old_extract_files_out():
+            old_extract_files(to_extract_fam, prots)
+            return read_fams()
+
+        print(f"{'function':<26}{'before':>11}{'after':>11}{'speedup':>10}")
+        bench("get_genome_contigs_rename",
+              lambda: (old_rename("GENO.1017.00001", genome, out_old), read(out_old)),
+              lambda: (utils.get_genome_contigs_and_rename("GENO.1017.00001", genome,
+                                                           out_new, logger), read(out_new)))
+        bench("extract_sequences", old_extract_out, new_extract)
+        bench("extract_sequences (files)", old_extract_files_out, new_extract_files)
+        bench("read_alignments", lambda: old_read_alignments(aln, genomes),
+              lambda: post_align.read_alignments(aln, genomes))
+        bench("check_lens", lambda: old_check_lens(aln),
+              lambda: alignment.check_lens(aln, 1, logger))
+        bench("grep", lambda: old_grep(prots, "_0001"), lambda: utils.grep(prots, "_0001"))
+        bench("grep (count headers)", lambda: old_grep(prots, "^>", counts=True),
+              lambda: utils.grep(prots, "^>", counts=True))
+        bench("count lines", lambda: old_count(prots), lambda: utils.count(prots))
+        bench("count words", lambda: old_count(prots, "words"),
+              lambda: utils.count(prots, "words"))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark fasta reading/writing functions")
+    parser.add_argument("-n", dest="nbseqs", type=int, default=50000,
+                        help="Number of protein sequences to generate (default 50000)")
+    main(parser.parse_args().nbseqs)
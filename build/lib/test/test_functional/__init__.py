@@ -0,0 +1 @@
+""" PanACoTA functional tests """
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+
+"""
+Functional tests for PanACoTA corepers subcommand
+"""
+import glob
+import os
+import subprocess
+import pytest
+import shutil
+import logging
+
+import PanACoTA.subcommands.corepers as corepers
+import test.test_unit.utilities_for_tests as tutil
+
+
+PERS_PATH = os.path.join("test", "data", "persgenome")
+TEST_PATH = os.path.join(PERS_PATH, "test_files")
+EXP_PATH = os.path.join(PERS_PATH, "exp_files")
+GENEPATH = os.path.join(PERS_PATH, "generated_by_func-tests")
+OPAN = os.path.join(TEST_PATH, "test_pan-for-corepers.txt")
+UPAN = os.path.join(GENEPATH, "pangenome.lst")
+
+@pytest.fixture(autouse=True)
+def setup_teardown_module():
+    """
+    Remove log files at the end of this test module
+
+    Before each test:
+    - init logger
+    - create directory to put generated files
+
+    After:
+    - remove all log files
+    - remove directory with generated results
+    """
+    if not os.path.isdir(GENEPATH):
+        os.mkdir(GENEPATH)
+    shutil.copyfile(OPAN, UPAN)
+    print("setup")
+
+    yield
+    shutil.rmtree(GENEPATH, ignore_errors=True)
+    print("teardown")
+
+
+def test_main_default(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 1
+    multi = False
+    mixed = False
+    cmd = "cmd"
+    floor = False
+    verbose = 0
+    quiet = False
+    lstinfo = ""
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-all_1.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, GENEPATH, lstinfo, floor,verbose,quiet) == out_pers
+    # Check creation of binary file for pangenome, and remove it
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_coregenome.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert "Will generate a CoreGenome." in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 4 genomes" in out
+    assert ("The core genome contains 2 families, each one having exactly "
+            "4 members, from the 4 different genomes.") in out
+
+
+def test_main_core_subset(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 1
+    multi = False
+    mixed = False
+    cmd = "cmd"
+    floor = False
+    verbose = 0
+    quiet = False
+    lstinfo = os.path.join(GENEPATH, "lstinfo-ok.lst")
+    with open(lstinfo, "w") as lst:
+        lst.write("GEN4.1111.00001 toto we don't use other fields\n")
+        lst.write("GENO.1216.00003\n")
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-lstinfo-ok.lst_1.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, GENEPATH, lstinfo, floor, verbose, quiet) == out_pers
+    # Check creation of binary file for pangenome
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content
+    exp_pers = os.path.join(EXP_PATH, "exp_coregenome_subset.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert "Will generate a CoreGenome." in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 2 genomes" in out
+    assert ("The core genome contains 3 families, each one having exactly "
+            "2 members, from the 2 different genomes.") in out
+
+
+def test_main_pers(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 0.99
+    multi = False
+    mixed = False
+    lstinfo = os.path.join(TEST_PATH, "test_lstinfo.txt")
+    floor = False
+    verbose = 0
+    quiet = False
+    cmd = "cmd"
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-test_lstinfo.txt_0.99.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, GENEPATH, lstinfo, floor, verbose, quiet) == out_pers
+    # Check creation of binary file for pangenome, and remove it
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_coregenome.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert ("Will generate a Persistent genome with member(s) in at least 99.0% "
+            "of all genomes in each family.") in out
+    assert ("To be considered as persistent, a family "
+            "must contain exactly 1 member in at least 99.0% of all genomes. "
+            "The other genomes are absent from the family.") in out
+    assert ("Getting subset of pangenome for genomes in "
+            "test/data/persgenome/test_files/test_lstinfo.txt") in out 
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 4 genomes" in out
+    assert ("The persistent genome contains 2 families, each one having exactly "
+            "1 member from at least 99.0% of the 4 different genomes "
+            "(that is 4 genomes). The other genomes are absent from the family.") in out
+
+
+def test_main_pers_floor_verbose2(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 0.99
+    multi = False
+    mixed = False
+    floor = True
+    verbose = 2
+    lstinfo = ""
+    quiet = False
+    cmd = "cmd"
+    floor = True
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-all_F0.99.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, GENEPATH, lstinfo,
+                         floor, verbose, quiet) == out_pers
+    # Check creation of binary file for pangenome, and remove it
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_pers-floor-strict.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    assert os.path.isfile(logfile + ".details")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert ("Will generate a Persistent genome with member(s) in at least 99.0% "
+            "of all genomes in each family.") in out
+    assert ("To be considered as persistent, a family must contain exactly 1 "
+            "member in at least 99.0% of all genomes. The other genomes are absent from the "
+            "family.") in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 4 genomes" in out
+    assert ("The persistent genome contains 5 families, each one having exactly "
+            "1 member from at least 99.0% of the 4 different genomes (that is 3 genomes). "
+            "The other genomes are absent from the family.") in out
+
+
+def test_main_pers_floor_mixed_debug(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 0.99
+    multi = False
+    mixed = True
+    floor = True
+    verbose = 15
+    quiet = False
+    lstinfo = ""
+    cmd = "cmd"
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-all_F0.99-mixed.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, GENEPATH, lstinfo,
+                         floor, verbose, quiet) == out_pers
+    # Check creation of binary file for pangenome, and remove it
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_pers-floor-mixed.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".details")
+    assert os.path.isfile(logfile + ".debug")
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert ("Will generate a Persistent genome with member(s) in at least 99.0% "
+            "of all genomes in each family.") in out
+    assert ("Mixed families are allowed. To be considered as persistent, "
+            "a family must have exactly 1 member in 99.0% of the genomes, but in the "
+            "remaining 1.0% genomes, there can be 0, 1 or several members.") in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 4 genomes" in out
+    assert ("The persistent genome contains 7 families, each one having exactly "
+            "1 member from at least 99.0% of the genomes (3 genomes). In the "
+            "remaining 1.0% genomes, there can be 0, 1 or several members.") in out
+
+
+def test_main_pers_floor_multi(capsys):
+    """
+    Test that with default parameters, it creates the expected core genome.
+    """
+    tol = 0.99
+    multi = True
+    mixed = False
+    floor = True
+    verbose = 15
+    lstinfo = os.path.join(GENEPATH, "lstinfo-ok.lst")
+    with open(lstinfo, "w") as lst:
+        lst.write("GEN4.1111.00001 toto we don't use other fields\n")
+        lst.write("GENO.1216.00003\n")    
+    quiet = False
+    cmd = "cmd"
+    outdir = os.path.join(GENEPATH, "outdir")
+    out_pers = os.path.join(outdir, "PersGenome_pangenome.lst-lstinfo-ok.lst_F0.99-multi.lst")
+    assert corepers.main(cmd, UPAN, tol, multi, mixed, outdir, lstinfo, floor, verbose, quiet) == out_pers
+    # Check creation of binary file for pangenome, and remove it
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_pers-floor-multi_subset.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(outdir, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert ("Will generate a Persistent genome with member(s) in at least 99.0% "
+            "of all genomes in each family.") in out
+    assert ("Multigenic families are allowed (several members in any genome of a family).") in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 2 genomes" in out
+    assert ("The persistent genome contains 9 families with members present in "
+            "at least 1 different genomes (99.0% of the total number of genomes).") in out
+
+
+def test_main_from_parse(capsys):
+    """
+    Test main when we give the output of the parser
+    """
+    import argparse
+    tol = 1
+    multi = False
+    mixed = False
+    floor = False
+    args = argparse.Namespace()
+    args.pangenome = UPAN
+    args.tol = tol
+    args.multi = multi
+    args.mixed = mixed
+    args.lstinfo_file = ""
+    args.floor = floor
+    args.outputdir = GENEPATH
+    args.verbose = 0
+    args.quiet = False
+    args.sweep = None
+    args.subsets = None
+    args.stream = False
+    args.argv = "PanACoTA corepers test_main_from_parse"
+
+    corepers.main_from_parse(args)
+
+    # Check creation of binary file for pangenome, and remove it
+    out_pers = os.path.join(GENEPATH, "PersGenome_pangenome.lst-all_1.lst")
+    assert os.path.isfile(UPAN + ".bin")
+    # Check presence of persistent genome, and its content, and remove it
+    exp_pers = os.path.join(EXP_PATH, "exp_coregenome.txt")
+    assert os.path.isfile(out_pers)
+    assert tutil.compare_order_content(out_pers, exp_pers)
+    # Check presence of log files and remove them
+    logfile = os.path.join(GENEPATH, "PanACoTA-corepers.log")
+    assert os.path.isfile(logfile)
+    assert os.path.isfile(logfile + ".err")
+    # Check log messages
+    out, err = capsys.readouterr()
+    assert "Will generate a CoreGenome." in out
+    assert "Saving all information to a binary file for later use" in out
+    assert "Generating Persistent genome of a dataset containing 4 genomes" in out
+    assert ("The core genome contains 2 families, each one having exactly 4 "
+            "members, from the 4 different genomes.") in out
+
+
+def test_main_sweep(capsys):
+    """
+    Test that with several settings, the pangenome is read once, and each persistent genome
+    is the same as the one generated alone, with the same name
+    """
+    sweep = [(1, False, False), (0.5, False, False), (0.5, True, False), (0.5, False, True)]
+    sweepdir = os.path.join(GENEPATH, "sweep")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, sweepdir, "", False, 0, False,
+                             sweep=sweep)
+    out, _ = capsys.readouterr()
+    assert out.count("Saving all information to a binary file for later use") == 1
+    assert out.count("Generating Persistent genome of a dataset containing 4 genomes") == 4
+    for (tol, multi, mixed), sweep_pers in zip(sweep, out_pers):
+        alone = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, "", False, 0, False)
+        assert sweep_pers == os.path.join(sweepdir, os.path.basename(alone))
+        with open(sweep_pers) as swf, open(alone) as alf:
+            assert swf.read() == alf.read()
+
+
+def test_main_subsets(capsys):
+    """
+    Test that with a directory of lists of genomes, 1 persistent genome is written per list
+    and setting, the same as the one generated with -l, with the same name
+    """
+    listdir = os.path.join(GENEPATH, "lists")
+    os.mkdir(listdir)
+    lists = {"clade1.lst": ["GEN4.1111.00001", "GENO.1216.00002"],
+             "clade2.lst": ["GENO.0817.00001", "GENO.1216.00002", "GENO.1216.00003"]}
+    for name, genomes in lists.items():
+        with open(os.path.join(listdir, name), "w") as lstf:
+            lstf.write("".join(genome + "\n" for genome in genomes))
+    sweep = [(1, False, False), (0.5, False, True)]
+    subdir = os.path.join(GENEPATH, "subsets")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, subdir, "", False, 0, False,
+                             sweep=sweep, subsets=[listdir])
+    assert len(out_pers) == 4
+    out, _ = capsys.readouterr()
+    assert "Getting persistent genomes of 2 subsets of genomes." in out
+    for num, sub_pers in enumerate(out_pers):
+        lstinfo = os.path.join(listdir, sorted(lists)[num // 2])
+        tol, multi, mixed = sweep[num % 2]
+        alone = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, lstinfo, False, 0,
+                              False)
+        assert sub_pers == os.path.join(subdir, os.path.basename(alone))
+        with open(sub_pers) as subf, open(alone) as alf:
+            assert subf.read() == alf.read()
+
+
+@pytest.mark.parametrize("lstinfo", ["", "lstinfo-ok.lst"])
+def test_main_stream(lstinfo, capsys):
+    """
+    Test that persistent genomes found by reading the pangenome file line by line are the
+    same as when loading the pangenome, with and without a list of genomes, and that no
+    binary file is saved
+    """
+    if lstinfo:
+        lstinfo = os.path.join(GENEPATH, lstinfo)
+        with open(lstinfo, "w") as lstf:
+            lstf.write("GEN4.1111.00001\nGENO.0817.00001\nGENO.1216.00003\n")
+    sweep = [(1, False, False), (0.5, False, False), (0.5, True, False), (0.5, False, True),
+             (0.7, False, False)]
+    streamdir = os.path.join(GENEPATH, "stream")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, streamdir, lstinfo, True, 0, False,
+                             sweep=sweep, stream=True)
+    assert not os.path.isfile(UPAN + ".bin")
+    out, _ = capsys.readouterr()
+    assert "Reading {} line by line.".format(UPAN) in out
+    nb_lines = []
+    for (tol, multi, mixed), stream_pers in zip(sweep, out_pers):
+        loaded = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, lstinfo, True, 0, False)
+        assert stream_pers == os.path.join(streamdir, os.path.basename(loaded))
+        with open(stream_pers) as stf, open(loaded) as lof:
+            content = stf.read()
+            assert content == lof.read()
+        nb_lines.append(content.count("\n"))
+    assert max(nb_lines) > 0
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Functional tests for the parser of 'pangenome' subcommand
+"""
+
+import pytest
+import argparse
+
+from PanACoTA.subcommands import pangenome
+
+
+def test_parser_noarg(capsys):
+    """
+    Test that when the script is called without any argument, an error message appears,
+    indicating the required arguments.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "".split())
+    _, err = capsys.readouterr()
+    assert "usage: " in err
+    assert "-l LSTINFO_FILE -n DATASET_NAME -d DBPATH" in err
+    assert "[-i MIN_ID]" in err
+    assert " -o OUTDIR" in err
+    assert "[-f OUTFILE] [-c {0,1,2}]" in err
+    assert "[-s SPEDIR]" in err
+    assert "[--dedup]" in err
+    assert "[--bank]" in err
+    assert "[--matrix {csv,sparse,all}]" in err
+    assert "[--update PANGENOME TMPDIR]" in err
+    assert "[--engine {cluster,linclust}]" in err
+    assert "[--max-mem MAX_MEM]" in err
+    assert "[--distances]" in err
+    assert "[--curves NB_PERMS]" in err
+    assert "[--sweep-id MIN_ID [MIN_ID ...]]" in err
+    assert "[--sweep-mode {0,1,2} [{0,1,2} ...]]" in err
+    assert "[--threads THREADS]" in err
+    assert "[-q] [-h]" in err
+    assert "the following arguments are required: -l, -n, -d, -o" in err
+
+
+def test_perc_id_nonum(capsys):
+    """
+    Test that when the given percentage of identity is not a number, it returns the
+    expected error.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -i toto -o outdir".split())
+    _, err = capsys.readouterr()
+    assert "argument -i percentage_id: invalid float value: toto" in err
+
+
+def test_neg_perc_id(capsys):
+    """
+    Test that when the given percentage of identity is a negative number, it returns the
+    expected error.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -i -0.2 -o outdir".split())
+    _, err = capsys.readouterr()
+    assert "The minimum %% of identity must be in [0, 1]. Invalid value: -0.2" in err
+
+
+def test_big_perc_id(capsys):
+    """
+    Test that when the given percentage of identity is greater than 1, it returns the
+    expected error.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -i 2 -o outdir".split())
+    _, err = capsys.readouterr()
+    assert "The minimum %% of identity must be in [0, 1]. Invalid value: 2" in err
+
+
+def test_wrong_clust_mode(capsys):
+    """
+    Test that when the given cluster mode does not exist, it returns the expected error message
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -i 0.8 -o od -c 3".split())
+    _, err = capsys.readouterr()
+    assert "argument -c: invalid choice: 3 (choose from 0, 1, 2)" in err
+
+
+def test_thread_no_int(capsys):
+    """
+    Test that when the given number of threads is not an int, it returns the expected
+    error message.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --threads 1.5".split())
+    _, err = capsys.readouterr()
+    assert "argument --threads threads: invalid int value: 1.5" in err
+
+
+def test_thread_too_many(capsys):
+    """
+    Test that when the given number of threads is greater than the number of available threads,
+    it returns the expected error message.
+    """
+    import multiprocessing
+    nb = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, f"-l lstinfo -n TEST4 -d dbpath -o od --threads {nb*10}".split())
+    _, err = capsys.readouterr()
+    assert ("You have {} threads on your computer, you cannot ask for more: "
+            "invalid value: {}").format(nb, nb*10) in err
+
+
+def test_thread_neg(capsys):
+    """
+    Test that when the given number of threads is negative,
+    it returns the expected error message.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --threads -1".split())
+    _, err = capsys.readouterr()
+    assert "Please provide a positive number of threads (or 0 for all threads)" in err
+
+
+def test_parser_default():
+    """
+    Test that when run with the minimum required arguments, all default values are
+    as expected.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od".split())
+    assert options.lstinfo_file == "lstinfo"
+    assert options.dataset_name == "TEST4"
+    assert options.dbpath == "dbpath"
+    assert options.min_id == 0.8
+    assert options.outdir == "od"
+    assert options.clust_mode == 1
+    assert not options.spedir
+    assert not options.dedup
+    assert not options.keep_bank
+    assert options.matrix == "csv"
+    assert not options.update
+    assert options.engine == "cluster"
+    assert options.max_mem is None
+    assert not options.distances
+    assert options.curves == 0
+    assert options.threads == 1
+    assert not options.outfile
+    assert options.verbose == 0
+    assert not options.quiet
+
+
+def test_parser_all_threads():
+    """
+    Test that when run with the minimum required arguments, + '0' for the thread number,
+    all default values are as expected, and the number of threads is equal to the total
+    number of threads.
+    """
+    import multiprocessing
+    nb = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --threads 0".split())
+    assert options.lstinfo_file == "lstinfo"
+    assert options.dataset_name == "TEST4"
+    assert options.dbpath == "dbpath"
+    assert options.min_id == 0.8
+    assert options.outdir == "od"
+    assert options.clust_mode == 1
+    assert not options.spedir
+    assert options.threads == nb
+    assert not options.outfile
+    assert options.verbose == 0
+    assert not options.quiet
+
+
+def test_parser_1thread():
+    """
+    Test that when run with the minimum required arguments, + '0' for the thread number,
+    all default values are as expected, and the number of threads is equal to the total
+    number of threads.
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --threads 1".split())
+    assert options.lstinfo_file == "lstinfo"
+    assert options.dataset_name == "TEST4"
+    assert options.dbpath == "dbpath"
+    assert options.min_id == 0.8
+    assert options.outdir == "od"
+    assert options.clust_mode == 1
+    assert not options.spedir
+    assert options.threads == 1
+    assert not options.outfile
+    assert options.verbose == 0
+    assert not options.quiet
+
+
+def test_parser_matrix(capsys):
+    """
+    Test that the format of the matrices can be chosen, only among the possible ones
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--matrix sparse".split())
+    assert options.matrix == "sparse"
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --matrix hdf5".split())
+    _, err = capsys.readouterr()
+    assert "argument --matrix: invalid choice: 'hdf5'" in err
+
+
+def test_parser_update(capsys):
+    """
+    Test that the previous pangenome and its mmseqs directory are given to update it, and
+    that it cannot be used with --dedup
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--update old.lst tmp_old".split())
+    assert options.update == ["old.lst", "tmp_old"]
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                "--update old.lst tmp_old --dedup".split())
+    _, err = capsys.readouterr()
+    assert "--dedup cannot be used with --update." in err
+
+
+def test_parser_sweep(capsys):
+    """
+    Test that all combinations of identities and cluster modes are swept, that -i or -c is
+    used when only modes or only identities are given, and that it cannot be used with -f
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od".split())
+    assert options.sweep is None
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--sweep-id 0.8 0.9 0.8 --sweep-mode 0 1".split())
+    assert options.sweep == [(0.8, 0), (0.8, 1), (0.9, 0), (0.9, 1)]
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -c 2 "
+                                      "--sweep-id 0.5 0.7".split())
+    assert options.sweep == [(0.5, 2), (0.7, 2)]
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -i 0.6 "
+                                      "--sweep-mode 2 0".split())
+    assert options.sweep == [(0.6, 2), (0.6, 0)]
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -f pan.lst "
+                                "--sweep-id 0.5 0.7".split())
+    _, err = capsys.readouterr()
+    assert "-f cannot be used with --sweep-id or --sweep-mode" in err
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --sweep-mode 3".split())
+    _, err = capsys.readouterr()
+    assert "argument --sweep-mode: invalid choice: 3" in err
+
+
+def test_parser_engine(capsys):
+    """
+    Test that the linclust engine can be chosen, but not to update a pangenome
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--engine linclust".split())
+    assert options.engine == "linclust"
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --engine linclust "
+                                "--update old.lst tmp_old".split())
+    _, err = capsys.readouterr()
+    assert "--engine cannot be used with --update" in err
+
+
+def test_parser_max_mem(capsys):
+    """
+    Test that the memory budget of mmseqs is converted to bytes, and that an invalid value
+    is refused
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--max-mem 16G".split())
+    assert options.max_mem == 16000000000
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --max-mem 0".split())
+    _, err = capsys.readouterr()
+    assert "argument --max-mem must be a positive amount of memory" in err
+
+
+def test_parser_distances():
+    """
+    Test that distances between genomes can be asked
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--distances".split())
+    assert options.distances
+
+
+def test_parser_curves(capsys):
+    """
+    Test that accumulation curves can be asked, and that a negative number of orders of
+    genomes returns an error
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--curves 100".split())
+    assert options.curves == 100
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --curves -3".split())
+    _, err = capsys.readouterr()
+    assert "--curves must be a positive number of random orders of genomes." in err
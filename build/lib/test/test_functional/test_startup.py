@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Functional tests checking that 'PanACoTA -h' and the parser of each subcommand start
+fast, without importing the heavy third-party libraries only needed to run a subcommand.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+# Maximum time (in seconds) allowed to import PanACoTA and parse the command-line
+IMPORT_BUDGET = 0.5
+
+# Modules which must only be imported by the functions using them
+HEAVY_MODULES = ["numpy", "scipy", "matplotlib", "Bio", "progressbar", "ncbi_genome_download"]
+
+# Code run in a new python interpreter: import PanACoTA, parse the given arguments, and
+# print the elapsed time and the heavy modules imported on the last line of stdout
+SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from PanACoTA.bin import run_panacota
+try:
+    run_panacota.parse_arguments(sys.argv[1:])
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = [mod for mod in {heavy} if mod in sys.modules]
+print()
+print(elapsed, ",".join(heavy), sep=";")
+""".format(heavy=HEAVY_MODULES)
+
+
+def run_startup(argv):
+    """
+    Run the parser on the given arguments in a new python interpreter.
+
+    Returns the time spent to import PanACoTA and parse the arguments, and the list of
+    heavy modules which were imported.
+    """
+    out = subprocess.run([sys.executable, "-c", SCRIPT] + argv, stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    elapsed, heavy = out.stdout.strip().split("\n")[-1].split(";")
+    return float(elapsed), [mod for mod in heavy.split(",") if mod]
+
+
+@pytest.mark.parametrize("argv", [["-h"], ["all", "-h"], ["prepare", "-h"],
+                                  ["annotate", "-h"], ["pangenome", "-h"],
+                                  ["corepers", "-h"], ["align", "-h"], ["tree", "-h"]])
+def test_parser_startup(argv):
+    """
+    Test that showing the help of PanACoTA, or of any of its subcommands, does not import
+    any heavy module, and is done within the import-time budget
+    """
+    # Run twice, and keep the fastest, so that a cold disk cache does not count
+    elapsed1, heavy = run_startup(argv)
+    elapsed2, _ = run_startup(argv)
+    assert heavy == []
+    assert min(elapsed1, elapsed2) < IMPORT_BUDGET
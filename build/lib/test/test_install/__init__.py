@@ -0,0 +1,2 @@
+""" Tests for installation script """
+
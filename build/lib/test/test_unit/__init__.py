@@ -0,0 +1 @@
+""" PanACoTA unit-tests"""
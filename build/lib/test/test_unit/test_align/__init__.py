@@ -0,0 +1 @@
+""" PanACoTA align_module unit-tests"""
@@ -0,0 +1 @@
+""" PanACoTA annotate module unit-tests"""
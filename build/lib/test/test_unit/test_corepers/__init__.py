@@ -0,0 +1 @@
+""" PanACoTA corepers_module unit-tests"""
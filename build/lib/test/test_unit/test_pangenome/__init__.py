@@ -0,0 +1 @@
+""" PanACoTA pangenome_module unit-tests"""
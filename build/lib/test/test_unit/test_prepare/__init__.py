@@ -0,0 +1 @@
+""" PanACoTA prepare_module unit-tests"""
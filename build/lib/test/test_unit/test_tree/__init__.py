@@ -0,0 +1 @@
+""" PanACoTA tree_module unit-tests"""
@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Unit tests for the utils_pangenome submodule of PanACoTA
+"""
+import logging
+import os
+import shutil
+import pytest
+import numpy as np
+
+from PanACoTA import utils_pangenome as upan
+from PanACoTA import utils
+
+
+# Define functions and variables shared by several tests
+def my_logger():
+    """
+    logger given to function called by a subprocess
+    """
+
+    def make_logger(name="test_post_mmseq"):
+        """
+        Create logger according to name given
+        """
+        logfile_base = "log_" + name
+        level = logging.DEBUG
+        utils.init_logger(logfile_base, level, name, verbose=0, quiet=False)
+        return logfile_base
+
+    return make_logger
+
+# Define common variables
+PAN_PATH = os.path.join("test", "data", "pangenome")
+PAN_EXP = os.path.join(PAN_PATH, "exp_files")
+PAN_TEST = os.path.join(PAN_PATH, "test_files")
+GENEPATH = os.path.join(PAN_PATH, "generated_by_unit-tests")
+PAN_FILE = os.path.join(PAN_EXP, "exp_pangenome-4genomes.lst")
+LOGFILE_BASE = "test_getseqs-logs"
+LOG_LEVEL = logging.DEBUG
+LOGFILES = [LOGFILE_BASE + ext for ext in [".log", ".log.debug", ".log.details", ".log.err"]]
+
+@pytest.fixture(autouse=True)
+def setup_teardown_module():
+    """
+    Remove log files at the end of this test module
+
+    Before each test:
+    - init logger
+    - create directory to put generated files
+
+    After:
+    - remove all log files
+    - remove directory with generated results
+    """
+    utils.init_logger(LOGFILE_BASE, LOG_LEVEL, 'test_utilspan', verbose=1)
+    os.mkdir(GENEPATH)
+    print("setup")
+
+    yield
+    for f in LOGFILES:
+        if os.path.exists(f):
+            os.remove(f)
+    shutil.rmtree(GENEPATH)
+    print("teardown")
+
+
+
+FAMS_BY_STRAIN = \
+    {'1': {'GEN2.1017.00001': ['GEN2.1017.00001.i0002_00004'],
+           'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00002'],
+           'GENO.1017.00001': ['GENO.1017.00001.b0002_00003'],
+           'GENO.1216.00002': ["GENO.1216.00002.i0001_00003"]
+           },
+     '2': {'GEN2.1017.00001': ['GEN2.1017.00001.b0003_00010']},
+     '3': {'GEN2.1017.00001': ['GEN2.1017.00001.b0004_00013']},
+     '4': {'GEN2.1017.00001': ['GEN2.1017.00001.i0002_00005'],
+           'GEN4.1111.00001': ["GEN4.1111.00001.b0001_00001"],
+           'GENO.1017.00001': ["GENO.1017.00001.b0001_00002"],
+           'GENO.1216.00002': ["GENO.1216.00002.b0001_00001", "GENO.1216.00002.i0001_00002"]},
+     '5': {'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00003']},
+     '6': {'GEN2.1017.00001': ['GEN2.1017.00001.b0004_00011'],
+           'GEN4.1111.00001': ['GEN4.1111.00001.b0001_00009'],
+           'GENO.1017.00001': ['GENO.1017.00001.b0002_00011'],
+           'GENO.1216.00002': ['GENO.1216.00002.b0002_00010']
+           },
+     '7': {'GEN2.1017.00001': ['GEN2.1017.00001.b0002_00006'],
+           'GENO.1017.00001': ["GENO.1017.00001.b0001_00001"]},
+     '8': {'GEN2.1017.00001': ['GEN2.1017.00001.b0003_00007'],
+           'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00006'],
+           'GENO.1017.00001': ['GENO.1017.00001.i0002_00006', 'GENO.1017.00001.i0002_00007'],
+           'GENO.1216.00002': ['GENO.1216.00002.i0001_00007']
+           },
+     '9': {'GEN2.1017.00001': ['GEN2.1017.00001.i0004_00012'],
+           'GENO.1017.00001': ['GENO.1017.00001.i0002_00008']},
+     '10': {'GEN2.1017.00001': ['GEN2.1017.00001.i0003_00008'],
+            'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00007'],
+            'GENO.1017.00001': ['GENO.1017.00001.i0002_00009'],
+            'GENO.1216.00002': ['GENO.1216.00002.b0001_00008']
+            },
+     '11': {'GEN2.1017.00001': ['GEN2.1017.00001.i0003_00009'],
+            'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00008'],
+            'GENO.1017.00001': ['GENO.1017.00001.i0002_00010'],
+            'GENO.1216.00002': ['GENO.1216.00002.b0002_00009']
+            },
+     '12': {'GEN2.1017.00001': ['GEN2.1017.00001.b0002_00003'],
+            'GENO.1216.00002': ['GENO.1216.00002.i0001_00004']
+            },
+     '13': {'GEN2.1017.00001': ['GEN2.1017.00001.b0001_00002'],
+            'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00004'],
+            'GENO.1017.00001': ['GENO.1017.00001.i0002_00004'],
+            'GENO.1216.00002': ['GENO.1216.00002.i0001_00005']},
+     '14': {'GEN2.1017.00001': ['GEN2.1017.00001.b0001_00001'],
+            'GEN4.1111.00001': ['GEN4.1111.00001.i0001_00005'],
+            'GENO.1017.00001': ['GENO.1017.00001.i0002_00005'],
+            'GENO.1216.00002': ['GENO.1216.00002.i0001_00006']},
+     '15': {'GENO.1216.00002': ['GENO.1216.00002.b0003_00011']},
+     '16': {'GENO.1216.00002': ['GENO.1216.00002.b0003_00012']}
+     }
+
+FAMILIES = {'1': ['GEN2.1017.00001.i0002_00004', 'GEN4.1111.00001.i0001_00002',
+                  'GENO.1017.00001.b0002_00003', 'GENO.1216.00002.i0001_00003'],
+            '2': ['GEN2.1017.00001.b0003_00010'],
+            '3': ['GEN2.1017.00001.b0004_00013'],
+            '4': ['GEN2.1017.00001.i0002_00005', 'GEN4.1111.00001.b0001_00001',
+                  'GENO.1017.00001.b0001_00002', 'GENO.1216.00002.b0001_00001',
+                  'GENO.1216.00002.i0001_00002'],
+            '5': ['GEN4.1111.00001.i0001_00003'],
+            '6': ['GEN2.1017.00001.b0004_00011', 'GEN4.1111.00001.b0001_00009',
+                  'GENO.1017.00001.b0002_00011', 'GENO.1216.00002.b0002_00010'],
+            '7': ['GEN2.1017.00001.b0002_00006', 'GENO.1017.00001.b0001_00001'],
+            '8': ['GEN2.1017.00001.b0003_00007', 'GEN4.1111.00001.i0001_00006',
+                  'GENO.1017.00001.i0002_00006', 'GENO.1017.00001.i0002_00007',
+                  'GENO.1216.00002.i0001_00007'],
+            '9': ['GEN2.1017.00001.i0004_00012', 'GENO.1017.00001.i0002_00008'],
+            '10': ['GEN2.1017.00001.i0003_00008', 'GEN4.1111.00001.i0001_00007',
+                   'GENO.1017.00001.i0002_00009', 'GENO.1216.00002.b0001_00008'],
+            '11': ['GEN2.1017.00001.i0003_00009', 'GEN4.1111.00001.i0001_00008',
+                   'GENO.1017.00001.i0002_00010', 'GENO.1216.00002.b0002_00009'],
+            '12': ['GEN2.1017.00001.b0002_00003', 'GENO.1216.00002.i0001_00004'],
+            '13': ['GEN2.1017.00001.b0001_00002', 'GEN4.1111.00001.i0001_00004',
+                   'GENO.1017.00001.i0002_00004', 'GENO.1216.00002.i0001_00005'],
+            '14': ['GEN2.1017.00001.b0001_00001', 'GEN4.1111.00001.i0001_00005',
+                   'GENO.1017.00001.i0002_00005', 'GENO.1216.00002.i0001_00006'],
+            '15': ['GENO.1216.00002.b0003_00011'],
+            '16': ['GENO.1216.00002.b0003_00012']
+            }
+
+ALL_STRAINS = ['GEN2.1017.00001', 'GEN4.1111.00001', 'GENO.1017.00001', 'GENO.1216.00002']
+
+
+def test_read_gene():
+    """
+    Check that when reading a given gene name, it extracts expected information
+    """
+    gene = "ESCO.1016.00012.i012_00015"
+    num = "1"
+    fams_by_strain = {"1": {}}
+    all_strains = set()
+    upan.read_gene(gene, num, fams_by_strain, all_strains)
+    assert all_strains == {"ESCO.1016.00012"}
+    assert fams_by_strain == {"1": {"ESCO.1016.00012": [gene]}}
+
+
+def test_read_gene_other_format():
+    """
+    Check that when reading a gene name which does not have the gembase
+    format, it still returns the right information
+    """
+    gene = "my_gene-name_other_0001t"
+    num = "1"
+    fams_by_strain = {"1": {}}
+    all_strains = set()
+    upan.read_gene(gene, num, fams_by_strain, all_strains)
+    assert all_strains == {"my_gene-name_other"}
+    assert fams_by_strain == {"1": {"my_gene-name_other": [gene]}}
+
+
+def test_read_gene_strain_known():
+    """
+    Check that when reading a gene name, and its corresponding
+    strain already exists in fams_by_strain and all_strains, it just adds
+    this new gene to fams_by_strain, and does nothing to all_strains
+    """
+    gene = "ESCO.1016.00012.i012_00015"
+    num = "1"
+    fams_by_strain = {"1": {"ESCO.1016.00012": ["ESCO.1016.00012.i001_01"]}}
+    all_strains = {"ESCO.1016.00012"}
+    upan.read_gene(gene, num, fams_by_strain, all_strains)
+    assert all_strains == {"ESCO.1016.00012"}
+    assert fams_by_strain == {"1": {"ESCO.1016.00012": ["ESCO.1016.00012.i001_01", gene]}}
+
+
+def test_read_panfile(caplog):
+    """
+    check that it reads the pangenome file and returns the expected objects
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    fbs, fams, sas = upan.read_pan_file(PAN_FILE, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert sas == ALL_STRAINS
+    assert "Reading and getting information from pangenome file" in caplog.text
+
+
+def test_read_panfile_strfamnum(caplog):
+    """
+    check that it reads the pangenome file and returns the expected objects
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "panfile_wrong")
+    with open(panfile, "w") as pfw:
+        pfw.write("family1 gene1_5 gene2_6 gene3_8\n")
+        pfw.write("2 gene1_ gene3_5 gene1_toto")
+    fbs, fams, sas = upan.read_pan_file(panfile, logger)
+    assert fbs == {"family1": {"gene1": ["gene1_5"],
+                               "gene2": ["gene2_6"],
+                               "gene3": ["gene3_8"]},
+                   "2": {"gene1": ["gene1_", "gene1_toto"],
+                         "gene3": ["gene3_5"]}}
+    assert fams == {"family1": ["gene1_5", "gene2_6", "gene3_8"],
+                    "2": ["gene1_", "gene3_5", "gene1_toto"]}
+    assert sas == ["gene1", "gene2", "gene3"]
+    assert "Reading and getting information from pangenome file" in caplog.text
+
+
+def test_read_panfile_wrong(caplog):
+    """
+    reading wrong format pangenome file
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "panfile_wrong")
+    with open(panfile, "w") as pfw:
+        pfw.write("I'm a wrong panfile")
+        pfw.write("123 456 789")
+    with pytest.raises(SystemExit):
+        upan.read_pan_file(panfile, logger)
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Error in pangenome file. No family found." in caplog.text
+
+
+def test_read_panfile_empty(caplog):
+    """
+    reading wrong format pangenome file
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "panfile_wrong")
+    open(panfile, "w").close()
+    with pytest.raises(SystemExit):
+        upan.read_pan_file(panfile, logger)
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Error in pangenome file. No family found." in caplog.text
+
+
+def test_get_fams(caplog):
+    """
+    Test that when giving all members for each family, it returns all strains involved in
+    those families, and all families with members sorted by strain
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    bystrain, sortedf = upan.get_fams_info(FAMILIES, logger)
+    assert bystrain == FAMS_BY_STRAIN
+    assert sortedf == ALL_STRAINS
+    assert "Retrieving information from pan families" in caplog.text
+
+
+def test_read_pangenome_filetxt(caplog):
+    """
+    Test that when giving a pangenome file, it returns all families as expected.
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    # Copy pan file to folder for files generated by tests. It will also save its bin version
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(pan_to_use + ".bin")
+
+
+def test_read_pangenome_filewrong(caplog):
+    """
+    giving a wrong pangenome file, raises error
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    # create wrong pangenome file
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    with open(pan_to_use, "w") as ptu:
+        ptu.write("I'm not a good pangenome file")
+    with pytest.raises(SystemExit):
+        upan.read_pangenome(pan_to_use, logger)
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Error in pangenome file. No family found" in caplog.text
+    assert not os.path.isfile(pan_to_use + ".bin")
+
+
+def test_read_pangenome_strfamnum(caplog):
+    """
+    giving a wrong pangenome file, raises error
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    # create wrong pangenome file
+    panfile = os.path.join(GENEPATH, "panfile_wrong")
+    with open(panfile, "w") as pfw:
+        pfw.write("family1 gene1_5 gene2_6 gene3_8\n")
+        pfw.write("2 gene1_ gene3_5 gene1_toto")
+    fbs, fams, sas = upan.read_pangenome(panfile, logger)
+    assert fbs == {"family1": {"gene1": ["gene1_5"],
+                               "gene2": ["gene2_6"],
+                               "gene3": ["gene3_8"]},
+                   "2": {"gene1": ["gene1_", "gene1_toto"],
+                         "gene3": ["gene3_5"]}}
+    assert fams == {"family1": ["gene1_5", "gene2_6", "gene3_8"],
+                    "2": ["gene1_", "gene3_5", "gene1_toto"]}
+    assert sas == ["gene1", "gene2", "gene3"]
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(panfile + ".bin")
+
+
+def test_read_pangenome_filebin(caplog):
+    """
+    Test that when giving only a pangenome filename, and the corresponding bin file exists,
+    it reads the binary file, and returns expected objects.
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    # Copy pan file to folder for files generated by tests. It will also save its bin version
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    upan.read_pangenome(pan_to_use, logger)
+    caplog.clear()
+    fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Retrieving info from binary file" in caplog.text
+
+
+def test_read_pangenome_filebin_legacy(caplog):
+    """
+    Test that when giving only a pangenome filename, and the corresponding bin file was
+    saved by a previous version (pickle), the bin file is not loaded, even if it is more
+    recent than the pangenome file: information is read from the pangenome file.
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    panbin_to_use = os.path.join(GENEPATH, "Pangenome.lst.bin")
+    test_panbin = os.path.join(PAN_TEST, "pangenome-strfamnum.bin")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    shutil.copyfile(test_panbin, panbin_to_use)
+    fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Pangenome.lst.bin is not in the current binary format" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
+
+
+def test_read_pangenome_fams(caplog):
+    """
+    Test that when giving a pangenome file, and families, it directly extracts strain information
+    from the families: pangenome file does not need to exist, and a binary file is created
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "toto.txt")
+    fbs, fams, ass = upan.read_pangenome(panfile, logger, families=FAMILIES)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Retrieving information from pan families" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(panfile + ".bin")
+    
+
+def test_read_pangenome_fams_binok(caplog):
+    """
+    Test that when giving a pangenome file, and families, it directly extracts strain information
+    from the families: pangenome file does not need to exist. However, the pangenome.bin file
+    already exists. As it is not a valid binary file, it is replaced. Once valid, it is not
+    saved again.
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "toto.txt")
+    # Create bn pangenome file (which is empty
+    open(panfile + ".bin", "w").close()
+    fbs, fams, ass = upan.read_pangenome(panfile, logger, FAMILIES)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Retrieving information from pan families" in caplog.text
+    assert "toto.txt.bin is not in the current binary format" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.getsize(panfile + ".bin") > 0
+    mtime = os.stat(panfile + ".bin").st_mtime_ns
+    caplog.clear()
+    upan.read_pangenome(panfile, logger, FAMILIES)
+    assert "Saving all information" not in caplog.text
+    assert os.stat(panfile + ".bin").st_mtime_ns == mtime
+
+
+def test_read_lstinfo():
+    """
+    Read lstinfo file and return genome names
+    """
+    logger = logging.getLogger("test_pan")
+    lstinfo = os.path.join(PAN_TEST, "list_to_pan.txt")
+    g = upan.read_lstinfo(lstinfo, logger)
+    assert g == ["GEN2.1017.00001", "GEN4.1111.00001", "GENO.1017.00001", "GENO.1216.00002"]
+
+
+def test_read_lstinfo_empty(caplog):
+    """
+    Reading empty lstinfo file: exits with error no genome found
+    """
+    logger = logging.getLogger("test_pan")
+    empty_lstinfo = os.path.join(GENEPATH, "empty.txt")
+    open(empty_lstinfo, "w").close()
+    with pytest.raises(SystemExit):
+        upan.read_lstinfo(empty_lstinfo, logger)
+    assert ("No genome found in "
+            "test/data/pangenome/generated_by_unit-tests/empty.txt file.") in caplog.text
+
+
+def test_read_lstinfo_nofile(caplog):
+    """
+    Trying to read genomes from non-existing file
+    """
+    logger = logging.getLogger("test_pan")
+    with pytest.raises(SystemExit):
+        upan.read_lstinfo("non-existing-file.txt", logger)
+    assert ("non-existing-file.txt file not found") in caplog.text
+    
+
+def test_compact_families():
+    """
+    Test that families added to a CompactFamilies are numbered from 1, and can be retrieved
+    as lists or as a dict
+    """
+    fams = upan.CompactFamilies()
+    assert len(fams) == 0
+    assert fams.to_dict() == {}
+    fams.append(["GEN1.1017.00001.i0001_00002", "GEN2.1017.00001.i0001_00001"])
+    fams.append(["GEN1.1017.00001.i0001_00005"])
+    assert len(fams) == 2
+    assert fams[2] == ["GEN1.1017.00001.i0001_00005"]
+    assert list(fams) == [1, 2]
+    assert fams.to_dict() == {1: ["GEN1.1017.00001.i0001_00002", "GEN2.1017.00001.i0001_00001"],
+                              2: ["GEN1.1017.00001.i0001_00005"]}
+    assert list(fams.offsets) == [0, 2, 3]
+    with pytest.raises(KeyError):
+        fams[3]
+    # Can be used instead of a dict to get information on families
+    fams_by_strain, all_strains = upan.get_fams_info(fams, logging.getLogger("test"))
+    assert all_strains == ["GEN1.1017.00001", "GEN2.1017.00001"]
+    assert fams_by_strain[1] == {"GEN1.1017.00001": ["GEN1.1017.00001.i0001_00002"],
+                                 "GEN2.1017.00001": ["GEN2.1017.00001.i0001_00001"]}
+
+
+def test_get_strain():
+    """
+    Test that genome names are found from gembase-like and other gene names, and that
+    a gembase-like name is only kept if it is one of the given genomes
+    """
+    assert upan.get_strain("ESCO.1512.00001.i001_12313") == "ESCO.1512.00001"
+    assert upan.get_strain("my_genome_00012") == "my_genome"
+    assert upan.get_strain("ESCO.1512.00001.C001_00001") == "ESCO.1512.00001"
+    assert upan.get_strain("ESCO.1512.00001.C001_00001",
+                           {"ESCO.1512.00001.C001"}) == "ESCO.1512.00001.C001"
+    assert upan.get_strain("ESCO.1512.00001.i001_12313",
+                           {"ESCO.1512.00001"}) == "ESCO.1512.00001"
+
+
+def test_pangenome_from_file():
+    """
+    Test that a pangenome read from a file gives the same families, strains and genomes as
+    read_pan_file, with interned members and genomes
+    """
+    pan = upan.Pangenome.from_file(PAN_FILE)
+    assert pan.families() == FAMILIES
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert pan.genomes == ALL_STRAINS
+    assert len(pan) == len(FAMILIES)
+    assert pan.members.dtype == "int32"
+    assert pan.member_genomes.dtype == "int32"
+    assert len(pan.proteins) == len(pan.members) == pan.offsets[-1]
+    assert pan.sorted_families() == sorted(range(len(pan)), key=lambda num: int(pan.fam_nums[num]))
+    assert pan.family(pan.fam_nums.index("1")) == FAMILIES["1"]
+
+
+def test_pangenome_stats():
+    """
+    Test the number of members of each genome in each family, and the statistics computed
+    on all families at once
+    """
+    pan = upan.Pangenome.from_families({1: ["A_1", "A_2", "B_1"], 2: ["C_1"], 3: [],
+                                        4: ["A_3", "B_2", "C_2"]})
+    assert pan.genomes == ["A", "B", "C"]
+    assert pan.genome_counts(0).tolist() == [2, 1, 0]
+    assert pan.genome_counts(2).tolist() == [0, 0, 0]
+    assert pan.nb_members.tolist() == [3, 1, 0, 3]
+    nb_genomes, nb_mono, max_multi = pan.family_stats()
+    assert nb_genomes.tolist() == [2, 1, 0, 3]
+    assert nb_mono.tolist() == [1, 1, 0, 3]
+    assert max_multi.tolist() == [2, 1, 0, 1]
+
+
+def test_pangenome_subset():
+    """
+    Test that a subset of a pangenome only contains members of the given genomes, and no
+    empty family
+    """
+    pan = upan.Pangenome.from_families({1: ["A_1", "A_2", "B_1"], 2: ["C_1"],
+                                        4: ["A_3", "B_2", "C_2"]})
+    sub = pan.subset(["C", "A", "D"])
+    assert sub.genomes == ["A", "C"]
+    assert sub.families() == {1: ["A_1", "A_2"], 2: ["C_1"], 4: ["A_3", "C_2"]}
+    assert sub.fams_by_strain() == {1: {"A": ["A_1", "A_2"]}, 2: {"C": ["C_1"]},
+                                    4: {"A": ["A_3"], "C": ["C_2"]}}
+    sub = pan.subset(["B"])
+    assert sub.families() == {1: ["B_1"], 4: ["B_2"]}
+    assert sub.offsets.tolist() == [0, 1, 2]
+
+
+def test_load_pangenome_file(caplog):
+    """
+    Test that a pangenome is read from the text file and saved to a binary file, which is
+    then used by load_pangenome and read_pangenome
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(pan_to_use + ".bin")
+    caplog.clear()
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert pan.genomes == ALL_STRAINS
+    assert "Retrieving info from binary file" in caplog.text
+    fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+
+
+def test_load_pangenome_stats(caplog):
+    """
+    Test that the statistics of families are saved to the binary file, and loaded with it
+    instead of being computed again
+    """
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    pan = upan.load_pangenome(pan_to_use, logger)
+    exp_stats = [stat.tolist() for stat in pan.family_stats()]
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.stats is not None
+    assert [stat.tolist() for stat in pan.family_stats()] == exp_stats
+    # Computed again for a subset of genomes
+    sub = pan.subset(ALL_STRAINS[:2])
+    assert sub.stats is None
+    assert sub.family_stats()[0].max() == 2
+
+
+def test_load_pangenome_oldbin(caplog):
+    """
+    Test that a binary file saved by read_pangenome in previous versions is replaced by a
+    binary file in the current format, built from the pangenome file
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    shutil.copyfile(os.path.join(PAN_TEST, "pangenome.bin"), pan_to_use + ".bin")
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert "Pangenome.lst.bin cannot be used" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
+    with open(pan_to_use + ".bin", "rb") as binf:
+        assert binf.read(len(upan.CACHE_MAGIC)) == upan.CACHE_MAGIC
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+
+
+def test_load_pangenome_fams(caplog):
+    """
+    Test that a pangenome is built from the families given, and that the binary file is
+    saved, with arrays mapped in memory when loaded
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "toto.txt")
+    pan = upan.load_pangenome(panfile, logger, FAMILIES)
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert "Retrieving information from pan families" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(panfile + ".bin")
+    caplog.clear()
+    pan = upan.load_pangenome(panfile, logger)
+    assert "Retrieving info from binary file" in caplog.text
+    assert pan.families() == FAMILIES
+    assert pan.genomes == ALL_STRAINS
+    assert isinstance(pan.members, np.memmap)
+    assert isinstance(pan.proteins, upan.StringTable)
+
+
+def test_load_pangenome_changed(caplog):
+    """
+    Test that the binary file is not used when the pangenome file changed since it was
+    saved, but is still used if only its modification time changed
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    upan.load_pangenome(pan_to_use, logger)
+    # Same content, newer file
+    stat = os.stat(pan_to_use)
+    os.utime(pan_to_use, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+    assert "was modified, but not its content" in caplog.text
+    # New modification time saved: the file is not hashed again
+    header = upan.check_cache(pan_to_use + ".bin", pan_to_use, logger)
+    assert header["source"]["mtime_ns"] == os.stat(pan_to_use).st_mtime_ns
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+    assert "was modified" not in caplog.text
+    # New content
+    with open(pan_to_use, "w") as panf:
+        panf.write("1 GEN1.1017.00001.i0001_00002 GEN2.1017.00001.i0001_00001\n")
+    caplog.clear()
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == {"1": ["GEN1.1017.00001.i0001_00002",
+                                    "GEN2.1017.00001.i0001_00001"]}
+    assert "Pangenome.lst changed since" in caplog.text
+    assert "Pangenome.lst.bin cannot be used" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
+    # Binary file saved again for the new content
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == pan.families()
+    assert "Retrieving info from binary file" in caplog.text
+
+
+def test_string_table():
+    """
+    Test that strings are found back from a string table
+    """
+    table = upan.StringTable.from_list(["abc", "", "é_1"])
+    assert len(table) == 3
+    assert list(table) == ["abc", "", "é_1"]
+    assert table[2] == "é_1"
+    assert table.take([1, 2]) == ["", "é_1"]
+    assert table.take([2, 0]) == ["é_1", "abc"]
+    assert table.take([]) == []
+    assert len(upan.StringTable.from_list([])) == 0
+
+
+def test_load_pangenome_wrong(caplog):
+    """
+    Test that an empty pangenome file gives an error
+    """
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "empty.txt")
+    open(panfile, "w").close()
+    with pytest.raises(SystemExit):
+        upan.load_pangenome(panfile, logger)
+    assert "Error in pangenome file. No family found." in caplog.text
@@ -49,6 +49,7 @@ def test_parser_noconffile():
     assert options.l90 == 100
     assert options.clust_mode == 1
     assert options.min_id == 0.8
+    assert options.max_mem is None
     assert options.tol == 1
     assert options.boot == 0
 
@@ -289,3 +290,43 @@ def test_parser_error_contig_annotate(capsys):
     out, err = capsys.readouterr()
     assert ("cutn not allowed in annotate section.") in out
 
+
+def test_parser_max_mem(tmp_path, capsys):
+    """
+    Test that the memory budget of mmseqs can be given in the command line or in the
+    pangenome section of the config file, and that an invalid value is refused
+    """
+    parser = argparse.ArgumentParser(description="Run all modules", add_help=False)
+    allm.build_parser(parser)
+    options = allm.parse(parser, "-o out-all -n TEST -T 1234 --max-mem 500M".split())
+    assert options.max_mem == 500000000
+    conffile = tmp_path / "conf.ini"
+    conffile.write_text("[pangenome]\nmax_mem = 2G\n")
+    options = allm.parse(parser, f"-c {conffile} -o out-all -n TEST -T 1234".split())
+    assert options.max_mem == 2000000000
+    conffile.write_text("[pangenome]\nmax_mem = lots\n")
+    with pytest.raises(SystemExit):
+        allm.parse(parser, f"-c {conffile} -o out-all -n TEST -T 1234".split())
+    out, _ = capsys.readouterr()
+    assert "ERROR: argument --max-mem: invalid memory value: 'lots'" in out
+
+
+def test_parser_pyrodigal(tmp_path, capsys):
+    """
+    Test that pyrodigal can be asked in the command line or in the annotate section of the
+    config file, only with prodigal
+    """
+    parser = argparse.ArgumentParser(description="Run all modules", add_help=False)
+    allm.build_parser(parser)
+    options = allm.parse(parser, "-o out-all -n TEST -T 1234".split())
+    assert not options.in_process
+    options = allm.parse(parser, "-o out-all -n TEST -T 1234 --prodigal --pyrodigal".split())
+    assert options.in_process
+    conffile = tmp_path / "conf.ini"
+    conffile.write_text("[annotate]\nprodigal_only = True\nin_process = True\n")
+    options = allm.parse(parser, f"-c {conffile} -o out-all -n TEST -T 1234".split())
+    assert options.in_process is True
+    with pytest.raises(SystemExit):
+        allm.parse(parser, "-o out-all -n TEST -T 1234 --pyrodigal".split())
+    _, err = capsys.readouterr()
+    assert "You cannot use --pyrodigal option with prokka" in err
@@ -50,11 +50,12 @@ def test_main_default_qc_only():
     # nbcont (int), cutn (int), min_dist (float), max_dist (float)
     args_prepare = ("", "104099", "", "", "all", "refseq", "", False, "", False, "", 100, 999, 5, 1e-4, 0.06)
     # args for annotate:
-    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool)
-    args_annot = ("TEST", True, "2101", False, False)
+    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool),
+    # in_process (bool)
+    args_annot = ("TEST", True, "2101", False, False, False)
     # args for pangenome:
-    # min_id (float), clust_mode (int), spe_dir (str), outfile (str)
-    args_pan = (0.8, 1, "", "")
+    # min_id (float), clust_mode (int), spe_dir (str), outfile (str), max_mem (int)
+    args_pan = (0.8, 1, "", "", None)
     # args for corepers
     # tol (float), mixed (bool), multi (bool), floor (bool)
     args_corepers = (1, False, False, False)
@@ -111,11 +112,12 @@ def test_main_qconly_spestrains():
     strains_file = os.path.join("test", "data", "prepare", "test_files", "test_list-strains.txt")
     args_prepare = ("", "", "",strains_file, "all", "refseq", "", False, "", False, "", 100, 999, 5, 1e-4, 0.06)
     # args for annotate:
-    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool)
-    args_annot = ("TEST", True, "2101", False, False)
+    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool),
+    # in_process (bool)
+    args_annot = ("TEST", True, "2101", False, False, False)
     # args for pangenome:
-    # min_id (float), clust_mode (int), spe_dir (str), outfile (str)
-    args_pan = (0.8, 1, "", "")
+    # min_id (float), clust_mode (int), spe_dir (str), outfile (str), max_mem (int)
+    args_pan = (0.8, 1, "", "", None)
     # args for corepers
     # tol (float), mixed (bool), multi (bool), floor (bool)
     args_corepers = (1, False, False, False)
@@ -174,11 +176,12 @@ def test_main_norefseq():
     db_dir = os.path.join(DATADIR, "genomes")
     args_prepare = ("", "104099", "", "", "all", "refseq", "", True, db_dir, False, "", 100, 999, 5, 1e-4, 1)
     # args for annotate:
-    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool)
-    args_annot = ("TEST", False, "2101", True, False)
+    # name (str), qc_only (bool), date (str), prodigal_only (bool), small (bool),
+    # in_process (bool)
+    args_annot = ("TEST", False, "2101", True, False, False)
     # args for pangenome:
-    # min_id (float), clust_mode (int), spe_dir (str), outfile (str)
-    args_pan = (0.8, 1, "", "")
+    # min_id (float), clust_mode (int), spe_dir (str), outfile (str), max_mem (int)
+    args_pan = (0.8, 1, "", "", None)
     # args for args_corepers
     # tol (float), mixed (bool), multi (bool), floor (bool)
     args_corepers = (1, False, False, False)
@@ -287,6 +290,7 @@ def test_main_from_parse():
     args.date = "2101"
     args.prodigal_only = False
     args.small = False
+    args.in_process = False
     args.name = "TEST"
     # pangenome params
     args.min_id = 0.8
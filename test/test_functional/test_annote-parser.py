@@ -47,10 +47,12 @@ def test_parser_noarg(capsys):
         annot.parse(parser, "".split())
     _, err = capsys.readouterr()
     assert "[-d DB_PATH] -r RES_PATH [-l LIST_FILE] [-n NAME] [-Q]" in err
-    assert "[--info FROM_INFO] [--prodigal] [--small] [--l90 L90]" in err
+    assert "[--info FROM_INFO] [--prodigal] [--small] [--pyrodigal]" in err
     assert "[--nbcont NBCONT] [--cutn CUTN] [--date DATE] [--tmp TMPDIR]" in err
-    assert "[--annot_dir ANNOTDIR] [-F] [--threads THREADS] [-v]" in err
-    assert "[-q] [-h]" in err
+    assert "[--annot_dir ANNOTDIR] [--scratch SCRATCH_DIR]" in err
+    assert "[--compress {gzip,bgzip,zstd}] [-F]" in err
+    assert "[--threads THREADS]" in err
+    assert "[--max-mem MAX_MEM] [-v] [-q] [-h]" in err
     assert "the following arguments are required: -r" in err
 
 
@@ -206,11 +208,32 @@ def test_parser_default():
     assert options.nbcont == 999
     assert options.cutn == 5
     assert options.threads == 1
+    assert options.max_mem is None
+    assert options.scratch_dir is None
     assert options.date == time.strftime("%m%y")
     assert not options.force
     assert not options.qc_only
     assert not options.from_info
     assert not options.prodigal_only
+    assert not options.in_process
+    assert options.compress is None
+
+
+def test_parser_max_mem(capsys):
+    """
+    Test that the memory limit given is converted to bytes, and that an error is returned
+    if it is not a valid amount of memory
+    """
+    parser = argparse.ArgumentParser(description="Annotate all genomes", add_help=False)
+    annot.build_parser(parser)
+    options = annot.parse(parser, "-r respath -n g123 -l list_genomes -d dbpath "
+                                  "--max-mem 8G".split())
+    assert options.max_mem == 8000000000
+    with pytest.raises(SystemExit):
+        annot.parse(parser, "-r respath -n g123 -l list_genomes -d dbpath "
+                            "--max-mem lots".split())
+    _, err = capsys.readouterr()
+    assert "argument --max-mem: invalid memory value: 'lots'" in err
 
 
 def test_parser_values():
@@ -357,6 +380,33 @@ def test_parser_small_noprodigal(capsys):
            "Either use prodigal, or remove this option") in err
 
 
+def test_parser_pyrodigal_noprodigal(capsys):
+    """
+    Test that when run with --pyrodigal but do not ask to use prodigal, it returns error
+    """
+    parser = argparse.ArgumentParser(description="Annotate all genomes", add_help=False)
+    annot.build_parser(parser)
+    with pytest.raises(SystemExit):
+        annot.parse(parser, "-r respath -n name --pyrodigal".split())
+    _, err = capsys.readouterr()
+    assert("You cannot use --pyrodigal option with prokka. "
+           "Either use prodigal, or remove this option") in err
+
+
+def test_parser_compress(capsys):
+    """
+    Test that the compression method is kept, and that an unknown method returns an error
+    """
+    parser = argparse.ArgumentParser(description="Annotate all genomes", add_help=False)
+    annot.build_parser(parser)
+    options = annot.parse(parser, "-r respath -n name -l list -d dbpath --compress bgzip".split())
+    assert options.compress == "bgzip"
+    with pytest.raises(SystemExit):
+        annot.parse(parser, "-r respath -n name -l list -d dbpath --compress bz2".split())
+    _, err = capsys.readouterr()
+    assert "argument --compress: invalid choice: 'bz2'" in err
+
+
 def test_parser_filter(capsys):
     """
     Test that warnings are written (when will split l90 and/or nbcont)
@@ -138,3 +138,68 @@ def test_parser_mixed_floor():
     assert options.floor is True
     assert options.verbose == 0
     assert not options.quiet
+
+
+def test_parser_sweep():
+    """
+    Test that all combinations of --sweep-tol and --sweep-mode are kept once, in the given
+    order, without mixed families for a 'tol' of 1
+    """
+    parser = argparse.ArgumentParser(description="Do corepers", add_help=False)
+    corepers.build_parser(parser)
+    options = corepers.parse(parser, ("-p pangenome -o outdir --sweep-tol 0.9 1 0.9 "
+                                      "--sweep-mode strict mixed multi").split())
+    assert options.sweep == [(0.9, False, False), (0.9, False, True), (0.9, True, False),
+                             (1, False, False), (1, True, False)]
+    options = corepers.parse(parser, "-p pangenome -o outdir --sweep-tol 0.9 0.5 -X".split())
+    assert options.sweep == [(0.9, False, True), (0.5, False, True)]
+    options = corepers.parse(parser, "-p pangenome -o outdir -t 0.8 --sweep-mode multi".split())
+    assert options.sweep == [(0.8, True, False)]
+    options = corepers.parse(parser, "-p pangenome -o outdir".split())
+    assert options.sweep is None
+
+
+@pytest.mark.parametrize("argv, error", [
+    ("--sweep-mode mixed -M", "-M and -X options cannot be used with --sweep-mode"),
+    ("--sweep-tol 0.9 1 -X", "Mixed families (-X) cannot be used with a 'tol' of 1"),
+    ("--sweep-tol 1 -F", "but all values of --sweep-tol are 1"),
+    ("--sweep-mode mixed", "With a 'tol' of 1, mixed families are the same as the core genome")])
+def test_parser_sweep_error(argv, error, capsys):
+    """
+    Test that incompatible sweep options return the expected error
+    """
+    parser = argparse.ArgumentParser(description="Do corepers", add_help=False)
+    corepers.build_parser(parser)
+    with pytest.raises(SystemExit):
+        corepers.parse(parser, ("-p pangenome -o outdir " + argv).split())
+    _, err = capsys.readouterr()
+    assert error in err
+
+
+def test_parser_subsets(capsys):
+    """
+    Test that several lists of genomes can be given, but not together with -l
+    """
+    parser = argparse.ArgumentParser(description="Do corepers", add_help=False)
+    corepers.build_parser(parser)
+    options = corepers.parse(parser, "-p pangenome -o outdir --subsets lst1 lstdir".split())
+    assert options.subsets == ["lst1", "lstdir"]
+    assert not corepers.parse(parser, "-p pangenome -o outdir".split()).subsets
+    with pytest.raises(SystemExit):
+        corepers.parse(parser, "-p pangenome -o outdir --subsets lst1 -l lst2".split())
+    _, err = capsys.readouterr()
+    assert "-l and --subsets options cannot be used together" in err
+
+
+def test_parser_stream(capsys):
+    """
+    Test that the pangenome can be read line by line, but not with --subsets
+    """
+    parser = argparse.ArgumentParser(description="Do corepers", add_help=False)
+    corepers.build_parser(parser)
+    assert corepers.parse(parser, "-p pangenome -o outdir --stream".split()).stream
+    assert not corepers.parse(parser, "-p pangenome -o outdir".split()).stream
+    with pytest.raises(SystemExit):
+        corepers.parse(parser, "-p pangenome -o outdir --stream --subsets lst1".split())
+    _, err = capsys.readouterr()
+    assert "--stream and --subsets options cannot be used together." in err
@@ -293,6 +293,9 @@ def test_main_from_parse(capsys):
     args.outputdir = GENEPATH
     args.verbose = 0
     args.quiet = False
+    args.sweep = None
+    args.subsets = None
+    args.stream = False
     args.argv = "PanACoTA corepers test_main_from_parse"
 
     corepers.main_from_parse(args)
@@ -315,3 +318,81 @@ def test_main_from_parse(capsys):
     assert "Generating Persistent genome of a dataset containing 4 genomes" in out
     assert ("The core genome contains 2 families, each one having exactly 4 "
             "members, from the 4 different genomes.") in out
+
+
+def test_main_sweep(capsys):
+    """
+    Test that with several settings, the pangenome is read once, and each persistent genome
+    is the same as the one generated alone, with the same name
+    """
+    sweep = [(1, False, False), (0.5, False, False), (0.5, True, False), (0.5, False, True)]
+    sweepdir = os.path.join(GENEPATH, "sweep")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, sweepdir, "", False, 0, False,
+                             sweep=sweep)
+    out, _ = capsys.readouterr()
+    assert out.count("Saving all information to a binary file for later use") == 1
+    assert out.count("Generating Persistent genome of a dataset containing 4 genomes") == 4
+    for (tol, multi, mixed), sweep_pers in zip(sweep, out_pers):
+        alone = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, "", False, 0, False)
+        assert sweep_pers == os.path.join(sweepdir, os.path.basename(alone))
+        with open(sweep_pers) as swf, open(alone) as alf:
+            assert swf.read() == alf.read()
+
+
+def test_main_subsets(capsys):
+    """
+    Test that with a directory of lists of genomes, 1 persistent genome is written per list
+    and setting, the same as the one generated with -l, with the same name
+    """
+    listdir = os.path.join(GENEPATH, "lists")
+    os.mkdir(listdir)
+    lists = {"clade1.lst": ["GEN4.1111.00001", "GENO.1216.00002"],
+             "clade2.lst": ["GENO.0817.00001", "GENO.1216.00002", "GENO.1216.00003"]}
+    for name, genomes in lists.items():
+        with open(os.path.join(listdir, name), "w") as lstf:
+            lstf.write("".join(genome + "\n" for genome in genomes))
+    sweep = [(1, False, False), (0.5, False, True)]
+    subdir = os.path.join(GENEPATH, "subsets")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, subdir, "", False, 0, False,
+                             sweep=sweep, subsets=[listdir])
+    assert len(out_pers) == 4
+    out, _ = capsys.readouterr()
+    assert "Getting persistent genomes of 2 subsets of genomes." in out
+    for num, sub_pers in enumerate(out_pers):
+        lstinfo = os.path.join(listdir, sorted(lists)[num // 2])
+        tol, multi, mixed = sweep[num % 2]
+        alone = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, lstinfo, False, 0,
+                              False)
+        assert sub_pers == os.path.join(subdir, os.path.basename(alone))
+        with open(sub_pers) as subf, open(alone) as alf:
+            assert subf.read() == alf.read()
+
+
+@pytest.mark.parametrize("lstinfo", ["", "lstinfo-ok.lst"])
+def test_main_stream(lstinfo, capsys):
+    """
+    Test that persistent genomes found by reading the pangenome file line by line are the
+    same as when loading the pangenome, with and without a list of genomes, and that no
+    binary file is saved
+    """
+    if lstinfo:
+        lstinfo = os.path.join(GENEPATH, lstinfo)
+        with open(lstinfo, "w") as lstf:
+            lstf.write("GEN4.1111.00001\nGENO.0817.00001\nGENO.1216.00003\n")
+    sweep = [(1, False, False), (0.5, False, False), (0.5, True, False), (0.5, False, True),
+             (0.7, False, False)]
+    streamdir = os.path.join(GENEPATH, "stream")
+    out_pers = corepers.main("cmd", UPAN, 1, False, False, streamdir, lstinfo, True, 0, False,
+                             sweep=sweep, stream=True)
+    assert not os.path.isfile(UPAN + ".bin")
+    out, _ = capsys.readouterr()
+    assert "Reading {} line by line.".format(UPAN) in out
+    nb_lines = []
+    for (tol, multi, mixed), stream_pers in zip(sweep, out_pers):
+        loaded = corepers.main("cmd", UPAN, tol, multi, mixed, GENEPATH, lstinfo, True, 0, False)
+        assert stream_pers == os.path.join(streamdir, os.path.basename(loaded))
+        with open(stream_pers) as stf, open(loaded) as lof:
+            content = stf.read()
+            assert content == lof.read()
+        nb_lines.append(content.count("\n"))
+    assert max(nb_lines) > 0
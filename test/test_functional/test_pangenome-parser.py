@@ -26,7 +26,18 @@ def test_parser_noarg(capsys):
     assert "[-i MIN_ID]" in err
     assert " -o OUTDIR" in err
     assert "[-f OUTFILE] [-c {0,1,2}]" in err
-    assert "[-s SPEDIR] [--threads THREADS] [-v]" in err
+    assert "[-s SPEDIR]" in err
+    assert "[--dedup]" in err
+    assert "[--bank]" in err
+    assert "[--matrix {csv,sparse,all}]" in err
+    assert "[--update PANGENOME TMPDIR]" in err
+    assert "[--engine {cluster,linclust}]" in err
+    assert "[--max-mem MAX_MEM]" in err
+    assert "[--distances]" in err
+    assert "[--curves NB_PERMS]" in err
+    assert "[--sweep-id MIN_ID [MIN_ID ...]]" in err
+    assert "[--sweep-mode {0,1,2} [{0,1,2} ...]]" in err
+    assert "[--threads THREADS]" in err
     assert "[-q] [-h]" in err
     assert "the following arguments are required: -l, -n, -d, -o" in err
 
@@ -139,6 +150,14 @@ def test_parser_default():
     assert options.outdir == "od"
     assert options.clust_mode == 1
     assert not options.spedir
+    assert not options.dedup
+    assert not options.keep_bank
+    assert options.matrix == "csv"
+    assert not options.update
+    assert options.engine == "cluster"
+    assert options.max_mem is None
+    assert not options.distances
+    assert options.curves == 0
     assert options.threads == 1
     assert not options.outfile
     assert options.verbose == 0
@@ -189,3 +208,123 @@ def test_parser_1thread():
     assert not options.outfile
     assert options.verbose == 0
     assert not options.quiet
+
+
+def test_parser_matrix(capsys):
+    """
+    Test that the format of the matrices can be chosen, only among the possible ones
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--matrix sparse".split())
+    assert options.matrix == "sparse"
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --matrix hdf5".split())
+    _, err = capsys.readouterr()
+    assert "argument --matrix: invalid choice: 'hdf5'" in err
+
+
+def test_parser_update(capsys):
+    """
+    Test that the previous pangenome and its mmseqs directory are given to update it, and
+    that it cannot be used with --dedup
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--update old.lst tmp_old".split())
+    assert options.update == ["old.lst", "tmp_old"]
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                "--update old.lst tmp_old --dedup".split())
+    _, err = capsys.readouterr()
+    assert "--dedup cannot be used with --update." in err
+
+
+def test_parser_sweep(capsys):
+    """
+    Test that all combinations of identities and cluster modes are swept, that -i or -c is
+    used when only modes or only identities are given, and that it cannot be used with -f
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od".split())
+    assert options.sweep is None
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--sweep-id 0.8 0.9 0.8 --sweep-mode 0 1".split())
+    assert options.sweep == [(0.8, 0), (0.8, 1), (0.9, 0), (0.9, 1)]
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -c 2 "
+                                      "--sweep-id 0.5 0.7".split())
+    assert options.sweep == [(0.5, 2), (0.7, 2)]
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -i 0.6 "
+                                      "--sweep-mode 2 0".split())
+    assert options.sweep == [(0.6, 2), (0.6, 0)]
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od -f pan.lst "
+                                "--sweep-id 0.5 0.7".split())
+    _, err = capsys.readouterr()
+    assert "-f cannot be used with --sweep-id or --sweep-mode" in err
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --sweep-mode 3".split())
+    _, err = capsys.readouterr()
+    assert "argument --sweep-mode: invalid choice: 3" in err
+
+
+def test_parser_engine(capsys):
+    """
+    Test that the linclust engine can be chosen, but not to update a pangenome
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--engine linclust".split())
+    assert options.engine == "linclust"
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --engine linclust "
+                                "--update old.lst tmp_old".split())
+    _, err = capsys.readouterr()
+    assert "--engine cannot be used with --update" in err
+
+
+def test_parser_max_mem(capsys):
+    """
+    Test that the memory budget of mmseqs is converted to bytes, and that an invalid value
+    is refused
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--max-mem 16G".split())
+    assert options.max_mem == 16000000000
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --max-mem 0".split())
+    _, err = capsys.readouterr()
+    assert "argument --max-mem must be a positive amount of memory" in err
+
+
+def test_parser_distances():
+    """
+    Test that distances between genomes can be asked
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--distances".split())
+    assert options.distances
+
+
+def test_parser_curves(capsys):
+    """
+    Test that accumulation curves can be asked, and that a negative number of orders of
+    genomes returns an error
+    """
+    parser = argparse.ArgumentParser(description="Do pangenome", add_help=False)
+    pangenome.build_parser(parser)
+    options = pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od "
+                                      "--curves 100".split())
+    assert options.curves == 100
+    with pytest.raises(SystemExit):
+        pangenome.parse(parser, "-l lstinfo -n TEST4 -d dbpath -o od --curves -3".split())
+    _, err = capsys.readouterr()
+    assert "--curves must be a positive number of random orders of genomes." in err
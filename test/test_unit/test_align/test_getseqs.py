@@ -260,6 +260,21 @@ def test_get_genome_seqs_outgiven_1col():
     assert tutil.compare_file_content(outfile, exp_file)
 
 
+def test_get_genome_seqs_compressed():
+    """
+    Test that sequences are extracted the same way from a gzip compressed fasta file
+    """
+    import gzip
+    fasta = os.path.join(GENEPATH, "fasta.prt.gz")
+    with open(FASTA, "rb") as inf, gzip.open(fasta, "wb") as outf:
+        shutil.copyfileobj(inf, outf)
+    tabfile = os.path.join(TESTPATH, "getentry_all_1column.txt")
+    outfile = os.path.join(GENEPATH, "fileout.txt")
+    gseq.get_genome_seqs(fasta, tabfile, [], outfile)
+    exp_file = os.path.join(EXPPATH, "exp_extracted.prt")
+    assert tutil.compare_file_content(outfile, exp_file)
+
+
 def test_get_genome_seqs_1notasked():
     """
     Test that given a fasta file, and a tab file containing all sequences to extract, with the
@@ -63,6 +63,25 @@ def test_get_genome_included():
     genomes = [ "TOTO.0215.00002", "TOTO.0315.00001", "ESCO.0215.00002", "aTOTO.0215.00002"]
     assert pal.get_genome(header, genomes) == "aTOTO.0215.00002"
 
+
+def test_get_genome_index():
+    """
+    Check that the genome is the same with an index of genome names: the first genome of
+    the list whose name starts the header, and that a genome name longer than the header
+    does not match
+    """
+    genomes = ["86KG", "6KG", "GEN", "GEN1", "GEN12_3", "8"]
+    index = pal.genome_index(genomes)
+    assert index == ({"86KG": 0, "6KG": 1, "GEN": 2, "GEN1": 3, "GEN12_3": 4, "8": 5},
+                     [1, 3, 4, 7])
+    assert pal.get_genome(">86KG_12345 info", genomes, index) == "86KG"
+    assert pal.get_genome(">6KG_12345", genomes, index) == "6KG"
+    assert pal.get_genome(">8KG_12345", genomes, index) == "8"
+    assert pal.get_genome(">GEN1_2", genomes, index) == "GEN"
+    assert pal.get_genome(">GEN1_2", genomes[3:], pal.genome_index(genomes[3:])) == "GEN1"
+    assert pal.get_genome(">GEN12_3", genomes[3:]) == "GEN1"
+    assert pal.get_genome(">GEN12", genomes[4:]) is None
+
 # def test_get_genome_not_start():
 #     """
 #     Given a header and a list of genomes, check that it returns the expected genome. The genome
@@ -113,6 +113,34 @@ def test_prodigal_train_exists(caplog):
             "H299_H561.fasta.trn). It will be used to annotate all genomes.") in caplog.text
 
 
+def test_pyrodigal_train(caplog):
+    """
+    Check pyrodigal training on a genome: training file written in prodigal format
+    """
+    pyrodigal = pytest.importorskip("pyrodigal")
+    caplog.set_level(logging.DEBUG)
+    train_gpath = os.path.join(GEN_PATH, "A_H738.fasta")
+    gtrain = afunc.pyrodigal_train(train_gpath, GENEPATH)
+    assert "pyrodigal will train using test/data/annotate/genomes/A_H738.fasta" in caplog.text
+    assert gtrain == ("test/data/annotate/generated_by_unit-tests/A_H738.fasta.trn")
+    with open(gtrain, "rb") as trnf:
+        training_info = pyrodigal.TrainingInfo.load(trnf)
+    assert training_info.translation_table == 11
+
+
+def test_pyrodigal_train_error(caplog):
+    """
+    Check pyrodigal training on a genome too small
+    """
+    pytest.importorskip("pyrodigal")
+    caplog.set_level(logging.DEBUG)
+    train_gpath = os.path.join(GEN_PATH, "H299_H561.fasta")
+    gtrain = afunc.pyrodigal_train(train_gpath, GENEPATH)
+    assert "Error while trying to train pyrodigal on H299_H561.fasta" in caplog.text
+    assert gtrain == ""
+    assert not os.path.isfile(os.path.join(GENEPATH, "H299_H561.fasta.trn"))
+
+
 def test_check_prodigal_nofaa():
     """
     Check that check_prodigal returns false when a faa file is missing, and an error message
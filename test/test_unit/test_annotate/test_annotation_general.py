@@ -758,3 +758,135 @@ def test_run_all_parallel_prokka_more_threads():
     message_err1 = "test_runall_1by1_2 genome1.fasta: several .faa files"
     assert message_err1 in messages
 
+
+
+def test_estimate_mem():
+    """
+    Test that the memory estimated for a genome is proportional to its size, with the
+    safety margin
+    """
+    assert afunc.estimate_mem(1000000, 100) == int(100000000 * afunc.MEM_MARGIN)
+    assert afunc.estimate_mem(0, 100) == 0
+
+
+@pytest.mark.parametrize("threads, peak", [(1, 600000000), (2, 300000000)])
+def test_run_mem_limited(monkeypatch, caplog, threads, peak):
+    """
+    Test that genomes are annotated in parallel only when their estimated memory fits in
+    the memory limit, and that the memory observed for the genomes already annotated is used
+    for the next ones.
+    4 genomes of 1Mb, prokka estimation is 300MB per genome before any observation: 2
+    genomes fit in 700MB. Then, observed peak memory is 600MB per genome (peak of the largest
+    process, counted once per thread of prokka) -> 720MB estimated with margin: next genomes
+    must be annotated alone.
+    """
+    import threading
+    import time
+    from multiprocessing.pool import ThreadPool
+    caplog.set_level(logging.DEBUG)
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def fake_annot(arguments):
+        with lock:
+            running.append(arguments[3])
+            max_running.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(arguments[3])
+        return arguments[3] != "genome3"
+
+    monkeypatch.setattr(utils, "children_peak_mem", lambda: peak)
+    arguments = [("gpath", "annot", threads, f"genome{num}", False, 1, "", None)
+                 for num in range(4)]
+    gsizes = [1000000] * 4
+    pool = ThreadPool(4)
+    final = afunc.run_mem_limited(pool, fake_annot, arguments, gsizes, 4, 700000000,
+                                  False)
+    pool.close()
+    pool.join()
+    assert final == [True, True, True, False]
+    assert max(max_running) == 2
+    # The 2 last genomes were annotated alone
+    assert max_running[2:] == [1, 1]
+    assert ("Annotating genome2 may need about 0.72 GB, more than the given memory limit. "
+            "It is annotated alone.") in caplog.text
+
+
+def fake_prokka(arguments):
+    """
+    Write files like prokka in the given annotation folder, with a log file.
+    Return False for genomes whose name contains 'error'
+    """
+    gpath, annot_folder, _, name, _, _, _, _ = arguments
+    g_ori_name = os.path.basename(gpath)
+    with open(os.path.join(annot_folder, g_ori_name + "-prokka.log"), "w") as logf:
+        logf.write(f"annotating {name} in {annot_folder}\n")
+    if "error" in name:
+        return False
+    prok_dir = os.path.join(annot_folder, g_ori_name + "-prokkaRes")
+    os.makedirs(prok_dir)
+    for ext in [".fna", ".tbl", ".gff", ".ffn", ".faa", ".err", ".sqn", ".txt"]:
+        with open(os.path.join(prok_dir, name + ext), "w") as outf:
+            outf.write(ext + "\n")
+    return True
+
+
+def test_run_in_scratch_ok():
+    """
+    Test that when annotation runs in the scratch directory, only the files needed by the
+    format step and the log are moved to the annotation folder, and the scratch folder
+    of the genome is removed
+    """
+    scratch = os.path.join(GENEPATH, "scratch")
+    annot_folder = os.path.join(GENEPATH, "annot")
+    os.makedirs(scratch)
+    os.makedirs(annot_folder)
+    gpath = os.path.join(GEN_PATH, "H299_H561.fasta")
+    arguments = (gpath, annot_folder, 2, "test_scratch", False, 3, "", None)
+    assert afunc.run_in_scratch(fake_prokka, False, scratch, arguments)
+    res_dir = os.path.join(annot_folder, "H299_H561.fasta-prokkaRes")
+    assert sorted(os.listdir(res_dir)) == ["test_scratch" + ext for ext in
+                                           [".faa", ".ffn", ".fna", ".gff", ".tbl"]]
+    assert sorted(os.listdir(annot_folder)) == ["H299_H561.fasta-prokka.log",
+                                                "H299_H561.fasta-prokkaRes"]
+    with open(os.path.join(annot_folder, "H299_H561.fasta-prokka.log")) as logf:
+        assert logf.read().startswith(f"annotating test_scratch in {scratch}")
+    assert os.listdir(scratch) == []
+
+
+def test_run_in_scratch_error():
+    """
+    Test that when annotation fails in the scratch directory, no result folder is created
+    in the annotation folder, but the log is moved there, and the scratch folder of the
+    genome is removed
+    """
+    scratch = os.path.join(GENEPATH, "scratch")
+    annot_folder = os.path.join(GENEPATH, "annot")
+    os.makedirs(scratch)
+    os.makedirs(annot_folder)
+    gpath = os.path.join(GEN_PATH, "H299_H561.fasta")
+    arguments = (gpath, annot_folder, 2, "test_scratch_error", False, 3, "", None)
+    assert not afunc.run_in_scratch(fake_prokka, False, scratch, arguments)
+    assert os.listdir(annot_folder) == ["H299_H561.fasta-prokka.log"]
+    assert os.listdir(scratch) == []
+
+
+def test_run_in_scratch_exists():
+    """
+    Test that when the result folder already exists in the annotation folder, the
+    annotation function is called on the annotation folder (to check existing results),
+    and nothing is done in the scratch directory
+    """
+    scratch = os.path.join(GENEPATH, "scratch")
+    annot_folder = os.path.join(GENEPATH, "annot")
+    os.makedirs(scratch)
+    os.makedirs(os.path.join(annot_folder, "H299_H561.fasta-prokkaRes"))
+    gpath = os.path.join(GEN_PATH, "H299_H561.fasta")
+    arguments = (gpath, annot_folder, 2, "test_scratch", False, 3, "", None)
+    called = []
+    assert afunc.run_in_scratch(lambda args: called.append(args) or True, False, scratch,
+                                arguments)
+    assert called == [arguments]
+    assert os.listdir(scratch) == []
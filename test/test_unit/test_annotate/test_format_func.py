@@ -6,6 +6,7 @@ Unit tests for general_format_functions.py
 """
 
 import os
+import gzip
 import logging
 import shutil
 from io import StringIO
@@ -152,7 +153,7 @@ def test_handle_genome_badprok():
     os.makedirs(rep_dir)
     # Get args for function
     args = ("toto.fasta", "name", gpath, GENEPATH, "lst/dir", "prot/dir",
-            "gene/dir", rep_dir, "gff/dir", False, my_logger()[0])
+            "gene/dir", rep_dir, "gff/dir", False, None, None, my_logger()[0])
     ok_format, genome = ffunc.handle_genome(args)
     assert ok_format == False
     assert genome == "toto.fasta"
@@ -178,7 +179,7 @@ def test_handle_genome_badprodigal():
     os.makedirs(rep_dir)
     # Get args for function
     args = ("wrong.fasta", "name", gpath, GENEPATH, "lst/dir", "prot/dir",
-            "gene/dir", rep_dir, "gff/dir", True, my_logger()[0])
+            "gene/dir", rep_dir, "gff/dir", True, None, None, my_logger()[0])
     ok_format, genome = ffunc.handle_genome(args)
     assert ok_format == False
     assert genome == "wrong.fasta"
@@ -207,7 +208,7 @@ def test_handle_genome_formatok(caplog):
     os.makedirs(gff_dir)
     # Get args for function
     args = ("original_name", name, gpath, prok_path, lst_dir, prot_dir,
-            gene_dir, rep_dir, gff_dir, False, my_logger()[0])
+            gene_dir, rep_dir, gff_dir, False, None, None, my_logger()[0])
     ok_format, genome = ffunc.handle_genome(args)
     assert ok_format == True
     assert genome == "original_name"
@@ -257,7 +258,7 @@ def test_handle_genome_formatok_prodigal(caplog):
     os.makedirs(gff_dir)
     # Get args for function
     args = (name_orig, name, gpath, prodi_path, lst_dir, prot_dir,
-            gene_dir, rep_dir, gff_dir, True, my_logger()[0])
+            gene_dir, rep_dir, gff_dir, True, None, None, my_logger()[0])
     ok_format, genome = ffunc.handle_genome(args)
     assert ok_format == True
     assert genome == name_orig
@@ -283,6 +284,43 @@ def test_handle_genome_formatok_prodigal(caplog):
     assert tutil.compare_order_content(exp_gff, res_gff_file)
 
 
+def test_handle_genome_formatok_compress(caplog):
+    """
+    Test that when formatting a genome annotated by prodigal, with compression, Proteins,
+    Genes, Replicons and gff3 files are replaced by their gzip version, with the expected
+    content. LSTINFO file is not compressed.
+    """
+    caplog.set_level(logging.DEBUG)
+    name = "test.0417.00002"
+    gpath =  os.path.join(ANNOTEDIR, "test_files", "original_name.fna")
+    prodi_path = os.path.join(ANNOTEDIR, "test_files")
+    # Create result directories
+    prot_dir = os.path.join(GENEPATH, "Proteins")
+    lst_dir = os.path.join(GENEPATH, "LSTINFO")
+    rep_dir = os.path.join(GENEPATH, "Replicons")
+    gene_dir = os.path.join(GENEPATH, "Genes")
+    gff_dir = os.path.join(GENEPATH, "gff")
+    for folder in [prot_dir, lst_dir, rep_dir, gene_dir, gff_dir]:
+        os.makedirs(folder)
+    args = ("prodigal.outtest.ok", name, gpath, prodi_path, lst_dir, prot_dir,
+            gene_dir, rep_dir, gff_dir, True, None, "gzip", my_logger()[0])
+    ok_format, genome = ffunc.handle_genome(args)
+    assert ok_format == True
+    assert genome == "prodigal.outtest.ok"
+    expected = {os.path.join(rep_dir, name + ".fna"): "res_created_rep-prokka.fna",
+                os.path.join(prot_dir, name + ".prt"): "res_create_prt_prodigal.faa",
+                os.path.join(gene_dir, name + ".gen"): "res_create_gene_lst_prodigal.gen",
+                os.path.join(gff_dir, name + ".gff"): "res_create_gff_prodigal.gff"}
+    for res_file, exp_file in expected.items():
+        assert not os.path.isfile(res_file)
+        with gzip.open(res_file + ".gz", "rb") as resf, open(res_file, "wb") as outf:
+            shutil.copyfileobj(resf, outf)
+        assert tutil.compare_order_content(os.path.join(EXP_ANNOTE, exp_file), res_file)
+    exp_lst = os.path.join(EXP_ANNOTE, "res_create_gene_lst_prodigal.lst")
+    res_lst_file = os.path.join(lst_dir, "test.0417.00002.lst")
+    assert tutil.compare_order_content(exp_lst, res_lst_file)
+
+
 def test_format_all_prokka(caplog):
     """
     Test that when giving a list of genomes, for which prokka ran without problem,
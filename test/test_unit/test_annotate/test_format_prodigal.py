@@ -13,6 +13,7 @@ import pytest
 
 import test.test_unit.utilities_for_tests as tutil
 import PanACoTA.utils as utils
+from PanACoTA import utils_fasta
 from PanACoTA.annotate_module import format_prodigal as prodigalfunc
 
 ANNOTEDIR = os.path.join("test", "data", "annotate")
@@ -373,6 +374,84 @@ def test_format_1genome(caplog):
     assert os.path.isfile(os.path.join(gff_dir, "prodigal.outtest.ok.gff"))
 
 
+def test_call_genes_small():
+    """
+    Test that genes called by pyrodigal with the 'meta' procedure, on contigs already read,
+    are the ones found by prodigal with '-p meta'
+    """
+    pytest.importorskip("pyrodigal")
+    gpath = os.path.join(GENOMES_DIR, "H299_H561.fasta")
+    records = list(utils_fasta.read_records(gpath))
+    genes = prodigalfunc.call_genes(records, "small option")
+    assert [contig for contig, _ in genes] == ["H561_S27", "H561_S28", "H561_S29"]
+    found = [(f"{contig}_{num}", str(gene.begin), str(gene.end), str(gene.strand))
+             for contig, contig_genes in genes
+             for num, gene in enumerate(contig_genes, start=1)]
+    exp_ffn = os.path.join(EXP_ANNOTE, "H299_H561.fasta_small-prodigalRes",
+                           "test_runprodigal_small_H299.ffn")
+    with open(exp_ffn) as expf:
+        exp = [tuple(field.strip() for field in line[1:].split("#")[:4])
+               for line in expf if line.startswith(">")]
+    assert found == exp
+
+
+@pytest.mark.parametrize("gpath_train, prodigal_res, exts",
+                         [("A_H738-and-B2_A3_5.fna.trn", "H299_H561.fasta-prodigalRes",
+                           [".lst", ".prt", ".gen", ".fna", ".gff"]),
+                          ("small option", "H299_H561.fasta_small-prodigalRes",
+                           [".lst", ".prt", ".gen", ".fna"])])
+def test_format_1genome_inprocess(gpath_train, prodigal_res, exts, caplog):
+    """
+    Test that genes called with pyrodigal and formatted without writing prodigal files give
+    the same files as the formatting of prodigal results, with a training file or with
+    the 'meta' procedure. With 'meta', gene scores in gff files are not the same as the
+    ones of prodigal.
+    """
+    pytest.importorskip("pyrodigal")
+    caplog.set_level(logging.DEBUG)
+    name = "ESCO.1015.00001"
+    gpath = os.path.join(GENOMES_DIR, "H299_H561.fasta")
+    if gpath_train != "small option":
+        gpath_train = os.path.join(TEST_ANNOTE, gpath_train)
+    # Prodigal results of H299_H561.fasta, obtained with the same training file (or with
+    # '-p meta'), are in EXP_ANNOTE
+    shutil.copytree(os.path.join(EXP_ANNOTE, prodigal_res),
+                    os.path.join(GENEPATH, "H299_H561.fasta-prodigalRes"))
+    dirs = {}
+    for mode in ["prodigal", "pyrodigal"]:
+        dirs[mode] = [os.path.join(GENEPATH, mode, folder)
+                      for folder in ["LSTINFO", "Proteins", "Genes", "Replicons", "gff"]]
+        for folder in dirs[mode]:
+            os.makedirs(folder)
+    assert prodigalfunc.format_one_genome(gpath, name, GENEPATH, *dirs["prodigal"])
+    assert prodigalfunc.format_one_genome_inprocess(gpath, name, gpath_train,
+                                                    *dirs["pyrodigal"])
+    assert "Start annotating ESCO.1015.00001" in caplog.text
+    assert not os.path.isdir(gpath + "-prodigalRes")
+    for folder_prod, folder_pyro in zip(dirs["prodigal"], dirs["pyrodigal"]):
+        for ext in exts:
+            out_prod = os.path.join(folder_prod, name + ext)
+            if os.path.isfile(out_prod):
+                with open(out_prod) as prodf, open(os.path.join(folder_pyro, name + ext)) as pyrof:
+                    assert prodf.read() == pyrof.read()
+
+
+def test_format_1genome_inprocess_wrongtrain(caplog):
+    """
+    Test that when the training file cannot be read, genome is not formatted, and no
+    file is generated.
+    """
+    pytest.importorskip("pyrodigal")
+    caplog.set_level(logging.DEBUG)
+    gpath = os.path.join(GENOMES_DIR, "H299_H561.fasta")
+    gpath_train = os.path.join(GENEPATH, "nofile.trn")
+    assert not prodigalfunc.format_one_genome_inprocess(gpath, "ESCO.1015.00001", gpath_train,
+                                                        GENEPATH, GENEPATH, GENEPATH,
+                                                        GENEPATH, GENEPATH)
+    assert ("Error while trying to call genes of ESCO.1015.00001 with pyrodigal") in caplog.text
+    assert os.listdir(GENEPATH) == []
+
+
 def test_format_1genome_emptygpath(caplog):
     """
     Test on formatting prodigal results, when ffn file is empty -> error message,
@@ -10,6 +10,7 @@ import pytest
 import shutil
 
 import PanACoTA.corepers_module.persistent_functions as persf
+import PanACoTA.utils_pangenome as upan
 import test.test_unit.utilities_for_tests as tutils
 
 
@@ -239,6 +240,18 @@ def test_isinsubset():
     assert persf.is_in_subset(protein2, genomes2)
 
 
+def test_isinsubset_same_genome_as_pangenome():
+    """
+    Check that the genome of a protein is the same as in the pangenome, also for names with
+    several "_"
+    """
+    for protein in ["my_genome_00012", "ESCO_1.1512.00001.i0002_12124",
+                    "GEN.1017.00001_00002"]:
+        genome = upan.get_strain(protein)
+        assert persf.is_in_subset(protein, {genome})
+    assert not persf.is_in_subset("my_genome_00012", {"my"})
+
+
 def test_not_isinsubset():
     """
     Check if a given protein is not in the given list of genomes
@@ -415,3 +428,103 @@ def test_get_99pers_multi(caplog):
     assert exp_fams == fams
     assert ("The persistent genome contains 4 families with members present in "
             "at least 4 different genomes (99.0% of the total number of genomes).") in caplog.text
+
+
+@pytest.mark.parametrize("tol, multi, mixed, floor", [(1, False, False, False),
+                                                      (1, True, False, False),
+                                                      (0.99, False, False, True),
+                                                      (0.99, False, True, True),
+                                                      (0.99, True, False, True),
+                                                      (0.5, False, False, False),
+                                                      (0.5, False, True, False),
+                                                      (0.5, True, False, False)])
+def test_get_pers_pangenome(tol, multi, mixed, floor, caplog):
+    """
+    Test that persistent families found from a Pangenome object are the same as the ones
+    found from dicts, with the same logs
+    """
+    caplog.set_level(logging.DEBUG)
+    exp_fams = persf.get_pers(FAMS_BY_STRAIN, FAMILIES, 4, tol, multi, mixed, floor)
+    exp_logs = [rec.getMessage() for rec in caplog.records]
+    caplog.clear()
+    pan = upan.Pangenome.from_families(FAMILIES)
+    fams = persf.get_pers_pangenome(pan, 4, tol, multi, mixed, floor)
+    assert fams == exp_fams
+    assert [rec.getMessage() for rec in caplog.records] == exp_logs
+
+
+def test_get_subset_pangenome(caplog):
+    """
+    Test that the subset of a Pangenome object has the same families as the subset of dicts
+    """
+    caplog.set_level(logging.DEBUG)
+    lstinfo = os.path.join(GENEPATH, "lstinfo-ok.lst")
+    with open(lstinfo, "w") as lst:
+        lst.write("GEN4.1111.00001 toto we don't use other fields\n")
+        lst.write("GENO.1216.00003\n")
+    exp_fbs, exp_fams, _ = persf.get_subset_genomes(FAMS_BY_STRAIN, FAMILIES, lstinfo)
+    pan, genomes = persf.get_subset_pangenome(upan.Pangenome.from_families(FAMILIES), lstinfo)
+    assert pan.families() == exp_fams
+    assert pan.fams_by_strain() == exp_fbs
+    assert pan.genomes == genomes == ["GEN4.1111.00001", "GENO.1216.00003"]
+    assert ("Getting subset of pangenome for genomes in "
+            "test/data/persgenome/generated_by_unit-tests/lstinfo-ok.lst") in caplog.text
+
+
+def test_get_pers_subsets(caplog):
+    """
+    Test that persistent genomes of several subsets of genomes, computed at once, are the
+    same as the ones of each subset pangenome, and are written with the same content
+    """
+    caplog.set_level(logging.DEBUG)
+    pan = upan.Pangenome.from_families(FAMILIES)
+    subsets = [pan.genomes, pan.genomes[:2], pan.genomes[1:], [pan.genomes[3], "GENX.0101.00001"]]
+    list_files = []
+    for num, genomes in enumerate(subsets):
+        list_files.append(os.path.join(GENEPATH, f"subset{num}.lst"))
+        with open(list_files[-1], "w") as lst:
+            lst.write("".join(genome + "\n" for genome in genomes))
+    assert persf.list_subset_files([GENEPATH]) == list_files
+    assert persf.list_subset_files(list_files[2:] + [GENEPATH]) == list_files[2:] + list_files[:2]
+    masks, nb_strains = persf.subset_masks(pan, list_files)
+    assert nb_strains == [4, 2, 3, 2]
+    assert masks.sum(axis=1).tolist() == [4, 2, 3, 1]
+    settings = [(1, False, False), (0.5, False, False), (0.5, True, False), (0.5, False, True),
+                (0, True, False)]
+    res = list(persf.get_pers_subsets(pan, masks, nb_strains, settings, floor=True))
+    assert [(sub, setting) for sub, setting, _ in res] == [(sub, setting) for sub in range(4)
+                                                           for setting in settings]
+    sorted_fams = {}
+    for sub, (tol, multi, mixed), fams in res:
+        sub_pan = pan.subset(subsets[sub])
+        exp_fams = persf.get_pers_pangenome(sub_pan, nb_strains[sub], tol, multi, mixed, True)
+        assert {pan.fam_nums[num] for num in fams} == set(exp_fams)
+        outfile = os.path.join(GENEPATH, "pers_subset.lst")
+        expfile = os.path.join(GENEPATH, "pers_exp.lst")
+        persf.write_persistent_subset(pan, fams, masks[sub], outfile, sorted_fams)
+        persf.write_persistent(exp_fams, expfile)
+        with open(outfile) as outf, open(expfile) as expf:
+            assert outf.read() == expf.read()
+
+
+def test_list_subset_files_error(caplog):
+    """
+    Test that a path which does not exist, or directories without any file, give an error
+    """
+    with pytest.raises(SystemExit):
+        persf.list_subset_files([os.path.join(GENEPATH, "nofile.lst")])
+    assert "test/data/persgenome/generated_by_unit-tests/nofile.lst file not found." in caplog.text
+    empty = os.path.join(GENEPATH, "empty")
+    os.mkdir(empty)
+    with pytest.raises(SystemExit):
+        persf.list_subset_files([empty])
+    assert "No list of genomes found in " + empty in caplog.text
+    # Different files with the same name
+    other = os.path.join(GENEPATH, "other")
+    os.mkdir(other)
+    for folder in [empty, other]:
+        open(os.path.join(folder, "genomes.lst"), "w").close()
+    with pytest.raises(SystemExit):
+        persf.list_subset_files([empty, other])
+    assert ("empty/genomes.lst and test/data/persgenome/generated_by_unit-tests/other/"
+            "genomes.lst have the same name") in caplog.text
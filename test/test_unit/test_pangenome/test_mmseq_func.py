@@ -154,6 +154,31 @@ def test_create_mmseqdb(caplog):
     assert os.path.isfile(logfile)
 
 
+def test_create_mmseqdb_prt_files(caplog):
+    """
+    Test that mmseq DB is created from the protein files of each genome, given to mmseqs
+    on its standard input, without creating the protein bank.
+    """
+    caplog.set_level(logging.DEBUG)
+    filename = os.path.join(GENEPATH, "test_create_mmseqsdb.msdb")
+    prt_path = os.path.join(GENEPATH, "EXEM.All.prt")
+    dbpath = os.path.join(PATH_TEST_FILES, "example_db", "Proteins")
+    prt_files = sorted(glob.glob(os.path.join(dbpath, "*.prt")))
+    logfile = os.path.join(GENEPATH, "test_create_mmseqsdb.log")
+    assert mmseqs.create_mmseqs_db(filename, prt_path, logfile, prt_files)
+
+    outext = ["", ".index", ".lookup", "_h", "_h.index", ".dbtype", "_h.dbtype"]
+    for file in [filename + ext for ext in outext]:
+        assert os.path.isfile(file)
+    assert not os.path.isfile(prt_path)
+    assert ("MMseqs command: mmseqs createdb stdin "
+            "test/data/pangenome/generated_by_unit-tests/test_create_mmseqsdb.msdb") in caplog.text
+    # All proteins are in the database
+    with open(filename + ".lookup") as lookf:
+        nb_prots = len(lookf.readlines())
+    assert nb_prots == sum(utils.grep(prt, "^>", counts=True) for prt in prt_files)
+
+
 def test_create_mmseqdb_existok(caplog):
     """
     Check that, when trying to create mmseqdb while all output files already exist,
@@ -327,6 +352,29 @@ def test_cluster2file():
             assert fam in exp_fams
 
 
+def test_cluster2file_members():
+    """
+    Check that proteins removed because identical to a clustered protein are added to the
+    family of this protein, sorted with the other members
+    """
+    fileout = os.path.join(GENEPATH, "test_clusters2file.txt")
+    clusters = {"ESCO.0216.00001.i001_00006":
+                ["ESCO.0216.00001.i001_00006", "ESCO.0216.00002.b010_00115"],
+                "ESCO.0216.00002.b010_01265":
+                ["ESCO.0216.00002.b010_01265"]}
+    members = {"ESCO.0216.00002.b010_00115": ["ESCA.0216.00001.i001_00015",
+                                              "ESCO.0216.00003.i001_00020"],
+               "ESCO.0216.00004.i001_00001": ["ESCO.0216.00005.i001_00001"]}
+    fams = mmseqs.clusters_to_file(clusters, fileout, members)
+    assert fams == {1: ["ESCA.0216.00001.i001_00015", "ESCO.0216.00001.i001_00006",
+                        "ESCO.0216.00002.b010_00115", "ESCO.0216.00003.i001_00020"],
+                    2: ["ESCO.0216.00002.b010_01265"]}
+    with open(fileout, "r") as fo:
+        assert fo.read() == ("1 ESCA.0216.00001.i001_00015 ESCO.0216.00001.i001_00006 "
+                             "ESCO.0216.00002.b010_00115 ESCO.0216.00003.i001_00020\n"
+                             "2 ESCO.0216.00002.b010_01265\n")
+
+
 def test_tsv2cluster():
     """
     Check that conversion from mmseq tsv file to clusters is as expected.
@@ -379,6 +427,44 @@ def test_tsv2pangenome():
         assert "End: " in end_line
 
 
+def test_stream_tsv2file():
+    """
+    Check that the pangenome file and families obtained by streaming mmseqs tsv file are the
+    same as when loading all clusters first, as a dict or a CompactFamilies
+    """
+    filein = os.path.join(PATH_TEST_FILES, "mmseq_clust-out.tsv")
+    exp_out = os.path.join(GENEPATH, "test_clusters2file.txt")
+    exp_fams = mmseqs.clusters_to_file(mmseqs.mmseq_tsv_to_clusters(filein), exp_out)
+    fileout = os.path.join(GENEPATH, "test_stream2file.txt")
+    assert mmseqs.stream_tsv_to_file(filein, fileout) == exp_fams
+    assert tutil.compare_order_content(exp_out, fileout)
+    fams = mmseqs.stream_tsv_to_file(filein, fileout, compact=True)
+    assert fams.to_dict() == exp_fams
+    assert tutil.compare_order_content(exp_out, fileout)
+
+
+def test_tsv2pangenome_notgrouped(caplog):
+    """
+    Check that when members of a cluster are not all together in mmseqs tsv file, all clusters
+    are loaded before writing the pangenome, which is then the same as with grouped clusters
+    """
+    caplog.set_level(logging.DEBUG)
+    filein = os.path.join(PATH_TEST_FILES, "mmseq_clust-out.tsv")
+    mmseqclust = os.path.join(GENEPATH, "mmseq_clust-shuffled")
+    with open(filein) as inf:
+        lines = inf.readlines()
+    with open(mmseqclust + ".tsv", "w") as outf:
+        # Move last line (member of the last cluster) after the first cluster
+        outf.write(lines[0] + lines[-1] + "".join(lines[1:-1]))
+    exp_out = os.path.join(GENEPATH, "test_clusters2file.txt")
+    exp_fams = mmseqs.clusters_to_file(mmseqs.mmseq_tsv_to_clusters(filein), exp_out)
+    logmmseq = os.path.join(GENEPATH, "test_tsv2pan.log")
+    outfile = os.path.join(GENEPATH, "test_tsv2pan_outpangenome.txt")
+    fams = mmseqs.mmseqs_tsv_to_pangenome(mmseqclust, logmmseq, outfile, compact=True)
+    assert "is not grouped by cluster: loading all clusters" in caplog.text
+    assert sorted(map(sorted, fams.to_dict().values())) == sorted(map(sorted, exp_fams.values()))
+
+
 def test_mmseq2pan_givenout():
     """
     From mmseq clust output, convert to pangenome (with steps inside, already tested by the other
@@ -967,3 +1053,199 @@ def test_run_all_pangenome_panexists_wrong(caplog):
     assert caplog.records[1].levelname == "WARNING"
     assert caplog.records[2].levelname == "INFO"
     assert caplog.records[3].levelname == "ERROR"
+
+
+def test_update_families(caplog):
+    """
+    Test that previous families keep their number, that new proteins are added to the
+    family of the proteins they are clustered with, and that new clusters get new numbers
+    """
+    caplog.set_level(logging.DEBUG)
+    old_families = {"1": ["GEN2.1017.00001.i0002_00004", "GEN4.1111.00001.i0001_00002"],
+                    "2": ["GEN2.1017.00001.b0003_00010"],
+                    "3": ["GEN4.1111.00001.b0001_00001"]}
+    tsvfile = os.path.join(GENEPATH, "update.tsv")
+    with open(tsvfile, "w") as tsvf:
+        # family 1 gets a new member
+        tsvf.write("GEN2.1017.00001.i0002_00004\tGEN2.1017.00001.i0002_00004\n"
+                   "GEN2.1017.00001.i0002_00004\tGEN4.1111.00001.i0001_00002\n"
+                   "GEN2.1017.00001.i0002_00004\tGENO.1017.00001.b0002_00003\n"
+                   # family 2 unchanged
+                   "GEN2.1017.00001.b0003_00010\tGEN2.1017.00001.b0003_00010\n"
+                   # new cluster, with 2 new proteins
+                   "GENO.1017.00001.b0001_00001\tGENO.1017.00001.b0001_00001\n"
+                   "GENO.1017.00001.b0001_00001\tGENO.1216.00002.b0001_00001\n"
+                   # new protein clustered with proteins of families 3 and 2
+                   "GEN4.1111.00001.b0001_00001\tGEN4.1111.00001.b0001_00001\n"
+                   "GEN4.1111.00001.b0001_00001\tGEN2.1017.00001.b0003_00010\n"
+                   "GEN4.1111.00001.b0001_00001\tGENO.1017.00001.b0001_00002\n")
+    fileout = os.path.join(GENEPATH, "update.lst")
+    fams = mmseqs.update_families(tsvfile, old_families, fileout)
+    exp_fams = {1: ["GEN2.1017.00001.i0002_00004", "GEN4.1111.00001.i0001_00002",
+                    "GENO.1017.00001.b0002_00003"],
+                2: ["GEN2.1017.00001.b0003_00010", "GENO.1017.00001.b0001_00002"],
+                3: ["GEN4.1111.00001.b0001_00001"],
+                4: ["GENO.1017.00001.b0001_00001", "GENO.1216.00002.b0001_00001"]}
+    assert fams == exp_fams
+    with open(fileout) as fout:
+        assert fout.read() == "".join(f"{num} {' '.join(fam)}\n"
+                                      for num, fam in exp_fams.items())
+    assert ("New proteins are clustered with proteins of families 2, 3. They are added to "
+            "family 2.") in caplog.text
+    assert ("Updated pangenome has 4 families: 1 new families, and 2 previous families "
+            "with new members.") in caplog.text
+
+
+def test_find_mmseqs_files(caplog):
+    """
+    Test that the database and clustering of a previous run are found, ignoring the
+    intermediate clusterings of the linclust engine, and that there is an error if there is
+    no clustering named as the directory
+    """
+    tmpdir = os.path.join(GENEPATH, "tmp_bank_0.8-mode1-linclust")
+    os.makedirs(tmpdir)
+    for name in ["bank-msDB.dbtype", "bank-msDB_h.dbtype", "bank-msDB.index",
+                 "bank-clust-0.8-mode1-linclust.dbtype", "bank-clust-0.8-mode1-linclust.0",
+                 "bank-clust-0.8-mode1-linclust.tsv", "bank-clust-0.8-mode1-linclust-lin.dbtype",
+                 "bank-clust-0.8-mode1-linclust-lin-rep-clust.dbtype"]:
+        open(os.path.join(tmpdir, name), "w").close()
+    assert mmseqs.find_mmseqs_files(tmpdir + "/") == (
+        os.path.join(tmpdir, "bank-msDB"), os.path.join(tmpdir, "bank-clust-0.8-mode1-linclust"))
+    with pytest.raises(SystemExit):
+        mmseqs.find_mmseqs_files(GENEPATH)
+    assert ("must be the tmp_<dataset>_<information> folder of a previous run, containing its "
+            "mmseqs clustering <dataset>-clust-<information>. Found 0 such "
+            "clustering(s).") in caplog.text
+
+
+def test_find_mmseqs_files_sweep(caplog):
+    """
+    Test that the clustering of 1 setting of a sweep is found in its directory, with the
+    database shared by all settings, and that there is an error if this database is missing
+    """
+    tmpdir = os.path.join(GENEPATH, "tmp_bank_0.9-mode1-th2")
+    dbdir = os.path.join(GENEPATH, "tmp_bank_sweep")
+    os.makedirs(tmpdir)
+    open(os.path.join(tmpdir, "bank-clust-0.9-mode1-th2.dbtype"), "w").close()
+    with pytest.raises(SystemExit):
+        mmseqs.find_mmseqs_files(tmpdir)
+    assert "No mmseqs database bank-msDB found in " + tmpdir in caplog.text
+    os.makedirs(dbdir)
+    open(os.path.join(dbdir, "bank-msDB.dbtype"), "w").close()
+    assert mmseqs.find_mmseqs_files(tmpdir) == (os.path.join(dbdir, "bank-msDB"),
+                                                os.path.join(tmpdir, "bank-clust-0.9-mode1-th2"))
+
+
+def test_run_pangenome_sweep_done(caplog):
+    """
+    Test that, when the database and all pangenomes of a sweep already exist, they are
+    used, with the names of each setting, and that threads are shared between settings
+    """
+    caplog.set_level(logging.DEBUG)
+    prt_path = os.path.join(GENEPATH, "bank.All.prt")
+    dbdir = os.path.join(GENEPATH, "tmp_bank.All.prt_sweep")
+    os.makedirs(dbdir)
+    for ext in ["", ".index", ".dbtype", ".lookup", "_h", "_h.index", "_h.dbtype"]:
+        open(os.path.join(dbdir, "bank.All.prt-msDB" + ext), "w").close()
+    settings = [(0.8, 1), (0.9, 1), (0.8, 0)]
+    panfiles = [os.path.join(GENEPATH, f"PanGenome-bank.All.prt-clust-{info}.lst")
+                for info in ["0.8-mode1-th2", "0.9-mode1-th2", "0.8-mode0-th2"]]
+    for num, panfile in enumerate(panfiles):
+        with open(panfile, "w") as panf:
+            panf.write(f"{num + 1} GEN2.1017.00001.i0002_00004 GEN4.1111.00001.i0001_00002\n")
+    res = list(mmseqs.run_pangenome_sweep(settings, GENEPATH, prt_path, 7, quiet=True))
+    assert [(min_id, mode, panfile) for min_id, mode, _, panfile in res] == \
+           [setting + (panfile,) for setting, panfile in zip(settings, panfiles)]
+    assert [fams for _, _, fams, _ in res] == [
+        {num: ["GEN2.1017.00001.i0002_00004", "GEN4.1111.00001.i0001_00002"]}
+        for num in ["1", "2", "3"]]
+    assert "3 clustering(s) at the same time, with 2 thread(s) each" in caplog.text
+    assert "mmseqs database" in caplog.text and "already exists. The program will use it" \
+        in caplog.text
+    for setting_dir in ["0.8-mode1-th2", "0.9-mode1-th2", "0.8-mode0-th2"]:
+        assert os.path.isdir(os.path.join(GENEPATH, "tmp_bank.All.prt_" + setting_dir))
+    # Compact families: existing pangenomes are not loaded, but read when post-treated
+    res = list(mmseqs.run_pangenome_sweep(settings, GENEPATH, prt_path, 7, quiet=True,
+                                          compact=True))
+    assert [(fams, panfile) for _, _, fams, panfile in res] == [(None, panfile)
+                                                                for panfile in panfiles]
+
+
+@pytest.mark.parametrize("engine", ["cluster", "linclust"])
+def test_cluster_setting_fails(caplog, engine):
+    """
+    Test that, when mmseqs clustering fails (here, database which does not exist), the
+    clustering of the setting returns None, with an error, instead of going on with a
+    missing clustering
+    """
+    caplog.set_level(logging.DEBUG)
+    mmseqdb = os.path.join(GENEPATH, "nodb-msDB")
+    mmseqclust = os.path.join(GENEPATH, "nodb-clust-0.8-mode1")
+    logmmseq = os.path.join(GENEPATH, "mmseq_nodb.log")
+    panfile = os.path.join(GENEPATH, "PanGenome-nodb.lst")
+    assert mmseqs.cluster_setting(mmseqdb, 1, 0.8, 1, GENEPATH, mmseqclust, logmmseq,
+                                  panfile, engine=engine) is None
+    assert "ERROR" in caplog.text
+    assert not os.path.isfile(panfile)
+    # Only the first mmseqs command was run
+    assert caplog.text.count("MMseqs command") == 1
+
+
+def test_get_info_linclust():
+    """
+    Test that the linclust engine is written in the information on the run, and not the
+    default engine
+    """
+    assert mmseqs.get_info(1, 0.8, 1, "cluster") == "0.8-mode1"
+    assert mmseqs.get_info(4, 0.5, 0, "linclust") == "0.5-mode0-th4-linclust"
+
+
+def test_get_mem_limit(caplog):
+    """
+    Test that the memory limit of the prefilter index is a part of the budget, and that the
+    number of parts of the index is estimated from the bank size
+    """
+    caplog.set_level(logging.DEBUG)
+    prt_path = os.path.join(GENEPATH, "bank.All.prt")
+    with open(prt_path, "w") as prtf:
+        prtf.write("A" * 1000)
+    assert mmseqs.get_mem_limit(None, prt_path) is None
+    assert mmseqs.get_mem_limit(10000000000, prt_path) == 7000000000
+    assert mmseqs.get_mem_limit(2000000000, prt_path, [prt_path, prt_path]) == 1400000000
+    assert "prefilter index (estimated to 0.69 GB) limited to 1.40 GB, so split in about " \
+           "1 part(s)" in caplog.text
+    assert "probably too small" not in caplog.text
+    assert mmseqs.get_mem_limit(100000000, prt_path) == 70000000
+    assert "split in about 10 part(s)" in caplog.text
+    assert "The memory given to mmseqs is probably too small" in caplog.text
+
+
+def test_mem_option():
+    """
+    Test that the memory limit is given to mmseqs in MiB, and that there is no option
+    without limit
+    """
+    assert mmseqs.mem_option(None) == ""
+    assert mmseqs.mem_option(7 * 2**30 + 10) == " --split-memory-limit 7168M"
+    assert mmseqs.mem_option(10) == " --split-memory-limit 1M"
+
+
+def test_log_peak_mem(caplog):
+    """
+    Test that the peak memory of the given mmseqs command is logged, as an upper bound if
+    it is not more than the peak of the current process, and nothing if it is unknown
+    """
+    import sys
+    caplog.set_level(logging.DEBUG)
+    call = utils.run_cmd(f"{sys.executable} -c 'a = bytearray(50000000)'", "error")
+    mmseqs.log_peak_mem(call, "mmseqs clustering")
+    assert "Peak memory (RSS) used by mmseqs clustering: " in caplog.text
+    assert float(caplog.text.split()[-2]) >= 0.05
+    caplog.clear()
+    call.peak_mem = 1
+    mmseqs.log_peak_mem(call, "mmseqs clustering")
+    assert "Peak memory (RSS) used by mmseqs clustering: at most 0.00 GB" in caplog.text
+    caplog.clear()
+    call.peak_mem = 0
+    mmseqs.log_peak_mem(call, "mmseqs clustering")
+    assert "Peak memory" not in caplog.text
@@ -13,6 +13,7 @@ import shutil
 
 import PanACoTA.pangenome_module.post_treatment as post
 import PanACoTA.utils as utils
+import PanACoTA.utils_pangenome as utilsp
 import test.test_unit.utilities_for_tests as tutil
 
 # Define variables shared by several tests
@@ -167,13 +168,18 @@ def test_write_outputs(caplog):
     pqtf = io.StringIO(base + ".quanti_transpose.txt")
     psf = io.StringIO(base + ".sum.txt")
     # run cmd
-    res = post.generate_and_write_outputs(FAMS_BY_STRAIN, FAMILIES, 
-                                          ALL_STRAINS, pqlf, pqtf, psf)
+    pan = utilsp.Pangenome.from_families(FAMILIES)
+    assert pan.genomes == ALL_STRAINS
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    res = post.generate_and_write_outputs(pan, pqlf, pqtf, psf)
     # Check returned outputs
-    (qualis, quantis, sums) = res
-    assert qualis == EXP_QUALIS
+    (fam_nums, sums) = res
+    assert fam_nums == [str(num) for num in range(1, 17)]
+    assert dict(zip(fam_nums, sums.tolist())) == EXP_SUMS
+    quantis = {fam_num: pan.genome_counts(num).tolist() for num, fam_num in enumerate(pan.fam_nums)}
     assert quantis == EXP_QUANTIS
-    assert sums == EXP_SUMS
+    assert {fam_num: [int(nb > 0) for nb in quanti]
+            for fam_num, quanti in quantis.items()} == EXP_QUALIS
     # Check generated files
     # check content of matrix quali file
     with open(EXP_QUALIF, "r") as eq:
@@ -204,13 +210,11 @@ def test_open_out():
     with the expected content (quanti, quali, summary)
     """
     pangenome = os.path.join(GENEPATH, "test_open_out_pangenome.txt")
-    res = post.open_outputs_to_write(FAMS_BY_STRAIN, FAMILIES, ALL_STRAINS, pangenome)
+    res = post.open_outputs_to_write(utilsp.Pangenome.from_families(FAMILIES), pangenome)
 
     # Check function output
-    qualis, quantis, sums = res
-    assert qualis == EXP_QUALIS
-    assert quantis == EXP_QUANTIS
-    assert sums == EXP_SUMS
+    fam_nums, sums = res
+    assert dict(zip(fam_nums, sums.tolist())) == EXP_SUMS
 
     # Check presence and content of quali matrix file
     assert os.path.isfile(pangenome + ".quali.txt")
@@ -223,6 +227,39 @@ def test_open_out():
     assert tutil.compare_order_content(pangenome + ".summary.txt", EXP_SUMF) 
 
 
+def test_open_out_blocks(monkeypatch):
+    """
+    Check that output files are the same when matrices and summary are written by blocks
+    of a few lines
+    """
+    pan = utilsp.Pangenome.from_families(FAMILIES)
+    pangenome = os.path.join(GENEPATH, "test_open_out_pangenome.txt")
+    post.open_outputs_to_write(pan, pangenome)
+    monkeypatch.setattr(post, "MATRIX_CELLS", 20)
+    monkeypatch.setattr(post, "SUMMARY_ROWS", 3)
+    pangenome_blocks = os.path.join(GENEPATH, "test_open_out_pangenome-blocks.txt")
+    post.open_outputs_to_write(pan, pangenome_blocks)
+    for ext, expf in [(".quali.txt", EXP_QUALIF), (".quanti.txt", EXP_QUANTIF),
+                      (".summary.txt", EXP_SUMF)]:
+        assert tutil.compare_order_content(pangenome_blocks + ext, expf)
+        with open(pangenome + ext, "rb") as outf, open(pangenome_blocks + ext, "rb") as outb:
+            assert outf.read() == outb.read()
+
+
+def test_format_rows():
+    """
+    Check that matrix lines are formatted the same way for values of 1 digit, and larger
+    values
+    """
+    import numpy as np
+    names = ["genome1", "genome2"]
+    assert post.format_rows(names, np.array([[0, 1, 9], [2, 0, 0]])) == ("genome1,0,1,9\n"
+                                                                          "genome2,2,0,0\n")
+    assert post.format_rows(names, np.array([[0, 1, 10], [2, 0, 0]])) == ("genome1,0,1,10\n"
+                                                                           "genome2,2,0,0\n")
+    assert post.format_rows(names, np.zeros((2, 0), dtype=int)) == "genome1\ngenome2\n"
+
+
 def test_all_post():
     """
     Check that when running main method of post-treatment, it creates the 3 output files
@@ -245,4 +282,147 @@ def test_all_post():
 
     # Check that bin pangenome file was created (as it did not exist before)
     assert os.path.isfile(pangenome + ".bin")
-    
\ No newline at end of file
+    
+
+@pytest.mark.parametrize("matrix", ["sparse", "all"])
+def test_all_post_sparse(matrix):
+    """
+    Check that sparse matrices contain the same values as the csv matrices, and that csv
+    files are only written when asked
+    """
+    import json
+    import numpy as np
+    import scipy.sparse
+    pangenome = os.path.join(GENEPATH, "test_all_post")
+    post.post_treat(FAMILIES, pangenome, matrix)
+    assert os.path.isfile(pangenome + ".quali.txt") == (matrix == "all")
+    assert os.path.isfile(pangenome + ".quanti.txt") == (matrix == "all")
+    assert tutil.compare_order_content(pangenome + ".summary.txt", EXP_SUMF)
+    with open(pangenome + ".index.json") as indf:
+        index = json.load(indf)
+    assert index == {"genomes": ALL_STRAINS, "families": [str(num) for num in range(1, 17)]}
+    quanti = scipy.sparse.load_npz(pangenome + ".quanti.npz")
+    assert quanti.shape == (4, 16)
+    assert {fam: quanti[:, col].toarray().ravel().tolist()
+            for col, fam in enumerate(index["families"])} == EXP_QUANTIS
+    quali = np.load(pangenome + ".quali.npz")
+    bits = np.unpackbits(quali["bits"], axis=1, count=int(quali["nb_families"]))
+    assert {fam: bits[:, col].tolist()
+            for col, fam in enumerate(index["families"])} == EXP_QUALIS
+
+
+def test_all_post_update(caplog):
+    """
+    Check that the matrices of a pangenome updated with new genomes, obtained by patching
+    the matrices of the previous pangenome, are the same as when generated from scratch.
+    And that they are generated when the previous matrices are not found.
+    """
+    caplog.set_level(logging.DEBUG)
+    old_strains = ('GEN2.1017.00001', 'GENO.1216.00002')
+    old_fams = {num: [mem for mem in fam if mem.startswith(old_strains)]
+                for num, fam in FAMILIES.items()}
+    old_fams = {num: fam for num, fam in old_fams.items() if fam}
+    # Family with only new proteins is numbered after the previous families
+    new_fams = {num: fam for num, fam in FAMILIES.items() if num in old_fams}
+    new_fams["17"] = FAMILIES["5"]
+    previous = os.path.join(GENEPATH, "test_previous")
+    post.post_treat(old_fams, previous)
+    updated = os.path.join(GENEPATH, "test_updated")
+    post.post_treat(new_fams, updated, previous=previous)
+    assert "Updating qualitative and quantitative matrix of" in caplog.text
+    full = os.path.join(GENEPATH, "test_full")
+    post.post_treat(new_fams, full)
+    for ext in [".quali.txt", ".quanti.txt", ".summary.txt"]:
+        with open(updated + ext) as updf, open(full + ext) as fullf:
+            assert updf.read() == fullf.read()
+
+    caplog.clear()
+    os.remove(previous + ".quanti.txt")
+    post.post_treat(new_fams, updated, previous=previous)
+    assert "matrices will be generated" in caplog.text
+    with open(updated + ".quanti.txt") as updf, open(full + ".quanti.txt") as fullf:
+        assert updf.read() == fullf.read()
+
+
+@pytest.mark.parametrize("tiles", [(2048, 8192), (3, 8)])
+def test_write_distances(monkeypatch, tiles):
+    """
+    Check that distances between genomes are the ones computed from the
+    presence/absence matrix, with 1 or several tiles of genome pairs and blocks of families
+    """
+    import numpy as np
+    from scipy.spatial.distance import pdist
+    import PanACoTA.utils_pangenome as utilsp
+    monkeypatch.setattr(post, "DIST_GENOMES", tiles[0])
+    monkeypatch.setattr(post, "DIST_FAMILIES", tiles[1])
+    # More genomes and families than in FAMILIES, to have several tiles
+    families = dict(FAMILIES)
+    families["17"] = ["GEN5.1017.00001.i0001_00001", "GEN6.1017.00001.i0001_00001",
+                      "GEN7.1017.00001.i0001_00001", "GEN7.1017.00001.i0001_00002"]
+    for num in range(18, 30):
+        families[str(num)] = [f"GEN{gen}.1017.00001.i0001_{num:05d}"
+                              for gen in [5, 6, 7, 8] if (num + gen) % 3]
+    pan = utilsp.Pangenome.from_families(families)
+    pangenome = os.path.join(GENEPATH, "test_distances")
+    post.write_distances(pan, pangenome, threads=2)
+    dists = np.load(pangenome + ".distances.npz")
+    assert list(dists["genomes"]) == pan.genomes
+    presence = np.vstack([counts for _, counts in post.genome_blocks(pan, range(len(pan)))]) > 0
+    assert dists["nb_families"].tolist() == presence.sum(axis=1).tolist()
+    assert np.allclose(dists["jaccard"], pdist(presence, "jaccard"))
+    assert dists["hamming"].tolist() == (pdist(presence, "hamming")
+                                         * len(pan)).round().astype(int).tolist()
+
+
+def test_genome_bits():
+    """
+    Check that only families neither in all genomes nor in only 1 genome are packed into
+    bits, and that other families are counted
+    """
+    import numpy as np
+    import PanACoTA.utils_pangenome as utilsp
+    pan = utilsp.Pangenome.from_families(FAMILIES)
+    bits, nb_fams, nb_core = post.genome_bits(pan)
+    # Families 1, 4, 6, 8, 10, 11, 13, 14 are in all genomes, 2, 3, 5, 15, 16 in only 1
+    assert nb_core == 8
+    assert nb_fams.tolist() == [13, 9, 10, 11]
+    # Families 7, 9, 12 in this order (sorted by family number, as in pan)
+    order = [pan.fam_nums[num] for num in range(len(pan))]
+    kept = [fam for fam in order if fam in ["7", "9", "12"]]
+    presence = np.unpackbits(bits, axis=1)[:, :3]
+    exp = {"7": [1, 0, 1, 0], "9": [1, 0, 1, 0], "12": [1, 0, 0, 1]}
+    assert presence.T.tolist() == [exp[fam] for fam in kept]
+
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_write_curves(threads):
+    """
+    Check that pan and core accumulation curves are the ones computed genome by genome on
+    the presence/absence matrix, whatever the number of processes, and that they are
+    written with their quantiles
+    """
+    import numpy as np
+    import PanACoTA.utils_pangenome as utilsp
+    pan = utilsp.Pangenome.from_families(FAMILIES)
+    presence = np.vstack([counts for _, counts in post.genome_blocks(pan, range(len(pan)))]) > 0
+    perms = np.array([[0, 1, 2, 3], [3, 2, 1, 0], [2, 0, 3, 1]])
+    pan_sizes, core_sizes = post.accumulation_curves(perms,
+                                                     post.genome_bits(pan, informative=False)[0])
+    for perm, pans, cores in zip(perms, pan_sizes, core_sizes):
+        assert pans.tolist() == np.logical_or.accumulate(presence[perm]).sum(axis=1).tolist()
+        assert cores.tolist() == np.logical_and.accumulate(presence[perm]).sum(axis=1).tolist()
+    pangenome = os.path.join(GENEPATH, "test_curves")
+    post.write_curves(pan, pangenome, 20, threads)
+    with open(pangenome + ".curves.txt") as curf:
+        header = curf.readline().strip().split(",")
+        lines = [[float(val) for val in line.split(",")] for line in curf]
+    assert header[:3] == ["nb_genomes", "pan_mean", "pan_min"]
+    assert header[9:11] == ["core_mean", "core_min"]
+    assert header[-1] == "core_max"
+    assert [line[0] for line in lines] == [1, 2, 3, 4]
+    # All orders end with all genomes
+    assert lines[-1][1:9] == [len(pan)] * 8
+    assert lines[-1][9:] == [8] * 8
+    # 1 genome: between 9 and 13 families
+    assert lines[0][2] == 9
+    assert lines[0][8] == 13
@@ -91,6 +91,26 @@ def test_build_bank_spedir_quiet(caplog):
             "generated_by_unit-tests/test_build_prt/toto/EXEM.All.prt") in caplog.text
 
 
+def test_list_prt_files(caplog):
+    """
+    Test that protein files of all genomes are listed, in the order of the list of genomes,
+    without building the bank. If the bank already exists, it is used instead.
+    """
+    caplog.set_level(logging.DEBUG)
+    lstinfo = os.path.join(PATH_TEST_FILES, "list_to_pan.txt")
+    dbpath = os.path.join(PATH_TEST_FILES, "example_db", "Proteins")
+    prt_path, prt_files = psf.list_prt_files(lstinfo, dbpath, "EXEM", GENEPATH)
+    assert prt_path == os.path.join(GENEPATH, "EXEM.All.prt")
+    assert not os.path.isfile(prt_path)
+    assert prt_files == [os.path.join(dbpath, gen + ".prt")
+                         for gen in ["GEN2.1017.00001", "GEN4.1111.00001", "GENO.1017.00001",
+                                     "GENO.1216.00002"]]
+    assert "Proteins of 4 genomes will be given to mmseqs" in caplog.text
+    open(prt_path, "w").close()
+    assert psf.list_prt_files(lstinfo, dbpath, "EXEM", GENEPATH) == (prt_path, None)
+    assert "Protein bank {} already exists".format(prt_path) in caplog.text
+
+
 def test_build_bank_exists(caplog):
     """
     Test that when we want to create a bank but the output file already exists, it prints
@@ -112,3 +132,60 @@ def test_build_bank_exists(caplog):
     assert ("Protein bank test/data/pangenome/generated_by_unit-tests/Proteins/"
             "EXEM.All.prt already exists. It will be used by mmseqs.") in caplog.text
     assert caplog.records[0].levelname == "WARNING"
+
+
+@pytest.mark.parametrize("method", ["gzip", "bgzip", "zstd"])
+def test_build_bank_compressed(method):
+    """
+    Build a protein bank from a list of genomes whose protein files are compressed (as
+    done by 'annotate --compress'): the bank is the same as with uncompressed files.
+    """
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    from PanACoTA import utils_fasta
+    lstinfo = os.path.join(PATH_TEST_FILES, "list_to_pan.txt")
+    dbpath = os.path.join(PATH_TEST_FILES, "example_db", "Proteins")
+    cur_dbpath = os.path.join(GENEPATH, "Proteins")
+    shutil.copytree(dbpath, cur_dbpath)
+    for prt in os.listdir(cur_dbpath):
+        utils_fasta.compress(os.path.join(cur_dbpath, prt), method)
+    outfile = psf.build_prt_bank(lstinfo, cur_dbpath, "EXEM", None, True)
+    exp_file = os.path.join(PATH_EXP_FILES, "exp_EXEM.All.prt")
+    assert outfile == os.path.join(cur_dbpath, "EXEM.All.prt")
+    assert tutil.compare_order_content(exp_file, outfile)
+
+
+def test_build_bank_dedup(caplog):
+    """
+    Build a protein bank keeping only 1 copy of identical proteins (whatever their line
+    wrapping), and check the members file listing the other copies.
+    """
+    caplog.set_level(logging.DEBUG)
+    dbpath = os.path.join(GENEPATH, "Proteins")
+    os.makedirs(dbpath)
+    lstinfo = os.path.join(GENEPATH, "list_to_pan.txt")
+    with open(lstinfo, "w") as lstf:
+        lstf.write("gembase_name\nGEN1.1017.00001\nGEN2.1017.00001\n")
+    with open(os.path.join(dbpath, "GEN1.1017.00001.prt"), "w") as prtf:
+        prtf.write(">GEN1.1017.00001.i0001_00001 12 NA\nMKLVT\n"
+                   ">GEN1.1017.00001.i0001_00002 12 NA\nMAAAA\n"
+                   ">GEN1.1017.00001.i0001_00003 12 NA\nMKL\nVT\n")
+    with open(os.path.join(dbpath, "GEN2.1017.00001.prt"), "w") as prtf:
+        prtf.write(">GEN2.1017.00001.i0001_00001 12 NA\nMAAAA\n"
+                   ">GEN2.1017.00001.i0001_00002 12 NA\nMKLVT\n"
+                   ">GEN2.1017.00001.i0001_00003 12 NA\nMCCCC\n")
+    outfile = psf.build_prt_bank(lstinfo, dbpath, "GEN", None, True, dedup=True)
+    assert outfile == os.path.join(dbpath, "GEN.All.uniq.prt")
+    with open(outfile) as outf:
+        assert outf.read() == (">GEN1.1017.00001.i0001_00001 12 NA\nMKLVT\n"
+                               ">GEN1.1017.00001.i0001_00002 12 NA\nMAAAA\n"
+                               ">GEN2.1017.00001.i0001_00003 12 NA\nMCCCC\n")
+    assert psf.members_path(outfile) == os.path.join(dbpath, "GEN.All.uniq.members")
+    assert psf.read_members(outfile) == {
+        "GEN1.1017.00001.i0001_00001": ["GEN1.1017.00001.i0001_00003",
+                                        "GEN2.1017.00001.i0001_00002"],
+        "GEN1.1017.00001.i0001_00002": ["GEN2.1017.00001.i0001_00001"]}
+    assert "3 unique proteins among 6 proteins." in caplog.text
+    # Bank and members file exist: bank is used
+    assert psf.build_prt_bank(lstinfo, dbpath, "GEN", None, True, dedup=True) == outfile
+    assert "Protein bank {} already exists".format(outfile) in caplog.text
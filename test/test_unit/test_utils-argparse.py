@@ -114,6 +114,30 @@ def test_positive_int():
             "invalid int value: '-1'") in str(err.value)
 
 
+def test_mem_size():
+    """
+    Test that given memory is converted to bytes, and that an error is raised if it is not
+    a positive amount of memory
+    """
+    assert autils.mem_size("1000") == 1000
+    assert autils.mem_size("16G") == 16000000000
+    assert autils.mem_size("1.5g") == 1500000000
+    assert autils.mem_size("500MB") == 500000000
+    with pytest.raises(argparse.ArgumentTypeError) as err:
+        autils.mem_size("16Go")
+    assert ("argument --max-mem: invalid memory value: '16Go'. Give a number of bytes, or a "
+            "number followed by K, M, G or T (for example '16G').") in str(err.value)
+    with pytest.raises(argparse.ArgumentTypeError) as err:
+        autils.mem_size("-2G")
+    assert ("argument --max-mem must be a positive amount of memory: "
+            "invalid value: '-2G'") in str(err.value)
+    for value in ["inf", "nan", "1e400G"]:
+        with pytest.raises(argparse.ArgumentTypeError) as err:
+            autils.mem_size(value)
+        assert ("argument --max-mem must be a positive amount of memory: "
+                f"invalid value: '{value}'") in str(err.value)
+
+
 def test_mash_dist():
     """
     Test checking that given value is ok for a mash distance
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Unit tests for the functions of utils_fasta.py reading and writing fasta files
+"""
+
+import os
+import pytest
+
+import PanACoTA.utils_fasta as futils
+
+GENOME = os.path.join("test", "data", "annotate", "genomes", "H299_H561.fasta")
+
+# Sequences wrapped on several lines, lines before the first header, an empty sequence,
+# and no end of line at the end of the file
+CONTENT = (b"not a sequence\n"
+           b">seq1 first sequence\nACGT\nAC\n"
+           b">seq2\n"
+           b">seq3 third\r\nAAAA\r\nCC\r\n"
+           b">seq4\nTT\nG")
+
+
+@pytest.fixture
+def fasta(tmp_path):
+    """
+    Fasta file with the content to read
+    """
+    fasta = tmp_path / "test.fasta"
+    fasta.write_bytes(CONTENT)
+    return str(fasta)
+
+
+def test_read_records(fasta):
+    """
+    Test that all records are found, with their header, sequence and offset in the file
+    """
+    records = list(futils.read_records(fasta))
+    assert [rec.name for rec in records] == [b"seq1", b"seq2", b"seq3", b"seq4"]
+    assert [rec.header for rec in records] == [b"seq1 first sequence", b"seq2", b"seq3 third",
+                                               b"seq4"]
+    assert [rec.seq for rec in records] == [b"ACGTAC", b"", b"AAAACC", b"TTG"]
+    assert [len(rec) for rec in records] == [6, 0, 6, 3]
+    assert [rec.offset for rec in records] == [15, 44, 50, 73]
+    assert records[0].raw == b">seq1 first sequence\nACGT\nAC\n"
+    assert records[0].body == b"ACGT\nAC\n"
+    assert b"".join(rec.raw for rec in records) == CONTENT[15:]
+
+
+def test_read_records_blocks(fasta, monkeypatch):
+    """
+    Test that records are the same when the file is read by small blocks, cutting records
+    anywhere (including between the end of a line and the start of a header), or with
+    records larger than a block
+    """
+    records = [(rec.raw, rec.offset) for rec in futils.read_records(fasta)]
+    for size in range(2, len(CONTENT) + 1):
+        monkeypatch.setattr(futils, "BUFSIZE", size)
+        assert [(rec.raw, rec.offset) for rec in futils.read_records(fasta)] == records
+
+
+def test_read_records_mmap(fasta):
+    """
+    Test that records are the same when the file is mapped in memory, or given as
+    an open file, in binary or text mode
+    """
+    records = [(rec.raw, rec.offset) for rec in futils.read_records(fasta)]
+    assert [(rec.raw, rec.offset)
+            for rec in futils.read_records(fasta, use_mmap=True)] == records
+    with open(fasta, "rb") as fastf:
+        assert [(rec.raw, rec.offset) for rec in futils.read_records(fastf)] == records
+    with open(fasta, "r") as fastf:
+        assert [(rec.raw, rec.offset) for rec in futils.read_records(fastf)] == records
+
+
+def test_read_records_empty(tmp_path):
+    """
+    Test that there is no record in an empty file, nor in a file without any header
+    """
+    empty = tmp_path / "empty.fasta"
+    empty.write_bytes(b"")
+    assert list(futils.read_records(str(empty))) == []
+    assert list(futils.read_records(str(empty), use_mmap=True)) == []
+    empty.write_bytes(b"ACGT\nACGT\n")
+    assert list(futils.read_records(str(empty))) == []
+
+
+def test_index_fetch_records():
+    """
+    Test that records found from their position in the file are the same as the ones read
+    """
+    index = futils.index_records(GENOME)
+    assert list(index) == ["H561_S27", "H561_S28", "H561_S29"]
+    records = list(futils.read_records(GENOME))
+    with open(GENOME, "rb") as fastf:
+        rec = futils.fetch_record(fastf, *index["H561_S28"])
+    assert rec.raw == records[1].raw
+    assert rec.offset == records[1].offset
+    assert len(rec) == 7080
+
+
+def test_write_record(tmp_path):
+    """
+    Test that a record is written with its sequence on 1 line, or wrapped
+    """
+    out = str(tmp_path / "out.fasta")
+    with futils.open_write(out) as outf:
+        futils.write_record(outf, b"seq1 info", b"ACGTACGTAC")
+        futils.write_record(outf, b"seq2", b"ACGTACGTAC", width=4)
+        futils.write_record(outf, b"seq3", b"ACGT", width=4)
+    with futils.open_write(out, append=True) as outf:
+        futils.write_record(outf, b"seq4", b"")
+    with open(out, "rb") as outf:
+        assert outf.read() == (b">seq1 info\nACGTACGTAC\n>seq2\nACGT\nACGT\nAC\n"
+                               b">seq3\nACGT\n>seq4\n\n")
+
+
+def test_count_records(fasta, monkeypatch):
+    """
+    Test that all headers are counted, even when the file is read by small blocks
+    """
+    assert futils.count_records(fasta) == 4
+    monkeypatch.setattr(futils, "BUFSIZE", 3)
+    assert futils.count_records(fasta) == 4
+    assert futils.count_records(GENOME) == 3
+
+
+def test_grep_lines(fasta, monkeypatch):
+    """
+    Test that lines containing the pattern are found once, and that a match over several
+    lines is not considered
+    """
+    assert list(futils.grep_lines(fasta, "^>seq[13]")) == [b">seq1 first sequence\n",
+                                                           b">seq3 third\r\n"]
+    assert list(futils.grep_lines(fasta, "A|2")) == [b"ACGT\n", b"AC\n", b">seq2\n",
+                                                     b"AAAA\r\n"]
+    assert list(futils.grep_lines(fasta, r"AC\s>")) == []
+    assert list(futils.grep_lines(fasta, "G$")) == [b"G"]
+    monkeypatch.setattr(futils, "BUFSIZE", 4)
+    assert list(futils.grep_lines(fasta, "^>")) == [b">seq1 first sequence\n", b">seq2\n",
+                                                    b">seq3 third\r\n", b">seq4\n"]
+
+
+def test_binary(fasta):
+    """
+    Test that the binary file under a text file is returned, after writing what was
+    already written in text mode
+    """
+    with open(fasta, "rb") as fastf:
+        assert futils.binary(fastf) is fastf
+    with open(fasta, "w") as fastf:
+        fastf.write(">text\n")
+        futils.binary(fastf).write(b"ACGT\n")
+    with open(fasta, "rb") as fastf:
+        assert fastf.read() == b">text\nACGT\n"
+
+
+@pytest.mark.parametrize("method, ext", [("gzip", ".gz"), ("bgzip", ".gz"), ("zstd", ".zst")])
+def test_compress_read(fasta, method, ext, monkeypatch):
+    """
+    Test that a compressed file replaces the original one, is found from the original name,
+    and that its records are the same as in the original file
+    """
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    records = [(rec.raw, rec.offset) for rec in futils.read_records(fasta)]
+    assert futils.find_file(fasta) == fasta
+    assert futils.compress(fasta, method) == fasta + ext
+    assert not os.path.isfile(fasta)
+    assert futils.find_file(fasta) == fasta + ext
+    with futils.open_read(fasta + ext) as fastf:
+        assert futils.is_compressed(fastf)
+        assert fastf.read() == CONTENT
+    assert [(rec.raw, rec.offset) for rec in futils.read_records(fasta + ext)] == records
+    # mmap is not used for compressed files
+    assert [(rec.raw, rec.offset)
+            for rec in futils.read_records(fasta + ext, use_mmap=True)] == records
+    monkeypatch.setattr(futils, "BUFSIZE", 5)
+    assert futils.count_records(fasta + ext) == 4
+
+
+def test_open_read_plain(fasta):
+    """
+    Test that a file which is not compressed is read as is
+    """
+    with futils.open_read(fasta) as fastf:
+        assert not futils.is_compressed(fastf)
+        assert fastf.read() == CONTENT
+    assert futils.find_file(fasta + ".none") == fasta + ".none"
@@ -8,6 +8,7 @@ import logging
 import os
 import shutil
 import pytest
+import numpy as np
 
 from PanACoTA import utils_pangenome as upan
 from PanACoTA import utils
@@ -338,10 +339,9 @@ def test_read_pangenome_filebin(caplog):
     logger = logging.getLogger("test_pan")
     # Copy pan file to folder for files generated by tests. It will also save its bin version
     pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
-    panbin_to_use = os.path.join(GENEPATH, "Pangenome.lst.bin")
-    test_panbin = os.path.join(PAN_TEST, "pangenome.bin")
     shutil.copyfile(PAN_FILE, pan_to_use)
-    shutil.copyfile(test_panbin, panbin_to_use)
+    upan.read_pangenome(pan_to_use, logger)
+    caplog.clear()
     fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
     assert fbs == FAMS_BY_STRAIN
     assert fams == FAMILIES
@@ -349,29 +349,25 @@ def test_read_pangenome_filebin(caplog):
     assert "Retrieving info from binary file" in caplog.text
 
 
-def test_read_pangenome_filebin_strfamnum(caplog):
+def test_read_pangenome_filebin_legacy(caplog):
     """
-    Test that when giving only a pangenome filename, and the corresponding bin file exists,
-    it reads the binary file, and returns expected objects.
+    Test that when giving only a pangenome filename, and the corresponding bin file was
+    saved by a previous version (pickle), the bin file is not loaded, even if it is more
+    recent than the pangenome file: information is read from the pangenome file.
     """
-    caplog.set_level(logging.INFO)
+    caplog.set_level(logging.DEBUG)
     logger = logging.getLogger("test_pan")
-    # Copy pan file to folder for files generated by tests. It will also save its bin version
     pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
     panbin_to_use = os.path.join(GENEPATH, "Pangenome.lst.bin")
     test_panbin = os.path.join(PAN_TEST, "pangenome-strfamnum.bin")
     shutil.copyfile(PAN_FILE, pan_to_use)
     shutil.copyfile(test_panbin, panbin_to_use)
     fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
-    assert fbs == {"family1": {"gene1": ["gene1_5"],
-                               "gene2": ["gene2_6"],
-                               "gene3": ["gene3_8"]},
-                   "2": {"gene1": ["gene1_", "gene1_toto"],
-                         "gene3": ["gene3_5"]}}
-    assert fams == {"family1": ["gene1_5", "gene2_6", "gene3_8"],
-                    "2": ["gene1_", "gene3_5", "gene1_toto"]}
-    assert ass == ["gene1", "gene2", "gene3"]
-    assert "Retrieving info from binary file" in caplog.text
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+    assert "Pangenome.lst.bin is not in the current binary format" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
 
 
 def test_read_pangenome_fams(caplog):
@@ -395,9 +391,10 @@ def test_read_pangenome_fams_binok(caplog):
     """
     Test that when giving a pangenome file, and families, it directly extracts strain information
     from the families: pangenome file does not need to exist. However, the pangenome.bin file
-    already exists (whatever its content), and is then not recreated.
+    already exists. As it is not a valid binary file, it is replaced. Once valid, it is not
+    saved again.
     """
-    caplog.set_level(logging.INFO)
+    caplog.set_level(logging.DEBUG)
     logger = logging.getLogger("test_pan")
     panfile = os.path.join(GENEPATH, "toto.txt")
     # Create bn pangenome file (which is empty
@@ -406,13 +403,15 @@ def test_read_pangenome_fams_binok(caplog):
     assert fbs == FAMS_BY_STRAIN
     assert fams == FAMILIES
     assert ass == ALL_STRAINS
-    with open(panfile + ".bin", "r") as panf:
-        all_lines = panf.readlines()
-    assert all_lines == []
     assert "Retrieving information from pan families" in caplog.text
-    assert os.path.isfile(panfile + ".bin")
-    with open(panfile + ".bin", "r") as pfb:
-        assert pfb.readlines() == []
+    assert "toto.txt.bin is not in the current binary format" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.getsize(panfile + ".bin") > 0
+    mtime = os.stat(panfile + ".bin").st_mtime_ns
+    caplog.clear()
+    upan.read_pangenome(panfile, logger, FAMILIES)
+    assert "Saving all information" not in caplog.text
+    assert os.stat(panfile + ".bin").st_mtime_ns == mtime
 
 
 def test_read_lstinfo():
@@ -446,4 +445,247 @@ def test_read_lstinfo_nofile(caplog):
     with pytest.raises(SystemExit):
         upan.read_lstinfo("non-existing-file.txt", logger)
     assert ("non-existing-file.txt file not found") in caplog.text
-    
\ No newline at end of file
+    
+
+def test_compact_families():
+    """
+    Test that families added to a CompactFamilies are numbered from 1, and can be retrieved
+    as lists or as a dict
+    """
+    fams = upan.CompactFamilies()
+    assert len(fams) == 0
+    assert fams.to_dict() == {}
+    fams.append(["GEN1.1017.00001.i0001_00002", "GEN2.1017.00001.i0001_00001"])
+    fams.append(["GEN1.1017.00001.i0001_00005"])
+    assert len(fams) == 2
+    assert fams[2] == ["GEN1.1017.00001.i0001_00005"]
+    assert list(fams) == [1, 2]
+    assert fams.to_dict() == {1: ["GEN1.1017.00001.i0001_00002", "GEN2.1017.00001.i0001_00001"],
+                              2: ["GEN1.1017.00001.i0001_00005"]}
+    assert list(fams.offsets) == [0, 2, 3]
+    with pytest.raises(KeyError):
+        fams[3]
+    # Can be used instead of a dict to get information on families
+    fams_by_strain, all_strains = upan.get_fams_info(fams, logging.getLogger("test"))
+    assert all_strains == ["GEN1.1017.00001", "GEN2.1017.00001"]
+    assert fams_by_strain[1] == {"GEN1.1017.00001": ["GEN1.1017.00001.i0001_00002"],
+                                 "GEN2.1017.00001": ["GEN2.1017.00001.i0001_00001"]}
+
+
+def test_get_strain():
+    """
+    Test that genome names are found from gembase-like and other gene names, and that
+    a gembase-like name is only kept if it is one of the given genomes
+    """
+    assert upan.get_strain("ESCO.1512.00001.i001_12313") == "ESCO.1512.00001"
+    assert upan.get_strain("my_genome_00012") == "my_genome"
+    assert upan.get_strain("ESCO.1512.00001.C001_00001") == "ESCO.1512.00001"
+    assert upan.get_strain("ESCO.1512.00001.C001_00001",
+                           {"ESCO.1512.00001.C001"}) == "ESCO.1512.00001.C001"
+    assert upan.get_strain("ESCO.1512.00001.i001_12313",
+                           {"ESCO.1512.00001"}) == "ESCO.1512.00001"
+
+
+def test_pangenome_from_file():
+    """
+    Test that a pangenome read from a file gives the same families, strains and genomes as
+    read_pan_file, with interned members and genomes
+    """
+    pan = upan.Pangenome.from_file(PAN_FILE)
+    assert pan.families() == FAMILIES
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert pan.genomes == ALL_STRAINS
+    assert len(pan) == len(FAMILIES)
+    assert pan.members.dtype == "int32"
+    assert pan.member_genomes.dtype == "int32"
+    assert len(pan.proteins) == len(pan.members) == pan.offsets[-1]
+    assert pan.sorted_families() == sorted(range(len(pan)), key=lambda num: int(pan.fam_nums[num]))
+    assert pan.family(pan.fam_nums.index("1")) == FAMILIES["1"]
+
+
+def test_pangenome_stats():
+    """
+    Test the number of members of each genome in each family, and the statistics computed
+    on all families at once
+    """
+    pan = upan.Pangenome.from_families({1: ["A_1", "A_2", "B_1"], 2: ["C_1"], 3: [],
+                                        4: ["A_3", "B_2", "C_2"]})
+    assert pan.genomes == ["A", "B", "C"]
+    assert pan.genome_counts(0).tolist() == [2, 1, 0]
+    assert pan.genome_counts(2).tolist() == [0, 0, 0]
+    assert pan.nb_members.tolist() == [3, 1, 0, 3]
+    nb_genomes, nb_mono, max_multi = pan.family_stats()
+    assert nb_genomes.tolist() == [2, 1, 0, 3]
+    assert nb_mono.tolist() == [1, 1, 0, 3]
+    assert max_multi.tolist() == [2, 1, 0, 1]
+
+
+def test_pangenome_subset():
+    """
+    Test that a subset of a pangenome only contains members of the given genomes, and no
+    empty family
+    """
+    pan = upan.Pangenome.from_families({1: ["A_1", "A_2", "B_1"], 2: ["C_1"],
+                                        4: ["A_3", "B_2", "C_2"]})
+    sub = pan.subset(["C", "A", "D"])
+    assert sub.genomes == ["A", "C"]
+    assert sub.families() == {1: ["A_1", "A_2"], 2: ["C_1"], 4: ["A_3", "C_2"]}
+    assert sub.fams_by_strain() == {1: {"A": ["A_1", "A_2"]}, 2: {"C": ["C_1"]},
+                                    4: {"A": ["A_3"], "C": ["C_2"]}}
+    sub = pan.subset(["B"])
+    assert sub.families() == {1: ["B_1"], 4: ["B_2"]}
+    assert sub.offsets.tolist() == [0, 1, 2]
+
+
+def test_load_pangenome_file(caplog):
+    """
+    Test that a pangenome is read from the text file and saved to a binary file, which is
+    then used by load_pangenome and read_pangenome
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert "Reading and getting information from pangenome file" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(pan_to_use + ".bin")
+    caplog.clear()
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert pan.genomes == ALL_STRAINS
+    assert "Retrieving info from binary file" in caplog.text
+    fbs, fams, ass = upan.read_pangenome(pan_to_use, logger)
+    assert fbs == FAMS_BY_STRAIN
+    assert fams == FAMILIES
+    assert ass == ALL_STRAINS
+
+
+def test_load_pangenome_stats(caplog):
+    """
+    Test that the statistics of families are saved to the binary file, and loaded with it
+    instead of being computed again
+    """
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    pan = upan.load_pangenome(pan_to_use, logger)
+    exp_stats = [stat.tolist() for stat in pan.family_stats()]
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.stats is not None
+    assert [stat.tolist() for stat in pan.family_stats()] == exp_stats
+    # Computed again for a subset of genomes
+    sub = pan.subset(ALL_STRAINS[:2])
+    assert sub.stats is None
+    assert sub.family_stats()[0].max() == 2
+
+
+def test_load_pangenome_oldbin(caplog):
+    """
+    Test that a binary file saved by read_pangenome in previous versions is replaced by a
+    binary file in the current format, built from the pangenome file
+    """
+    caplog.set_level(logging.INFO)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    shutil.copyfile(os.path.join(PAN_TEST, "pangenome.bin"), pan_to_use + ".bin")
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == FAMILIES
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert "Pangenome.lst.bin cannot be used" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
+    with open(pan_to_use + ".bin", "rb") as binf:
+        assert binf.read(len(upan.CACHE_MAGIC)) == upan.CACHE_MAGIC
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+
+
+def test_load_pangenome_fams(caplog):
+    """
+    Test that a pangenome is built from the families given, and that the binary file is
+    saved, with arrays mapped in memory when loaded
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "toto.txt")
+    pan = upan.load_pangenome(panfile, logger, FAMILIES)
+    assert pan.fams_by_strain() == FAMS_BY_STRAIN
+    assert "Retrieving information from pan families" in caplog.text
+    assert "Saving all information to a binary file for later use" in caplog.text
+    assert os.path.isfile(panfile + ".bin")
+    caplog.clear()
+    pan = upan.load_pangenome(panfile, logger)
+    assert "Retrieving info from binary file" in caplog.text
+    assert pan.families() == FAMILIES
+    assert pan.genomes == ALL_STRAINS
+    assert isinstance(pan.members, np.memmap)
+    assert isinstance(pan.proteins, upan.StringTable)
+
+
+def test_load_pangenome_changed(caplog):
+    """
+    Test that the binary file is not used when the pangenome file changed since it was
+    saved, but is still used if only its modification time changed
+    """
+    caplog.set_level(logging.DEBUG)
+    logger = logging.getLogger("test_pan")
+    pan_to_use = os.path.join(GENEPATH, "Pangenome.lst")
+    shutil.copyfile(PAN_FILE, pan_to_use)
+    upan.load_pangenome(pan_to_use, logger)
+    # Same content, newer file
+    stat = os.stat(pan_to_use)
+    os.utime(pan_to_use, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+    assert "was modified, but not its content" in caplog.text
+    # New modification time saved: the file is not hashed again
+    header = upan.check_cache(pan_to_use + ".bin", pan_to_use, logger)
+    assert header["source"]["mtime_ns"] == os.stat(pan_to_use).st_mtime_ns
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == FAMILIES
+    assert "Retrieving info from binary file" in caplog.text
+    assert "was modified" not in caplog.text
+    # New content
+    with open(pan_to_use, "w") as panf:
+        panf.write("1 GEN1.1017.00001.i0001_00002 GEN2.1017.00001.i0001_00001\n")
+    caplog.clear()
+    pan = upan.load_pangenome(pan_to_use, logger)
+    assert pan.families() == {"1": ["GEN1.1017.00001.i0001_00002",
+                                    "GEN2.1017.00001.i0001_00001"]}
+    assert "Pangenome.lst changed since" in caplog.text
+    assert "Pangenome.lst.bin cannot be used" in caplog.text
+    assert "Reading and getting information from pangenome file" in caplog.text
+    # Binary file saved again for the new content
+    caplog.clear()
+    assert upan.load_pangenome(pan_to_use, logger).families() == pan.families()
+    assert "Retrieving info from binary file" in caplog.text
+
+
+def test_string_table():
+    """
+    Test that strings are found back from a string table
+    """
+    table = upan.StringTable.from_list(["abc", "", "é_1"])
+    assert len(table) == 3
+    assert list(table) == ["abc", "", "é_1"]
+    assert table[2] == "é_1"
+    assert table.take([1, 2]) == ["", "é_1"]
+    assert table.take([2, 0]) == ["é_1", "abc"]
+    assert table.take([]) == []
+    assert len(upan.StringTable.from_list([])) == 0
+
+
+def test_load_pangenome_wrong(caplog):
+    """
+    Test that an empty pangenome file gives an error
+    """
+    logger = logging.getLogger("test_pan")
+    panfile = os.path.join(GENEPATH, "empty.txt")
+    open(panfile, "w").close()
+    with pytest.raises(SystemExit):
+        upan.load_pangenome(panfile, logger)
+    assert "Error in pangenome file. No family found." in caplog.text
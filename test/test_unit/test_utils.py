@@ -382,6 +382,33 @@ def test_sort_proteins_other_format():
     assert sorted_prot == exp
 
 
+def test_sort_proteins_species_underscore():
+    """
+    Test that a gembase-like protein whose species name contains "_" is sorted by its
+    species, strain number and protein number
+    """
+    assert utils.sort_proteins("ESCO_1.1512.00001.i0002_12124") == ("ESCO_1", 1, 12124)
+    proteins = ["ESCO_1.1512.00002.i0001_3", "ESCO_1.1512.00001.i0002_12124",
+                "ESCO.1512.00003.i0001_1"]
+    assert sorted(proteins, key=utils.sort_proteins) == ["ESCO.1512.00003.i0001_1",
+                                                         "ESCO_1.1512.00001.i0002_12124",
+                                                         "ESCO_1.1512.00002.i0001_3"]
+
+
+def test_split_protein():
+    """
+    Test that protein names are split into their genome name and protein number, for
+    gembase-like names (with "_" in species name or not) and other names
+    """
+    assert utils.split_protein("ESCO.1512.00001.i0002_12124") == ("ESCO.1512.00001", "12124")
+    assert utils.split_protein("ESCO_1.1512.00001.i0002_12124") == ("ESCO_1.1512.00001",
+                                                                    "12124")
+    assert utils.split_protein("GEN.1017.00001_00002") == ("GEN.1017.00001", "00002")
+    assert utils.split_protein("a_my_prot_15") == ("a_my_prot", "15")
+    assert utils.split_protein("ESCO.1512.00001.i0002") == ("ESCO.1512.00001", "")
+    assert utils.split_protein("error-protein") == ("", "")
+
+
 def test_sort_proteins_error_format1(caplog):
     """
     Test that when a protein name does not follow the format <alpha_num>_<num>,
@@ -398,6 +425,7 @@ def test_sort_proteins_error_format1(caplog):
             "Please change its name.") in caplog.text
 
 
+
 def test_read_genomes_nofile(caplog):
     """
     Test that when the genome list file provided does not exist, it
@@ -874,6 +902,51 @@ def test_run_cmd_retcode_non0_quit(caplog):
     assert error in caplog.text
 
 
+def test_run_cmd_peak_mem():
+    """
+    Test that the peak memory of the command is given, with its return code
+    """
+    import sys
+    call = utils.run_cmd(f"{sys.executable} -c 'a = bytearray(100000000)'", "error")
+    assert call.returncode == 0
+    assert call.peak_mem >= 100000000
+    call = utils.run_cmd(f"{sys.executable} -c 'import sys; sys.exit(3)'", "error")
+    assert call.returncode == 3
+    assert call.peak_mem > 0
+
+
+def test_run_cmd_stdin_files():
+    """
+    Test that the content of the given files, possibly compressed, is given to the command
+    standard input
+    """
+    import gzip
+    file1 = os.path.join(GENEPATH, "stdin1.txt")
+    file2 = os.path.join(GENEPATH, "stdin2.txt.gz")
+    outfile = os.path.join(GENEPATH, "stdout.txt")
+    with open(file1, "w") as inf:
+        inf.write(">seq1\nACGT\n")
+    with gzip.open(file2, "wt") as inf:
+        inf.write(">seq2\nTTTT\n")
+    with open(outfile, "w") as outf:
+        call = utils.run_cmd("cat", "error", stdout=outf, stdin_files=[file1, file2])
+    assert call.returncode == 0
+    with open(outfile) as outf:
+        assert outf.read() == ">seq1\nACGT\n>seq2\nTTTT\n"
+
+
+def test_run_cmd_stdin_files_stopped(caplog):
+    """
+    Test that when the command stops before reading all its input, its error is returned
+    """
+    file1 = os.path.join(GENEPATH, "stdin1.txt")
+    with open(file1, "w") as inf:
+        inf.write("A" * 1000000)
+    call = utils.run_cmd("false", "command stopped", stdin_files=[file1] * 5)
+    assert call.returncode != 0
+    assert "command stopped" in caplog.text
+
+
 def test_run_cmd_error_stderrfile(caplog):
     """
     Test that when we try to run a command which does not exist, and direct its output to
@@ -1239,3 +1312,14 @@ def test_thread_empty_progressbar(capsys):
     time.sleep(0.5)
     stop_bar = True
     x.join()
+
+
+def test_children_peak_mem():
+    """
+    Test that the peak memory of the finished children is at least the memory used by a
+    child allocating 50MB
+    """
+    import subprocess
+    import sys
+    subprocess.run([sys.executable, "-c", "a = bytearray(50000000)"], check=True)
+    assert utils.children_peak_mem() >= 50000000